@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from chongqinghotpot import views
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill roomId, senderId, senderType, messageAt and status on "
+        "qontak_message_interactions from rawJson in batches "
+        "(qontak_backfill_message_interaction_columns)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per call (default 1000)')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds to pause between batches (default 0.1)')
+
+    def handle(self, *args, **options):
+        supabase = views.create_cq_hotpot_supabase_client()
+
+        total = 0
+        while True:
+            updated = supabase.rpc('qontak_backfill_message_interaction_columns', {
+                'p_batch_size': options['batch_size'],
+            }).execute().data or 0
+            if not updated:
+                # A short batch is not the end: SKIP LOCKED leaves out rows other writers hold
+                break
+            total += updated
+            self.stdout.write(f"qontak_message_interactions: {total} rows backfilled")
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f"qontak_message_interactions: done ({total} rows)"))
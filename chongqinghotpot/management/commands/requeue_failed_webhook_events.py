@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from chongqinghotpot import views
+
+
+class Command(BaseCommand):
+    help = (
+        "Move Qontak webhook events that gave up after repeated failures (failed_events in "
+        "the local buffer) back into the queue, e.g. once the cause has been fixed. The "
+        "running workers insert them on their next flush."
+    )
+
+    def handle(self, *args, **options):
+        buffer = views.message_interaction_buffer
+        failed = buffer.stats()['failed']
+        if not failed:
+            self.stdout.write(f"{buffer.table}: no failed events")
+            return
+        moved = buffer.requeue_failed()
+        self.stdout.write(self.style.SUCCESS(f"{buffer.table}: {moved} failed events requeued"))
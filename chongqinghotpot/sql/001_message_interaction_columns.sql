@@ -0,0 +1,85 @@
+-- Typed columns for qontak_message_interactions, extracted from rawJson.
+--
+-- New rows get them at ingest (message_interaction_columns in chongqinghotpot/views.py,
+-- which must stay in step with the extraction below) with "fieldsVersion" = 1.
+-- Existing rows are filled by qontak_backfill_message_interaction_columns in batches:
+--   python manage.py backfill_message_interaction_columns
+--
+-- Apply to the CQ Hotpot Supabase database with:
+--   psql "$CQ_HOTPOT_DATABASE_URL" -f chongqinghotpot/sql/001_message_interaction_columns.sql
+-- (run outside a transaction; the indexes are built CONCURRENTLY)
+
+ALTER TABLE public.qontak_message_interactions ADD COLUMN IF NOT EXISTS "roomId" text;
+ALTER TABLE public.qontak_message_interactions ADD COLUMN IF NOT EXISTS "senderId" text;
+ALTER TABLE public.qontak_message_interactions ADD COLUMN IF NOT EXISTS "senderType" text;
+ALTER TABLE public.qontak_message_interactions ADD COLUMN IF NOT EXISTS "messageAt" timestamptz;
+ALTER TABLE public.qontak_message_interactions ADD COLUMN IF NOT EXISTS "status" text;
+-- Version of the extraction a row was filled with; NULL means not extracted yet
+ALTER TABLE public.qontak_message_interactions ADD COLUMN IF NOT EXISTS "fieldsVersion" smallint;
+
+-- Room history by time range (GET /api/chongqinghotpot/message-interactions/), keyset on (messageAt, id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS qontak_message_interactions_room_message_at_idx
+    ON public.qontak_message_interactions ("roomId", "messageAt" DESC, "id" DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS qontak_message_interactions_sender_message_at_idx
+    ON public.qontak_message_interactions ("senderId", "messageAt" DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS qontak_message_interactions_status_message_at_idx
+    ON public.qontak_message_interactions ("status", "messageAt" DESC);
+
+-- Rows still to backfill; empty once the backfill has run
+CREATE INDEX CONCURRENTLY IF NOT EXISTS qontak_message_interactions_unextracted_idx
+    ON public.qontak_message_interactions ("id")
+    WHERE "fieldsVersion" IS NULL;
+
+-- ISO 8601 text or epoch seconds/milliseconds to timestamptz; NULL when unparseable.
+-- Text without an offset is UTC, not the session TimeZone, as in parse_qontak_timestamp.
+CREATE OR REPLACE FUNCTION public.qontak_parse_timestamp(p_value text)
+RETURNS timestamptz
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    IF p_value IS NULL OR p_value = '' THEN
+        RETURN NULL;
+    END IF;
+    IF p_value ~ '^\d+(\.\d+)?$' THEN
+        RETURN to_timestamp(CASE WHEN p_value::numeric > 1e11 THEN p_value::numeric / 1000 ELSE p_value::numeric END);
+    END IF;
+    IF p_value ~ '\d{2}:\d{2}(:\d{2}(\.\d+)?)?\s*([Zz]|[+-]\d{2}(:?\d{2})?)$' THEN
+        RETURN p_value::timestamptz;
+    END IF;
+    RETURN p_value::timestamp AT TIME ZONE 'UTC';
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$;
+
+-- Fill one batch of rows that have not been extracted yet; returns the number of rows updated.
+CREATE OR REPLACE FUNCTION public.qontak_backfill_message_interaction_columns(p_batch_size int DEFAULT 1000)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_updated int;
+BEGIN
+    UPDATE public.qontak_message_interactions AS t SET
+        "roomId" = coalesce(nullif(t."rawJson"->>'room_id', ''), nullif(t."rawJson"->'room'->>'id', '')),
+        "senderId" = coalesce(nullif(t."rawJson"->>'sender_id', ''), nullif(t."rawJson"->'sender'->>'id', ''),
+                              nullif(t."rawJson"->>'participant_id', '')),
+        "senderType" = coalesce(nullif(t."rawJson"->>'sender_type', ''), nullif(t."rawJson"->'sender'->>'type', ''),
+                                nullif(t."rawJson"->>'participant_type', '')),
+        "messageAt" = public.qontak_parse_timestamp(coalesce(nullif(t."rawJson"->>'created_at', ''), nullif(t."rawJson"->>'timestamp', ''))),
+        "status" = nullif(t."rawJson"->>'status', ''),
+        "fieldsVersion" = 1
+    WHERE t.ctid IN (
+        SELECT s.ctid FROM public.qontak_message_interactions AS s
+        WHERE s."fieldsVersion" IS NULL
+        LIMIT greatest(p_batch_size, 1)
+        FOR UPDATE SKIP LOCKED
+    );
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
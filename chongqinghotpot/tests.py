@@ -1,3 +1,243 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ecosuite.benchmarks.fake_supabase import FakeSupabase
+from taratechapi.cache import LockTimeout, cache_lock
+
+from . import views
+from .webhook_buffer import RecentKeys, WebhookBuffer
+
+
+class SharedCacheTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings = override_settings(CACHES={'default': {'BACKEND': 'taratechapi.cache.FileBasedCache', 'LOCATION': directory}})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_add_is_atomic_between_writers(self):
+        results = []
+        threads = [threading.Thread(target=lambda i=i: results.append(cache.add('key', i))) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 1)
+
+    def test_cache_lock_excludes_other_holders_until_released(self):
+        with cache_lock('refresh'):
+            with self.assertRaises(LockTimeout), cache_lock('refresh', wait=0):
+                pass
+        with cache_lock('refresh', wait=0):
+            self.assertIsNotNone(cache.get('lock:refresh'))
+        self.assertIsNone(cache.get('lock:refresh'))
+
+    def test_expired_crm_token_is_refreshed_once_for_concurrent_callers(self):
+        views.save_crm_tokens('old-access', 'old-refresh', time.time() - 10)
+        refreshes = views.CRM_TOKEN_REFRESHES.value(('request', 'ok'))
+        waiters = views.CRM_TOKEN_REFRESH_WAITERS.value()
+        pause = threading.Event()
+
+        def token_url(url, **kwargs):
+            # Hold the refresh until the other callers have found the token expired and are waiting
+            while loads.call_count < 6:
+                pause.wait(0.01)
+            pause.wait(0.2)
+            self.assertEqual(kwargs['data']['refresh_token'], 'old-refresh')
+            return mock.Mock(status_code=200, json=lambda: {'access_token': 'new-access', 'refresh_token': 'new-refresh', 'expires_in': 3600})
+
+        results = []
+        with mock.patch.object(views, 'CRM_CLIENT_ID', 'id'), mock.patch.object(views, 'CRM_CLIENT_SECRET', 'secret'), \
+                mock.patch.object(views, 'load_crm_tokens', wraps=views.load_crm_tokens) as loads, \
+                mock.patch.object(views.requests, 'post', side_effect=token_url) as post:
+            threads = [threading.Thread(target=lambda: results.append(views.get_crm_oauth_token())) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(results, ['new-access'] * 5)
+        self.assertEqual(views.load_crm_tokens()['refresh_token'], 'new-refresh')
+        self.assertEqual(views.CRM_TOKEN_REFRESHES.value(('request', 'ok')), refreshes + 1)
+        self.assertEqual(views.CRM_TOKEN_REFRESH_WAITERS.value(), waiters + 4)
+
+    def test_background_refresh_only_near_expiry(self):
+        response = mock.Mock(status_code=200, json=lambda: {'access_token': 'new-access', 'expires_in': 3600})
+        with mock.patch.object(views, 'CRM_CLIENT_ID', 'id'), mock.patch.object(views, 'CRM_CLIENT_SECRET', 'secret'), \
+                mock.patch.object(views.requests, 'post', return_value=response) as post:
+            views.save_crm_tokens('access', 'refresh', time.time() + views.CRM_TOKEN_REFRESH_AHEAD + 600)
+            self.assertFalse(views.refresh_crm_token_ahead())
+            views.save_crm_tokens('access', 'refresh', time.time() + views.CRM_TOKEN_REFRESH_AHEAD - 60)
+            self.assertTrue(views.refresh_crm_token_ahead())
+
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(views.load_crm_tokens()['access_token'], 'new-access')
+
+    def test_crm_tokens_are_one_record(self):
+        views.save_crm_tokens('access', 'refresh', time.time() + 3600)
+        self.assertEqual(set(cache.get(views.CRM_TOKEN_CACHE_KEY)), {'access_token', 'refresh_token', 'expires_at'})
+        self.assertEqual(views.get_crm_oauth_token(), 'access')
+
+
+class WebhookBufferTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = Path(directory) / 'buffer.sqlite3'
+        self.db = FakeSupabase()
+
+    def buffer(self, **kwargs):
+        buffer = WebhookBuffer(self.path, 'qontak_message_interactions', lambda: self.db, **kwargs)
+        patcher = mock.patch.object(buffer, 'start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return buffer
+
+    def test_events_are_inserted_in_batches(self):
+        buffer = self.buffer(batch_size=2)
+        for i in range(5):
+            buffer.append({'id': str(i), 'type': 'message'})
+        self.assertEqual(buffer.stats()['pending'], 5)
+
+        buffer.flush()
+
+        self.assertEqual([row['id'] for row in self.db.rows('qontak_message_interactions')], ['0', '1', '2', '3', '4'])
+        stats = buffer.stats()
+        self.assertEqual((stats['pending'], stats['batches'], stats['flushed']), (0, 3, 5))
+
+    def test_failed_batches_back_off_then_move_to_failed(self):
+        buffer = self.buffer(max_attempts=2)
+        buffer.append({'id': '1'})
+        with mock.patch.object(self.db, 'table', side_effect=ConnectionError('down')):
+            buffer.flush()
+            self.assertEqual((buffer.stats()['pending'], buffer.stats()['failed']), (1, 0))
+            # Backing off: not due again yet
+            self.assertEqual(buffer.flush_once(), 0)
+            with mock.patch('taratechapi.buffer.time.time', return_value=time.time() + 10):
+                buffer.flush()
+
+        stats = buffer.stats()
+        self.assertEqual((stats['pending'], stats['failed'], stats['failedBatches']), (0, 1, 2))
+        self.assertEqual(self.db.rows('qontak_message_interactions'), [])
+
+    def test_rejected_event_does_not_hold_back_the_rest_of_its_batch(self):
+        buffer = self.buffer(max_attempts=1)
+        for i in range(5):
+            buffer.append({'id': str(i), 'bad': i == 3})
+        table = self.db.table
+
+        def reject_bad_rows(name):
+            query = table(name)
+            insert = query.insert
+
+            def checked_insert(rows):
+                if any(row['bad'] for row in rows):
+                    raise ValueError('column "bad" does not exist')
+                return insert(rows)
+            query.insert = checked_insert
+            return query
+
+        with mock.patch.object(self.db, 'table', side_effect=reject_bad_rows):
+            self.assertEqual(buffer.flush_once(), 4)
+
+        self.assertEqual(sorted(row['id'] for row in self.db.rows('qontak_message_interactions')), ['0', '1', '2', '4'])
+        self.assertEqual((buffer.stats()['pending'], buffer.stats()['failed']), (0, 1))
+
+        # Once the cause is fixed, the failed event is put back and inserted
+        self.assertEqual(buffer.requeue_failed(), 1)
+        buffer.flush()
+        self.assertEqual(len(self.db.rows('qontak_message_interactions')), 5)
+        self.assertEqual((buffer.stats()['pending'], buffer.stats()['failed']), (0, 0))
+
+    def post_webhook(self, buffer, event):
+        with mock.patch.object(views, 'message_interaction_buffer', buffer):
+            return self.client.post('/api/chongqinghotpot/handle-message-interaction-webhook/', event, content_type='application/json')
+
+    def test_webhook_acknowledges_after_buffering(self):
+        buffer = self.buffer()
+        with mock.patch.object(views, 'recent_message_interactions', RecentKeys()):
+            response = self.post_webhook(buffer, {'id': 'evt-1', 'type': 'message_interaction', 'room_id': 'room-1'})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(buffer.stats()['pending'], 1)
+        self.assertEqual(self.db.rows('qontak_message_interactions'), [])
+        buffer.flush()
+        self.assertEqual(self.db.rows('qontak_message_interactions')[0]['roomId'], 'room-1')
+
+    def test_redeliveries_are_dropped(self):
+        buffer = self.buffer(on_conflict='id')
+        event = {'id': 'evt-1', 'type': 'message_interaction', 'room_id': 'room-1'}
+        with mock.patch.object(views, 'recent_message_interactions', RecentKeys()):
+            first = self.post_webhook(buffer, event)
+            again = self.post_webhook(buffer, event)
+            other_type = self.post_webhook(buffer, {**event, 'type': 'status'})
+
+        self.assertEqual((first.status_code, again.status_code, other_type.status_code), (202, 200, 202))
+        self.assertEqual(first.json()['id'], again.json()['id'])
+        self.assertEqual(buffer.stats()['pending'], 2)
+
+        # A redelivery that reached another worker is skipped by the upsert
+        buffer.append({'id': first.json()['id'], 'type': 'message_interaction', 'rawJson': event})
+        buffer.flush()
+        self.assertEqual(len(self.db.rows('qontak_message_interactions')), 2)
+
+    def test_recent_keys_are_bounded(self):
+        recent = RecentKeys(max_size=2)
+        self.assertEqual([recent.add(key) for key in ('a', 'b', 'a', 'c', 'b')], [True, True, False, True, True])
+
+
+class MessageInteractionColumnsTest(SimpleTestCase):
+    def test_columns_are_extracted_from_flat_and_nested_events(self):
+        self.assertEqual(views.message_interaction_columns({
+            'room_id': 'room-1', 'sender_id': 42, 'sender_type': 'customer',
+            'created_at': '2026-03-01T10:00:00.000Z', 'status': 'read',
+        }), {
+            'roomId': 'room-1', 'senderId': '42', 'senderType': 'customer',
+            'messageAt': '2026-03-01T10:00:00+00:00', 'status': 'read', 'fieldsVersion': 1,
+        })
+        columns = views.message_interaction_columns({'room': {'id': 'room-2'}, 'sender': {'id': 's', 'type': 'agent'}, 'timestamp': 1772359200000})
+        self.assertEqual((columns['roomId'], columns['senderId'], columns['senderType']), ('room-2', 's', 'agent'))
+        self.assertEqual(columns['messageAt'], '2026-03-01T10:00:00+00:00')
+        self.assertIsNone(views.message_interaction_columns({'created_at': 'yesterday'})['messageAt'])
+
+    def test_room_history_by_time_range(self):
+        db = FakeSupabase()
+        db.tables['qontak_message_interactions'] = [
+            {'id': f'm{i}', 'roomId': 'room-1' if i % 2 else 'room-2', 'messageAt': f'2026-03-01T{10 + i:02d}:00:00+00:00'}
+            for i in range(8)
+        ]
+        token = AccessToken()
+        token['id'] = 'user-1'
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        with mock.patch.object(views, 'create_cq_hotpot_supabase_client', return_value=db):
+            page = self.client.get('/api/chongqinghotpot/message-interactions/', {
+                'room_id': 'room-1', 'start': '2026-03-01T11:00:00+00:00', 'end': '2026-03-01T16:00:00+00:00', 'limit': 2,
+            }, **auth)
+            missing_room = self.client.get('/api/chongqinghotpot/message-interactions/', **auth)
+            anonymous = self.client.get('/api/chongqinghotpot/message-interactions/', {'room_id': 'room-1'})
+
+        self.assertEqual(page.status_code, 200)
+        self.assertEqual([row['id'] for row in page.json()['data']], ['m5', 'm3'])
+        self.assertIsNotNone(page.json()['next_cursor'])
+        self.assertEqual(missing_room.status_code, 400)
+        self.assertEqual(anonymous.status_code, 401)
+
+    def test_backfill_continues_past_short_batches(self):
+        supabase = mock.Mock()
+        supabase.rpc.return_value.execute.side_effect = [mock.Mock(data=n) for n in (2, 1, 2, 0)]
+        with mock.patch.object(views, 'create_cq_hotpot_supabase_client', return_value=supabase):
+            call_command('backfill_message_interaction_columns', '--batch-size', '2', '--sleep', '0', stdout=StringIO())
+
+        self.assertEqual(supabase.rpc.call_count, 4)
@@ -7,6 +7,8 @@ urlpatterns = [
 
     # Qontak message interactions
     path("handle-message-interaction-webhook/", handle_message_interaction_webhook, name="handle_message_interaction_webhook"),
+    path("message-interaction-buffer-status/", message_interaction_buffer_status, name="message_interaction_buffer_status"),
+    path("message-interactions/", get_message_interactions, name="get_message_interactions"),
 
     
     # CRM OAuth Flow
@@ -6,17 +6,29 @@ import json
 from datetime import datetime, timezone
 import time
 import os
+import random
+import threading
 import uuid
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse, HttpResponseRedirect
 from django.urls import reverse
+from django.conf import settings
 from django.core.cache import cache
 from urllib.parse import urlencode
 from django.utils import timezone as django_timezone
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import IsAuthenticated
+from typing import TYPE_CHECKING
 
-import supabase
-from supabase import create_client, Client, ClientOptions
+from ecosuite.pagination import apply_date_range, keyset_page, parse_page_size
+from taratechapi.async_api import async_api_view, async_client
+from taratechapi.cache import cache_lock
+from taratechapi.metrics import Counter, register
+
+from .webhook_buffer import DUPLICATE_EVENTS, RecentKeys, WebhookBuffer
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # --------------------------
 # CONFIG
@@ -31,10 +43,28 @@ CQ_HOTPOT_QONTAK_CRM_BASE_URL = os.getenv('CQ_HOTPOT_QONTAK_CRM_BASE_URL', 'http
 CQ_HOTPOT_QONTAK_CRM_TOKEN_URL = os.getenv('CQ_HOTPOT_QONTAK_CRM_TOKEN_URL', 'https://app.qontak.com/oauth/token')
 CQ_HOTPOT_QONTAK_CRM_AUTHORIZE_URL = os.getenv('CQ_HOTPOT_QONTAK_CRM_AUTHORIZE_URL', 'https://app.qontak.com/oauth/authorize')
 
-# Token cache keys for CRM OAuth tokens (using Django cache framework)
-CRM_TOKEN_CACHE_KEY = 'crm_oauth_access_token'
-CRM_REFRESH_TOKEN_CACHE_KEY = 'crm_oauth_refresh_token'
-CRM_TOKEN_EXPIRES_AT_KEY = 'crm_oauth_expires_at'
+# CRM OAuth tokens are kept as one record in the shared Django cache, so every worker
+# sees the same access token, refresh token and expiry, and never half of an update
+CRM_TOKEN_CACHE_KEY = 'crm_oauth_tokens'
+CRM_TOKEN_CACHE_TIMEOUT = 86400
+
+# Qontak rotates the refresh token on every refresh, so refreshes are serialized across
+# workers with this cache lock; callers that waited reuse the token the holder got
+CRM_TOKEN_REFRESH_LOCK = 'crm_oauth_refresh'
+# The background refresher renews the token this many seconds before it expires,
+# ahead of request-path callers (which refresh at 60 seconds left)
+CRM_TOKEN_REFRESH_AHEAD = int(os.getenv('CQ_HOTPOT_CRM_TOKEN_REFRESH_AHEAD', '300'))
+CRM_TOKEN_REFRESH_CHECK_INTERVAL = 60
+
+CRM_TOKEN_REFRESHES = register(Counter(
+    'taratech_crm_token_refreshes_total',
+    'Qontak CRM OAuth token refreshes sent to the token URL, by trigger (request or background) and outcome.',
+    ('trigger', 'outcome'),
+))
+CRM_TOKEN_REFRESH_WAITERS = register(Counter(
+    'taratech_crm_token_refresh_waiters_total',
+    'Callers that waited for a CRM token refresh already in progress.',
+))
 
 
 # --------------------------
@@ -106,9 +136,50 @@ def send_mekari_request(method: str, path: str, payload: dict = None, client_id:
     }
 
 
+async def send_mekari_request_async(method: str, path: str, payload: dict = None, client_id: str = CLIENT_ID, client_secret: str = CLIENT_SECRET):
+    """
+    send_mekari_request for async views, on the shared httpx.AsyncClient.
+    """
+    url = BASE_URL.rstrip('/') + path
+    headers = generate_headers(method, path, client_id, client_secret)
+
+    if method.upper() == "GET":
+        response = await async_client().get(url, headers=headers, params=payload)
+    else:
+        response = await async_client().request(method.upper(), url, headers=headers, json=payload)
+
+    try:
+        body = response.json()
+    except Exception:
+        body = response.text
+
+    return {
+        "http_code": response.status_code,
+        "response": body
+    }
+
+
 # --------------------------
 # CRM OAUTH TOKEN MANAGEMENT
 # --------------------------
+def load_crm_tokens():
+    """
+    The cached CRM token record: a dict with access_token, refresh_token and
+    expires_at, or {} when nothing is stored.
+    """
+    return cache.get(CRM_TOKEN_CACHE_KEY) or {}
+
+
+def save_crm_tokens(access_token, refresh_token, expires_at):
+    tokens = {
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+        'expires_at': expires_at
+    }
+    cache.set(CRM_TOKEN_CACHE_KEY, tokens, timeout=CRM_TOKEN_CACHE_TIMEOUT)
+    return tokens
+
+
 def exchange_authorization_code_for_token(authorization_code):
     """
     Exchange authorization code for access token using OAuth Authorization Code flow.
@@ -170,38 +241,47 @@ def exchange_authorization_code_for_token(authorization_code):
         
         # Store tokens in cache (cache for 24 hours to ensure persistence)
         try:
-            cache.set(CRM_TOKEN_CACHE_KEY, access_token, timeout=86400)
-            cache.set(CRM_REFRESH_TOKEN_CACHE_KEY, refresh_token, timeout=86400)
-            cache.set(CRM_TOKEN_EXPIRES_AT_KEY, expires_at, timeout=86400)
+            tokens = save_crm_tokens(access_token, refresh_token, expires_at)
             
             # Verify tokens were saved
-            saved_access_token = cache.get(CRM_TOKEN_CACHE_KEY)
-            saved_refresh_token = cache.get(CRM_REFRESH_TOKEN_CACHE_KEY)
-            saved_expires_at = cache.get(CRM_TOKEN_EXPIRES_AT_KEY)
+            saved = load_crm_tokens()
             
-            if not saved_access_token or not saved_refresh_token or not saved_expires_at:
-                raise Exception(f"Failed to save tokens to cache. Saved: access_token={saved_access_token is not None}, refresh_token={saved_refresh_token is not None}, expires_at={saved_expires_at is not None}")
+            if not saved.get('access_token') or not saved.get('refresh_token') or not saved.get('expires_at'):
+                raise Exception(f"Failed to save tokens to cache. Saved: access_token={saved.get('access_token') is not None}, refresh_token={saved.get('refresh_token') is not None}, expires_at={saved.get('expires_at') is not None}")
         except Exception as cache_error:
             raise Exception(f"Cache error while saving tokens: {str(cache_error)}")
         
-        return {
-            'access_token': access_token,
-            'refresh_token': refresh_token,
-            'expires_at': expires_at
-        }
+        return tokens
     except Exception as e:
         raise Exception(f"Failed to exchange authorization code: {str(e)}")
 
 
-def refresh_crm_access_token():
+def refresh_crm_access_token(min_valid=60, trigger='request'):
     """
     Refresh the access token using refresh_token.
+    Only one refresh runs at a time across all workers. A caller that gets the lock
+    after someone else's refresh returns the new token if it still has min_valid
+    seconds left, instead of refreshing again.
     
     Returns:
         Access token string
     """
-    refresh_token = cache.get(CRM_REFRESH_TOKEN_CACHE_KEY)
-    
+    with cache_lock(CRM_TOKEN_REFRESH_LOCK, timeout=60, wait=30) as waited:
+        if waited:
+            CRM_TOKEN_REFRESH_WAITERS.inc()
+        tokens = load_crm_tokens()
+        if tokens.get('access_token') and time.time() < (tokens.get('expires_at') or 0) - min_valid:
+            return tokens['access_token']
+        try:
+            access_token = _send_crm_token_refresh(tokens.get('refresh_token'))
+        except Exception:
+            CRM_TOKEN_REFRESHES.inc((trigger, 'failed'))
+            raise
+        CRM_TOKEN_REFRESHES.inc((trigger, 'ok'))
+        return access_token
+
+
+def _send_crm_token_refresh(refresh_token):
     if not refresh_token:
         raise Exception("No refresh token available. Please re-authenticate via /crm/login/")
     
@@ -222,7 +302,8 @@ def refresh_crm_access_token():
     }
     
     try:
-        response = requests.post(url, headers=headers, data=payload)
+        # Bounded well inside the refresh lock's 60 second expiry
+        response = requests.post(url, headers=headers, data=payload, timeout=20)
         
         if response.status_code != 200:
             error_detail = response.text
@@ -253,9 +334,7 @@ def refresh_crm_access_token():
         expires_at = time.time() + expires_in
         
         # Store tokens in cache (cache for 24 hours to ensure persistence)
-        cache.set(CRM_TOKEN_CACHE_KEY, access_token, timeout=86400)
-        cache.set(CRM_REFRESH_TOKEN_CACHE_KEY, new_refresh_token, timeout=86400)
-        cache.set(CRM_TOKEN_EXPIRES_AT_KEY, expires_at, timeout=86400)
+        save_crm_tokens(access_token, new_refresh_token, expires_at)
         
         return access_token
     except Exception as e:
@@ -279,8 +358,9 @@ def get_crm_oauth_token(force_refresh=False):
     """
     # Check if we have a valid cached token
     if not force_refresh:
-        access_token = cache.get(CRM_TOKEN_CACHE_KEY)
-        expires_at = cache.get(CRM_TOKEN_EXPIRES_AT_KEY)
+        tokens = load_crm_tokens()
+        access_token = tokens.get('access_token')
+        expires_at = tokens.get('expires_at')
         
         if access_token and expires_at:
             # Check if token is still valid (with 60 second buffer)
@@ -288,7 +368,7 @@ def get_crm_oauth_token(force_refresh=False):
                 return access_token
             
             # Token expired, try to refresh
-            refresh_token = cache.get(CRM_REFRESH_TOKEN_CACHE_KEY)
+            refresh_token = tokens.get('refresh_token')
             if refresh_token:
                 try:
                     return refresh_crm_access_token()
@@ -300,6 +380,44 @@ def get_crm_oauth_token(force_refresh=False):
     raise Exception("No valid access token. Please authenticate first by visiting /api/chongqinghotpot/crm/login/")
 
 
+def refresh_crm_token_ahead():
+    """
+    Refresh the CRM token if it expires within CRM_TOKEN_REFRESH_AHEAD seconds.
+    Returns True when the token was (or already had been) renewed.
+    """
+    tokens = load_crm_tokens()
+    if not tokens.get('refresh_token') or time.time() < (tokens.get('expires_at') or 0) - CRM_TOKEN_REFRESH_AHEAD:
+        return False
+    refresh_crm_access_token(min_valid=CRM_TOKEN_REFRESH_AHEAD, trigger='background')
+    return True
+
+
+def _run_crm_token_refresher():
+    while True:
+        # Jittered so the workers don't all check at the same moment
+        time.sleep(CRM_TOKEN_REFRESH_CHECK_INTERVAL * random.uniform(0.75, 1.25))
+        try:
+            refresh_crm_token_ahead()
+        except Exception as e:
+            print(f"Background CRM token refresh failed: {e}")
+
+
+_crm_token_refresher = None
+_crm_token_refresher_lock = threading.Lock()
+
+
+def start_crm_token_refresher():
+    """
+    Start this worker's daemon thread that renews the CRM token before it expires,
+    so request-path callers rarely find it expired. Safe to call more than once.
+    """
+    global _crm_token_refresher
+    with _crm_token_refresher_lock:
+        if _crm_token_refresher is None or not _crm_token_refresher.is_alive():
+            _crm_token_refresher = threading.Thread(target=_run_crm_token_refresher, name='crm-token-refresher', daemon=True)
+            _crm_token_refresher.start()
+
+
 # --------------------------
 # CRM REQUEST FUNCTION
 # --------------------------
@@ -357,6 +475,44 @@ def send_mekari_crm_request(method: str, path: str, params: dict = None, payload
     }
 
 
+async def send_mekari_crm_request_async(method: str, path: str, params: dict = None, payload: dict = None):
+    """
+    send_mekari_crm_request for async views, on the shared httpx.AsyncClient.
+    The token lookup (and refresh, when expired) still runs in a worker thread.
+    """
+    try:
+        access_token = await sync_to_async(get_crm_oauth_token, thread_sensitive=False)()
+    except Exception as e:
+        request_info = {
+            "method": method,
+            "path": path,
+            "params": params,
+            "payload": payload
+        }
+        raise Exception(f"{str(e)}. CRM API request info: {request_info}")
+
+    url = f"{CQ_HOTPOT_QONTAK_CRM_BASE_URL}{path}"
+    headers = {
+        'Authorization': f'Bearer {access_token}',
+        'Content-Type': 'application/json'
+    }
+
+    if method.upper() == "GET":
+        response = await async_client().get(url, headers=headers, params=params)
+    else:
+        response = await async_client().request(method.upper(), url, headers=headers, json=payload, params=params)
+
+    try:
+        body = response.json()
+    except Exception:
+        body = response.text
+
+    return {
+        "http_code": response.status_code,
+        "response": body
+    }
+
+
 # --------------------------
 # CRM OAUTH FLOW VIEWS
 # --------------------------
@@ -407,9 +563,10 @@ def crm_callback(request):
         token_data = exchange_authorization_code_for_token(authorization_code)
         
         # Verify tokens are in cache after saving
-        access_token_check = cache.get(CRM_TOKEN_CACHE_KEY)
-        refresh_token_check = cache.get(CRM_REFRESH_TOKEN_CACHE_KEY)
-        expires_at_check = cache.get(CRM_TOKEN_EXPIRES_AT_KEY)
+        saved = load_crm_tokens()
+        access_token_check = saved.get('access_token')
+        refresh_token_check = saved.get('refresh_token')
+        expires_at_check = saved.get('expires_at')
         
         return JsonResponse({
             "message": "Successfully authenticated with Qontak CRM",
@@ -443,9 +600,10 @@ def crm_token_status(request):
     cache_test_result = cache.get(test_key)
     cache_working = cache_test_result == test_value
     
-    access_token = cache.get(CRM_TOKEN_CACHE_KEY)
-    refresh_token = cache.get(CRM_REFRESH_TOKEN_CACHE_KEY)
-    expires_at = cache.get(CRM_TOKEN_EXPIRES_AT_KEY)
+    tokens = load_crm_tokens()
+    access_token = tokens.get('access_token')
+    refresh_token = tokens.get('refresh_token')
+    expires_at = tokens.get('expires_at')
     
     current_time = time.time()
     is_valid = False
@@ -473,8 +631,8 @@ def crm_token_status(request):
     }, status=200)
 
 
-def get_all_whatsapp_templates(request):
-    response = send_mekari_request("GET", "/qontak/chat/v1/templates/whatsapp", {})
+async def get_all_whatsapp_templates(request):
+    response = await send_mekari_request_async("GET", "/qontak/chat/v1/templates/whatsapp", {})
 
     # response is a dict with 'http_code' and 'response' keys
     http_code = response.get('http_code', 200)
@@ -490,8 +648,8 @@ def get_all_whatsapp_templates(request):
     return JsonResponse(data, status=http_code)
 
 
-def get_all_rooms(request):
-    response = send_mekari_request("GET", "/qontak/chat/v1/rooms", {})
+async def get_all_rooms(request):
+    response = await send_mekari_request_async("GET", "/qontak/chat/v1/rooms", {})
 
     # response is a dict with 'http_code' and 'response' keys
     http_code = response.get('http_code', 200)
@@ -506,23 +664,109 @@ def get_all_rooms(request):
 
     return JsonResponse(data, status=http_code)
 
-def create_cq_hotpot_supabase_client() -> Client:
-    """Create Supabase client for Chongqing Hotpot using CQ_HOTPOT_SUPABASE credentials."""
+_cq_hotpot_supabase_clients = {}
+_cq_hotpot_supabase_clients_lock = threading.Lock()
+
+
+def create_cq_hotpot_supabase_client() -> 'Client':
+    """
+    Supabase client for Chongqing Hotpot using CQ_HOTPOT_SUPABASE credentials.
+    One client per process, so its HTTP connections are reused.
+    """
     url = os.getenv('CQ_HOTPOT_SUPABASE_CLIENT_URL')
     key = os.getenv('CQ_HOTPOT_SUPABASE_CLIENT_SECRET')
     if not url or not key:
         raise Exception("CQ_HOTPOT_SUPABASE_CLIENT_URL and CQ_HOTPOT_SUPABASE_CLIENT_SECRET environment variables must be set")
-    return create_client(url, key, options=ClientOptions())
+    client = _cq_hotpot_supabase_clients.get((url, key))
+    if client is None:
+        with _cq_hotpot_supabase_clients_lock:
+            client = _cq_hotpot_supabase_clients.get((url, key))
+            if client is None:
+                # Imported here so workers don't pay for supabase at startup
+                from supabase import ClientOptions, create_client
+                client = _cq_hotpot_supabase_clients[(url, key)] = create_client(url, key, options=ClientOptions())
+    return client
+
+
+# Qontak webhooks are acknowledged once they are in this local buffer; a background
+# thread per worker bulk-inserts them into qontak_message_interactions
+message_interaction_buffer = WebhookBuffer(
+    settings.QONTAK_WEBHOOK_BUFFER_PATH,
+    'qontak_message_interactions',
+    create_cq_hotpot_supabase_client,
+    batch_size=int(os.getenv('CQ_HOTPOT_WEBHOOK_BATCH_SIZE', '200')),
+    flush_interval=float(os.getenv('CQ_HOTPOT_WEBHOOK_FLUSH_INTERVAL', '1.0')),
+    on_conflict='id',
+).register_atexit().register_metrics()
+
+# Qontak redelivers webhooks that time out. Record ids are derived from the event's
+# own id and type, so a redelivery gets the same primary key (and is skipped by the
+# flusher's upsert); recently seen ids are dropped here before they reach the buffer.
+MESSAGE_INTERACTION_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'https://app.qontak.com/webhooks/message_interaction')
+recent_message_interactions = RecentKeys(max_size=int(os.getenv('CQ_HOTPOT_WEBHOOK_DEDUPE_SIZE', '10000')))
+
+
+def message_interaction_record_id(webhook_data):
+    """uuid5 of the event's type and id, or a fresh uuid1 when the event has no id."""
+    event_id = webhook_data.get('id')
+    if not event_id:
+        return str(uuid.uuid1())
+    return str(uuid.uuid5(MESSAGE_INTERACTION_ID_NAMESPACE, f"{webhook_data.get('type', '')}:{event_id}"))
+
+
+# Bump when message_interaction_columns changes, together with the backfill in
+# chongqinghotpot/sql/001_message_interaction_columns.sql
+MESSAGE_INTERACTION_FIELDS_VERSION = 1
+
+
+def _first_value(data, *paths):
+    for path in paths:
+        value = data
+        for key in path.split('.'):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+
+def parse_qontak_timestamp(value):
+    """ISO 8601 text or epoch seconds/milliseconds to an aware datetime; None when unparseable."""
+    if value is None:
+        return None
+    try:
+        if str(value).replace('.', '', 1).isdigit():
+            seconds = float(value)
+            return datetime.fromtimestamp(seconds / 1000 if seconds > 1e11 else seconds, timezone.utc)
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (ValueError, OverflowError, OSError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def message_interaction_columns(webhook_data):
+    """
+    Typed columns of qontak_message_interactions taken from the raw event, so rooms,
+    senders and time ranges are queried through indexes instead of rawJson.
+    """
+    message_at = parse_qontak_timestamp(_first_value(webhook_data, 'created_at', 'timestamp'))
+    return {
+        'roomId': _first_value(webhook_data, 'room_id', 'room.id'),
+        'senderId': _first_value(webhook_data, 'sender_id', 'sender.id', 'participant_id'),
+        'senderType': _first_value(webhook_data, 'sender_type', 'sender.type', 'participant_type'),
+        'messageAt': message_at.isoformat() if message_at else None,
+        'status': _first_value(webhook_data, 'status'),
+        'fieldsVersion': MESSAGE_INTERACTION_FIELDS_VERSION,
+    }
 
 def set_message_interaction_settings(request):
     pass
 
-@api_view(['GET', 'POST'])
-@permission_classes([AllowAny])
-def handle_message_interaction_webhook(request):
+@async_api_view(['GET', 'POST'])
+async def handle_message_interaction_webhook(request):
     """
     Handle webhook from Qontak for message interactions.
-    Receives webhook data and uploads it to Supabase table 'qontak_message_interactions'.
+    Appends the event to message_interaction_buffer and acknowledges it; the buffer's
+    flusher inserts it into Supabase table 'qontak_message_interactions' in batches.
     
     Expected data structure:
     {
@@ -533,11 +777,12 @@ def handle_message_interaction_webhook(request):
     }
     
     Maps to Supabase model:
-    - id: UUID v1 (String)
+    - id: UUID v5 of type and id, so redeliveries are dropped (UUID v1 if there is no id)
     - createdAt: DateTime
     - rawJson: Map<String, dynamic> (entire response from qontak)
     - type: String (from response)
     - utcOffset: number (default 0)
+    - roomId, senderId, senderType, messageAt, status: see message_interaction_columns
     """
     try:
         # Handle GET requests (webhook verification)
@@ -550,76 +795,104 @@ def handle_message_interaction_webhook(request):
         # Get webhook data from request (POST)
         webhook_data = request.data if hasattr(request, 'data') else {}
         
-        # # If data is empty, try to get from request body
-        # if not webhook_data:
-        #     try:
-        #         if request.body:
-        #             webhook_data = json.loads(request.body)
-        #     except (json.JSONDecodeError, AttributeError):
-        #         pass
-        
         if not webhook_data:
             # Treat as verification ping / empty event
             return JsonResponse({"status": "ok"}, status=200)
         
-        
-
-        
         # Extract type from webhook data
         message_type = webhook_data.get('type', '')
         
-        # Generate UUID v1 for the id
-        record_id = str(uuid.uuid1())
+        record_id = message_interaction_record_id(webhook_data)
+        if not recent_message_interactions.add(record_id):
+            DUPLICATE_EVENTS.inc(('qontak_message_interactions',))
+            return JsonResponse({
+                "message": "Duplicate message interaction ignored",
+                "id": record_id,
+                "type": message_type
+            }, status=200)
         
         # Get current datetime in UTC (since running on fly.io with UTC time)
         current_datetime = datetime.now(timezone.utc)
         
-        # Prepare data for Supabase
-        print('Saving message interaction to database... 0')
         supabase_data = {
             'id': record_id,
             'createdAt': current_datetime.isoformat(),
             'rawJson': webhook_data,  # Store entire webhook data as JSON
             'type': message_type,
-            'utcOffset': 0  # Default to 0 since running on fly.io with UTC time
+            'utcOffset': 0,  # Default to 0 since running on fly.io with UTC time
+            **message_interaction_columns(webhook_data)
         }
         
-        # Create Supabase client and insert data
-        print('Saving message interaction to database... 1')
-        supabase_client = create_cq_hotpot_supabase_client()
-        print('Saving message interaction to database... 2')
         try:
-            response = supabase_client.table('qontak_message_interactions').insert(supabase_data).execute()
+            await sync_to_async(message_interaction_buffer.append, thread_sensitive=False)(supabase_data)
         except Exception as e:
-            print('Error saving message interaction to database...')
-            print(e)
+            # Not buffered, so let Qontak's retry through
+            recent_message_interactions.discard(record_id)
             return JsonResponse({
                 "error": "Failed to save message interaction",
                 "response": str(e)
             }, status=500)
+        
+        return JsonResponse({
+            "message": "Message interaction queued",
+            "id": record_id,
+            "type": message_type,
+            "created_at": current_datetime.isoformat()
+        }, status=202)
             
-        print('Saving message interaction to database... 3')
-        if response.data:
-            print('Successfully saved message interaction to database')
-            return JsonResponse({
-                "message": "Message interaction saved successfully",
-                "id": record_id,
-                "type": message_type,
-                "created_at": current_datetime.isoformat()
-            }, status=201)
-        else:
-            return JsonResponse({
-                "error": "Failed to save message interaction",
-                "response": str(response)
-            }, status=500)
-            
     except Exception as e:
         return JsonResponse({
             "error": str(e),
             "error_type": type(e).__name__
         }, status=500)
 
-def get_all_contacts(request):
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_message_interactions(request):
+    """
+    Message interactions of one room, newest first, optionally within a time range.
+    Served by the (roomId, messageAt, id) index; rows stored before the typed columns
+    existed appear once backfill_message_interaction_columns has run.
+    GET /api/chongqinghotpot/message-interactions/?room_id=xxx&start=<ISO>&end=<ISO>&limit=100&cursor=...
+    Dates may also be YYYY-MM-DD (end inclusive). The next page's cursor is in next_cursor.
+    """
+    room_id = request.GET.get('room_id')
+    if not room_id:
+        return JsonResponse({"error": "room_id is required"}, status=400)
+    
+    try:
+        limit = parse_page_size(request.GET.get('limit'))
+        supabase_client = create_cq_hotpot_supabase_client()
+        query = supabase_client.table('qontak_message_interactions').select('*').eq('roomId', room_id)
+        query = apply_date_range(query, request.GET.get('start'), request.GET.get('end'), column='messageAt')
+        rows, next_cursor = keyset_page(query, request.GET.get('cursor'), limit, column='messageAt')
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({
+            "error": str(e),
+            "error_type": type(e).__name__
+        }, status=500)
+    
+    return JsonResponse({
+        "room_id": room_id,
+        "count": len(rows),
+        "data": rows,
+        "next_cursor": next_cursor
+    }, status=200)
+
+
+def message_interaction_buffer_status(request):
+    """
+    Status of the local message interaction buffer: events waiting to be inserted,
+    events that gave up after repeated failures, and this worker's flush counts.
+    GET /api/chongqinghotpot/message-interaction-buffer-status/
+    """
+    return JsonResponse(message_interaction_buffer.stats(), status=200)
+
+
+async def get_all_contacts(request):
     """
     Get all contacts from CRM API.
     Supports optional query parameters: name, job_title, phone, email, 
@@ -637,7 +910,7 @@ def get_all_contacts(request):
     
     try:
         # Use CRM request function with OAuth token
-        response = send_mekari_crm_request("GET", "/api/v3.1/contacts", params=params)
+        response = await send_mekari_crm_request_async("GET", "/api/v3.1/contacts", params=params)
 
         # response is a dict with 'http_code' and 'response' keys
         if not response:
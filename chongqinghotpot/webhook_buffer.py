@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+
+from taratechapi.buffer import DurableBuffer
+from taratechapi.metrics import Counter, register
+
+
+DUPLICATE_EVENTS = register(Counter(
+    'taratech_webhook_duplicate_events_total',
+    'Webhook redeliveries dropped before buffering, by table.',
+    ('table',),
+))
+
+
+class RecentKeys:
+    """Bounded, thread-safe LRU set of recently seen keys."""
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key):
+        """Remember key; returns False if it was already there."""
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return False
+            self._keys[key] = None
+            if len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._keys.pop(key, None)
+
+
+class WebhookBuffer(DurableBuffer):
+    """
+    DurableBuffer between a webhook and its Supabase table, so the webhook is
+    acknowledged as soon as the event is on disk.
+
+    With on_conflict set, batches are upserted with ignore_duplicates, so events
+    already in the table (redeliveries, or a batch sent twice) are skipped.
+    """
+
+    def __init__(self, path, table, client_factory, on_conflict=None, **kwargs):
+        super().__init__(path, table, **kwargs)
+        self.client_factory = client_factory
+        self.on_conflict = on_conflict
+
+    def deliver(self, records):
+        query = self.client_factory().table(self.table)
+        if self.on_conflict:
+            query.upsert(records, on_conflict=self.on_conflict, ignore_duplicates=True).execute()
+        else:
+            query.insert(records).execute()
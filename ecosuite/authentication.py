@@ -95,3 +95,18 @@ class SupabaseJWTAuthentication(JWTAuthentication):
         except KeyError:
             raise InvalidToken(_("Token contained no recognizable user identification"))
 
+
+
+class SupabaseQueryTokenAuthentication(SupabaseJWTAuthentication):
+    """
+    Reads the JWT from the accessToken query parameter, for EventSource streams,
+    which cannot set an Authorization header.
+    """
+
+    def authenticate(self, request):
+        raw_token = request.query_params.get('accessToken')
+        if not raw_token:
+            return None
+
+        validated_token = self.get_validated_token(raw_token.encode())
+        return (self.get_user(validated_token), validated_token)
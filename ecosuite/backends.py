@@ -0,0 +1,115 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from psycopg2.extras import Json
+
+from taratechapi.metrics import RPC, timer
+
+
+RPC_BACKEND_SUPABASE = 'supabase'
+RPC_BACKEND_POSTGRES = 'postgres'
+RPC_BACKENDS = (RPC_BACKEND_SUPABASE, RPC_BACKEND_POSTGRES)
+
+# Explicit casts for parameters whose Python value would otherwise be sent
+# with the wrong type (psycopg2 adapts lists to text[]). Values cast to
+# json/jsonb are sent as JSON documents.
+RPC_PARAM_CASTS = {
+    'reserve_slots': {
+        'p_slot_starts': 'timestamptz[]',
+    },
+    'ecosuite_merge_upsert': {
+        'p_patch': 'jsonb',
+        'p_insert': 'jsonb',
+    },
+    'ecosuite_sync_crm_customers': {
+        'p_items': 'jsonb',
+    },
+}
+
+MERGE_UPSERT_TABLES = ('ecosuite_reservations', 'ecosuite_crm_customers', 'ecosuite_brands')
+
+_IDENTIFIER_RE = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+def rpc_backend_for(rpc_name):
+    """Return the configured backend for an RPC (ECOSUITE_RPC_BACKENDS, then ECOSUITE_RPC_BACKEND)."""
+    per_rpc = getattr(settings, 'ECOSUITE_RPC_BACKENDS', {}) or {}
+    backend = per_rpc.get(rpc_name) or getattr(settings, 'ECOSUITE_RPC_BACKEND', RPC_BACKEND_SUPABASE)
+    if backend not in RPC_BACKENDS:
+        raise ValueError(f"Invalid RPC backend '{backend}' for {rpc_name}. Must be one of {', '.join(RPC_BACKENDS)}")
+    return backend
+
+
+def call_rpc(rpc_name, params, supabase=None, backend=None):
+    """
+    Call a Postgres function and return its result (what Supabase returns as result.data).
+
+    backend is 'supabase' (PostgREST over HTTPS) or 'postgres' (direct call over the
+    persistent Django DATABASES connection). When omitted, the backend configured for
+    rpc_name is used. Errors raised by the function propagate as exceptions whose
+    message contains the RAISE text on both backends.
+    """
+    backend = backend or rpc_backend_for(rpc_name)
+
+    if backend == RPC_BACKEND_POSTGRES:
+        return _call_rpc_postgres(rpc_name, params)
+
+    if supabase is None:
+        raise ValueError(f"A Supabase client is required to call {rpc_name} through PostgREST")
+    return supabase.rpc(rpc_name, params).execute().data
+
+
+def _call_rpc_postgres(rpc_name, params):
+    if not _IDENTIFIER_RE.match(rpc_name):
+        raise ValueError(f"Invalid RPC name: {rpc_name}")
+
+    casts = RPC_PARAM_CASTS.get(rpc_name, {})
+    arguments = []
+    values = []
+    for name, value in params.items():
+        if not _IDENTIFIER_RE.match(name):
+            raise ValueError(f"Invalid RPC parameter name: {name}")
+        cast = casts.get(name)
+        if cast in ('json', 'jsonb') or isinstance(value, dict):
+            value = Json(value)
+        arguments.append(f"{name} => %s" + (f"::{cast}" if cast else ""))
+        values.append(value)
+
+    sql = f"SELECT public.{rpc_name}({', '.join(arguments)})"
+
+    alias = getattr(settings, 'ECOSUITE_RPC_DATABASE', 'default')
+    with timer(RPC, rpc_name), connections[alias].cursor() as cursor:
+        cursor.execute(sql, values)
+        row = cursor.fetchone()
+
+    # psycopg2 decodes json/jsonb results, matching the PostgREST payload
+    return row[0] if row else None
+
+
+def merge_upsert(table, record_id, patch, insert_data=None, required_fields=(), supabase=None, backend=None):
+    """
+    Insert or partially update one row in a single round trip (ecosuite_merge_upsert).
+
+    patch holds only the fields to change on an existing row. When the row does not
+    exist, insert_data (with patch applied on top) is inserted after checking
+    required_fields. Concurrent writers to the same id are merged via ON CONFLICT.
+
+    Returns (row, inserted, missing_fields); row is None when required fields are missing.
+    """
+    if table not in MERGE_UPSERT_TABLES:
+        raise ValueError(f"merge_upsert is not enabled for table {table}")
+
+    result = call_rpc('ecosuite_merge_upsert', {
+        'p_table': table,
+        'p_id': str(record_id),
+        'p_patch': patch,
+        'p_insert': insert_data or {},
+        'p_required': list(required_fields),
+    }, supabase=supabase, backend=backend)
+
+    if not result:
+        return None, False, []
+    if result.get('error') == 'MISSING_REQUIRED_FIELDS':
+        return None, False, result.get('missingFields') or []
+    return result.get('row'), bool(result.get('inserted')), []
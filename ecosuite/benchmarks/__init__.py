@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the reservation hot paths.
+
+The scenarios run the real views through the Django test client against an
+in-memory stand-in for Supabase (fake_supabase.FakeSupabase), so they need no
+network and no credentials. Run them with manage.py benchmark_scenarios.
+"""
@@ -0,0 +1,381 @@
+import copy
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from taratechapi.metrics import RPC, SUPABASE, timer
+
+from ecosuite.capacity import DINING_WINDOW_SLOTS, SLOT_STEP
+
+
+JAKARTA = dt_timezone(timedelta(hours=7))
+
+
+class FakeRPCError(Exception):
+    """Raised by the fake RPCs where the real functions RAISE EXCEPTION (the views match on the message)."""
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _as_datetime(value):
+    if not isinstance(value, str) or len(value) < 10 or value[4:5] != '-':
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _comparable(left, right):
+    """
+    Coerce a stored value and a filter value the way PostgREST would for our columns.
+
+    Timestamps compare as timestamps. A timestamptz literal against a timestamp (no tz)
+    column is cast like Postgres does, which keeps the wall-clock time and drops the offset.
+    """
+    left_dt, right_dt = _as_datetime(left), _as_datetime(right)
+    if left_dt is None or right_dt is None:
+        return left, right
+    if (left_dt.tzinfo is None) != (right_dt.tzinfo is None):
+        left_dt, right_dt = left_dt.replace(tzinfo=None), right_dt.replace(tzinfo=None)
+    return left_dt, right_dt
+
+
+def _equal(left, right):
+    left, right = _comparable(left, right)
+    return left == right or (left is not None and right is not None and str(left) == str(right))
+
+
+def _ordered(op):
+    def compare(left, right):
+        if left is None:
+            return False
+        left, right = _comparable(left, right)
+        try:
+            return op(left, right)
+        except TypeError:
+            return op(str(left), str(right))
+    return compare
+
+
+OPERATORS = {
+    'eq': _equal,
+    'neq': lambda left, right: not _equal(left, right),
+    'gt': _ordered(lambda left, right: left > right),
+    'gte': _ordered(lambda left, right: left >= right),
+    'lt': _ordered(lambda left, right: left < right),
+    'lte': _ordered(lambda left, right: left <= right),
+    'in': lambda left, values: any(_equal(left, value) for value in values),
+    'is': lambda left, value: left is None if value in (None, 'null') else left is value,
+}
+
+
+class _Negate:
+    def __init__(self, query):
+        self._query = query
+
+    def __getattr__(self, name):
+        method = getattr(self._query, name)
+
+        def negated(*args, **kwargs):
+            self._query._negate_next = True
+            return method(*args, **kwargs)
+        return negated
+
+
+class FakeQuery:
+    """The subset of the postgrest-py request builder the ecosuite views use."""
+
+    def __init__(self, database, table):
+        self._database = database
+        self._table = table
+        self._action = 'select'
+        self._columns = None
+        self._payload = None
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._negate_next = False
+
+    # Actions
+
+    def select(self, columns='*', count=None):
+        self._action = 'select'
+        self._columns = None if columns.strip() == '*' else [c.strip() for c in columns.split(',') if c.strip()]
+        return self
+
+    def insert(self, rows):
+        self._action = 'insert'
+        self._payload = rows
+        return self
+
+    def upsert(self, rows, on_conflict='id', ignore_duplicates=False):
+        self._action = 'upsert'
+        self._payload = rows
+        self._conflict = [c.strip() for c in (on_conflict or 'id').split(',')]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values):
+        self._action = 'update'
+        self._payload = values
+        return self
+
+    def delete(self):
+        self._action = 'delete'
+        return self
+
+    # Filters
+
+    def _filter(self, op, column, value):
+        self._filters.append((column, op, value, self._negate_next))
+        self._negate_next = False
+        return self
+
+    @property
+    def not_(self):
+        return _Negate(self)
+
+    def eq(self, column, value):
+        return self._filter('eq', column, value)
+
+    def neq(self, column, value):
+        return self._filter('neq', column, value)
+
+    def gt(self, column, value):
+        return self._filter('gt', column, value)
+
+    def gte(self, column, value):
+        return self._filter('gte', column, value)
+
+    def lt(self, column, value):
+        return self._filter('lt', column, value)
+
+    def lte(self, column, value):
+        return self._filter('lte', column, value)
+
+    def in_(self, column, values):
+        return self._filter('in', column, list(values))
+
+    def is_(self, column, value):
+        return self._filter('is', column, value)
+
+    # Modifiers
+
+    def order(self, column, desc=False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self._limit = size
+        return self
+
+    def _matches(self, row):
+        for column, op, value, negated in self._filters:
+            if OPERATORS[op](row.get(column), value) == negated:
+                return False
+        return True
+
+    def execute(self):
+        with timer(SUPABASE, self._table):
+            self._database.round_trip()
+            with self._database.lock:
+                return FakeResponse(self._run(self._database.tables.setdefault(self._table, [])))
+
+    def _run(self, rows):
+        if self._action == 'insert':
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            inserted = [{'id': str(uuid.uuid4()), **copy.deepcopy(row)} for row in payload]
+            rows.extend(inserted)
+            return copy.deepcopy(inserted)
+        if self._action == 'upsert':
+            return self._upsert(rows)
+
+        matched = [row for row in rows if self._matches(row)]
+        if self._action == 'update':
+            for row in matched:
+                row.update(copy.deepcopy(self._payload))
+            return copy.deepcopy(matched)
+        if self._action == 'delete':
+            rows[:] = [row for row in rows if not self._matches(row)]
+            return copy.deepcopy(matched)
+
+        for column, desc in reversed(self._order):
+            matched.sort(key=lambda row: (row.get(column) is None, _as_datetime(row.get(column)) or row.get(column) or ''), reverse=desc)
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        if self._columns is not None:
+            matched = [{column: row.get(column) for column in self._columns} for row in matched]
+        return copy.deepcopy(matched)
+
+    def _upsert(self, rows):
+        existing = {tuple(row.get(c) for c in self._conflict): row for row in rows}
+        written = []
+        for row in self._payload if isinstance(self._payload, list) else [self._payload]:
+            key = tuple(row.get(c) for c in self._conflict)
+            if key in existing:
+                if self._ignore_duplicates:
+                    continue
+                existing[key].update(copy.deepcopy(row))
+                written.append(existing[key])
+            else:
+                existing[key] = copy.deepcopy(row)
+                rows.append(existing[key])
+                written.append(existing[key])
+        return copy.deepcopy(written)
+
+
+class FakeRPC:
+    def __init__(self, database, name, params):
+        self._database = database
+        self._name = name
+        self._params = params
+
+    def execute(self):
+        function = getattr(self._database, f'rpc_{self._name}', None)
+        if function is None:
+            raise FakeRPCError(f"function public.{self._name} does not exist")
+        with timer(RPC, self._name):
+            self._database.round_trip()
+            with self._database.lock:
+                return FakeResponse(function(**self._params))
+
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the Supabase client, for offline benchmarks and tests.
+
+    Tables are lists of dicts behind one lock, so every query and RPC is atomic the
+    way a single PostgREST call is. latency adds a fixed delay per round trip
+    (outside the lock) to model the network. Calls are recorded in the request
+    metrics like real Supabase calls, so Server-Timing and query budgets apply.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lock = threading.RLock()
+        self.tables = {}
+
+    def round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        return FakeRPC(self, name, params)
+
+    def rows(self, table):
+        with self.lock:
+            return copy.deepcopy(self.tables.get(table, []))
+
+    # RPCs (semantics of the Postgres functions the views call, without their audit side effects)
+
+    def _slots(self, brand_id, outlet_id, slot_starts):
+        wanted = {_as_datetime(s) for s in slot_starts}
+        return [
+            slot for slot in self.tables.get('ecosuite_capacity_slot', [])
+            if slot['brandId'] == brand_id and slot['outletId'] == outlet_id
+            and slot['channel'] == 'both' and _as_datetime(slot['slotStart']) in wanted
+        ]
+
+    def rpc_reserve_slots(self, p_brand_id, p_outlet_id, p_reservation_datetime, p_slot_starts, p_pax,
+                          p_idempotency_key, p_channel='both', p_customer_name=None, p_customer_phone=None,
+                          p_notes=None, p_join_waitlist=False):
+        reservations = self.tables.setdefault('ecosuite_reservations', [])
+        for reservation in reservations:
+            if reservation.get('idempotencyKey') == p_idempotency_key:
+                return {'ok': True, 'status': 'already_confirmed', 'reservationId': reservation['id']}
+
+        slots = self._slots(p_brand_id, p_outlet_id, p_slot_starts)
+        if len(slots) != len(p_slot_starts):
+            raise FakeRPCError('CAPACITY_SLOT_NOT_FOUND')
+
+        if all(slot['usedPax'] + p_pax <= slot['maxPax'] for slot in slots):
+            status, column = 'confirmed', 'usedPax'
+        elif not p_join_waitlist:
+            raise FakeRPCError('CAPACITY_EXCEEDED')
+        elif all(slot['waitlistedPax'] + p_pax <= slot['maxWaitlistedPax'] for slot in slots):
+            status, column = 'waitlisted', 'waitlistedPax'
+        else:
+            raise FakeRPCError('WAITLIST_FULL')
+
+        for slot in slots:
+            slot[column] += p_pax
+        reservation = {
+            'id': str(uuid.uuid4()),
+            'brandId': p_brand_id,
+            'outletId': p_outlet_id,
+            'reservationDateTime': p_reservation_datetime,
+            'numberOfGuests': p_pax,
+            'idempotencyKey': p_idempotency_key,
+            'channel': p_channel,
+            'customerName': p_customer_name,
+            'customerPhone': p_customer_phone,
+            'notes': p_notes,
+            'status': status,
+            'confirmedExpiryDateTime': None,
+            'createdBy': 'website',
+            'createdAt': datetime.now(dt_timezone.utc).isoformat(),
+        }
+        reservations.append(reservation)
+        return {'ok': True, 'status': status, 'reservationId': reservation['id'], 'pax': p_pax}
+
+    def rpc_rebuild_capacity_slots(self, p_brand_id, p_outlet_id, p_start_date, p_end_date, p_channel='both',
+                                   p_slot_minutes=30, p_dining_slots=DINING_WINDOW_SLOTS,
+                                   p_fallback_max_pax=16, p_fallback_max_wait=10):
+        start = datetime.fromisoformat(p_start_date).replace(tzinfo=JAKARTA).astimezone(dt_timezone.utc)
+        end = (datetime.fromisoformat(p_end_date) + timedelta(days=1)).replace(tzinfo=JAKARTA).astimezone(dt_timezone.utc)
+        slots = self.tables.setdefault('ecosuite_capacity_slot', [])
+        slots[:] = [
+            slot for slot in slots
+            if not (slot['brandId'] == p_brand_id and slot['outletId'] == p_outlet_id
+                    and start <= _as_datetime(slot['slotStart']) < end)
+        ]
+        by_start = {}
+        current = start
+        while current < end:
+            slot = {
+                'id': str(uuid.uuid4()),
+                'brandId': p_brand_id,
+                'outletId': p_outlet_id,
+                'slotStart': current.isoformat(),
+                'channel': 'both',
+                'maxPax': p_fallback_max_pax,
+                'usedPax': 0,
+                'maxWaitlistedPax': p_fallback_max_wait,
+                'waitlistedPax': 0,
+            }
+            slots.append(slot)
+            by_start[current] = slot
+            current += timedelta(minutes=p_slot_minutes)
+
+        # Recompute usage from the outlet's live reservations
+        for reservation in self.tables.get('ecosuite_reservations', []):
+            if reservation['brandId'] != p_brand_id or reservation['outletId'] != p_outlet_id:
+                continue
+            column = {'confirmed': 'usedPax', 'verified': 'usedPax', 'waitlisted': 'waitlistedPax'}.get(reservation['status'])
+            if column is None:
+                continue
+            local = _as_datetime(reservation['reservationDateTime']).replace(tzinfo=JAKARTA).astimezone(dt_timezone.utc)
+            first = local.replace(minute=(local.minute // 30) * 30, second=0, microsecond=0)
+            for i in range(p_dining_slots):
+                slot = by_start.get(first + SLOT_STEP * i)
+                if slot is not None:
+                    slot[column] += reservation['numberOfGuests']
+        return {'ok': True, 'slots': len(by_start)}
+
+    def rpc_reconfirm_reservation(self, p_reservation_id):
+        for reservation in self.tables.get('ecosuite_reservations', []):
+            if reservation['id'] == p_reservation_id:
+                if reservation['status'] != 'confirmed':
+                    return {'ok': False, 'status': 'INVALID_STATUS', 'currentStatus': reservation['status']}
+                reservation['status'] = 'verified'
+                return {'ok': True, 'status': 'verified', 'reservationId': p_reservation_id}
+        return {'ok': False, 'status': 'RESERVATION_NOT_FOUND'}
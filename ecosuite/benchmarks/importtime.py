@@ -0,0 +1,59 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+
+
+# What a fresh worker imports before it can answer its first request
+BOOT_CODE = 'import taratechapi.asgi, taratechapi.urls'
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def _import_times(output):
+    """Parse python -X importtime output into [(module, self_us, cumulative_us, depth)]."""
+    entries = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def measure_cold_start(runs=5, top=10):
+    """
+    Import the app the way a fresh worker does, runs times in new interpreters, under
+    python -X importtime. Returns the median total import time in ms and the
+    slowest top-level imports of the median run.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'taratechapi.settings')}
+    measured = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_CODE],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        entries = _import_times(completed.stderr)
+        measured.append((sum(self_us for _, self_us, _, _ in entries) / 1000, entries))
+
+    measured.sort(key=lambda run: run[0])
+    total_ms, entries = measured[len(measured) // 2]
+    top_level = sorted((e for e in entries if e[3] == 0), key=lambda e: e[2], reverse=True)[:top]
+    return {
+        'runs': runs,
+        'importMs': round(total_ms, 1),
+        'minImportMs': round(measured[0][0], 1),
+        'stdevImportMs': round(statistics.pstdev(ms for ms, _ in measured), 1),
+        'slowest': [{'module': module, 'cumulativeMs': round(cumulative_us / 1000, 1)} for module, _, cumulative_us, _ in top_level],
+    }
+
+
+def compare_cold_start(result, baseline, tolerance):
+    limit = baseline['importMs'] * (1 + tolerance)
+    if result['importMs'] > limit:
+        return [f"cold_start: import time {result['importMs']:.1f} ms > {limit:.1f} ms (baseline {baseline['importMs']:.1f} ms)"]
+    return []
@@ -0,0 +1,118 @@
+import contextlib
+import importlib
+import logging
+import pkgutil
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+from django.test import Client, override_settings
+
+from ecosuite import views
+from ecosuite.coalescing import SingleFlight
+
+from .fake_supabase import FakeSupabase
+
+
+class _UpstreamResponse:
+    status_code = 200
+    text = '{}'
+
+    def json(self):
+        return {}
+
+
+@contextlib.contextmanager
+def offline_backends(db):
+    """
+    Point the ecosuite views at db instead of Supabase and stub the Koala broadcast calls.
+
+    RPCs go through the Supabase client (so through db), and read coalescing and the
+    brand cache start empty so runs do not share results. The expected 409s are not logged.
+    """
+    request_logger = logging.getLogger('django.request')
+    with contextlib.ExitStack() as stack:
+        def patch_views(name, value):
+            # Each route module holds its own reference to shared helpers
+            for module in _view_modules():
+                if hasattr(module, name):
+                    stack.enter_context(mock.patch.object(module, name, value))
+
+        stack.enter_context(mock.patch.object(request_logger, 'level', logging.ERROR))
+        stack.enter_context(override_settings(ECOSUITE_RPC_BACKEND='supabase', ECOSUITE_RPC_BACKENDS={}))
+        patch_views('create_supabase_client', mock.Mock(return_value=db))
+        patch_views('availability_reads', SingleFlight(ttl=views.availability_reads.ttl))
+        patch_views('brand_reads', SingleFlight(ttl=views.brand_reads.ttl))
+        patch_views('_login_to_koala', mock.Mock(return_value='benchmark-token'))
+        stack.enter_context(mock.patch.object(requests, 'post', return_value=_UpstreamResponse()))
+        yield db
+
+
+def _view_modules():
+    return [importlib.import_module(f'{views.__name__}.{info.name}') for info in pkgutil.iter_modules(views.__path__)]
+
+
+def run_scenario(scenario_class, iterations, concurrency, latency=0.0):
+    """Seed a fresh FakeSupabase, send iterations requests concurrently and summarise latencies."""
+    scenario = scenario_class()
+    db = FakeSupabase(latency=latency)
+    scenario.setup(db)
+
+    def send(i):
+        client = Client(raise_request_exception=False)
+        started = time.perf_counter()
+        response = scenario.request(client, i)
+        return time.perf_counter() - started, response.status_code
+
+    with offline_backends(db):
+        # Warm up imports and code paths outside the measurement
+        send(-1)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(send, range(iterations)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    status_counts = {}
+    for _, status_code in results:
+        status_counts[str(status_code)] = status_counts.get(str(status_code), 0) + 1
+
+    return {
+        'requests': len(results),
+        'statuses': status_counts,
+        'throughput': round(len(results) / elapsed, 1),
+        'mean': round(statistics.mean(latencies), 2),
+        'p50': round(percentile(latencies, 50), 2),
+        'p95': round(percentile(latencies, 95), 2),
+        'p99': round(percentile(latencies, 99), 2),
+    }
+
+
+def compare_to_baseline(name, result, baseline, tolerance):
+    """Regressions of result against baseline: p95/p99 slower or throughput lower by more than tolerance."""
+    regressions = []
+    for metric in ('p95', 'p99'):
+        limit = baseline[metric] * (1 + tolerance)
+        if result[metric] > limit:
+            regressions.append(f"{name}: {metric} {result[metric]:.1f} ms > {limit:.1f} ms (baseline {baseline[metric]:.1f} ms)")
+    floor = baseline['throughput'] * (1 - tolerance)
+    if result['throughput'] < floor:
+        regressions.append(f"{name}: throughput {result['throughput']:.1f} req/s < {floor:.1f} req/s (baseline {baseline['throughput']:.1f} req/s)")
+    errors, baseline_errors = _server_errors(result['statuses']), _server_errors(baseline.get('statuses', {}))
+    if errors > baseline_errors:
+        regressions.append(f"{name}: {errors} 5xx responses (baseline {baseline_errors})")
+    return regressions
+
+
+def _server_errors(statuses):
+    return sum(count for status_code, count in statuses.items() if not status_code.isdigit() or int(status_code) >= 500)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
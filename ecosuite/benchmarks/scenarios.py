@@ -0,0 +1,167 @@
+import random
+from datetime import datetime, time, timedelta
+
+from .fake_supabase import JAKARTA
+
+
+BRAND_ID = 'BENCHBRAND'
+OUTLET_ID = 'BENCHOUTLET'
+
+
+def _tomorrow():
+    return datetime.now(JAKARTA).date() + timedelta(days=1)
+
+
+def _local(day, hour, minute=0):
+    return datetime.combine(day, time(hour, minute))
+
+
+def _seed_brand(db, max_pax=40):
+    db.tables['ecosuite_brands'] = [{
+        'id': BRAND_ID,
+        'name': 'Benchmark Brand',
+        'outlets': [{
+            'id': OUTLET_ID,
+            'name': 'Benchmark Outlet',
+            'onlineOperatingHours': {
+                'isMaxPaxExclusive': False,
+                'dateExceptions': [],
+                'dayBasedHours': [
+                    {'day': day, 'openTime': '10:00', 'closeTime': '22:00', 'maxPax': max_pax}
+                    for day in range(7)
+                ],
+            },
+        }],
+    }]
+
+
+def _seed_slots(db, days, max_pax=40, max_wait=20):
+    start = _tomorrow()
+    db.rpc_rebuild_capacity_slots(
+        BRAND_ID, OUTLET_ID, start.isoformat(), (start + timedelta(days=days - 1)).isoformat(),
+        p_fallback_max_pax=max_pax, p_fallback_max_wait=max_wait,
+    )
+
+
+def _seed_reservations(db, count, days, seed=7):
+    rng = random.Random(seed)
+    today = datetime.now(JAKARTA).date()
+    now = datetime.now(JAKARTA).replace(tzinfo=None, microsecond=0)
+    statuses = ['pending', 'confirmed', 'confirmed', 'verified', 'waitlisted', 'cancelled']
+    rows = []
+    for i in range(count):
+        status = rng.choice(statuses)
+        reservation_time = _local(today + timedelta(days=rng.randrange(days)), rng.randrange(11, 21), rng.choice((0, 30)))
+        expiry = None
+        if status == 'confirmed' and rng.random() < 0.3:
+            expiry = (now + timedelta(hours=rng.uniform(-12, 12))).isoformat()
+        rows.append({
+            'id': f'bench-{i}',
+            'brandId': BRAND_ID,
+            'outletId': OUTLET_ID,
+            'reservationDateTime': reservation_time.isoformat(),
+            'numberOfGuests': rng.randrange(1, 9),
+            'status': status,
+            'confirmedExpiryDateTime': expiry,
+            'customerName': f'Guest {i}',
+            'customerPhone': f'0812{i:08d}',
+            'createdBy': rng.choice(('website', 'dashboard')),
+            'idempotencyKey': f'bench-seed-{i}',
+        })
+    db.tables['ecosuite_reservations'] = rows
+
+
+class Scenario:
+    """A seeded dataset plus the request each benchmark iteration sends."""
+
+    name = None
+    description = None
+
+    def setup(self, db):
+        raise NotImplementedError
+
+    def request(self, client, i):
+        raise NotImplementedError
+
+
+class CommitContention(Scenario):
+    name = 'commit_contention'
+    description = 'commit_reservation: concurrent 2-pax bookings into three overlapping dinner windows until they fill up'
+
+    def setup(self, db):
+        _seed_brand(db)
+        _seed_slots(db, days=1)
+        self.day = _tomorrow()
+
+    def request(self, client, i):
+        return client.post('/api/ecosuite/reservations/commit/', {
+            'brandId': BRAND_ID,
+            'outletId': OUTLET_ID,
+            'reservationDateTime': _local(self.day, 18 + i % 3).isoformat(),
+            'numberOfGuests': 2,
+            'idempotencyKey': f'bench-commit-{i}',
+            'customerName': 'Benchmark',
+            'joinWaitlist': i % 2 == 0,
+        }, content_type='application/json')
+
+
+class AvailabilityProbe(Scenario):
+    name = 'availability_probe'
+    description = 'check_reservation_availability: random times and party sizes over a week of reservations'
+
+    def setup(self, db):
+        _seed_brand(db)
+        _seed_slots(db, days=2)
+        _seed_reservations(db, count=600, days=7)
+        self.day = _tomorrow()
+
+    def request(self, client, i):
+        rng = random.Random(i)
+        requested = _local(self.day, rng.randrange(11, 21), rng.choice((0, 30))).replace(tzinfo=JAKARTA)
+        return client.get('/api/ecosuite/check-reservation-availability/', {
+            'brandId': BRAND_ID,
+            'outletId': OUTLET_ID,
+            'dateTime': requested.isoformat(),
+            'guests': rng.randrange(2, 12),
+        })
+
+
+class SlotListing(Scenario):
+    name = 'slot_listing'
+    description = 'get_available_capacity_slots: one week of slots, alternating row and columnar formats'
+
+    def setup(self, db):
+        _seed_brand(db)
+        _seed_slots(db, days=14)
+        self.day = _tomorrow()
+
+    def request(self, client, i):
+        params = {
+            'brandId': BRAND_ID,
+            'outletId': OUTLET_ID,
+            'startDate': _local(self.day, 0).replace(tzinfo=JAKARTA).isoformat(),
+            'endDate': _local(self.day + timedelta(days=7), 0).replace(tzinfo=JAKARTA).isoformat(),
+        }
+        if i % 2:
+            params['format'] = 'columnar'
+        return client.get('/api/ecosuite/slots/available/', params, HTTP_ACCEPT_ENCODING='gzip')
+
+
+class ReminderSweeps(Scenario):
+    name = 'reminder_sweeps'
+    description = 'The cron sweeps (5+ pax reminder, expired-confirmation cancel, waitlist expiry) over 2000 reservations'
+
+    paths = (
+        '/api/ecosuite/send-reservation-reminder-for-5pax-and-above-2day-before-reservation-date/',
+        '/api/ecosuite/send-cancel-notification-for-confirmed-reservations-1day-before-reservation-date/',
+        '/api/ecosuite/check-waitlisted-reservations-with-confirmedExpiryDateTime-expired/',
+    )
+
+    def setup(self, db):
+        _seed_reservations(db, count=2000, days=5)
+
+    def request(self, client, i):
+        return client.get(self.paths[i % len(self.paths)], {'brandId': BRAND_ID})
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (CommitContention, AvailabilityProbe, SlotListing, ReminderSweeps)}
@@ -0,0 +1,153 @@
+from collections import deque
+from datetime import datetime, timedelta
+
+
+DINING_WINDOW_SLOTS = 5
+SLOT_STEP = timedelta(minutes=30)
+
+
+def parse_slot_start(value):
+    """Parse a slotStart value returned by PostgREST into an aware datetime."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+def nearest_fitting_windows(slots, pax, requested_start, count=3, window_slots=DINING_WINDOW_SLOTS, not_before=None):
+    """
+    Find the dining windows closest to requested_start that can seat pax.
+
+    slots must be ordered by slotStart. A window is window_slots consecutive
+    30-minute slots; it fits when the minimum of (maxPax - usedPax) across
+    those slots is at least pax. The minimum is maintained with a monotonic
+    deque, so the scan is O(len(slots)). Gaps in the slot sequence reset the
+    window.
+
+    Returns a dict with 'before' and 'after' lists (nearest first), each item
+    describing one window start.
+    """
+    candidates_before = []
+    candidates_after = []
+
+    window = deque()  # indices into parsed, increasing available pax
+    parsed = []
+    run_start = 0
+
+    for slot in slots:
+        try:
+            slot_start = parse_slot_start(slot.get('slotStart'))
+        except (TypeError, ValueError):
+            continue
+
+        max_pax = slot.get('maxPax', 0) or 0
+        used_pax = slot.get('usedPax', 0) or 0
+        available = max_pax - used_pax
+
+        index = len(parsed)
+        if parsed and slot_start - parsed[-1][0] != SLOT_STEP:
+            # Non-contiguous slot, start a new run
+            window.clear()
+            run_start = index
+        parsed.append((slot_start, available, slot))
+
+        while window and parsed[window[-1]][1] >= available:
+            window.pop()
+        window.append(index)
+
+        first = index - window_slots + 1
+        if first < run_start:
+            continue
+        while window[0] < first:
+            window.popleft()
+
+        window_min = parsed[window[0]][1]
+        if window_min < pax:
+            continue
+
+        window_start, _, first_slot = parsed[first]
+        if window_start == requested_start:
+            continue
+        if not_before is not None and window_start < not_before:
+            continue
+
+        item = {
+            'slotStart': first_slot.get('slotStart'),
+            'windowEnd': slot.get('slotStart'),
+            'availablePax': window_min,
+            'minutesFromRequested': int((window_start - requested_start).total_seconds() // 60),
+        }
+        if window_start < requested_start:
+            candidates_before.append(item)
+        else:
+            candidates_after.append(item)
+
+    candidates_before.reverse()
+    return {
+        'before': candidates_before[:count],
+        'after': candidates_after[:count],
+    }
+
+
+COLUMNAR_CONSTANT_FIELDS = ('brandId', 'outletId', 'channel')
+
+
+def columnar_slots(rows, include_waitlist_info=True):
+    """
+    Encode capacity slot rows as per-field arrays instead of one dict per slot.
+
+    Fields that are identical for every row (brandId, outletId, channel) are
+    returned once under 'constants'. slotStart is returned as minute offsets
+    from 'baseTime' (the first slotStart).
+    """
+    if not rows:
+        return {
+            'constants': {},
+            'baseTime': None,
+            'length': 0,
+            'columns': {},
+        }
+
+    constants = {}
+    columns = {}
+    for field in COLUMNAR_CONSTANT_FIELDS:
+        values = [row.get(field) for row in rows]
+        if all(value == values[0] for value in values):
+            constants[field] = values[0]
+        else:
+            columns[field] = values
+
+    starts = [parse_slot_start(row.get('slotStart')) for row in rows]
+    base_time = starts[0]
+
+    max_pax = [row.get('maxPax', 0) or 0 for row in rows]
+    used_pax = [row.get('usedPax', 0) or 0 for row in rows]
+    max_waitlisted = [row.get('maxWaitlistedPax', 10) or 10 for row in rows]
+    waitlisted_pax = [row.get('waitlistedPax', 0) or 0 for row in rows]
+    available_pax = [m - u for m, u in zip(max_pax, used_pax)]
+    available_waitlist_pax = [m - w for m, w in zip(max_waitlisted, waitlisted_pax)]
+
+    columns.update({
+        'id': [row.get('id') for row in rows],
+        'slotStartOffsetMinutes': [int((start - base_time).total_seconds() // 60) for start in starts],
+        'maxPax': max_pax,
+        'usedPax': used_pax,
+        'availablePax': available_pax,
+        'capacityPercentage': [round((u / m * 100) if m > 0 else 0, 2) for m, u in zip(max_pax, used_pax)],
+        'totalAllowedGuests': [a + w for a, w in zip(available_pax, available_waitlist_pax)],
+        'isWaitlistOverbooked': [w < 0 for w in available_waitlist_pax],
+    })
+
+    if include_waitlist_info:
+        columns.update({
+            'maxWaitlistedPax': max_waitlisted,
+            'waitlistedPax': waitlisted_pax,
+            'availableWaitlistPax': available_waitlist_pax,
+            'waitlistCapacityPercentage': [round((w / m * 100) if m > 0 else 0, 2) for m, w in zip(max_waitlisted, waitlisted_pax)],
+        })
+
+    return {
+        'constants': constants,
+        'baseTime': rows[0].get('slotStart'),
+        'length': len(rows),
+        'columns': columns,
+    }
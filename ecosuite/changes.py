@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from .pagination import decode_cursor, encode_cursor, quote_filter_value
+
+
+CHANGE_FIELDS = ('changedAt', 'id')
+
+# Reservations in these statuses are sent as tombstones so clients drop them from their lists
+TOMBSTONE_STATUSES = ('cancelled', 'expired')
+
+
+def _parse_timestamp(value):
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
+
+
+def parse_since(value):
+    """
+    Parse the since parameter: a watermark returned by a previous call, or an ISO
+    datetime for a first sync from that moment. Returns (changedAt, id) or None.
+    """
+    if not value:
+        return None
+    try:
+        return _parse_timestamp(value).isoformat(), ''
+    except ValueError:
+        pass
+    changed_at, row_id = decode_cursor(value)
+    return _parse_timestamp(changed_at).isoformat(), row_id
+
+
+def _after(query, since, settle_before):
+    if since:
+        changed_at, row_id = since
+        query = query.or_(
+            f"changedAt.gt.{quote_filter_value(changed_at)},"
+            f"and(changedAt.eq.{quote_filter_value(changed_at)},id.gt.{quote_filter_value(row_id)})"
+        )
+    # Rows stamped in the last few seconds may belong to transactions that have not
+    # committed yet; leaving them for the next poll keeps the watermark from skipping them.
+    query = query.lt('changedAt', settle_before.isoformat())
+    return query.order('changedAt').order('id')
+
+
+def tombstone(row, deleted=False):
+    return {
+        'id': row.get('id'),
+        'brandId': row.get('brandId'),
+        'outletId': row.get('outletId'),
+        'status': 'deleted' if deleted else row.get('status'),
+        'changedAt': row.get('changedAt'),
+        'tombstone': True,
+    }
+
+
+def reservation_changes(reservations_query, tombstones_query, since, limit, settle_seconds=5, now=None):
+    """
+    One page of reservation changes after since, ordered by (changedAt, id).
+
+    reservations_query / tombstones_query are select builders already filtered to the
+    brand. Live rows come back in full (with tombstone: false); cancelled/expired and
+    deleted reservations come back as tombstones. Returns (changes, watermark, has_more);
+    pass watermark as since on the next call.
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    settle_before = now - timedelta(seconds=settle_seconds)
+
+    rows = _after(reservations_query, since, settle_before).limit(limit + 1).execute().data or []
+    deleted = _after(tombstones_query, since, settle_before).limit(limit + 1).execute().data or []
+
+    merged = [
+        (_parse_timestamp(row['changedAt']), str(row['id']), row, False) for row in rows
+    ] + [
+        (_parse_timestamp(row['changedAt']), str(row['id']), row, True) for row in deleted
+    ]
+    merged.sort(key=lambda item: (item[0], item[1]))
+
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    changes = []
+    for _, _, row, is_deleted in merged:
+        if is_deleted or str(row.get('status', '')).lower() in TOMBSTONE_STATUSES:
+            changes.append(tombstone(row, deleted=is_deleted))
+        else:
+            changes.append({**row, 'tombstone': False})
+
+    if merged:
+        watermark = encode_cursor(merged[-1][2], CHANGE_FIELDS)
+    elif since:
+        watermark = encode_cursor({'changedAt': since[0], 'id': since[1]}, CHANGE_FIELDS)
+    else:
+        watermark = None
+    return changes, watermark, has_more
@@ -0,0 +1,106 @@
+import threading
+import time
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent reads within a worker process.
+
+    The first caller for a key runs the fetch; callers arriving while it is in
+    flight wait for and share its result. Successful results are kept in a
+    micro-cache for ttl seconds so bursts of identical requests issue a single
+    upstream query. Results are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, ttl=1.0, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._cache = {}
+        self._stats = {
+            'requests': 0,
+            'upstreamQueries': 0,
+            'cacheHits': 0,
+            'coalesced': 0,
+            'errors': 0,
+        }
+
+    def do(self, key, fetch):
+        with self._lock:
+            self._stats['requests'] += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                expires_at, value = cached
+                if expires_at > time.monotonic():
+                    self._stats['cacheHits'] += 1
+                    return value
+                del self._cache[key]
+
+            call = self._in_flight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                self._in_flight[key] = call
+                self._stats['upstreamQueries'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fetch()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if call.error is not None:
+                    self._stats['errors'] += 1
+                elif self.ttl > 0:
+                    if len(self._cache) >= self.max_entries:
+                        self._evict_expired()
+                    self._cache[key] = (time.monotonic() + self.ttl, call.value)
+            call.event.set()
+
+        return call.value
+
+    def put(self, key, value):
+        """Cache value for key for ttl seconds, as if it had just been fetched."""
+        with self._lock:
+            if len(self._cache) >= self.max_entries:
+                self._evict_expired()
+            self._cache[key] = (time.monotonic() + self.ttl, value)
+
+    def forget(self, key):
+        """Drop the cached result for key, so the next call fetches again."""
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for cache_key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+            del self._cache[cache_key]
+        if len(self._cache) >= self.max_entries:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['inFlight'] = len(self._in_flight)
+            stats['cachedKeys'] = len(self._cache)
+        stats['upstreamQueriesSaved'] = stats['cacheHits'] + stats['coalesced']
+        stats['ttlSeconds'] = self.ttl
+        return stats
@@ -0,0 +1,60 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def rows_etag(request, rows, by_updated_at=True):
+    """
+    Weak ETag for a response built from rows.
+
+    With by_updated_at, uses (id, updatedAt) of every row when all rows have both, so
+    unchanged data is detected without serialising it. Otherwise (or when a row lacks
+    them) it is a hash of the rows; use that for tables that RPCs modify without
+    bumping updatedAt. The request path and query string are included because they
+    select the rows and fields in the body.
+    """
+    digest = hashlib.sha1(request.get_full_path().encode())
+    if by_updated_at and all(isinstance(row, dict) and row.get('id') is not None and row.get('updatedAt') for row in rows):
+        for row in rows:
+            digest.update(f"\x1f{row['id']}\x1e{row['updatedAt']}".encode())
+        digest.update(f"\x1d{len(rows)}".encode())
+    else:
+        digest.update(json.dumps(rows, sort_keys=True, cls=DjangoJSONEncoder).encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(request, etag):
+    """Weak comparison of etag against the If-None-Match request header."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def conditional_response(request, data, rows, cache_control='private, no-cache', by_updated_at=True,
+                         status_code=status.HTTP_200_OK, headers=None):
+    """
+    Response for data with an ETag derived from rows; 304 Not Modified when the
+    client's If-None-Match already matches.
+    """
+    etag = rows_etag(request, rows, by_updated_at)
+    response_headers = dict(headers or {})
+    response_headers['ETag'] = etag
+    if cache_control:
+        response_headers['Cache-Control'] = cache_control
+
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+    return Response(data, status=status_code, headers=response_headers)
@@ -0,0 +1,73 @@
+from taratechapi.buffer import DurableBuffer
+
+from .backends import call_rpc
+
+
+CRM_SYNC_RPC = 'ecosuite_sync_crm_customers'
+
+
+def extract_receipt_id(reservation):
+    return (
+        reservation.get('receiptId')
+        or reservation.get('receiptID')
+        or reservation.get('clientReferenceId')
+        or reservation.get('invoiceNo')
+        or reservation.get('id')
+    )
+
+
+def crm_sync_item(reservation_record, request_user_id):
+    """Build the ecosuite_sync_crm_customers item for a reservation, or None if it cannot be synced."""
+    if not reservation_record:
+        return None
+    if not reservation_record.get('customerPhone'):
+        return None
+    if not reservation_record.get('brandId') or not reservation_record.get('outletId'):
+        return None
+
+    return {
+        'brandId': reservation_record.get('brandId'),
+        'outletId': reservation_record.get('outletId'),
+        'customerName': reservation_record.get('customerName') or '',
+        'customerPhone': reservation_record.get('customerPhone'),
+        'customerEmail': reservation_record.get('customerEmail'),
+        'notes': reservation_record.get('notes'),
+        'utcOffset': reservation_record.get('utcOffset'),
+        'receiptId': extract_receipt_id(reservation_record),
+        'userId': str(request_user_id) if request_user_id is not None else None,
+    }
+
+
+def crm_sync_failures(result):
+    """(index into p_items, error) of each item the RPC reported in "failed"."""
+    if not isinstance(result, dict):
+        return []
+    return [(failure['index'], failure.get('error')) for failure in result.get('failed') or []]
+
+
+def failed_crm_sync_items(items, result):
+    """Items the RPC reported in "failed", each paired with its error message."""
+    return [(items[index], error) for index, error in crm_sync_failures(result)]
+
+
+class CRMSyncQueue(DurableBuffer):
+    """
+    CRM customer syncs, queued off the reservation write path.
+
+    enqueue() commits the item to a local SQLite buffer (taratechapi.buffer), so it
+    survives a worker being killed or restarted; a daemon thread per worker sends
+    due items as one ecosuite_sync_crm_customers call per batch. The RPC applies
+    each item in its own subtransaction and reports the ones that failed, so only
+    those are retried. The RPC is idempotent (receipt ids are appended with set
+    semantics), so a retried item cannot duplicate data.
+    """
+
+    def __init__(self, path, client_factory, **kwargs):
+        super().__init__(path, 'ecosuite_crm_customers', **kwargs)
+        self.client_factory = client_factory
+
+    def enqueue(self, item):
+        return self.append(item)
+
+    def deliver(self, items):
+        return crm_sync_failures(call_rpc(CRM_SYNC_RPC, {'p_items': items}, self.client_factory()))
@@ -0,0 +1,158 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .streaming import prefetch_first_page, streaming_response
+
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+PAYMENT_LAYOUTS = ('rows', 'columns', 'nested')
+
+RESERVATION_EXPORT_COLUMNS = (
+    'id', 'brandId', 'outletId', 'customerName', 'customerPhone', 'customerPhoneE164', 'numberOfGuests',
+    'reservationDateTime', 'status', 'tableIds', 'notes', 'utcOffset', 'createdAt', 'updatedAt',
+    'checkedInAt', 'checkedOutAt', 'waitlistedAt', 'confirmedExpiryDateTime',
+)
+# One line per payment (payments=rows)
+PAYMENT_ROW_COLUMNS = (
+    'paymentId', 'paymentStatus', 'paymentAmount', 'paymentMethod', 'paymentCreatedAt', 'paymentPaidAt',
+)
+# Payment summary per reservation (payments=columns)
+PAYMENT_SUMMARY_COLUMNS = (
+    'paymentCount', 'paymentTotalAmount', 'paidAmount', 'paymentStatuses', 'lastPaidAt',
+)
+CRM_CUSTOMER_EXPORT_COLUMNS = (
+    'id', 'brandId', 'outletId', 'fullName', 'phone', 'phoneE164', 'email', 'receiptIds', 'notes',
+    'utcOffset', 'createdAt', 'updatedAt',
+)
+
+
+class Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def _payments(reservation):
+    payments = reservation.get('payments') or []
+    if isinstance(payments, str):
+        try:
+            payments = json.loads(payments)
+        except (ValueError, TypeError):
+            payments = []
+    return [p for p in payments if isinstance(p, dict)] if isinstance(payments, list) else []
+
+
+def _payment_amount(payment):
+    amount = payment.get('amount')
+    if isinstance(amount, dict):
+        amount = amount.get('value')
+    try:
+        return float(amount) if amount not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _payment_row(payment):
+    return {
+        'paymentId': payment.get('id'),
+        'paymentStatus': payment.get('status'),
+        'paymentAmount': _payment_amount(payment),
+        'paymentMethod': payment.get('paymentMethod') or payment.get('paymentMethodID') or payment.get('paymentMethodId'),
+        'paymentCreatedAt': payment.get('createdAt'),
+        'paymentPaidAt': payment.get('paidAt'),
+    }
+
+
+def _payment_summary(payments):
+    amounts = [_payment_amount(p) or 0 for p in payments]
+    paid = [(p, a) for p, a in zip(payments, amounts) if str(p.get('status', '')).lower() == 'paid']
+    paid_at = [p.get('paidAt') for p, _ in paid if p.get('paidAt')]
+    return {
+        'paymentCount': len(payments),
+        'paymentTotalAmount': sum(amounts),
+        'paidAmount': sum(a for _, a in paid),
+        'paymentStatuses': '|'.join(str(p.get('status', '')) for p in payments),
+        'lastPaidAt': max(paid_at) if paid_at else None,
+    }
+
+
+def reservation_export_rows(reservation, payments_layout):
+    """Flatten one reservation into export records according to payments_layout."""
+    base = {column: reservation.get(column) for column in RESERVATION_EXPORT_COLUMNS}
+    payments = _payments(reservation)
+
+    if payments_layout == 'nested':
+        base['payments'] = payments
+        return [base]
+    if payments_layout == 'columns':
+        return [{**base, **_payment_summary(payments)}]
+
+    if not payments:
+        return [{**base, **{column: None for column in PAYMENT_ROW_COLUMNS}}]
+    return [{**base, **_payment_row(payment)} for payment in payments]
+
+
+def reservation_export_columns(payments_layout):
+    if payments_layout == 'columns':
+        return RESERVATION_EXPORT_COLUMNS + PAYMENT_SUMMARY_COLUMNS
+    if payments_layout == 'nested':
+        return RESERVATION_EXPORT_COLUMNS + ('payments',)
+    return RESERVATION_EXPORT_COLUMNS + PAYMENT_ROW_COLUMNS
+
+
+def crm_customer_export_rows(customer):
+    return [{column: customer.get(column) for column in CRM_CUSTOMER_EXPORT_COLUMNS}]
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return '|'.join('' if v is None else str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    return value
+
+
+def _csv_lines(pages, columns, flatten):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for page in pages:
+        yield ''.join(
+            writer.writerow([_csv_value(record.get(column)) for column in columns])
+            for row in page
+            for record in flatten(row)
+        )
+
+
+def _ndjson_lines(pages, flatten):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for page in pages:
+        yield ''.join(
+            encoder.encode(record) + '\n'
+            for row in page
+            for record in flatten(row)
+        )
+
+
+def export_response(pages, export_format, columns, flatten, filename, request=None):
+    """
+    StreamingHttpResponse writing every record of pages as CSV or NDJSON.
+
+    pages is consumed lazily, so only the page being written is held in memory
+    (also under ASGI when request is given).
+    """
+    pages = prefetch_first_page(pages)
+    if export_format == 'csv':
+        body = _csv_lines(pages, columns, flatten)
+        content_type = 'text/csv; charset=utf-8'
+    else:
+        body = _ndjson_lines(pages, flatten)
+        content_type = 'application/x-ndjson'
+
+    response = streaming_response(request, body, content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,159 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from .phones import normalize_phone_e164
+
+
+# Stable ids for imported rows without an id column, so re-running an import skips what is already there
+IMPORT_NAMESPACE = uuid.UUID('5b1f0c2e-7c1a-4d7e-9a51-3f0e6f0f2a11')
+
+DEFAULT_RESERVATION_STATUS = 'pending'
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def _clean(row, field):
+    value = row.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_import_datetime(value, utc_offset_hours):
+    """Parse an ISO or 'YYYY-MM-DD HH:MM[:SS]' value; naive values are in the brand's UTC offset."""
+    if value is None:
+        return None
+    text = str(value).strip().replace('Z', '+00:00')
+    for candidate in (text, text.replace('/', '-')):
+        try:
+            parsed = datetime.fromisoformat(candidate)
+            break
+        except ValueError:
+            continue
+    else:
+        raise ImportRowError(f"Invalid datetime: {value}")
+    local_tz = dt_timezone(timedelta(hours=utc_offset_hours))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=local_tz)
+    return parsed
+
+
+def _local_timestamp(value, utc_offset_hours):
+    # reservationDateTime is stored as brand-local time without offset (as reserve_slots writes it)
+    local_tz = dt_timezone(timedelta(hours=utc_offset_hours))
+    return parse_import_datetime(value, utc_offset_hours).astimezone(local_tz).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def _aware_timestamp(value, utc_offset_hours):
+    if not value:
+        return None
+    return parse_import_datetime(value, utc_offset_hours).isoformat()
+
+
+def _list_value(value):
+    if not value:
+        return []
+    if value.startswith('['):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            raise ImportRowError(f"Invalid JSON list: {value[:50]}")
+        return parsed if isinstance(parsed, list) else [parsed]
+    return [item.strip() for item in value.split('|') if item.strip()]
+
+
+def reservation_from_csv_row(row, brand_id, default_outlet_id=None, utc_offset_hours=7, now=None):
+    """Validate and normalise one reservation CSV row into an ecosuite_reservations record."""
+    now = now or datetime.now(dt_timezone.utc).isoformat()
+
+    outlet_id = _clean(row, 'outletId') or default_outlet_id
+    customer_name = _clean(row, 'customerName')
+    phone = normalize_phone_e164(_clean(row, 'customerPhone'))
+    guests = _clean(row, 'numberOfGuests')
+    reservation_date_time = _clean(row, 'reservationDateTime')
+
+    missing = [
+        field for field, value in (
+            ('outletId', outlet_id),
+            ('customerName', customer_name),
+            ('customerPhone', phone),
+            ('numberOfGuests', guests),
+            ('reservationDateTime', reservation_date_time),
+        ) if not value
+    ]
+    if missing:
+        raise ImportRowError(f"Missing required fields: {', '.join(missing)}")
+
+    try:
+        number_of_guests = int(float(guests))
+    except ValueError:
+        raise ImportRowError(f"numberOfGuests must be a number: {guests}")
+    if number_of_guests <= 0:
+        raise ImportRowError("numberOfGuests must be greater than 0")
+
+    local_date_time = _local_timestamp(reservation_date_time, utc_offset_hours)
+
+    payments = _clean(row, 'payments')
+    try:
+        payments = json.loads(payments) if payments else []
+    except ValueError:
+        raise ImportRowError("payments must be a JSON array")
+    if not isinstance(payments, list):
+        raise ImportRowError("payments must be a JSON array")
+
+    reservation_id = _clean(row, 'id') or str(uuid.uuid5(IMPORT_NAMESPACE, f"reservation:{brand_id}:{outlet_id}:{phone}:{local_date_time}"))
+
+    return {
+        'id': reservation_id,
+        'brandId': brand_id,
+        'outletId': outlet_id,
+        'customerName': customer_name,
+        'customerPhone': phone,
+        'numberOfGuests': number_of_guests,
+        'reservationDateTime': local_date_time,
+        'status': _clean(row, 'status') or DEFAULT_RESERVATION_STATUS,
+        'tableIds': _list_value(_clean(row, 'tableIds')),
+        'notes': _clean(row, 'notes'),
+        'utcOffset': _clean(row, 'utcOffset'),
+        'payments': payments,
+        'checkedInAt': _aware_timestamp(_clean(row, 'checkedInAt'), utc_offset_hours),
+        'checkedOutAt': _aware_timestamp(_clean(row, 'checkedOutAt'), utc_offset_hours),
+        'createdAt': _aware_timestamp(_clean(row, 'createdAt'), utc_offset_hours) or now,
+        'updatedAt': now,
+    }
+
+
+def crm_customer_from_csv_row(row, brand_id, default_outlet_id=None, utc_offset_hours=7, now=None):
+    """Validate and normalise one CRM customer CSV row into an ecosuite_crm_customers record."""
+    now = now or datetime.now(dt_timezone.utc).isoformat()
+
+    outlet_id = _clean(row, 'outletId') or default_outlet_id
+    full_name = _clean(row, 'fullName')
+    phone = normalize_phone_e164(_clean(row, 'phone'))
+
+    missing = [
+        field for field, value in (('outletId', outlet_id), ('fullName', full_name), ('phone', phone))
+        if not value
+    ]
+    if missing:
+        raise ImportRowError(f"Missing required fields: {', '.join(missing)}")
+
+    customer_id = _clean(row, 'id') or str(uuid.uuid5(IMPORT_NAMESPACE, f"crm-customer:{brand_id}:{phone}"))
+
+    return {
+        'id': customer_id,
+        'brandId': brand_id,
+        'outletId': outlet_id,
+        'fullName': full_name,
+        'phone': phone,
+        'email': _clean(row, 'email'),
+        'receiptIds': _list_value(_clean(row, 'receiptIds')),
+        'notes': _clean(row, 'notes'),
+        'utcOffset': _clean(row, 'utcOffset'),
+        'createdAt': _aware_timestamp(_clean(row, 'createdAt'), utc_offset_hours) or now,
+        'updatedAt': now,
+    }
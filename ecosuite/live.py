@@ -0,0 +1,316 @@
+import asyncio
+import collections
+import itertools
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+# Realtime tables pushed to the live board, with the SSE event name used for each
+LIVE_TABLES = {
+    'ecosuite_reservations': 'reservation',
+    'ecosuite_reservation_tombstones': 'tombstone',
+    'ecosuite_capacity_slot': 'capacitySlot',
+}
+
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+
+
+def realtime_url(supabase_url):
+    """Realtime endpoint of a Supabase project URL (https://x.supabase.co -> wss://x.supabase.co/realtime/v1)."""
+    if not supabase_url:
+        return None
+    url = supabase_url.rstrip('/')
+    if url.startswith('https://'):
+        url = 'wss://' + url[len('https://'):]
+    elif url.startswith('http://'):
+        url = 'ws://' + url[len('http://'):]
+    return url + '/realtime/v1'
+
+
+def sse_message(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    lines.extend(f"data: {line}" for line in payload.splitlines() or [''])
+    return '\n'.join(lines) + '\n\n'
+
+
+class ReplayBuffer:
+    """
+    Ring buffer of the most recent live events, shared by every subscriber in the process.
+
+    Event ids are '<epoch>-<seq>'. The epoch changes with every process, so an id from
+    another worker (or from before a restart) is recognised as unknown instead of
+    being compared with an unrelated sequence.
+    """
+
+    def __init__(self, size=1000):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._events = collections.deque(maxlen=size)
+        self._seq = itertools.count(1)
+        self._condition = threading.Condition()
+        self._waiters = set()
+
+    @property
+    def last_seq(self):
+        with self._condition:
+            return self._events[-1]['seq'] if self._events else 0
+
+    def append(self, event, data, outlet_id=None):
+        with self._condition:
+            seq = next(self._seq)
+            self._events.append({
+                'seq': seq,
+                'id': f"{self.epoch}-{seq}",
+                'event': event,
+                'outletId': outlet_id,
+                'data': data,
+            })
+            self._condition.notify_all()
+            for loop, event in self._waiters:
+                loop.call_soon_threadsafe(event.set)
+            return seq
+
+    def parse_id(self, event_id):
+        """Sequence number of an event id from this process, or None when it is unknown."""
+        if not event_id:
+            return None
+        epoch, _, seq = str(event_id).partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def covers(self, seq):
+        """True when every event after seq is still in the buffer."""
+        with self._condition:
+            return not self._events or self._events[0]['seq'] <= seq + 1
+
+    def since(self, seq, outlet_id=None):
+        """
+        Events after seq for outlet_id (events without an outlet go to everyone).
+        Returns (events, head); head is the last sequence number looked at, to pass
+        as seq next time.
+        """
+        with self._condition:
+            events = list(self._events)
+        head = events[-1]['seq'] if events else seq
+        return [
+            event for event in events
+            if event['seq'] > seq and (event['outletId'] is None or outlet_id is None or event['outletId'] == outlet_id)
+        ], max(seq, head)
+
+    async def wait_async(self, seq, timeout):
+        """wait() for coroutines; append() wakes them through their event loop."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            if self._events and self._events[-1]['seq'] > seq:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._condition:
+                self._waiters.discard(waiter)
+
+    def wait(self, seq, timeout):
+        """Block until an event after seq is appended or timeout seconds pass."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: bool(self._events) and self._events[-1]['seq'] > seq,
+                timeout=timeout,
+            )
+
+
+class LiveHub:
+    """
+    Fan out Supabase Realtime changes to live board subscribers.
+
+    One background thread per process holds a single Realtime subscription to
+    LIVE_TABLES and appends every change to a ReplayBuffer; each SSE response
+    reads from that buffer, so the number of open boards does not change the
+    upstream load. The subscription is started with the first subscriber.
+    """
+
+    def __init__(self, url, token, buffer_size=1000, heartbeat=HEARTBEAT_SECONDS):
+        self.url = url
+        self.token = token
+        self.heartbeat = heartbeat
+        self.buffer = ReplayBuffer(buffer_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._subscribed = False
+        self._stats = {
+            'subscribers': 0,
+            'events': 0,
+            'upstreamConnects': 0,
+            'upstreamErrors': 0,
+        }
+
+    @property
+    def configured(self):
+        return bool(self.url and self.token)
+
+    def publish_change(self, payload):
+        """Realtime postgres_changes callback: buffer the change under its outlet."""
+        data = payload.get('data') or {}
+        table = data.get('table')
+        event = LIVE_TABLES.get(table)
+        if not event:
+            return None
+        record = data.get('record') or {}
+        old_record = data.get('old_record') or {}
+        outlet_id = record.get('outletId') or old_record.get('outletId')
+        with self._lock:
+            self._stats['events'] += 1
+        return self.buffer.append(event, {
+            'action': str(getattr(data.get('type'), 'value', data.get('type'))),
+            'record': record or None,
+            'oldRecord': old_record or None,
+            'commitTimestamp': data.get('commit_timestamp'),
+        }, outlet_id=outlet_id)
+
+    def _on_subscribe(self, state, error=None):
+        state = str(getattr(state, 'value', state))
+        if state != 'SUBSCRIBED':
+            print(f"Live board realtime channel {state}: {error}")
+            return
+        with self._lock:
+            self._stats['upstreamConnects'] += 1
+            resubscribed = self._subscribed
+            self._subscribed = True
+        if resubscribed:
+            # Changes made while the socket was down were not received; tell boards to refetch
+            self.buffer.append('resync', {'at': datetime.now(dt_timezone.utc).isoformat()})
+
+    async def _listen(self):
+        from realtime import AsyncRealtimeClient, RealtimePostgresChangesListenEvent
+
+        client = AsyncRealtimeClient(self.url, self.token, auto_reconnect=True)
+        await client.connect()
+        channel = client.channel('ecosuite-live-board')
+        for table in LIVE_TABLES:
+            channel.on_postgres_changes(
+                RealtimePostgresChangesListenEvent.All, self.publish_change, table=table, schema='public',
+            )
+        await channel.subscribe(self._on_subscribe)
+        try:
+            # The client reconnects and rejoins on its own; stop once it gives up
+            while client.is_connected:
+                await asyncio.sleep(1)
+        finally:
+            await client.close()
+
+    def _run(self):
+        backoff = 1
+        while True:
+            started = time.monotonic()
+            try:
+                asyncio.run(self._listen())
+            except Exception as e:
+                print(f"Live board realtime connection failed: {e}")
+            with self._lock:
+                self._stats['upstreamErrors'] += 1
+            backoff = 1 if time.monotonic() - started > 60 else min(backoff * 2, 60)
+            time.sleep(backoff)
+
+    def _ensure_worker(self):
+        if not self.configured or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-board', daemon=True)
+                self._thread.start()
+
+    def _resume(self, last_event_id):
+        seq = self.buffer.parse_id(last_event_id)
+        reset = None
+        if last_event_id and seq is None:
+            reset = 'unknown lastEventId'
+        elif seq is not None and not self.buffer.covers(seq):
+            reset = 'lastEventId is outside the replay window'
+        if seq is None or reset:
+            seq = self.buffer.last_seq
+        return seq, reset
+
+    def _timeout(self, deadline):
+        if deadline is None:
+            return self.heartbeat
+        return max(0, min(self.heartbeat, deadline - time.monotonic()))
+
+    def stream(self, outlet_id, last_event_id=None, max_seconds=None):
+        """
+        SSE lines for one board: buffered events after last_event_id, then live events.
+
+        A reset event is sent first when last_event_id is given but cannot be replayed
+        (it is from another process or older than the buffer); the client should then
+        refetch the board. A comment is sent every heartbeat seconds to keep proxies
+        from closing the connection. With max_seconds the stream ends after that long
+        and EventSource reconnects with Last-Event-ID, picking up where it left off.
+        """
+        self._ensure_worker()
+        seq, reset = self._resume(last_event_id)
+
+        with self._lock:
+            self._stats['subscribers'] += 1
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            if reset:
+                yield sse_message('reset', {'reason': reset}, f"{self.buffer.epoch}-{seq}")
+
+            deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+            while True:
+                events, seq = self.buffer.since(seq, outlet_id)
+                for event in events:
+                    yield sse_message(event['event'], event['data'], event['id'])
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                if not self.buffer.wait(seq, self._timeout(deadline)):
+                    yield ": heartbeat\n\n"
+        finally:
+            with self._lock:
+                self._stats['subscribers'] -= 1
+
+    async def astream(self, outlet_id, last_event_id=None, max_seconds=None):
+        """stream() for the ASGI server: waits on the event loop instead of holding a thread."""
+        self._ensure_worker()
+        seq, reset = self._resume(last_event_id)
+
+        with self._lock:
+            self._stats['subscribers'] += 1
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            if reset:
+                yield sse_message('reset', {'reason': reset}, f"{self.buffer.epoch}-{seq}")
+
+            deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+            while True:
+                events, seq = self.buffer.since(seq, outlet_id)
+                for event in events:
+                    yield sse_message(event['event'], event['data'], event['id'])
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                if not await self.buffer.wait_async(seq, self._timeout(deadline)):
+                    yield ": heartbeat\n\n"
+        finally:
+            with self._lock:
+                self._stats['subscribers'] -= 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['upstreamRunning'] = self._thread is not None and self._thread.is_alive()
+        stats['lastEventId'] = f"{self.buffer.epoch}-{self.buffer.last_seq}"
+        return stats
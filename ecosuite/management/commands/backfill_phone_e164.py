@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ecosuite import views
+from ecosuite.backends import call_rpc
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill customerPhoneE164 on ecosuite_reservations and phoneE164 on "
+        "ecosuite_crm_customers in batches (ecosuite_backfill_phone_e164)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per call (default 1000)')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds to pause between batches (default 0.1)')
+        parser.add_argument(
+            '--table',
+            choices=['ecosuite_reservations', 'ecosuite_crm_customers'],
+            action='append',
+            help='Table to backfill (default: both)',
+        )
+
+    def handle(self, *args, **options):
+        supabase = views.create_supabase_client()
+        tables = options['table'] or ['ecosuite_reservations', 'ecosuite_crm_customers']
+
+        for table in tables:
+            total = 0
+            while True:
+                updated = call_rpc('ecosuite_backfill_phone_e164', {
+                    'p_table': table,
+                    'p_batch_size': options['batch_size'],
+                }, supabase) or 0
+                if not updated:
+                    # A short batch is not the end: SKIP LOCKED leaves out rows other writers hold
+                    break
+                total += updated
+                self.stdout.write(f"{table}: {total} rows backfilled")
+                time.sleep(options['sleep'])
+            self.stdout.write(self.style.SUCCESS(f"{table}: done ({total} rows)"))
@@ -0,0 +1,124 @@
+import statistics
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from ecosuite import views
+from ecosuite.backends import RPC_BACKENDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark commit_reservation latency and throughput with reserve_slots called through "
+        "each RPC backend. This creates real reservations; they are deleted and the capacity "
+        "slots rebuilt afterwards unless --keep is passed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--brand', required=True, help='Brand ID to book against')
+        parser.add_argument('--outlet', required=True, help='Outlet ID to book against')
+        parser.add_argument('--datetime', required=True, help='reservationDateTime to book (Asia/Jakarta local time)')
+        parser.add_argument('--pax', type=int, default=2, help='numberOfGuests per booking (default 2)')
+        parser.add_argument('--iterations', type=int, default=50, help='Bookings per backend (default 50)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent bookings (default 4)')
+        parser.add_argument('--backends', default=','.join(RPC_BACKENDS), help='Comma-separated backends to compare')
+        parser.add_argument('--join-waitlist', action='store_true', help='Set joinWaitlist on every booking')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark reservations instead of deleting them and rebuilding slots')
+
+    def handle(self, *args, **options):
+        backends = [b.strip() for b in options['backends'].split(',') if b.strip()]
+        for backend in backends:
+            if backend not in RPC_BACKENDS:
+                raise CommandError(f"Invalid backend '{backend}'. Must be one of {', '.join(RPC_BACKENDS)}")
+
+        run_id = uuid.uuid4().hex[:8]
+        factory = APIRequestFactory()
+        try:
+            for backend in backends:
+                with override_settings(ECOSUITE_RPC_BACKENDS={'reserve_slots': backend}):
+                    self._run_backend(factory, backend, run_id, options)
+        finally:
+            if not options['keep']:
+                self._cleanup(run_id, options)
+
+    def _run_backend(self, factory, backend, run_id, options):
+        def commit(i):
+            request = factory.post('/api/ecosuite/reservations/commit/', {
+                'brandId': options['brand'],
+                'outletId': options['outlet'],
+                'reservationDateTime': options['datetime'],
+                'numberOfGuests': options['pax'],
+                'idempotencyKey': f'benchmark-{run_id}-{backend}-{i}',
+                'customerName': 'Benchmark',
+                'notes': f'benchmark run {run_id}',
+                'joinWaitlist': options['join_waitlist'],
+            }, format='json')
+            started = time.perf_counter()
+            response = views.commit_reservation(request)
+            return time.perf_counter() - started, response.status_code
+
+        indices = iter(range(options['iterations']))
+        indices_lock = threading.Lock()
+        results = []
+        errors = []
+
+        def worker():
+            try:
+                while True:
+                    with indices_lock:
+                        i = next(indices, None)
+                    if i is None:
+                        return
+                    results.append(commit(i))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # Each thread reuses its own connection for all of its bookings; close it once at the end
+                connections.close_all()
+
+        # Warm up connections and code paths outside the measurement
+        commit('warmup')
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        if errors:
+            raise errors[0]
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        status_counts = {}
+        for _, status_code in results:
+            status_counts[status_code] = status_counts.get(status_code, 0) + 1
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{backend}"))
+        self.stdout.write(f"  requests:   {len(results)} (concurrency {options['concurrency']})")
+        self.stdout.write(f"  statuses:   {status_counts}")
+        self.stdout.write(f"  throughput: {len(results) / elapsed:.1f} req/s")
+        self.stdout.write(f"  mean:       {statistics.mean(latencies):.1f} ms")
+        for label, pct in (('p50', 50), ('p95', 95), ('p99', 99)):
+            self.stdout.write(f"  {label}:        {_percentile(latencies, pct):.1f} ms")
+
+    def _cleanup(self, run_id, options):
+        supabase = views.create_supabase_client()
+        supabase.table('ecosuite_reservations').delete().like('idempotencyKey', f'benchmark-{run_id}-%').execute()
+        # Recompute usedPax/waitlistedPax from the remaining reservations
+        factory = APIRequestFactory()
+        request = factory.post('/api/ecosuite/slots/rebuild/', {'brandId': options['brand'], 'outletId': options['outlet']}, format='json')
+        response = views.rebuild_capacity_slots(request)
+        self.stdout.write(f"Deleted benchmark reservations for run {run_id}; rebuild returned {response.status_code}")
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ecosuite.benchmarks.importtime import compare_cold_start, measure_cold_start
+from ecosuite.benchmarks.runner import compare_to_baseline, run_scenario
+from ecosuite.benchmarks.scenarios import SCENARIOS
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / 'benchmarks' / 'baseline.json'
+COLD_START = 'cold_start'
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the reservation hot paths offline: each scenario seeds an in-memory "
+        "Supabase stand-in and sends requests through the full Django stack. Reports "
+        "throughput and p50/p95/p99 latency. The cold_start scenario times a fresh worker's "
+        "imports with python -X importtime. --compare fails when a scenario regresses "
+        "against the stored baseline, --save-baseline rewrites it. Timings only compare on "
+        "the machine that recorded the baseline: CI records one from the base commit in the "
+        "same job, and the committed baseline.json is for local runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', default=','.join([*SCENARIOS, COLD_START]), help='Comma-separated scenarios to run')
+        parser.add_argument('--import-runs', type=int, default=5, help='Interpreters started for cold_start (default 5)')
+        parser.add_argument('--iterations', type=int, default=200, help='Requests per scenario (default 200)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (default 8)')
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated Supabase round-trip time in ms (default 0)')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+        parser.add_argument('--compare', action='store_true', help='Exit non-zero if a scenario regresses against the baseline')
+        parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed regression as a fraction of the baseline (default 0.5)')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results to the baseline file')
+
+    def handle(self, *args, **options):
+        names = [s.strip() for s in options['scenarios'].split(',') if s.strip()]
+        for name in names:
+            if name not in SCENARIOS and name != COLD_START:
+                raise CommandError(f"Invalid scenario '{name}'. Must be one of {', '.join([*SCENARIOS, COLD_START])}")
+
+        run_settings = {
+            'iterations': options['iterations'],
+            'concurrency': options['concurrency'],
+            'latencyMs': options['latency_ms'],
+        }
+        baseline_path = Path(options['baseline'])
+        baseline = None
+        if options['compare']:
+            if not baseline_path.exists():
+                raise CommandError(f"Baseline {baseline_path} does not exist; run with --save-baseline first")
+            baseline = json.loads(baseline_path.read_text())
+            if baseline.get('settings') != run_settings:
+                raise CommandError(f"Baseline was recorded with {baseline.get('settings')}, not {run_settings}")
+
+        results = {}
+        regressions = []
+        for name in names:
+            if name == COLD_START:
+                result = results[name] = measure_cold_start(runs=options['import_runs'])
+                self._report_cold_start(result)
+                if baseline is not None and name in baseline['scenarios']:
+                    regressions += compare_cold_start(result, baseline['scenarios'][name], options['tolerance'])
+                continue
+            result = run_scenario(SCENARIOS[name], options['iterations'], options['concurrency'], options['latency_ms'] / 1000)
+            results[name] = result
+            self._report(name, result, options)
+            if baseline is not None and name in baseline['scenarios']:
+                regressions += compare_to_baseline(name, result, baseline['scenarios'][name], options['tolerance'])
+
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps({'settings': run_settings, 'scenarios': results}, indent=2) + '\n')
+            self.stdout.write(f"Baseline written to {baseline_path}")
+
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f"{len(regressions)} regression(s) against {baseline_path}")
+        if baseline is not None:
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path} (tolerance {options['tolerance']:.0%})"))
+
+    def _report(self, name, result, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{name}"))
+        self.stdout.write(f"  {SCENARIOS[name].description}")
+        self.stdout.write(f"  requests:   {result['requests']} (concurrency {options['concurrency']}, Supabase latency {options['latency_ms']:.0f} ms)")
+        self.stdout.write(f"  statuses:   {result['statuses']}")
+        self.stdout.write(f"  throughput: {result['throughput']:.1f} req/s")
+        self.stdout.write(f"  mean:       {result['mean']:.1f} ms")
+        for label in ('p50', 'p95', 'p99'):
+            self.stdout.write(f"  {label}:        {result[label]:.1f} ms")
+
+    def _report_cold_start(self, result):
+        self.stdout.write(self.style.MIGRATE_HEADING(COLD_START))
+        self.stdout.write("  Imports of a fresh worker (python -X importtime), median of runs")
+        self.stdout.write(f"  runs:       {result['runs']}")
+        self.stdout.write(f"  imports:    {result['importMs']:.1f} ms (min {result['minImportMs']:.1f} ms, stdev {result['stdevImportMs']:.1f} ms)")
+        for entry in result['slowest'][:5]:
+            self.stdout.write(f"    {entry['cumulativeMs']:7.1f} ms  {entry['module']}")
+
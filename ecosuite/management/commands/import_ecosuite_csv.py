@@ -0,0 +1,199 @@
+import csv
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from ecosuite import views
+from ecosuite.imports import ImportRowError, crm_customer_from_csv_row, reservation_from_csv_row
+
+
+IMPORT_KINDS = {
+    'reservations': ('ecosuite_reservations', reservation_from_csv_row),
+    'crm-customers': ('ecosuite_crm_customers', crm_customer_from_csv_row),
+}
+
+# Besides the id, a row is a duplicate when a row with the same natural key exists:
+# table -> (key columns as stored, matching record fields, report message). Both keys are
+# covered by the (brandId, ...E164) indexes from sql/003_phone_e164.sql.
+NATURAL_KEYS = {
+    'ecosuite_reservations': (
+        ('customerPhoneE164', 'reservationDateTime'),
+        ('customerPhone', 'reservationDateTime'),
+        'A reservation for this phone at this time already exists',
+    ),
+    'ecosuite_crm_customers': (
+        ('phoneE164',),
+        ('phone',),
+        'A customer with this phone already exists',
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import reservations or CRM customers for a brand from a CSV file. Rows are "
+        "streamed, validated and normalised (E.164 phones, brand-local datetimes), "
+        "deduplicated against the file and existing rows, and inserted in batches. "
+        "Capacity slots are rebuilt once per outlet at the end of a reservation import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORT_KINDS), help='What the CSV contains')
+        parser.add_argument('csv_path', help='CSV file with a header row (column names as in the exports)')
+        parser.add_argument('--brand', required=True, help='Brand ID the rows belong to')
+        parser.add_argument('--outlet', help='Outlet ID for rows without an outletId column')
+        parser.add_argument('--utc-offset', type=int, default=7, help='UTC offset (hours) of naive datetimes (default 7)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per insert request (default 500)')
+        parser.add_argument('--report', help='Write the per-row report (errors and duplicates) to this CSV path')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and deduplicate only, insert nothing')
+        parser.add_argument('--skip-rebuild', action='store_true', help='Do not rebuild capacity slots after importing reservations')
+
+    def handle(self, *args, **options):
+        table, parse_row = IMPORT_KINDS[options['kind']]
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be greater than 0")
+
+        self.supabase = views.create_supabase_client()
+        self.table = table
+        self.key_columns, self.key_fields, self.key_message = NATURAL_KEYS[table]
+        self.options = options
+        self.report = []
+        self.counts = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'errors': 0}
+        self.touched_outlets = {}
+
+        seen_ids = set()
+        seen_keys = set()
+        batch = []
+
+        try:
+            csv_file = open(options['csv_path'], newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(f"Cannot open {options['csv_path']}: {e}")
+
+        with csv_file:
+            # Line 1 is the header
+            for line_number, row in enumerate(csv.DictReader(csv_file), start=2):
+                self.counts['rows'] += 1
+                try:
+                    record = parse_row(row, options['brand'], options['outlet'], options['utc_offset'])
+                except ImportRowError as e:
+                    self._report(line_number, row.get('id'), 'error', str(e))
+                    continue
+
+                key = self._natural_key(record)
+                if record['id'] in seen_ids or key in seen_keys:
+                    self._report(line_number, record['id'], 'duplicate', 'Duplicate of an earlier row in this file')
+                    continue
+                seen_ids.add(record['id'])
+                seen_keys.add(key)
+
+                batch.append((line_number, record))
+                if len(batch) >= options['batch_size']:
+                    self._flush(batch)
+                    batch = []
+
+        if batch:
+            self._flush(batch)
+
+        if table == 'ecosuite_reservations' and not options['dry_run'] and not options['skip_rebuild']:
+            self._rebuild_capacity()
+
+        if options['report']:
+            with open(options['report'], 'w', newline='', encoding='utf-8') as report_file:
+                writer = csv.DictWriter(report_file, fieldnames=['line', 'id', 'result', 'message'])
+                writer.writeheader()
+                writer.writerows(self.report)
+            self.stdout.write(f"Report written to {options['report']}")
+        else:
+            for entry in self.report[:50]:
+                self.stdout.write(f"line {entry['line']}: {entry['result']} - {entry['message']}")
+            if len(self.report) > 50:
+                self.stdout.write(f"... {len(self.report) - 50} more (use --report to write them all)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.counts['rows']} rows: {self.counts['inserted']} inserted, "
+            f"{self.counts['duplicates']} duplicates, {self.counts['errors']} errors"
+            + (" (dry run)" if options['dry_run'] else "")
+        ))
+
+    def _report(self, line_number, record_id, result, message):
+        self.counts['errors' if result == 'error' else 'duplicates'] += 1
+        self.report.append({'line': line_number, 'id': record_id, 'result': result, 'message': message})
+
+    def _natural_key(self, record):
+        return tuple(_key_value(record[field]) for field in self.key_fields)
+
+    def _flush(self, batch):
+        # One query for the ids that already exist, one for the natural keys
+        ids = [record['id'] for _, record in batch]
+        existing = self.supabase.table(self.table).select('id').in_('id', ids).execute().data or []
+        existing_ids = {row['id'] for row in existing}
+
+        query = self.supabase.table(self.table).select(','.join(self.key_columns)).eq('brandId', self.options['brand'])
+        for column, field in zip(self.key_columns, self.key_fields):
+            query = query.in_(column, sorted({record[field] for _, record in batch}))
+        rows = query.execute().data or []
+        existing_keys = {tuple(_key_value(row[column]) for column in self.key_columns) for row in rows}
+
+        new_records = []
+        for line_number, record in batch:
+            if record['id'] in existing_ids:
+                self._report(line_number, record['id'], 'duplicate', 'Already exists')
+            elif self._natural_key(record) in existing_keys:
+                self._report(line_number, record['id'], 'duplicate', self.key_message)
+            else:
+                new_records.append((line_number, record))
+
+        if not new_records:
+            return
+        if self.options['dry_run']:
+            # Counted as would-be inserts
+            self.counts['inserted'] += len(new_records)
+            return
+
+        try:
+            # ignore_duplicates keeps a concurrent insert of the same id from failing the batch;
+            # only the rows actually inserted come back
+            inserted = self.supabase.table(self.table).upsert(
+                [record for _, record in new_records], on_conflict='id', ignore_duplicates=True,
+            ).execute().data or []
+        except Exception as e:
+            for line_number, record in new_records:
+                self._report(line_number, record['id'], 'error', f"Batch insert failed: {e}")
+            return
+
+        inserted_ids = {row['id'] for row in inserted}
+        self.counts['inserted'] += len(inserted_ids)
+        for line_number, record in new_records:
+            if record['id'] not in inserted_ids:
+                self._report(line_number, record['id'], 'duplicate', 'Inserted by someone else during the import')
+            elif self.table == 'ecosuite_reservations':
+                reservation_date = record['reservationDateTime'][:10]
+                dates = self.touched_outlets.setdefault(record['outletId'], [reservation_date, reservation_date])
+                dates[0] = min(dates[0], reservation_date)
+                dates[1] = max(dates[1], reservation_date)
+        self.stdout.write(f"{self.counts['inserted']} rows inserted")
+
+    def _rebuild_capacity(self):
+        # usedPax/waitlistedPax only matter from today on; rebuild each outlet once
+        today = date.today().isoformat()
+        factory = APIRequestFactory()
+        for outlet_id, (first_date, last_date) in self.touched_outlets.items():
+            if last_date < today:
+                continue
+            request = factory.post('/api/ecosuite/slots/rebuild/', {
+                'brandId': self.options['brand'],
+                'outletId': outlet_id,
+                'startDate': max(first_date, today),
+                'endDate': last_date,
+            }, format='json')
+            response = views.rebuild_capacity_slots(request)
+            self.stdout.write(f"Rebuilt capacity slots for outlet {outlet_id}: {response.status_code}")
+
+
+def _key_value(value):
+    # PostgREST may return reservationDateTime with fractional seconds; the import writes YYYY-MM-DDTHH:MM:SS
+    if isinstance(value, str) and len(value) > 19 and value[10:11] == 'T':
+        return value[:19]
+    return value
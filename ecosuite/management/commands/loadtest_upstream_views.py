@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+SERVERS = {
+    'wsgi': ['taratechapi.wsgi'],
+    'asgi': ['--worker-class', 'uvicorn.workers.UvicornWorker', 'taratechapi.asgi:application'],
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _stub_upstream(delay):
+    """Local stand-in for ESB: answers every request with a small JSON body after delay seconds."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps({'data': {'branchCode': 'SUPG', 'path': self.path}}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', _free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test an upstream-bound endpoint (esb/get-branch-data) under the sync gunicorn "
+        "workers and under the ASGI uvicorn workers, against a local ESB stub that answers "
+        "after --upstream-delay seconds. Both servers run on this machine with the same "
+        "number of workers, so the numbers are comparable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', default=','.join(SERVERS), help='Comma-separated servers to compare (wsgi, asgi)')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn workers (default 2, as in the Dockerfile)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per server (default 200)')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients (default 50)')
+        parser.add_argument('--upstream-delay', type=float, default=0.5, help='Stub upstream latency in seconds (default 0.5)')
+        parser.add_argument('--path', default='/api/ecosuite/esb/get-branch-data/', help='Endpoint to load')
+
+    def handle(self, *args, **options):
+        servers = [s.strip() for s in options['servers'].split(',') if s.strip()]
+        for server in servers:
+            if server not in SERVERS:
+                raise CommandError(f"Invalid server '{server}'. Must be one of {', '.join(SERVERS)}")
+
+        upstream = _stub_upstream(options['upstream_delay'])
+        upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}"
+        try:
+            for server in servers:
+                self._run_server(server, upstream_url, options)
+        finally:
+            upstream.shutdown()
+
+    def _run_server(self, server, upstream_url, options):
+        port = _free_port()
+        env = {
+            **os.environ,
+            'ESB_URL_STAGING_INT': upstream_url,
+            'SUPAGETTI_ESB_TOKEN': 'loadtest',
+            'ECOSUITE_WARM_UP': 'false',
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'taratechapi.settings'),
+        }
+        command = [
+            sys.executable, '-m', 'gunicorn',
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(options['workers']),
+            '--log-level', 'warning',
+            *SERVERS[server],
+        ]
+        process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            self._wait_until_ready(base_url, process)
+            results, elapsed = asyncio.run(self._load(base_url + options['path'], options))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        status_counts = {}
+        for _, status_code in results:
+            status_counts[status_code] = status_counts.get(status_code, 0) + 1
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{server}"))
+        self.stdout.write(f"  requests:   {len(results)} (concurrency {options['concurrency']}, {options['workers']} workers, upstream {options['upstream_delay'] * 1000:.0f} ms)")
+        self.stdout.write(f"  statuses:   {status_counts}")
+        self.stdout.write(f"  throughput: {len(results) / elapsed:.1f} req/s")
+        self.stdout.write(f"  mean:       {statistics.mean(latencies):.1f} ms")
+        for label, pct in (('p50', 50), ('p95', 95), ('p99', 99)):
+            self.stdout.write(f"  {label}:        {_percentile(latencies, pct):.1f} ms")
+
+    def _wait_until_ready(self, base_url, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server exited with code {process.returncode}")
+            try:
+                if httpx.get(base_url + '/healthz', timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise CommandError(f"Server at {base_url} did not become ready in {timeout}s")
+
+    async def _load(self, url, options):
+        limits = httpx.Limits(max_connections=options['concurrency'])
+        timeout = httpx.Timeout(120.0)
+        remaining = iter(range(options['requests']))
+        results = []
+
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            async def worker():
+                for _ in remaining:
+                    started = time.perf_counter()
+                    try:
+                        status_code = (await client.get(url)).status_code
+                    except httpx.HTTPError as e:
+                        status_code = type(e).__name__
+                    results.append((time.perf_counter() - started, status_code))
+
+            # Warm up both workers' imports and upstream connections outside the measurement
+            await asyncio.gather(*(client.get(url) for _ in range(options['workers'] * 2)))
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(options['concurrency'])))
+            elapsed = time.perf_counter() - started
+        return results, elapsed
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
@@ -0,0 +1,130 @@
+import base64
+import json
+import re
+from datetime import date, datetime, timedelta
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Columns every reservation page needs to build the next cursor
+CURSOR_FIELDS = ('reservationDateTime', 'id')
+
+_FIELD_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse the limit query parameter, bounded to [1, maximum]."""
+    if value in (None, ''):
+        return default
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a valid integer")
+    if page_size < 1:
+        raise ValueError("limit must be greater than 0")
+    return min(page_size, maximum)
+
+
+def parse_fields(value, required=CURSOR_FIELDS):
+    """
+    Turn fields=a,b,c into a PostgREST select list ('*' when not provided).
+
+    The cursor columns are always included so the next page can be requested.
+    """
+    if not value:
+        return '*'
+    fields = []
+    for field in str(value).split(','):
+        field = field.strip()
+        if not field:
+            continue
+        if not _FIELD_RE.match(field):
+            raise ValueError(f"Invalid field: {field}")
+        if field not in fields:
+            fields.append(field)
+    for field in required:
+        if field not in fields:
+            fields.append(field)
+    return ','.join(fields)
+
+
+def encode_cursor(row, fields=CURSOR_FIELDS):
+    """Opaque cursor pointing just past row in the keyset order of fields (default (reservationDateTime, id))."""
+    payload = json.dumps([row.get(field) for field in fields], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not sort_value or row_id is None:
+        raise ValueError("Invalid cursor")
+    return str(sort_value), str(row_id)
+
+
+def quote_filter_value(value):
+    # Values inside a PostgREST or=() tree must be quoted when they contain , . : ( )
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def apply_date_range(query, start_date=None, end_date=None, column='reservationDateTime'):
+    """
+    Filter column to [start_date, end_date]. YYYY-MM-DD values cover whole days
+    (end_date is inclusive); full ISO datetimes are used as given.
+    """
+    if start_date:
+        query = query.gte(column, _date_bound(start_date))
+    if end_date:
+        if len(end_date) == 10:
+            next_day = date.fromisoformat(end_date) + timedelta(days=1)
+            query = query.lt(column, next_day.isoformat())
+        else:
+            query = query.lte(column, _date_bound(end_date))
+    return query
+
+
+def _date_bound(value):
+    if len(value) == 10:
+        return date.fromisoformat(value).isoformat()
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).isoformat()
+
+
+def keyset_page(query, cursor=None, page_size=DEFAULT_PAGE_SIZE, column='reservationDateTime'):
+    """
+    Fetch one page ordered by (column, id) descending, column defaulting to reservationDateTime.
+
+    Reads page_size + 1 rows to learn whether another page exists without a count query.
+    Rows without a value in column are not part of the keyset and are skipped.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    query = query.not_.is_(column, 'null')
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.or_(
+            f"{column}.lt.{quote_filter_value(sort_value)},"
+            f"and({column}.eq.{quote_filter_value(sort_value)},id.lt.{quote_filter_value(row_id)})"
+        )
+    query = query.order(column, desc=True).order('id', desc=True).limit(page_size + 1)
+
+    rows = query.execute().data or []
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1], (column, 'id'))
+    return rows, None
+
+
+def next_page_headers(request, next_cursor):
+    """X-Next-Cursor and RFC 8288 Link headers for list-shaped responses."""
+    if not next_cursor:
+        return {}
+    params = request.query_params.copy()
+    params['cursor'] = next_cursor
+    next_url = request.build_absolute_uri(request.path + '?' + params.urlencode())
+    return {
+        'X-Next-Cursor': next_cursor,
+        'Link': f'<{next_url}>; rel="next"',
+    }
@@ -0,0 +1,30 @@
+import re
+
+
+DEFAULT_COUNTRY_CODE = '62'
+
+_SEPARATORS_RE = re.compile(r'[\s\-\.\(\)]')
+
+
+def normalize_phone_e164(phone_number):
+    """
+    Canonical E.164 form of a phone number, as stored in customerPhoneE164 / phoneE164.
+
+    Must stay in sync with ecosuite_normalize_phone (ecosuite/sql/002_crm_customer_sync.sql):
+    separators are dropped, '+...' is kept, '62...' gets a '+', a local '0...' number
+    becomes '+62...' and anything else is assumed to be an Indonesian number.
+    """
+    if phone_number is None:
+        return None
+
+    phone_number = _SEPARATORS_RE.sub('', str(phone_number).strip())
+    if not phone_number or phone_number == '+':
+        return None
+
+    if phone_number.startswith('+'):
+        return phone_number
+    if phone_number.startswith(DEFAULT_COUNTRY_CODE):
+        return '+' + phone_number
+    if phone_number.startswith('0'):
+        return '+' + DEFAULT_COUNTRY_CODE + phone_number[1:]
+    return '+' + DEFAULT_COUNTRY_CODE + phone_number
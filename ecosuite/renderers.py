@@ -0,0 +1,30 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .live import sse_message
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    JSON renderer selected by ?format=columnar.
+
+    Lets views that support a columnar response layout accept the 'format'
+    query parameter without DRF rejecting it as an unknown format suffix.
+    """
+    format = 'columnar'
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Accepts Accept: text/event-stream for Server-Sent Events views.
+
+    The event stream itself is a StreamingHttpResponse; this renderer only
+    formats error responses as a single SSE error event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return sse_message('error', data).encode(self.charset)
@@ -0,0 +1,117 @@
+-- ecosuite_merge_upsert: insert-or-merge a single row in one round trip.
+--
+-- Applies p_patch (only the columns the client sent) to the row with id p_id.
+-- When the row does not exist, validates p_required against p_insert || p_patch
+-- (absent or falsy values count as missing) and inserts it; a concurrent insert of the same id is resolved with
+-- ON CONFLICT (id) DO UPDATE, so the patch is merged instead of failing.
+--
+-- Returns {"row": <row json>, "inserted": bool}, or
+-- {"error": "MISSING_REQUIRED_FIELDS", "missingFields": [...]} when a new row
+-- lacks required fields. Unknown columns raise UNKNOWN_COLUMN.
+--
+-- Apply with: psql "$DATABASE_URL" -f ecosuite/sql/001_merge_upsert.sql
+
+CREATE OR REPLACE FUNCTION public.ecosuite_merge_upsert(
+    p_table text,
+    p_id text,
+    p_patch jsonb,
+    p_insert jsonb DEFAULT '{}'::jsonb,
+    p_required text[] DEFAULT '{}'::text[]
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_doc jsonb;
+    v_id_type text;
+    v_key text;
+    v_patch_cols text;
+    v_patch_vals text;
+    v_insert_cols text;
+    v_insert_vals text;
+    v_conflict_set text;
+    v_missing text[];
+    v_row jsonb;
+    v_inserted boolean;
+BEGIN
+    IF p_table NOT IN ('ecosuite_reservations', 'ecosuite_crm_customers', 'ecosuite_brands') THEN
+        RAISE EXCEPTION 'INVALID_TABLE: %', p_table;
+    END IF;
+
+    IF p_id IS NULL OR p_id = '' THEN
+        RAISE EXCEPTION 'INVALID_ID';
+    END IF;
+
+    p_patch := coalesce(p_patch, '{}'::jsonb) - 'id';
+    v_doc := (coalesce(p_insert, '{}'::jsonb) || p_patch) - 'id';
+
+    -- Every key must be a real column; this also makes the identifiers safe to format
+    FOR v_key IN SELECT jsonb_object_keys(v_doc) LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_attribute
+            WHERE attrelid = format('public.%I', p_table)::regclass
+              AND attname = v_key AND attnum > 0 AND NOT attisdropped
+        ) THEN
+            RAISE EXCEPTION 'UNKNOWN_COLUMN: %', v_key;
+        END IF;
+    END LOOP;
+
+    SELECT format_type(atttypid, atttypmod) INTO v_id_type
+    FROM pg_attribute
+    WHERE attrelid = format('public.%I', p_table)::regclass AND attname = 'id';
+
+    SELECT string_agg(format('%I', k), ', '), string_agg(format('r.%I', k), ', '),
+           string_agg(format('%I = EXCLUDED.%I', k, k), ', ')
+    INTO v_patch_cols, v_patch_vals, v_conflict_set
+    FROM jsonb_object_keys(p_patch) AS k;
+
+    -- 1) Existing row: merge only the provided fields
+    IF v_patch_cols IS NOT NULL THEN
+        EXECUTE format(
+            'UPDATE public.%1$I AS t SET (%2$s) = (SELECT %3$s FROM jsonb_populate_record(NULL::public.%1$I, $1) AS r)
+             WHERE t.id = $2::%4$s RETURNING to_jsonb(t)',
+            p_table, v_patch_cols, v_patch_vals, v_id_type
+        ) INTO v_row USING p_patch, p_id;
+
+        IF v_row IS NOT NULL THEN
+            RETURN jsonb_build_object('row', v_row, 'inserted', false);
+        END IF;
+    END IF;
+
+    -- 2) New row: validate and insert. A required field is missing when it is absent
+    -- or falsy (null, "", 0, false, [], {}), like the views' `if not data.get(field)`,
+    -- so e.g. numberOfGuests: 0 is rejected.
+    SELECT coalesce(array_agg(f ORDER BY ord), '{}'::text[]) INTO v_missing
+    FROM unnest(p_required) WITH ORDINALITY AS u(f, ord)
+    WHERE coalesce(v_doc -> f, 'null'::jsonb)
+          IN ('null'::jsonb, '""'::jsonb, '0'::jsonb, 'false'::jsonb, '[]'::jsonb, '{}'::jsonb);
+
+    IF array_length(v_missing, 1) > 0 THEN
+        RETURN jsonb_build_object('error', 'MISSING_REQUIRED_FIELDS', 'missingFields', to_jsonb(v_missing));
+    END IF;
+
+    v_doc := v_doc || jsonb_build_object('id', p_id);
+
+    SELECT string_agg(format('%I', k), ', '), string_agg(format('r.%I', k), ', ')
+    INTO v_insert_cols, v_insert_vals
+    FROM jsonb_object_keys(v_doc) AS k;
+
+    EXECUTE format(
+        'INSERT INTO public.%1$I AS t (%2$s)
+         SELECT %3$s FROM jsonb_populate_record(NULL::public.%1$I, $1) AS r
+         ON CONFLICT (id) DO %4$s
+         RETURNING to_jsonb(t), (t.xmax = 0)',
+        p_table, v_insert_cols, v_insert_vals,
+        CASE WHEN v_conflict_set IS NULL THEN 'NOTHING' ELSE 'UPDATE SET ' || v_conflict_set END
+    ) INTO v_row, v_inserted USING v_doc;
+
+    IF v_row IS NULL THEN
+        -- Lost an insert race with an empty patch: return the winner's row
+        EXECUTE format('SELECT to_jsonb(t) FROM public.%I AS t WHERE t.id = $1::%s', p_table, v_id_type)
+        INTO v_row USING p_id;
+        v_inserted := false;
+    END IF;
+
+    RETURN jsonb_build_object('row', v_row, 'inserted', v_inserted);
+END;
+$$;
@@ -0,0 +1,139 @@
+-- CRM customer sync from reservations.
+--
+-- ecosuite_normalize_phone mirrors _parse_phone_to_international in views.py
+-- (Indonesian numbers become +62...), ignoring spaces, dashes, dots and brackets.
+--
+-- ecosuite_sync_crm_customers takes a batch of reservation summaries and, for
+-- each one, upserts the CRM customer matched by normalised phone and appends the
+-- receipt id to receiptIds (jsonb array) only when it is not already there.
+-- A transaction-level advisory lock per phone serialises concurrent batches
+-- touching the same customer, so no duplicate customers or receipts are created.
+-- Each item runs in its own subtransaction: an item that raises is rolled back
+-- and reported in "failed" while the rest of the batch is still applied.
+--
+-- Item shape: {"brandId", "outletId", "customerName", "customerPhone",
+--              "customerEmail", "notes", "utcOffset", "receiptId", "userId"}
+-- Returns {"processed", "inserted", "updated", "skipped", "failed"}, where
+-- "failed" is a list of {"index", "receiptId", "error"} (index into p_items, from 0).
+--
+-- Apply with: psql "$DATABASE_URL" -f ecosuite/sql/002_crm_customer_sync.sql
+
+CREATE OR REPLACE FUNCTION public.ecosuite_normalize_phone(p_phone text)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN v IS NULL OR v = '' OR v = '+' THEN NULL
+        WHEN v LIKE '+%' THEN v
+        WHEN v LIKE '62%' THEN '+' || v
+        WHEN v LIKE '0%' THEN '+62' || substr(v, 2)
+        ELSE '+62' || v
+    END
+    FROM (SELECT regexp_replace(btrim(p_phone), '[\s\-\.\(\)]', '', 'g') AS v) AS cleaned
+$$;
+
+CREATE INDEX IF NOT EXISTS ecosuite_crm_customers_normalized_phone_idx
+    ON public.ecosuite_crm_customers (public.ecosuite_normalize_phone("phone"));
+
+CREATE OR REPLACE FUNCTION public.ecosuite_sync_crm_customers(p_items jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_item jsonb;
+    v_index int;
+    v_row public.ecosuite_crm_customers;
+    v_phone text;
+    v_receipt jsonb;
+    v_customer_id text;
+    v_now timestamptz := now();
+    v_processed int := 0;
+    v_inserted int := 0;
+    v_updated int := 0;
+    v_skipped int := 0;
+    v_failed jsonb := '[]'::jsonb;
+BEGIN
+    FOR v_item, v_index IN
+        SELECT value, (ordinality - 1)::int FROM jsonb_array_elements(coalesce(p_items, '[]'::jsonb)) WITH ORDINALITY
+    LOOP
+        v_processed := v_processed + 1;
+        v_phone := public.ecosuite_normalize_phone(v_item ->> 'customerPhone');
+
+        IF v_phone IS NULL
+           OR coalesce(v_item ->> 'brandId', '') = ''
+           OR coalesce(v_item ->> 'outletId', '') = '' THEN
+            v_skipped := v_skipped + 1;
+            CONTINUE;
+        END IF;
+
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtextextended('ecosuite_crm_phone:' || v_phone, 0));
+
+            -- Both branches take the item's columns from the same typed record
+            v_row := jsonb_populate_record(NULL::public.ecosuite_crm_customers, jsonb_build_object(
+                'brandId', v_item -> 'brandId',
+                'outletId', v_item -> 'outletId',
+                'fullName', coalesce(v_item ->> 'customerName', ''),
+                'phone', v_item -> 'customerPhone',
+                'email', v_item -> 'customerEmail',
+                'notes', v_item -> 'notes',
+                'createdBy', v_item -> 'userId',
+                'updatedBy', v_item -> 'userId',
+                'utcOffset', v_item -> 'utcOffset'
+            ));
+
+            v_receipt := CASE
+                WHEN coalesce(v_item ->> 'receiptId', '') = '' THEN '[]'::jsonb
+                ELSE jsonb_build_array(v_item ->> 'receiptId')
+            END;
+
+            SELECT c."id"::text INTO v_customer_id
+            FROM public.ecosuite_crm_customers AS c
+            WHERE public.ecosuite_normalize_phone(c."phone") = v_phone
+            ORDER BY c."createdAt"
+            LIMIT 1;
+
+            IF v_customer_id IS NOT NULL THEN
+                UPDATE public.ecosuite_crm_customers AS c
+                SET "receiptIds" = coalesce(c."receiptIds", '[]'::jsonb) || v_receipt,
+                    "updatedAt" = v_now,
+                    "updatedBy" = v_row."updatedBy"
+                WHERE c."id"::text = v_customer_id
+                  AND v_receipt <> '[]'::jsonb
+                  AND NOT coalesce(c."receiptIds", '[]'::jsonb) @> v_receipt;
+
+                IF FOUND THEN
+                    v_updated := v_updated + 1;
+                ELSE
+                    v_skipped := v_skipped + 1;
+                END IF;
+            ELSE
+                INSERT INTO public.ecosuite_crm_customers (
+                    "id", "brandId", "outletId", "fullName", "phone", "email", "receiptIds",
+                    "notes", "createdAt", "updatedAt", "createdBy", "updatedBy", "utcOffset"
+                ) VALUES (
+                    gen_random_uuid(), v_row."brandId", v_row."outletId", v_row."fullName", v_row."phone", v_row."email", v_receipt,
+                    v_row."notes", v_now, v_now, v_row."createdBy", v_row."updatedBy", v_row."utcOffset"
+                );
+
+                v_inserted := v_inserted + 1;
+            END IF;
+        EXCEPTION WHEN others THEN
+            v_failed := v_failed || jsonb_build_object(
+                'index', v_index,
+                'receiptId', v_item ->> 'receiptId',
+                'error', SQLERRM
+            );
+        END;
+    END LOOP;
+
+    RETURN jsonb_build_object(
+        'processed', v_processed,
+        'inserted', v_inserted,
+        'updated', v_updated,
+        'skipped', v_skipped,
+        'failed', v_failed
+    );
+END;
+$$;
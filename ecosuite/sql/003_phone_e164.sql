@@ -0,0 +1,89 @@
+-- Canonical E.164 phone columns for reservation and CRM phone lookups.
+--
+-- customerPhoneE164 / phoneE164 are maintained by triggers from customerPhone /
+-- phone using ecosuite_normalize_phone (002_crm_customer_sync.sql), so every write
+-- path (views, RPCs, dashboard edits) stores the same canonical value. Lookups
+-- filter on (brandId, <e164 column>) instead of the raw, inconsistently formatted
+-- strings.
+--
+-- Existing rows are filled by ecosuite_backfill_phone_e164 in batches:
+--   python manage.py backfill_phone_e164
+--
+-- Apply with: psql "$DATABASE_URL" -f ecosuite/sql/003_phone_e164.sql
+-- (run outside a transaction; the indexes are built CONCURRENTLY)
+
+ALTER TABLE public.ecosuite_reservations ADD COLUMN IF NOT EXISTS "customerPhoneE164" text;
+ALTER TABLE public.ecosuite_crm_customers ADD COLUMN IF NOT EXISTS "phoneE164" text;
+
+CREATE OR REPLACE FUNCTION public.ecosuite_reservations_set_phone_e164()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW."customerPhoneE164" := public.ecosuite_normalize_phone(NEW."customerPhone");
+    RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.ecosuite_crm_customers_set_phone_e164()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW."phoneE164" := public.ecosuite_normalize_phone(NEW."phone");
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS ecosuite_reservations_phone_e164 ON public.ecosuite_reservations;
+CREATE TRIGGER ecosuite_reservations_phone_e164
+    BEFORE INSERT OR UPDATE OF "customerPhone", "customerPhoneE164" ON public.ecosuite_reservations
+    FOR EACH ROW EXECUTE FUNCTION public.ecosuite_reservations_set_phone_e164();
+
+DROP TRIGGER IF EXISTS ecosuite_crm_customers_phone_e164 ON public.ecosuite_crm_customers;
+CREATE TRIGGER ecosuite_crm_customers_phone_e164
+    BEFORE INSERT OR UPDATE OF "phone", "phoneE164" ON public.ecosuite_crm_customers
+    FOR EACH ROW EXECUTE FUNCTION public.ecosuite_crm_customers_set_phone_e164();
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ecosuite_reservations_brand_phone_e164_idx
+    ON public.ecosuite_reservations ("brandId", "customerPhoneE164", "reservationDateTime" DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ecosuite_crm_customers_brand_phone_e164_idx
+    ON public.ecosuite_crm_customers ("brandId", "phoneE164");
+
+-- Fill one batch of rows whose canonical phone is missing; returns the number of rows updated.
+-- Updating the raw phone column to itself fires the trigger above.
+CREATE OR REPLACE FUNCTION public.ecosuite_backfill_phone_e164(p_table text, p_batch_size int DEFAULT 1000)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_phone_col text;
+    v_e164_col text;
+    v_updated int;
+BEGIN
+    IF p_table = 'ecosuite_reservations' THEN
+        v_phone_col := 'customerPhone';
+        v_e164_col := 'customerPhoneE164';
+    ELSIF p_table = 'ecosuite_crm_customers' THEN
+        v_phone_col := 'phone';
+        v_e164_col := 'phoneE164';
+    ELSE
+        RAISE EXCEPTION 'INVALID_TABLE: %', p_table;
+    END IF;
+
+    EXECUTE format(
+        'UPDATE public.%1$I AS t SET %2$I = t.%2$I
+         WHERE t.ctid IN (
+             SELECT s.ctid FROM public.%1$I AS s
+             WHERE s.%3$I IS NULL AND public.ecosuite_normalize_phone(s.%2$I) IS NOT NULL
+             LIMIT $1
+             FOR UPDATE SKIP LOCKED
+         )',
+        p_table, v_phone_col, v_e164_col
+    ) USING greatest(p_batch_size, 1);
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
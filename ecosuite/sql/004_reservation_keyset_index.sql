@@ -0,0 +1,11 @@
+-- Index backing keyset pagination of reservation listings
+-- (ORDER BY "reservationDateTime" DESC, id DESC per brand / outlet).
+--
+-- Apply with: psql "$DATABASE_URL" -f ecosuite/sql/004_reservation_keyset_index.sql
+-- (run outside a transaction; the indexes are built CONCURRENTLY)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ecosuite_reservations_brand_keyset_idx
+    ON public.ecosuite_reservations ("brandId", "reservationDateTime" DESC, "id" DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ecosuite_reservations_outlet_keyset_idx
+    ON public.ecosuite_reservations ("outletId", "reservationDateTime" DESC, "id" DESC);
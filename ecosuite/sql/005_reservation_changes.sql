@@ -0,0 +1,61 @@
+-- Change feed for ecosuite_reservations (get-reservation-changes-for-brand).
+--
+-- "changedAt" is stamped by a trigger with clock_timestamp() on every insert and
+-- update, whoever the writer is (views, reserve_slots and the other RPCs, dashboard
+-- edits). updatedAt cannot serve as the watermark: it is written by callers, mixes
+-- Jakarta-local and UTC values, and the booking RPCs change status without
+-- bumping it.
+--
+-- Deleted reservations leave a row in ecosuite_reservation_tombstones so clients
+-- can drop them; cancelled/expired rows are reported as tombstones by the API.
+--
+-- Apply with: psql "$DATABASE_URL" -f ecosuite/sql/005_reservation_changes.sql
+-- (run outside a transaction; the index is built CONCURRENTLY)
+
+ALTER TABLE public.ecosuite_reservations
+    ADD COLUMN IF NOT EXISTS "changedAt" timestamptz NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION public.ecosuite_reservations_set_changed_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW."changedAt" := clock_timestamp();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS ecosuite_reservations_changed_at ON public.ecosuite_reservations;
+CREATE TRIGGER ecosuite_reservations_changed_at
+    BEFORE INSERT OR UPDATE ON public.ecosuite_reservations
+    FOR EACH ROW EXECUTE FUNCTION public.ecosuite_reservations_set_changed_at();
+
+CREATE TABLE IF NOT EXISTS public.ecosuite_reservation_tombstones (
+    "id" text PRIMARY KEY,
+    "brandId" text NOT NULL,
+    "outletId" text,
+    "changedAt" timestamptz NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE INDEX IF NOT EXISTS ecosuite_reservation_tombstones_brand_changed_idx
+    ON public.ecosuite_reservation_tombstones ("brandId", "changedAt", "id");
+
+CREATE OR REPLACE FUNCTION public.ecosuite_reservations_record_tombstone()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO public.ecosuite_reservation_tombstones ("id", "brandId", "outletId", "changedAt")
+    VALUES (OLD."id"::text, OLD."brandId"::text, OLD."outletId"::text, clock_timestamp())
+    ON CONFLICT ("id") DO UPDATE SET "changedAt" = EXCLUDED."changedAt";
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS ecosuite_reservations_tombstone ON public.ecosuite_reservations;
+CREATE TRIGGER ecosuite_reservations_tombstone
+    AFTER DELETE ON public.ecosuite_reservations
+    FOR EACH ROW EXECUTE FUNCTION public.ecosuite_reservations_record_tombstone();
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ecosuite_reservations_brand_changed_idx
+    ON public.ecosuite_reservations ("brandId", "changedAt", "id");
@@ -0,0 +1,134 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .pagination import keyset_page
+
+
+STREAM_PAGE_SIZE = 500
+
+
+def wants_stream(request):
+    return str(request.query_params.get('stream', '')).lower() in ('1', 'true', 'yes')
+
+
+def iter_pages_by_id(query_factory, page_size=STREAM_PAGE_SIZE):
+    """
+    Yield pages of rows ordered by id, fetched lazily with keyset pagination.
+
+    query_factory() must return a fresh select builder with filters applied
+    (builders are mutable, so each page needs its own).
+    """
+    last_id = None
+    while True:
+        query = query_factory()
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.order('id').limit(page_size).execute().data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]['id']
+
+
+def iter_reservation_pages(query_factory, page_size=STREAM_PAGE_SIZE):
+    """Yield pages of reservations in (reservationDateTime, id) descending order."""
+    cursor = None
+    while True:
+        rows, cursor = keyset_page(query_factory(), cursor, page_size)
+        if rows:
+            yield rows
+        if not cursor:
+            return
+
+
+def _encode_pages(pages, transform=None):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    first = True
+    for page in pages:
+        if transform is not None:
+            page = [transform(row) for row in page]
+        if not page:
+            continue
+        chunk = ','.join(encoder.encode(row) for row in page)
+        yield (chunk if first else ',' + chunk).encode()
+        first = False
+
+
+def prefetch_first_page(pages):
+    # Fetch the first page before the response starts so query errors can
+    # still become a normal 400 instead of a truncated 200.
+    iterator = iter(pages)
+    first_page = next(iterator, None)
+
+    def chained():
+        if first_page is not None:
+            yield first_page
+        yield from iterator
+
+    return chained()
+
+
+def is_asgi(request):
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def _iterate_in_thread(iterator):
+    # Each next() may fetch a page from Supabase, so it runs off the event loop
+    done = object()
+    while True:
+        chunk = await sync_to_async(next, thread_sensitive=False)(iterator, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+def streaming_response(request, body, content_type, status=200):
+    """
+    StreamingHttpResponse for a sync iterator of chunks. Under the ASGI server the
+    body must be an async iterator, or Django reads it to the end before sending
+    the first byte, so it is driven from a worker thread one chunk at a time.
+    """
+    if request is not None and is_asgi(request):
+        body = _iterate_in_thread(iter(body))
+    return StreamingHttpResponse(body, content_type=content_type, status=status)
+
+
+def stream_json_list(pages, transform=None, status=200, request=None):
+    """StreamingHttpResponse writing pages of rows as one JSON array."""
+    pages = prefetch_first_page(pages)
+
+    def body():
+        yield b'['
+        yield from _encode_pages(pages, transform)
+        yield b']'
+
+    return streaming_response(request, body(), 'application/json', status=status)
+
+
+def stream_json_object(key, pages, transform=None, count_key=None, status=200, request=None):
+    """
+    StreamingHttpResponse writing {"<key>": [rows...]} and, when count_key is
+    given, the number of rows written as a trailing member.
+    """
+    pages = prefetch_first_page(pages)
+    written = [0]
+
+    def counted(pages):
+        for page in pages:
+            written[0] += len(page)
+            yield page
+
+    def body():
+        yield ('{' + json.dumps(key) + ':[').encode()
+        yield from _encode_pages(counted(pages), transform)
+        if count_key:
+            yield ('],' + json.dumps(count_key) + ':' + str(written[0]) + '}').encode()
+        else:
+            yield b']}'
+
+    return streaming_response(request, body(), 'application/json', status=status)
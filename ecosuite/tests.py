@@ -1,3 +1,982 @@
-from django.test import TestCase
+import asyncio
+import json
+import pstats
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from koalaplus import views as koala_views
+from taratechapi import metrics
+from taratechapi.metrics import Counter, Histogram, QueryBudgetExceeded, assert_query_budget, classify, query_budget
+from taratechapi.profiling import RequestProfilingMiddleware
+
+from . import views
+from .views import common as common_views, esb as esb_views, pivot as pivot_views, slots as slots_views
+from .benchmarks.fake_supabase import FakeRPCError, FakeSupabase
+from .benchmarks.importtime import _import_times
+from .benchmarks.runner import run_scenario
+from .benchmarks.scenarios import CommitContention
+from .backends import call_rpc, merge_upsert, rpc_backend_for
+from .capacity import columnar_slots, nearest_fitting_windows
+from .changes import parse_since, reservation_changes
+from .coalescing import SingleFlight
+from .conditional import conditional_response, rows_etag
+from .crm_sync import CRMSyncQueue, crm_sync_item
+from .exports import export_response, reservation_export_columns, reservation_export_rows
+from .imports import ImportRowError, crm_customer_from_csv_row, reservation_from_csv_row
+from .live import LiveHub, realtime_url
+from .pagination import decode_cursor, encode_cursor, keyset_page, parse_fields, parse_page_size
+from .phones import normalize_phone_e164
+from .streaming import iter_pages_by_id, stream_json_list, stream_json_object
+
+
+def _slot(start, max_pax, used_pax):
+    return {'slotStart': start.isoformat(), 'maxPax': max_pax, 'usedPax': used_pax}
+
+
+class NearestFittingWindowsTest(SimpleTestCase):
+    def setUp(self):
+        self.base = datetime(2026, 1, 10, 10, 0, tzinfo=dt_timezone.utc)
+
+    def _slots(self, available):
+        return [
+            _slot(self.base + timedelta(minutes=30 * i), 10, 10 - free)
+            for i, free in enumerate(available)
+        ]
+
+    def test_finds_nearest_windows_on_both_sides(self):
+        # 16 slots, requested window at index 6 is blocked by the full slot at index 8
+        available = [4] * 16
+        available[8] = 0
+        slots = self._slots(available)
+        requested = self.base + timedelta(minutes=30 * 6)
+
+        result = nearest_fitting_windows(slots, 4, requested, count=2)
+
+        self.assertEqual([item['minutesFromRequested'] for item in result['before']], [-90, -120])
+        self.assertEqual([item['minutesFromRequested'] for item in result['after']], [90, 120])
+        self.assertEqual(result['after'][0]['availablePax'], 4)
+
+    def test_window_minimum_must_fit_pax(self):
+        slots = self._slots([6, 6, 2, 6, 6, 6, 6, 6, 6])
+        requested = self.base
+
+        result = nearest_fitting_windows(slots, 4, requested, count=5)
+
+        self.assertEqual(result['before'], [])
+        self.assertEqual([item['slotStart'] for item in result['after']], [slots[3]['slotStart'], slots[4]['slotStart']])
+
+    def test_gap_in_slots_resets_window(self):
+        slots = self._slots([4] * 4)
+        slots += [
+            _slot(self.base + timedelta(hours=5, minutes=30 * i), 10, 6)
+            for i in range(5)
+        ]
+
+        result = nearest_fitting_windows(slots, 2, self.base - timedelta(hours=1), count=3)
+
+        self.assertEqual(len(result['after']), 1)
+        self.assertEqual(result['after'][0]['slotStart'], slots[4]['slotStart'])
+
+    def test_not_before_excludes_past_windows(self):
+        slots = self._slots([4] * 10)
+        requested = self.base + timedelta(hours=3)
+
+        result = nearest_fitting_windows(slots, 2, requested, count=10, not_before=self.base + timedelta(hours=1))
+
+        self.assertEqual(result['before'][-1]['minutesFromRequested'], -120)
+
+    def test_failed_lookup_is_logged_and_returns_none(self):
+        supabase = mock.Mock()
+        supabase.table.side_effect = ConnectionError('down')
+
+        with self.assertLogs('ecosuite.views.slots', level='WARNING') as logs:
+            result = slots_views._suggest_alternative_slots(supabase, 'brand', 'outlet', self.base, 2)
+
+        self.assertIsNone(result)
+        self.assertIn('Alternative slot lookup failed: down', logs.output[0])
+
+
+class ColumnarSlotsTest(SimpleTestCase):
+    def test_constant_fields_are_hoisted_and_starts_become_offsets(self):
+        base = datetime(2026, 1, 10, 10, 0, tzinfo=dt_timezone.utc)
+        rows = [
+            {
+                'id': f'slot-{i}',
+                'brandId': 'brand',
+                'outletId': 'outlet',
+                'channel': 'both',
+                'slotStart': (base + timedelta(minutes=30 * i)).isoformat(),
+                'maxPax': 10,
+                'usedPax': 2 * i,
+                'maxWaitlistedPax': 4,
+                'waitlistedPax': 5 if i == 2 else 0,
+            }
+            for i in range(3)
+        ]
+
+        result = columnar_slots(rows)
+
+        self.assertEqual(result['constants'], {'brandId': 'brand', 'outletId': 'outlet', 'channel': 'both'})
+        self.assertEqual(result['baseTime'], rows[0]['slotStart'])
+        self.assertEqual(result['columns']['slotStartOffsetMinutes'], [0, 30, 60])
+        self.assertEqual(result['columns']['availablePax'], [10, 8, 6])
+        self.assertEqual(result['columns']['isWaitlistOverbooked'], [False, False, True])
+        self.assertNotIn('brandId', result['columns'])
+
+    def test_varying_fields_stay_as_columns(self):
+        rows = [
+            {'id': 'a', 'brandId': 'b1', 'outletId': 'o', 'channel': 'both', 'slotStart': '2026-01-10T10:00:00+00:00'},
+            {'id': 'b', 'brandId': 'b2', 'outletId': 'o', 'channel': 'both', 'slotStart': '2026-01-10T10:00:00+00:00'},
+        ]
+
+        result = columnar_slots(rows, include_waitlist_info=False)
+
+        self.assertEqual(result['columns']['brandId'], ['b1', 'b2'])
+        self.assertNotIn('waitlistedPax', result['columns'])
+
+
+class SingleFlightTest(SimpleTestCase):
+    def test_concurrent_identical_reads_share_one_fetch(self):
+        flight = SingleFlight(ttl=5)
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return ['row']
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', fetch))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while flight.stats()['coalesced'] < 4:
+            release.wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [['row']] * 5)
+        self.assertEqual(flight.do('key', fetch), ['row'])
+        stats = flight.stats()
+        self.assertEqual(stats['upstreamQueries'], 1)
+        self.assertEqual(stats['upstreamQueriesSaved'], 5)
+
+    def test_errors_are_not_cached(self):
+        flight = SingleFlight(ttl=5)
+
+        def failing():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            flight.do('key', failing)
+        self.assertEqual(flight.do('key', lambda: 'ok'), 'ok')
+        self.assertEqual(flight.stats()['errors'], 1)
+
+    def test_put_primes_and_forget_drops_the_cache(self):
+        flight = SingleFlight(ttl=5)
+        flight.put('key', ['warm'])
+        self.assertEqual(flight.do('key', lambda: ['fetched']), ['warm'])
+        flight.forget('key')
+        self.assertEqual(flight.do('key', lambda: ['fetched']), ['fetched'])
+        self.assertEqual(flight.stats()['upstreamQueries'], 1)
+
+
+class RpcBackendTest(SimpleTestCase):
+    @override_settings(ECOSUITE_RPC_BACKEND='supabase', ECOSUITE_RPC_BACKENDS={'reserve_slots': 'postgres'})
+    def test_per_rpc_backend_overrides_default(self):
+        self.assertEqual(rpc_backend_for('reserve_slots'), 'postgres')
+        self.assertEqual(rpc_backend_for('rebuild_capacity_slots'), 'supabase')
+
+    @override_settings(ECOSUITE_RPC_BACKEND='mysql')
+    def test_invalid_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            rpc_backend_for('reserve_slots')
+
+    def test_postgres_backend_calls_function_with_named_arguments(self):
+        cursor = mock.MagicMock()
+        cursor.fetchone.return_value = ({'status': 'confirmed'},)
+        connection = mock.MagicMock()
+        connection.cursor.return_value.__enter__.return_value = cursor
+
+        with mock.patch('ecosuite.backends.connections', {'default': connection}):
+            result = call_rpc('reserve_slots', {'p_pax': 2, 'p_slot_starts': ['2026-01-10T10:00:00+00:00']}, backend='postgres')
+
+        self.assertEqual(result, {'status': 'confirmed'})
+        cursor.execute.assert_called_once_with(
+            'SELECT public.reserve_slots(p_pax => %s, p_slot_starts => %s::timestamptz[])',
+            [2, ['2026-01-10T10:00:00+00:00']],
+        )
+
+    def test_postgres_backend_rejects_unsafe_identifiers(self):
+        with self.assertRaises(ValueError):
+            call_rpc('reserve_slots; drop table x', {}, backend='postgres')
+
+
+class MergeUpsertTest(SimpleTestCase):
+    def _supabase(self, data):
+        supabase = mock.MagicMock()
+        supabase.rpc.return_value.execute.return_value.data = data
+        return supabase
+
+    @override_settings(ECOSUITE_RPC_BACKEND='supabase', ECOSUITE_RPC_BACKENDS={})
+    def test_single_rpc_call_returns_row_and_inserted_flag(self):
+        supabase = self._supabase({'row': {'id': 'c1', 'fullName': 'Ana'}, 'inserted': True})
+
+        row, inserted, missing = merge_upsert(
+            'ecosuite_crm_customers', 'c1', {'fullName': 'Ana'}, {'brandId': 'b'}, ['brandId'], supabase=supabase,
+        )
+
+        self.assertEqual(row, {'id': 'c1', 'fullName': 'Ana'})
+        self.assertTrue(inserted)
+        self.assertEqual(missing, [])
+        supabase.rpc.assert_called_once_with('ecosuite_merge_upsert', {
+            'p_table': 'ecosuite_crm_customers',
+            'p_id': 'c1',
+            'p_patch': {'fullName': 'Ana'},
+            'p_insert': {'brandId': 'b'},
+            'p_required': ['brandId'],
+        })
+
+    @override_settings(ECOSUITE_RPC_BACKEND='supabase', ECOSUITE_RPC_BACKENDS={})
+    def test_missing_required_fields_are_reported(self):
+        supabase = self._supabase({'error': 'MISSING_REQUIRED_FIELDS', 'missingFields': ['outletId']})
+
+        row, inserted, missing = merge_upsert('ecosuite_brands', 'b1', {}, {}, ['outletId'], supabase=supabase)
+
+        self.assertIsNone(row)
+        self.assertEqual(missing, ['outletId'])
+
+    def test_tables_outside_the_whitelist_are_rejected(self):
+        with self.assertRaises(ValueError):
+            merge_upsert('ecosuite_users', 'u1', {}, supabase=self._supabase(None))
+
+
+class CRMSyncQueueTest(SimpleTestCase):
+    def queue(self, **kwargs):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        sync_queue = CRMSyncQueue(Path(directory) / 'crm_sync.sqlite3', lambda: 'client', **kwargs)
+        patcher = mock.patch.object(sync_queue, 'start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return sync_queue
+
+    def test_items_are_sent_in_batches(self):
+        sync_queue = self.queue(batch_size=2)
+        for i in range(3):
+            sync_queue.enqueue({'customerPhone': f'0812{i}'})
+
+        with mock.patch('ecosuite.crm_sync.call_rpc', return_value={'failed': []}) as rpc:
+            sync_queue.flush()
+
+        self.assertEqual([len(c.args[1]['p_items']) for c in rpc.call_args_list], [2, 1])
+        self.assertEqual(rpc.call_args_list[0].args[0], 'ecosuite_sync_crm_customers')
+        self.assertEqual((sync_queue.stats()['flushed'], sync_queue.stats()['pending']), (3, 0))
+
+    def test_queued_items_survive_a_worker_restart(self):
+        sync_queue = self.queue()
+        sync_queue.enqueue({'receiptId': 'r1'})
+
+        restarted = CRMSyncQueue(sync_queue.path, lambda: 'client')
+        with mock.patch('ecosuite.crm_sync.call_rpc', return_value={'failed': []}) as rpc:
+            restarted.flush()
+
+        self.assertEqual(rpc.call_args.args[1]['p_items'], [{'receiptId': 'r1'}])
+
+    def test_only_items_the_rpc_reports_as_failed_are_retried(self):
+        sync_queue = self.queue()
+        for i in range(3):
+            sync_queue.enqueue({'receiptId': f'r{i}'})
+        results = [{'failed': [{'index': 1, 'error': 'bad utcOffset'}]}, {'failed': []}]
+
+        with mock.patch('ecosuite.crm_sync.call_rpc', side_effect=results) as rpc:
+            sync_queue.flush()
+            self.assertEqual(sync_queue.stats()['pending'], 1)
+            with mock.patch('taratechapi.buffer.time.time', return_value=time.time() + 10):
+                sync_queue.flush()
+
+        self.assertEqual(rpc.call_args_list[1].args[1]['p_items'], [{'receiptId': 'r1'}])
+        self.assertEqual((sync_queue.stats()['flushed'], sync_queue.stats()['pending']), (3, 0))
+
+    def test_batch_that_fails_as_a_whole_is_split_so_good_items_still_sync(self):
+        sync_queue = self.queue(max_attempts=1)
+        for i in range(4):
+            sync_queue.enqueue({'receiptId': f'r{i}'})
+
+        def rpc(name, params, client):
+            if {'receiptId': 'r2'} in params['p_items']:
+                raise RuntimeError('cannot encode item')
+            return {'failed': []}
+
+        with mock.patch('ecosuite.crm_sync.call_rpc', side_effect=rpc):
+            sync_queue.flush()
+
+        stats = sync_queue.stats()
+        self.assertEqual((stats['flushed'], stats['pending'], stats['failed']), (3, 0, 1))
+
+    def test_reservation_without_phone_is_not_synced(self):
+        self.assertIsNone(crm_sync_item({'brandId': 'b', 'outletId': 'o'}, 'user'))
+        item = crm_sync_item({'id': 'r1', 'brandId': 'b', 'outletId': 'o', 'customerPhone': '0812'}, 'user')
+        self.assertEqual(item['receiptId'], 'r1')
+
+
+class NormalizePhoneE164Test(SimpleTestCase):
+    def test_common_input_formats_share_one_canonical_form(self):
+        for raw in ('081234567890', '6281234567890', '+6281234567890', '+62 812-3456-7890', ' 0812 3456 7890 ', '81234567890'):
+            self.assertEqual(normalize_phone_e164(raw), '+6281234567890', raw)
+
+    def test_foreign_numbers_with_plus_are_kept(self):
+        self.assertEqual(normalize_phone_e164('+1 (415) 555-0100'), '+14155550100')
+
+    def test_empty_values(self):
+        self.assertIsNone(normalize_phone_e164(None))
+        self.assertIsNone(normalize_phone_e164('  '))
+
+
+class BackfillPhoneE164Test(SimpleTestCase):
+    def test_short_batches_do_not_end_the_backfill(self):
+        with mock.patch.object(views, 'create_supabase_client'), \
+                mock.patch('ecosuite.management.commands.backfill_phone_e164.call_rpc', side_effect=[2, 1, 2, 0]) as rpc:
+            call_command('backfill_phone_e164', '--table', 'ecosuite_reservations', '--batch-size', '2', '--sleep', '0', stdout=StringIO())
+
+        self.assertEqual(rpc.call_count, 4)
+
+
+class KeysetPaginationTest(SimpleTestCase):
+    def _query(self, rows):
+        query = mock.MagicMock()
+        for method in ('or_', 'order', 'limit', 'is_'):
+            getattr(query, method).return_value = query
+        query.not_ = query
+        query.execute.return_value.data = rows
+        return query
+
+    def test_fetches_one_extra_row_to_detect_next_page(self):
+        rows = [{'id': str(i), 'reservationDateTime': f'2026-01-10T1{i}:00:00'} for i in range(4)]
+        query = self._query(rows)
+
+        page, next_cursor = keyset_page(query, page_size=3)
+
+        query.limit.assert_called_once_with(4)
+        self.assertEqual(len(page), 3)
+        self.assertEqual(decode_cursor(next_cursor), ('2026-01-10T12:00:00', '2'))
+
+    def test_cursor_filters_after_the_previous_page(self):
+        query = self._query([{'id': 'a', 'reservationDateTime': '2026-01-10T10:00:00'}])
+        cursor = encode_cursor({'id': 'r-9', 'reservationDateTime': '2026-01-10T12:00:00+07:00'})
+
+        page, next_cursor = keyset_page(query, cursor, page_size=3)
+
+        self.assertIsNone(next_cursor)
+        query.or_.assert_called_once_with(
+            'reservationDateTime.lt."2026-01-10T12:00:00+07:00",'
+            'and(reservationDateTime.eq."2026-01-10T12:00:00+07:00",id.lt."r-9")'
+        )
+
+    def test_fields_and_limit_are_validated(self):
+        self.assertEqual(parse_fields('status,id'), 'status,id,reservationDateTime')
+        self.assertEqual(parse_fields(None), '*')
+        with self.assertRaises(ValueError):
+            parse_fields('payments(*)')
+        self.assertEqual(parse_page_size('10000'), 500)
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+
+class StreamingJSONTest(SimpleTestCase):
+    def _body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_object_stream_is_valid_json_with_trailing_count(self):
+        pages = iter([[{'id': 1, 'password': 'x'}, {'id': 2}], [{'id': 3}]])
+
+        response = stream_json_object('users', pages, transform=lambda row: {'id': row['id']}, count_key='count')
+
+        self.assertEqual(json.loads(self._body(response)), {'users': [{'id': 1}, {'id': 2}, {'id': 3}], 'count': 3})
+
+    def test_empty_list_stream(self):
+        self.assertEqual(json.loads(self._body(stream_json_list(iter([])))), [])
+
+    def test_asgi_requests_stream_pages_as_they_are_fetched(self):
+        request = AsyncRequestFactory().get('/api/ecosuite/get-all-brands/', {'stream': 'true'})
+        loop_thread = threading.get_ident()
+        fetches = []
+
+        def pages():
+            for page in ([{'id': 1}], [{'id': 2}]):
+                fetches.append(threading.get_ident())
+                yield page
+
+        async def consume(response):
+            chunks = []
+            async for chunk in response.streaming_content:
+                chunks.append((chunk, len(fetches)))
+            return chunks
+
+        response = stream_json_object('brands', pages(), request=request)
+        self.assertTrue(response.is_async)
+        chunks = asyncio.run(consume(response))
+
+        self.assertEqual(json.loads(b''.join(chunk for chunk, _ in chunks)), {'brands': [{'id': 1}, {'id': 2}]})
+        # The second page is fetched after the first one has been sent, off the event loop
+        self.assertEqual([fetched for _, fetched in chunks], [1, 1, 2, 2])
+        self.assertNotIn(loop_thread, fetches[1:])
+
+        export = export_response(iter([[{'id': 'r1'}]]), 'ndjson', ('id',), lambda row: [row], 'reservations_b', request=request)
+        self.assertTrue(export.is_async)
+        self.assertEqual(b''.join(chunk for chunk, _ in asyncio.run(consume(export))), b'{"id":"r1"}\n')
+
+    def test_pages_are_fetched_by_id_until_a_short_page(self):
+        query = mock.MagicMock()
+        for method in ('gt', 'order', 'limit'):
+            getattr(query, method).return_value = query
+        query.execute.side_effect = [
+            mock.Mock(data=[{'id': 'a'}, {'id': 'b'}]),
+            mock.Mock(data=[{'id': 'c'}]),
+        ]
+
+        pages = list(iter_pages_by_id(lambda: query, page_size=2))
+
+        self.assertEqual(pages, [[{'id': 'a'}, {'id': 'b'}], [{'id': 'c'}]])
+        query.gt.assert_called_once_with('id', 'b')
+
+
+class ReservationExportTest(SimpleTestCase):
+    reservation = {
+        'id': 'r1',
+        'brandId': 'b',
+        'customerName': 'Ana, Jr',
+        'tableIds': ['t1', 't2'],
+        'payments': [
+            {'id': 'p1', 'status': 'paid', 'amount': 50000, 'paidAt': '2026-01-10T10:00:00'},
+            {'id': 'p2', 'status': 'pending', 'amount': {'value': '25000'}},
+        ],
+    }
+
+    def test_payments_as_child_rows(self):
+        rows = reservation_export_rows(self.reservation, 'rows')
+
+        self.assertEqual([row['paymentId'] for row in rows], ['p1', 'p2'])
+        self.assertEqual(rows[1]['paymentAmount'], 25000.0)
+        self.assertEqual(rows[0]['id'], 'r1')
+
+    def test_payments_as_summary_columns(self):
+        (row,) = reservation_export_rows(self.reservation, 'columns')
+
+        self.assertEqual(row['paymentCount'], 2)
+        self.assertEqual(row['paymentTotalAmount'], 75000.0)
+        self.assertEqual(row['paidAmount'], 50000.0)
+        self.assertEqual(row['lastPaidAt'], '2026-01-10T10:00:00')
+
+    def test_csv_is_streamed_page_by_page(self):
+        columns = reservation_export_columns('columns')
+        response = export_response(
+            iter([[self.reservation], [{'id': 'r2'}]]),
+            'csv',
+            columns,
+            lambda reservation: reservation_export_rows(reservation, 'columns'),
+            'reservations_b',
+        )
+
+        chunks = list(response.streaming_content)
+        lines = b''.join(chunks).decode().splitlines()
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(lines[0].split(',')[:2], ['id', 'brandId'])
+        self.assertIn('"Ana, Jr"', lines[1])
+        self.assertIn('t1|t2', lines[1])
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="reservations_b.csv"')
+
+
+class CSVImportRowTest(SimpleTestCase):
+    def test_reservation_row_is_normalised(self):
+        record = reservation_from_csv_row({
+            'customerName': ' Ana ',
+            'customerPhone': '0812-3456-7890',
+            'numberOfGuests': '4',
+            'reservationDateTime': '2026-01-10T11:00:00Z',
+            'tableIds': 't1|t2',
+        }, 'brand', default_outlet_id='outlet', now='2026-01-01T00:00:00+00:00')
+
+        self.assertEqual(record['customerPhone'], '+6281234567890')
+        self.assertEqual(record['reservationDateTime'], '2026-01-10T18:00:00')
+        self.assertEqual(record['outletId'], 'outlet')
+        self.assertEqual(record['tableIds'], ['t1', 't2'])
+        self.assertEqual(record['status'], 'pending')
+
+    def test_generated_ids_are_stable_across_runs(self):
+        row = {'customerName': 'Ana', 'customerPhone': '+6281234567890', 'numberOfGuests': '2',
+               'reservationDateTime': '2026-01-10 18:00', 'outletId': 'o'}
+        same_row_other_format = dict(row, customerPhone='081234567890', reservationDateTime='2026-01-10T18:00:00')
+
+        self.assertEqual(
+            reservation_from_csv_row(row, 'brand')['id'],
+            reservation_from_csv_row(same_row_other_format, 'brand')['id'],
+        )
+
+    def test_invalid_rows_raise_row_errors(self):
+        with self.assertRaisesMessage(ImportRowError, 'customerPhone'):
+            reservation_from_csv_row({'customerName': 'Ana', 'numberOfGuests': '2',
+                                      'reservationDateTime': '2026-01-10 18:00', 'outletId': 'o'}, 'brand')
+        with self.assertRaises(ImportRowError):
+            crm_customer_from_csv_row({'fullName': 'Ana', 'phone': '0812', 'outletId': 'o',
+                                       'createdAt': 'yesterday'}, 'brand')
+
+    def test_import_skips_reservations_matching_an_existing_phone_and_time(self):
+        supabase = FakeSupabase()
+        # Booked through the app, so its id is not the one the importer derives
+        supabase.tables['ecosuite_reservations'] = [{
+            'id': 'booked-in-app', 'brandId': 'brand', 'customerPhone': '0812 3456 7890',
+            'customerPhoneE164': '+6281234567890', 'reservationDateTime': '2026-01-10T18:00:00',
+        }]
+        csv_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, csv_dir)
+        csv_path = Path(csv_dir) / 'reservations.csv'
+        csv_path.write_text(
+            'customerName,customerPhone,numberOfGuests,reservationDateTime\n'
+            'Ana,081234567890,2,2026-01-10 18:00\n'
+            'Budi,081298765432,2,2026-01-10 18:00\n'
+        )
+
+        out = StringIO()
+        with mock.patch.object(views, 'create_supabase_client', return_value=supabase):
+            call_command('import_ecosuite_csv', 'reservations', str(csv_path), '--brand', 'brand',
+                         '--outlet', 'o', '--skip-rebuild', stdout=out)
+
+        self.assertIn('2 rows: 1 inserted, 1 duplicates, 0 errors', out.getvalue())
+        self.assertIn('A reservation for this phone at this time already exists', out.getvalue())
+        self.assertEqual(len(supabase.rows('ecosuite_reservations')), 2)
+
+
+class ConditionalResponseTest(SimpleTestCase):
+    rows = [{'id': 'b1', 'updatedAt': '2026-01-10T10:00:00+00:00', 'name': 'Brand'}]
+
+    def test_matching_if_none_match_returns_304(self):
+        etag = rows_etag(RequestFactory().get('/brands/'), self.rows)
+        request = RequestFactory().get('/brands/', HTTP_IF_NONE_MATCH=etag)
+
+        response = conditional_response(request, {'brands': self.rows}, self.rows)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_with_updated_at_and_query(self):
+        request = RequestFactory().get('/brands/')
+        changed = [dict(self.rows[0], updatedAt='2026-01-11T10:00:00+00:00')]
+
+        self.assertNotEqual(rows_etag(request, self.rows), rows_etag(request, changed))
+        self.assertNotEqual(rows_etag(request, self.rows), rows_etag(RequestFactory().get('/brands/?limit=5'), self.rows))
+
+    def test_content_hash_detects_changes_without_updated_at_bump(self):
+        request = RequestFactory().get('/reservations/')
+        changed = [dict(self.rows[0], name='Renamed')]
+
+        self.assertEqual(rows_etag(request, self.rows), rows_etag(request, changed))
+        self.assertNotEqual(rows_etag(request, self.rows, by_updated_at=False), rows_etag(request, changed, by_updated_at=False))
+
+    def test_stale_etag_returns_full_response(self):
+        request = RequestFactory().get('/brands/', HTTP_IF_NONE_MATCH='W/"stale"')
+
+        response = conditional_response(request, {'brands': self.rows}, self.rows, cache_control='public, max-age=60')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+
+class ReservationChangesTest(SimpleTestCase):
+    now = datetime(2026, 1, 10, 12, 0, tzinfo=dt_timezone.utc)
+
+    def _query(self, rows):
+        query = mock.MagicMock()
+        for method in ('or_', 'lt', 'order', 'limit'):
+            getattr(query, method).return_value = query
+        query.execute.return_value.data = rows
+        return query
+
+    def test_live_rows_and_tombstones_are_merged_in_change_order(self):
+        reservations = self._query([
+            {'id': 'r1', 'status': 'confirmed', 'changedAt': '2026-01-10T10:00:00+00:00'},
+            {'id': 'r2', 'status': 'cancelled', 'changedAt': '2026-01-10T10:02:00+00:00'},
+        ])
+        tombstones = self._query([{'id': 'r3', 'brandId': 'b', 'changedAt': '2026-01-10T10:01:00.5+00:00'}])
+
+        changes, watermark, has_more = reservation_changes(reservations, tombstones, None, 10, now=self.now)
+
+        self.assertEqual([(c['id'], c['tombstone']) for c in changes], [('r1', False), ('r3', True), ('r2', True)])
+        self.assertEqual(changes[1]['status'], 'deleted')
+        self.assertEqual(parse_since(watermark), ('2026-01-10T10:02:00+00:00', 'r2'))
+        self.assertFalse(has_more)
+        reservations.lt.assert_called_once_with('changedAt', '2026-01-10T11:59:55+00:00')
+
+    def test_watermark_is_kept_when_nothing_changed(self):
+        since = ('2026-01-10T10:00:00+00:00', 'r1')
+
+        changes, watermark, has_more = reservation_changes(self._query([]), self._query([]), since, 10, now=self.now)
+
+        self.assertEqual(changes, [])
+        self.assertEqual(parse_since(watermark), since)
+
+    def test_since_accepts_an_iso_datetime(self):
+        self.assertEqual(parse_since('2026-01-10T17:00:00+07:00'), ('2026-01-10T17:00:00+07:00', ''))
+
+
+class LiveHubTest(SimpleTestCase):
+    def setUp(self):
+        self.hub = LiveHub(None, None, buffer_size=3, heartbeat=0)
+
+    def _change(self, table, outlet_id, record_id, change_type='UPDATE'):
+        return {'data': {
+            'table': table,
+            'type': change_type,
+            'record': {'id': record_id, 'outletId': outlet_id},
+            'commit_timestamp': '2026-01-10T10:00:00Z',
+        }, 'ids': [1]}
+
+    def test_replays_buffered_events_for_the_outlet_after_last_event_id(self):
+        first = self.hub.publish_change(self._change('ecosuite_reservations', 'o1', 'r1'))
+        self.hub.publish_change(self._change('ecosuite_reservations', 'o2', 'r2'))
+        self.hub.publish_change(self._change('ecosuite_capacity_slot', 'o1', 's1'))
+
+        stream = self.hub.stream('o1', f"{self.hub.buffer.epoch}-{first}", max_seconds=0)
+        messages = list(stream)
+
+        self.assertEqual(messages[0], 'retry: 3000\n\n')
+        self.assertEqual(len(messages), 2)
+        self.assertIn('event: capacitySlot', messages[1])
+        self.assertIn('"id":"s1"', messages[1])
+        self.assertIn(f"id: {self.hub.buffer.epoch}-3", messages[1])
+
+    def test_unknown_or_expired_event_id_sends_reset(self):
+        for i in range(5):
+            self.hub.publish_change(self._change('ecosuite_reservations', 'o1', f"r{i}"))
+
+        for last_event_id in ('otherworker-2', f"{self.hub.buffer.epoch}-1"):
+            messages = list(self.hub.stream('o1', last_event_id, max_seconds=0))
+            self.assertEqual(len(messages), 2)
+            self.assertIn('event: reset', messages[1])
+            self.assertIn(f"id: {self.hub.buffer.epoch}-5", messages[1])
+
+    def test_live_events_wake_waiting_streams(self):
+        stream = self.hub.stream('o1', max_seconds=5)
+        self.assertEqual(next(stream), 'retry: 3000\n\n')
+        self.hub.heartbeat = 5
+        self.hub.publish_change(self._change('ecosuite_reservations', 'o2', 'other'))
+        threading.Timer(0.05, self.hub.publish_change, [self._change('ecosuite_reservations', 'o1', 'r1', 'INSERT')]).start()
+
+        message = next(stream)
+        stream.close()
+
+        self.assertIn('event: reservation', message)
+        self.assertIn('"action":"INSERT"', message)
+        self.assertEqual(self.hub.stats()['subscribers'], 0)
+
+    def test_realtime_url_from_project_url(self):
+        self.assertEqual(realtime_url('https://abc.supabase.co/'), 'wss://abc.supabase.co/realtime/v1')
+        self.assertIsNone(realtime_url(None))
+
+    async def test_async_stream_waits_on_the_event_loop(self):
+        stream = self.hub.astream('o1', max_seconds=5)
+        self.assertEqual(await stream.__anext__(), 'retry: 3000\n\n')
+        self.hub.heartbeat = 5
+        threading.Timer(0.05, self.hub.publish_change, [self._change('ecosuite_capacity_slot', 'o1', 's1')]).start()
+
+        message = await asyncio.wait_for(stream.__anext__(), 2)
+        await stream.aclose()
+
+        self.assertIn('event: capacitySlot', message)
+
+
+    def test_live_board_requires_authentication(self):
+        token = AccessToken()
+        token['id'] = 'user-1'
+        with mock.patch.object(views.live_board.live_hub, 'url', None):
+            self.assertEqual(self.client.get('/api/ecosuite/live/outlet/o1/').status_code, 401)
+            self.assertEqual(self.client.get('/api/ecosuite/live/stats/').status_code, 401)
+            # EventSource passes the token as a query parameter
+            response = self.client.get('/api/ecosuite/live/outlet/o1/', {'accessToken': str(token)})
+            self.assertEqual(response.status_code, 503)
+            response = self.client.get('/api/ecosuite/live/stats/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.assertEqual(response.status_code, 200)
+
+class AsyncUpstreamViewTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.upstream_requests = []
+
+    def _client(self, handler):
+        def record(request):
+            self.upstream_requests.append(request)
+            return handler(request)
+        return httpx.AsyncClient(transport=httpx.MockTransport(record))
+
+    async def test_esb_proxy_returns_upstream_json(self):
+        client = self._client(lambda request: httpx.Response(200, json={'branches': ['SUPG']}))
+        with mock.patch.object(esb_views, 'async_client', return_value=client), \
+                mock.patch.dict('os.environ', {'ESB_URL_STAGING_INT': 'https://esb.test/', 'SUPAGETTI_ESB_TOKEN': 't'}):
+            response = await views.get_branch_data(self.factory.get('/api/ecosuite/esb/get-branch-data/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {'branches': ['SUPG']})
+        self.assertEqual(str(self.upstream_requests[0].url), 'https://esb.test/qsv1/setting/branch')
+        self.assertEqual(self.upstream_requests[0].headers['Data-Branch'], 'SUPG')
+
+    async def test_disallowed_method_and_bad_json(self):
+        response = await views.get_branch_data(self.factory.post('/api/ecosuite/esb/get-branch-data/'))
+        self.assertEqual(response.status_code, 405)
+
+        response = await views.submit_reservation_transaction(
+            self.factory.post('/x', data='{not json', content_type='application/json')
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_koala_non_json_upstream_body_is_a_json_error(self):
+        client = self._client(lambda request: httpx.Response(200, text='<html>maintenance</html>'))
+        with mock.patch.object(koala_views, 'async_client', return_value=client):
+            response = await koala_views.get_broadcast_templates(self.factory.get('/api/koalaplus/broadcast-templates/'))
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(json.loads(response.content)['error'], 'Failed to get broadcast templates')
+
+    async def test_pending_pivot_payments_are_checked_concurrently(self):
+        in_flight = {'now': 0, 'max': 0}
+
+        async def pivot(request):
+            if request.url.path == '/v1/access-token':
+                return httpx.Response(200, json={'data': {'accessToken': 'token'}})
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.05)
+            in_flight['now'] -= 1
+            payment_id = request.url.path.rsplit('/', 1)[-1]
+            return httpx.Response(200, json={'data': {'status': 'SUCCESS' if payment_id == 'p1' else 'EXPIRED'}})
+
+        supabase = mock.MagicMock()
+        query = supabase.table.return_value
+        for method in ('select', 'eq', 'update'):
+            getattr(query, method).return_value = query
+        query.execute.side_effect = [
+            mock.Mock(data=[{'id': 'r1', 'payments': [{'id': 'p1', 'status': 'pending'}, {'id': 'p2', 'status': 'pending'}]}]),
+            mock.Mock(data=[{'id': 'r1'}]),
+        ]
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(pivot))
+        with mock.patch.object(pivot_views, 'async_client', return_value=client), \
+                mock.patch.object(pivot_views, 'create_supabase_client', return_value=supabase), \
+                mock.patch.dict('os.environ', {'TARA_TECH_PIVOT_CLIENT_ID_STAGING': 'id', 'TARA_TECH_PIVOT_CLIENT_SECRET_STAGING': 'secret'}):
+            response = await views.pivot_check_payment(self.factory.get('/x'), reservation_id='r1')
+
+        self.assertEqual(response.status_code, 200)
+        statuses = {s['paymentId']: s['status'] for s in json.loads(response.content)['paymentStatuses']}
+        self.assertEqual(statuses, {'p1': 'paid', 'p2': 'expired'})
+        self.assertEqual(in_flight['max'], 2)
+
+
+class RequestMetricsTest(SimpleTestCase):
+    def test_calls_are_classified_by_host_and_path(self):
+        with mock.patch.dict('os.environ', {'TARA_TECH_SUPABASE_CLIENT_URL': 'https://db.example.com'}):
+            self.assertEqual(classify('https://db.example.com/rest/v1/ecosuite_brands?select=*'), ('supabase', 'ecosuite_brands'))
+            self.assertEqual(classify('https://db.example.com/rest/v1/rpc/reserve_slots'), ('rpc', 'reserve_slots'))
+            self.assertEqual(classify('https://api.koalaapp.id/v1/plus/broadcast/json'), ('upstream', 'api.koalaapp.id'))
+
+    def test_server_timing_header_and_metrics_by_url_name(self):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+        with mock.patch.object(esb_views, 'async_client', return_value=client), \
+                mock.patch.dict('os.environ', {'ESB_URL_STAGING_INT': 'https://esb.test', 'SUPAGETTI_ESB_TOKEN': 't'}):
+            response = self.client.get('/api/ecosuite/esb/get-branch-data/')
+            with override_settings(SERVER_TIMING_HOSTS=True):
+                named = self.client.get('/api/ecosuite/esb/get-branch-data/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, upstream;desc="x1";dur=[\d.]+$')
+        self.assertRegex(named['Server-Timing'], r'^total;dur=[\d.]+, upstream;desc="esb.test x1";dur=[\d.]+$')
+
+        with override_settings(METRICS_TOKEN='scrape'):
+            metrics = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape').content.decode()
+        self.assertIn('taratech_request_duration_seconds_count{view="get_branch_data",method="GET",status="200"}', metrics)
+        self.assertIn('taratech_backend_call_duration_seconds_count{view="get_branch_data",kind="upstream",target="esb.test"}', metrics)
+
+    def test_streaming_responses_are_timed_until_closed(self):
+        def body():
+            yield 'data: 1\n\n'
+            time.sleep(0.05)
+            yield 'data: 2\n\n'
+
+        request = RequestFactory().get('/x')
+        middleware = metrics.RequestMetricsMiddleware(lambda request: StreamingHttpResponse(body()))
+        with mock.patch.object(metrics, 'REQUEST_DURATION', Histogram('test_request_seconds', 'Requests.', ('view', 'method', 'status'))) as duration:
+            response = middleware(request)
+            self.assertEqual(duration.snapshot(), {})
+            b''.join(response.streaming_content)
+            response.close()
+
+        (series,) = duration.snapshot().values()
+        self.assertEqual(series['count'], 1)
+        self.assertGreaterEqual(series['sum'], 0.05)
+
+    def test_metrics_require_the_token_and_are_closed_without_one(self):
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(METRICS_TOKEN='scrape'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+    def test_scrape_sums_counters_and_histograms_across_workers(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        counter = Counter('test_worker_events_total', 'Events.', ('table',))
+        histogram = Histogram('test_worker_seconds', 'Durations.', ('table',), buckets=(1.0,))
+        counter.inc(('t',), 2)
+        histogram.observe(('t',), 0.5)
+        with mock.patch.object(metrics, '_registry', [counter, histogram]), \
+                override_settings(METRICS_DIR=directory, METRICS_TOKEN='scrape'):
+            # Another worker's snapshot, as write_snapshot saves it
+            with mock.patch('os.getpid', return_value=1):
+                metrics.write_snapshot()
+            counter.inc(('t',), 3)
+            histogram.observe(('t',), 2.0)
+            body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape').content.decode()
+
+        self.assertIn('test_worker_events_total{table="t"} 7', body)
+        self.assertIn('test_worker_seconds_bucket{table="t",le="1.0"} 2', body)
+        self.assertIn('test_worker_seconds_count{table="t"} 3', body)
+
+
+@mock.patch.dict('os.environ', {
+    'TARA_TECH_SUPABASE_CLIENT_URL': 'https://db.example.com',
+    'TARA_TECH_SUPABASE_CLIENT_SECRET': 'key',
+})
+class QueryBudgetTest(SimpleTestCase):
+    def _supabase_responses(self, rows):
+        # Answer PostgREST below the instrumented httpx.Client.send, so calls are counted
+        return mock.patch('httpx.HTTPTransport.handle_request', side_effect=lambda request: httpx.Response(200, json=rows))
+
+    def test_view_within_budget_counts_its_supabase_calls(self):
+        request = RequestFactory().get('/api/ecosuite/brands/b1/')
+        with self._supabase_responses([{'id': 'b1', 'name': 'Supagetti'}]), \
+                assert_query_budget(supabase=1, total=1) as counts:
+            response = views.get_brand(request, 'b1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(counts['supabase'], 1)
+
+    def test_over_budget_fails_when_strict_and_warns_otherwise(self):
+        @query_budget(supabase=1)
+        def list_brands_twice():
+            client = views.create_supabase_client()
+            client.table('ecosuite_brands').select('*').execute()
+            return client.table('ecosuite_brands').select('*').execute().data
+
+        with self._supabase_responses([]):
+            with override_settings(QUERY_BUDGET_STRICT=True), \
+                    self.assertRaisesMessage(QueryBudgetExceeded, 'list_brands_twice exceeded its query budget: supabase 2/1'):
+                list_brands_twice()
+            with override_settings(QUERY_BUDGET_STRICT=False), \
+                    self.assertLogs('taratechapi.metrics', level='WARNING') as logs:
+                self.assertEqual(list_brands_twice(), [])
+
+        self.assertIn('supabase 2/1', logs.output[0])
+
+    def test_test_runner_makes_budgets_strict(self):
+        self.assertTrue(settings.QUERY_BUDGET_STRICT)
+
+
+class FakeSupabaseTest(SimpleTestCase):
+    def test_filters_follow_postgrest_semantics(self):
+        db = FakeSupabase()
+        db.tables['ecosuite_reservations'] = [
+            {'id': 'a', 'status': 'confirmed', 'reservationDateTime': '2026-01-10T18:00:00', 'confirmedExpiryDateTime': None},
+            {'id': 'b', 'status': 'pending', 'reservationDateTime': '2026-01-10T19:00:00', 'confirmedExpiryDateTime': '2026-01-09T12:00:00'},
+            {'id': 'c', 'status': 'cancelled', 'reservationDateTime': '2026-01-10T21:00:00', 'confirmedExpiryDateTime': None},
+        ]
+        table = db.table('ecosuite_reservations')
+
+        # timestamptz literals against a timestamp column keep their wall-clock time
+        rows = table.select('id').not_.in_('status', ['pending', 'cancelled']).gte(
+            'reservationDateTime', '2026-01-10T17:00:00+07:00').lte('reservationDateTime', '2026-01-10T20:00:00+07:00').execute().data
+        self.assertEqual(rows, [{'id': 'a'}])
+        rows = db.table('ecosuite_reservations').select('*').not_.is_('confirmedExpiryDateTime', 'null').execute().data
+        self.assertEqual([row['id'] for row in rows], ['b'])
+        rows = db.table('ecosuite_reservations').select('id').order('reservationDateTime', desc=True).limit(2).execute().data
+        self.assertEqual(rows, [{'id': 'c'}, {'id': 'b'}])
+
+        updated = db.table('ecosuite_reservations').update({'status': 'cancelled'}).eq('id', 'a').execute().data
+        self.assertEqual(updated[0]['status'], 'cancelled')
+        with self.assertRaisesMessage(FakeRPCError, 'CAPACITY_SLOT_NOT_FOUND'):
+            db.rpc('reserve_slots', {
+                'p_brand_id': 'b', 'p_outlet_id': 'o', 'p_reservation_datetime': '2026-01-10 18:00:00',
+                'p_slot_starts': ['2026-01-10T11:00:00+00:00'], 'p_pax': 2, 'p_idempotency_key': 'k',
+            }).execute()
+
+    def test_commit_contention_never_overbooks(self):
+        db = FakeSupabase()
+        with mock.patch('ecosuite.benchmarks.runner.FakeSupabase', return_value=db):
+            result = run_scenario(CommitContention, iterations=60, concurrency=8)
+
+        self.assertEqual(result['requests'], 60)
+        self.assertEqual(set(result['statuses']) - {'200', '201', '409'}, set())
+        for slot in db.rows('ecosuite_capacity_slot'):
+            self.assertLessEqual(slot['usedPax'], slot['maxPax'])
+            self.assertLessEqual(slot['waitlistedPax'], slot['maxWaitlistedPax'])
+
+
+class RequestProfilingTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_disabled_by_default(self):
+        with override_settings(PROFILING_TOKEN='', PROFILING_SAMPLE_RATE=0.0), self.assertRaises(MiddlewareNotUsed):
+            RequestProfilingMiddleware(lambda request: None)
+
+    def test_header_token_profiles_request_and_keeps_newest(self):
+        with override_settings(PROFILING_TOKEN='secret', PROFILING_DIR=self.directory, PROFILING_MAX_FILES=1):
+            self.assertNotIn('X-Profile-Id', self.client.get('/healthz', HTTP_X_PROFILE_TOKEN='wrong'))
+            self.client.get('/healthz', HTTP_X_PROFILE_TOKEN='secret')
+            response = self.client.get('/healthz', HTTP_X_PROFILE_TOKEN='secret')
+
+        profile_id = response['X-Profile-Id']
+        self.assertEqual(sorted(p.name for p in Path(self.directory).iterdir()), [f'{profile_id}.json', f'{profile_id}.prof'])
+        summary = json.loads((Path(self.directory) / f'{profile_id}.json').read_text())
+        self.assertEqual((summary['urlName'], summary['status'], summary['trigger']), ('healthz', 200, 'header'))
+        self.assertGreater(pstats.Stats(str(Path(self.directory) / f'{profile_id}.prof')).total_calls, 0)
+
+
+
+class WarmUpTest(SimpleTestCase):
+    def test_warm_up_loads_brands_into_the_cache(self):
+        db = FakeSupabase()
+        db.tables['ecosuite_brands'] = [{'id': 'B1', 'name': 'One'}, {'id': 'B2', 'name': 'Two'}]
+        with mock.patch.object(common_views, 'create_supabase_client', return_value=db), \
+                mock.patch.object(common_views, 'brand_reads', SingleFlight(ttl=60)):
+            self.assertEqual(views.warm_up(), 2)
+            db.tables['ecosuite_brands'][0]['name'] = 'Renamed'
+            self.assertEqual(views.get_brand_rows(db, 'B1')[0]['name'], 'One')
+            common_views.brand_reads.forget('B1')
+            self.assertEqual(views.get_brand_rows(db, 'B1')[0]['name'], 'Renamed')
+
+    def test_import_times_parses_nesting(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     zlib\n'
+            'import time:       300 |        420 |   gzip\n'
+            'import time:      1500 |       1920 | taratechapi.urls\n'
+        )
+        self.assertEqual(_import_times(output), [
+            ('zlib', 120, 120, 2), ('gzip', 300, 420, 1), ('taratechapi.urls', 1500, 1920, 0),
+        ])
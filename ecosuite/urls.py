@@ -30,10 +30,15 @@ urlpatterns = [
     path('get-reservations/', views.get_reservations, name='get_reservations'),
     path('get-reservations-for-brand/<str:brand_id>/', views.get_reservations_for_brand, name='get_reservations_for_brand'),
     path('get-reservations-for-brand-with-reservation-id/<str:brand_id>/<str:reservation_id>/', views.get_reservations_for_brand_with_reservation_id, name='get_reservations_for_brand_with_reservation_id'),
+    path('get-reservation-changes-for-brand/<str:brand_id>/', views.get_reservation_changes_for_brand, name='get_reservation_changes_for_brand'),
+    path('live/outlet/<str:outlet_id>/', views.live_outlet_board, name='live_outlet_board'),
+    path('live/stats/', views.get_live_board_stats, name='get_live_board_stats'),
     path('get-reservations-for-brand-with-phone-number/<str:brand_id>/<str:phone_number>/', views.get_reservations_for_brand_with_phone_number, name='get_reservations_for_brand_with_phone_number'),
     path('upsert-reservation/<str:reservation_id>/', views.upsert_reservation, name='upsert_reservation'),
     path('upsert-crm-customer/<str:customer_id>/', views.upsert_crm_customer, name='upsert_crm_customer'),
     path('get-crm-customers/', views.get_crm_customers, name='get_crm_customers'),
+    path('export-reservations-for-brand/<str:brand_id>/', views.export_reservations_for_brand, name='export_reservations_for_brand'),
+    path('export-crm-customers-for-brand/<str:brand_id>/', views.export_crm_customers_for_brand, name='export_crm_customers_for_brand'),
     path('check-reservation-availability/', views.check_reservation_availability, name='check_reservation_availability'),
     path('request-reservation/', views.request_reservation, name='request_reservation'),
     path('confirm-reservation/<str:reservation_id>/', views.confirm_reservation, name='confirm_reservation'),
@@ -44,6 +49,7 @@ urlpatterns = [
     path('reservations/commit/', views.commit_reservation, name='commit_reservations'),
     path('slots/rebuild/', views.rebuild_capacity_slots, name='rebuild_capacity_slots'),
     path('slots/available/', views.get_available_capacity_slots, name='get_available_capacity_slots'),
+    path('slots/read-coalescing-stats/', views.get_read_coalescing_stats, name='get_read_coalescing_stats'),
     
     # Pivot Integration
     path('pivot/create-payment/', views.pivot_create_payment, name='pivot_create_payment'),
@@ -0,0 +1,99 @@
+"""
+Ecosuite API views, split by route group. Everything public is re-exported here,
+so ecosuite.urls and callers keep using ecosuite.views.<name>.
+"""
+
+from .common import (
+    resolve_request_environment,
+    sync_crm_customer_from_reservation,
+    create_supabase_client,
+    BRAND_CACHE_CONTROL,
+    crm_sync_queue,
+    availability_reads,
+    brand_reads,
+    get_brand_rows,
+    warm_up,
+)
+from .users import (
+    index,
+    hello,
+    register,
+    save_analytics_data,
+    login_user,
+    profile,
+    logout_user,
+    get_all_users,
+    update_user,
+)
+from .brands import (
+    get_all_brands,
+    get_brand,
+    create_brand,
+    update_brand,
+    suspend_brand,
+    upsert_brand,
+    upload_brand_logo,
+    upload_brand_floor_image,
+    upload_outlet_floor_image,
+    upsert_table,
+)
+from .slots import (
+    SLOT_MINUTES,
+    DAYS_AHEAD,
+    rebuild_capacity_slots,
+    round_up_even,
+    floor_to_slot,
+    ALTERNATIVE_SLOTS_DEFAULT,
+    ALTERNATIVE_SLOTS_MAX,
+    ALTERNATIVE_SEARCH_HOURS,
+    commit_reservation,
+    get_available_capacity_slots,
+    get_read_coalescing_stats,
+    promoteReservationQueue,
+)
+from .reservations import (
+    RESERVATION_UPSERT_FIELDS,
+    RESERVATION_REQUIRED_FIELDS,
+    CRM_CUSTOMER_UPSERT_FIELDS,
+    upsert_reservation,
+    upsert_crm_customer,
+    get_reservations,
+    get_reservations_for_brand_with_reservation_id,
+    get_reservations_for_brand,
+    get_reservation_changes_for_brand,
+    get_reservations_for_brand_with_phone_number,
+    get_crm_customers,
+    export_reservations_for_brand,
+    export_crm_customers_for_brand,
+    check_reservation_conflicts,
+    check_reservation_availability,
+    request_reservation,
+    confirm_reservation,
+    format_reservation_datetime,
+)
+from .notifications import (
+    check_for_reservations_2_days_before_reservation_date,
+    send_reservation_reminder_for_5pax_and_above_2day_before_reservation_date,
+    JAKARTA_TZ,
+    send_cancel_notification_for_confirmed_reservations_when_expired,
+    check_waitlisted_reservations_with_confirmedExpiryDateTime_expired,
+)
+from .pivot import (
+    map_reservation_to_pivot_payment,
+    authenticate_pivot_request,
+    authenticate_pivot_request_async,
+    pivot_create_payment,
+    pivot_check_payment,
+    pivot_check_all_pending_payments,
+)
+from .esb import (
+    create_esb_header,
+    get_branch_list,
+    get_menu_list,
+    submit_reservation_transaction,
+    get_tables_list,
+    get_visit_purpose,
+    reservation_to_esb_order,
+    get_branch_data,
+)
+from .live_board import live_hub, live_outlet_board, get_live_board_stats
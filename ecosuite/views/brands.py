@@ -0,0 +1,675 @@
+import os
+import uuid
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from taratechapi.metrics import query_budget
+
+from ..backends import merge_upsert
+from ..conditional import conditional_response
+from ..streaming import iter_pages_by_id, stream_json_object, wants_stream
+from .common import BRAND_CACHE_CONTROL, brand_reads, create_supabase_client
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@query_budget(supabase=1)
+def get_all_brands(request):
+    """Get all brands
+
+    Query parameters:
+    - stream: true to stream the brands as they are fetched page by page (constant memory)
+    """
+    supabase = create_supabase_client()
+    try:
+        if wants_stream(request):
+            return stream_json_object('brands', iter_pages_by_id(lambda: supabase.table('ecosuite_brands').select('*')), request=request)
+
+        response = supabase.table('ecosuite_brands').select('*').execute()
+        brands = response.data if response.data else []
+        
+        # Every brand write bumps updatedAt, so unchanged polls get a 304 without re-serialising
+        return conditional_response(request, {
+            "brands": brands
+        }, brands)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@query_budget(supabase=1)
+def get_brand(request, brand_id):
+    """Get a single brand by ID
+
+    Responses carry an ETag (304 on a matching If-None-Match) and a public Cache-Control
+    of ECOSUITE_BRAND_CACHE_MAX_AGE seconds (default 60).
+    """
+    supabase = create_supabase_client()
+    try:
+        response = supabase.table('ecosuite_brands').select('*').eq('id', brand_id).execute()
+        
+        if response.data and len(response.data) > 0:
+            return conditional_response(request, {
+                "brand": response.data[0]
+            }, response.data, cache_control=BRAND_CACHE_CONTROL)
+        else:
+            return Response({"error": "Brand not found"}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_brand(request):
+    """Create a new brand"""
+    supabase = create_supabase_client()
+    try:
+        data = request.data.copy()
+        
+        # Ensure required fields
+        if not data.get('name'):
+            return Response({"error": "Brand name is required"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Set timestamps if not provided
+        now = timezone.now().isoformat()
+        if 'createdAt' not in data:
+            data['createdAt'] = now
+        if 'updatedAt' not in data:
+            data['updatedAt'] = now
+        
+        # Set createdBy/updatedBy from authenticated user if not provided
+        if 'createdBy' not in data:
+            data['createdBy'] = request.user.id
+        if 'updatedBy' not in data:
+            data['updatedBy'] = request.user.id
+        
+        # Ensure default values
+        if 'status' not in data:
+            data['status'] = 'active'
+        if 'outlets' not in data:
+            data['outlets'] = []
+        if 'userIds' not in data:
+            data['userIds'] = []
+        if 'moduleAccess' not in data:
+            data['moduleAccess'] = {}
+        
+        # Insert brand
+        response = supabase.table('ecosuite_brands').insert(data).execute()
+        
+        if response.data:
+            return Response({
+                "message": "Brand created successfully",
+                "brand": response.data[0]
+            }, status=status.HTTP_201_CREATED)
+        else:
+            return Response({"error": "Failed to create brand"}, status=status.HTTP_400_BAD_REQUEST)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def update_brand(request, brand_id):
+    """Update an existing brand"""
+    supabase = create_supabase_client()
+    try:
+        data = request.data.copy()
+        
+        # Update timestamp
+        data['updatedAt'] = timezone.now().isoformat()
+        
+        # Set updatedBy from authenticated user if not provided
+        if 'updatedBy' not in data:
+            data['updatedBy'] = request.user.id
+        
+        # Update brand
+        response = supabase.table('ecosuite_brands').update(data).eq('id', brand_id).execute()
+        brand_reads.forget(brand_id)
+        
+        if response.data:
+            return Response({
+                "message": "Brand updated successfully",
+                "brand": response.data[0]
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({"error": "Brand not found or update failed"}, status=status.HTTP_404_NOT_FOUND)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def suspend_brand(request, brand_id):
+    """Suspend a brand (set status to 'suspended' instead of deleting)"""
+    supabase = create_supabase_client()
+    try:
+        data = {
+            'status': 'suspended',
+            'updatedAt': timezone.now().isoformat(),
+            'updatedBy': request.user.id
+        }
+        
+        response = supabase.table('ecosuite_brands').update(data).eq('id', brand_id).execute()
+        brand_reads.forget(brand_id)
+        
+        if response.data:
+            return Response({
+                "message": "Brand suspended successfully",
+                "brand": response.data[0]
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({"error": "Brand not found"}, status=status.HTTP_404_NOT_FOUND)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST', 'PUT'])
+@permission_classes([IsAuthenticated])
+def upsert_brand(request):
+    """Add or update a brand by id. Updates the provided fields of an existing brand; otherwise creates it.
+
+    Runs as a single ecosuite_merge_upsert call, so two writers racing on the same id are merged.
+    """
+    supabase = create_supabase_client()
+    try:
+        data = request.data.copy()
+        
+        # Ensure required fields
+        if not data.get('name'):
+            return Response({"error": "Brand name is required"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        brand_id = data.get('id')
+        if not brand_id:
+            return Response({"error": "Brand ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        now = timezone.now().isoformat()
+        
+        # Fields applied to an existing brand (and on top of the defaults for a new one)
+        patch = {k: v for k, v in data.items() if k != 'id'}
+        patch['updatedAt'] = now
+        
+        # Set updatedBy from authenticated user if not provided
+        if 'updatedBy' not in patch:
+            patch['updatedBy'] = request.user.id
+        
+        # Ensure status is valid (don't allow deletion, only suspend)
+        if 'status' in patch and patch['status'] == 'deleted':
+            patch['status'] = 'suspended'
+        
+        # Defaults for a new brand
+        insert_data = {
+            'createdAt': now,
+            'createdBy': request.user.id,
+            'status': 'active',
+            'outlets': [],
+            'userIds': [],
+            'moduleAccess': {},
+        }
+        
+        brand, is_new_brand, _ = merge_upsert(
+            'ecosuite_brands',
+            brand_id,
+            patch,
+            insert_data,
+            required_fields=['name'],
+            supabase=supabase,
+        )
+        brand_reads.forget(brand_id)
+        
+        if not brand:
+            return Response({"error": "Failed to save brand"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if is_new_brand:
+            return Response({
+                "message": "Brand created successfully",
+                "brand": brand
+            }, status=status.HTTP_201_CREATED)
+        return Response({
+            "message": "Brand updated successfully",
+            "brand": brand
+        }, status=status.HTTP_200_OK)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_brand_logo(request, brand_id):
+    """Upload a brand logo to Supabase Storage"""
+    supabase = create_supabase_client()
+    try:
+        # Check if file is provided
+        if 'logo' not in request.FILES:
+            return Response({"error": "Logo file is required"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        logo_file = request.FILES['logo']
+        
+        # Validate file type (optional - you can add more validation)
+        allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']
+        file_extension = os.path.splitext(logo_file.name)[1].lower()
+        if file_extension not in allowed_extensions:
+            return Response({
+                "error": f"Invalid file type. Allowed types: {', '.join(allowed_extensions)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Generate unique filename
+        file_id = str(uuid.uuid4())
+        file_name = f"{file_id}{file_extension}"
+        storage_path = f"logos/{file_name}"
+        
+        # Read file content as bytes
+        file_content = logo_file.read()
+        
+        # Upload to Supabase Storage
+        # Note: The bucket name should match your Supabase storage bucket
+        storage_response = supabase.storage.from_('ecosuite-brand-documents').upload(
+            path=storage_path,
+            file=file_content,
+            file_options={"content-type": logo_file.content_type}
+        )
+        
+        # Get public URL - construct it from Supabase URL
+        supabase_url = os.getenv('TARA_TECH_SUPABASE_CLIENT_URL')
+        # Remove trailing slash if present
+        supabase_url = supabase_url.rstrip('/')
+        logo_url = f"{supabase_url}/storage/v1/object/public/ecosuite-brand-documents/{storage_path}"
+        
+        # Update brand with logo URL
+        update_data = {
+            'logoUrl': logo_url,
+            'updatedAt': timezone.now().isoformat(),
+            'updatedBy': request.user.id
+        }
+        
+        brand_response = supabase.table('ecosuite_brands').update(update_data).eq('id', brand_id).execute()
+        brand_reads.forget(brand_id)
+        
+        if brand_response.data:
+            return Response({
+                "message": "Logo uploaded successfully",
+                "logoUrl": logo_url,
+                "brand": brand_response.data[0]
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({"error": "Brand not found"}, status=status.HTTP_404_NOT_FOUND)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_brand_floor_image(request, brand_id):
+    """Upload a brand floor plan image to Supabase Storage"""
+    supabase = create_supabase_client()
+    try:
+        # Check if file is provided
+        if 'floorImage' not in request.FILES:
+            return Response({"error": "Floor image file is required"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        floor_image_file = request.FILES['floorImage']
+        
+        # Validate file type (optional - you can add more validation)
+        allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']
+        file_extension = os.path.splitext(floor_image_file.name)[1].lower()
+        if file_extension not in allowed_extensions:
+            return Response({
+                "error": f"Invalid file type. Allowed types: {', '.join(allowed_extensions)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Generate unique filename
+        file_id = str(uuid.uuid4())
+        file_name = f"{file_id}{file_extension}"
+        storage_path = f"floor-plans/{file_name}"
+        
+        # Read file content as bytes
+        file_content = floor_image_file.read()
+        
+        # Upload to Supabase Storage
+        # Note: The bucket name should match your Supabase storage bucket
+        storage_response = supabase.storage.from_('ecosuite-brand-documents').upload(
+            path=storage_path,
+            file=file_content,
+            file_options={"content-type": floor_image_file.content_type}
+        )
+        
+        # Get public URL - construct it from Supabase URL
+        supabase_url = os.getenv('TARA_TECH_SUPABASE_CLIENT_URL')
+        # Remove trailing slash if present
+        supabase_url = supabase_url.rstrip('/')
+        floor_image_url = f"{supabase_url}/storage/v1/object/public/ecosuite-brand-documents/{storage_path}"
+        
+        # Update brand with floor image URL
+        update_data = {
+            'floorImageUrl': floor_image_url,
+            'updatedAt': timezone.now().isoformat(),
+            'updatedBy': request.user.id
+        }
+        
+        brand_response = supabase.table('ecosuite_brands').update(update_data).eq('id', brand_id).execute()
+        brand_reads.forget(brand_id)
+        
+        if brand_response.data:
+            return Response({
+                "message": "Floor image uploaded successfully",
+                "floorImageUrl": floor_image_url,
+                "brand": brand_response.data[0]
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({"error": "Brand not found"}, status=status.HTTP_404_NOT_FOUND)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_outlet_floor_image(request, outlet_id):
+    """Upload an outlet floor plan image to Supabase Storage"""
+    supabase = create_supabase_client()
+    try:
+        # Check if file is provided
+        if 'floorImage' not in request.FILES:
+            return Response({"error": "Floor image file is required"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Check if floorNumber is provided
+        floor_number = request.data.get('floorNumber')
+        if not floor_number:
+            return Response({"error": "Floor number is required"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Convert floor number to string (keys in JSON should be strings)
+        floor_number = str(floor_number)
+        
+        floor_image_file = request.FILES['floorImage']
+        
+        # Validate file type (optional - you can add more validation)
+        allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']
+        file_extension = os.path.splitext(floor_image_file.name)[1].lower()
+        if file_extension not in allowed_extensions:
+            return Response({
+                "error": f"Invalid file type. Allowed types: {', '.join(allowed_extensions)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Generate unique filename
+        file_id = str(uuid.uuid4())
+        file_name = f"{file_id}{file_extension}"
+        storage_path = f"outlet-floor-plans/{file_name}"
+        
+        # Read file content as bytes
+        file_content = floor_image_file.read()
+        
+        # Upload to Supabase Storage
+        # Note: The bucket name should match your Supabase storage bucket
+        storage_response = supabase.storage.from_('ecosuite-brand-documents').upload(
+            path=storage_path,
+            file=file_content,
+            file_options={"content-type": floor_image_file.content_type}
+        )
+        
+        # Get public URL - construct it from Supabase URL
+        supabase_url = os.getenv('TARA_TECH_SUPABASE_CLIENT_URL')
+        # Remove trailing slash if present
+        supabase_url = supabase_url.rstrip('/')
+        floor_image_url = f"{supabase_url}/storage/v1/object/public/ecosuite-brand-documents/{storage_path}"
+        
+        # Find the brand that contains this outlet
+        brands_response = supabase.table('ecosuite_brands').select('*').execute()
+        
+        if not brands_response.data:
+            return Response({"error": "No brands found"}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Search through all brands to find the one containing this outlet
+        brand_found = None
+        outlet_found = None
+        outlet_index = -1
+        
+        for brand in brands_response.data:
+            outlets = brand.get('outlets', [])
+            if isinstance(outlets, list):
+                for idx, outlet in enumerate(outlets):
+                    if isinstance(outlet, dict) and outlet.get('id') == outlet_id:
+                        brand_found = brand
+                        outlet_found = outlet
+                        outlet_index = idx
+                        break
+                if brand_found:
+                    break
+        
+        if not brand_found or not outlet_found:
+            return Response({"error": "Outlet not found"}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Get or initialize floorLayoutImages
+        floor_layout_images = outlet_found.get('floorLayoutImages', {})
+        if not isinstance(floor_layout_images, dict):
+            floor_layout_images = {}
+        
+        # Update the floorLayoutImages with the new image URL for this floor number
+        floor_layout_images[floor_number] = floor_image_url
+        
+        # Update the outlet's floorLayoutImages
+        outlet_found['floorLayoutImages'] = floor_layout_images
+        
+        # Update the outlets array in the brand
+        outlets = brand_found.get('outlets', [])
+        outlets[outlet_index] = outlet_found
+        
+        # Update the brand with the modified outlets array
+        update_data = {
+            'outlets': outlets,
+            'updatedAt': timezone.now().isoformat(),
+            'updatedBy': request.user.id
+        }
+        
+        brand_response = supabase.table('ecosuite_brands').update(update_data).eq('id', brand_found['id']).execute()
+        brand_reads.forget(brand_found['id'])
+        
+        if brand_response.data:
+            return Response({
+                "message": "Outlet floor image uploaded successfully",
+                "floorNumber": floor_number,
+                "floorImageUrl": floor_image_url,
+                "floorLayoutImages": floor_layout_images,
+                "outlet": outlet_found,
+                "brand": brand_response.data[0]
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({"error": "Failed to update brand"}, status=status.HTTP_400_BAD_REQUEST)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST', 'PUT', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def upsert_table(request, table_id):
+    """Insert or update a table. If table exists, updates it; otherwise creates a new one."""
+    supabase = create_supabase_client()
+    try:
+        data = request.data.copy()
+        
+        # Find the brand that contains the outlet that contains this table
+        brands_response = supabase.table('ecosuite_brands').select('*').execute()
+        
+        if not brands_response.data:
+            return Response({"error": "No brands found"}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Search through all brands to find the one containing this table
+        brand_found = None
+        outlet_found = None
+        outlet_index = -1
+        table_found = None
+        floor_number = None
+        table_index = -1
+        is_new_table = False
+        
+        for brand in brands_response.data:
+            outlets = brand.get('outlets', [])
+            if isinstance(outlets, list):
+                for outlet_idx, outlet in enumerate(outlets):
+                    if isinstance(outlet, dict):
+                        tables_map = outlet.get('tables', {})
+                        if isinstance(tables_map, dict):
+                            # Search through all floors in the tables map
+                            for floor_num_str, tables_list in tables_map.items():
+                                if isinstance(tables_list, list):
+                                    for table_idx, table in enumerate(tables_list):
+                                        if isinstance(table, dict) and table.get('id') == table_id:
+                                            brand_found = brand
+                                            outlet_found = outlet
+                                            outlet_index = outlet_idx
+                                            table_found = table
+                                            floor_number = floor_num_str
+                                            table_index = table_idx
+                                            break
+                                    if table_found:
+                                        break
+                        if table_found:
+                            break
+                if table_found:
+                    break
+        
+        # If table not found, we need to create it
+        if not table_found:
+            is_new_table = True
+            
+            # For new table, we need outletId and floorNumber from request
+            outlet_id = data.get('outletId')
+            floor_number = str(data.get('floorNumber', '1'))  # Default to floor 1 if not provided
+            
+            if not outlet_id:
+                return Response({"error": "outletId is required for new tables"}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Find the outlet
+            for brand in brands_response.data:
+                outlets = brand.get('outlets', [])
+                if isinstance(outlets, list):
+                    for outlet_idx, outlet in enumerate(outlets):
+                        if isinstance(outlet, dict) and outlet.get('id') == outlet_id:
+                            brand_found = brand
+                            outlet_found = outlet
+                            outlet_index = outlet_idx
+                            break
+                    if outlet_found:
+                        break
+            
+            if not brand_found or not outlet_found:
+                return Response({"error": "Outlet not found"}, status=status.HTTP_404_NOT_FOUND)
+            
+            # Create new table
+            now = timezone.now().isoformat()
+            table_found = {
+                'id': table_id,
+                'brandId': outlet_found.get('brandId', brand_found.get('id')),
+                'outletId': outlet_id,
+                'name': data.get('name', ''),
+                'capacity': data.get('capacity', 0),
+                'status': data.get('status', 'available'),
+                'currentReservationId': data.get('currentReservationId'),
+                'layoutPosition': data.get('layoutPosition'),
+                'createdAt': data.get('createdAt', now),
+                'updatedAt': now,
+                'createdBy': request.user.id,
+                'updatedBy': request.user.id
+            }
+        
+        # Update the table with new data (for both new and existing tables)
+        table_found.update({
+            'name': data.get('name', table_found.get('name', '')),
+            'capacity': data.get('capacity', table_found.get('capacity', 0)),
+            'status': data.get('status', table_found.get('status', 'available')),
+            'currentReservationId': data.get('currentReservationId', table_found.get('currentReservationId')),
+            'layoutPosition': data.get('layoutPosition', table_found.get('layoutPosition')),
+            'updatedAt': timezone.now().isoformat(),
+            'updatedBy': request.user.id
+        })
+        
+        # Ensure required fields are present
+        if 'id' not in table_found:
+            table_found['id'] = table_id
+        if 'brandId' not in table_found:
+            table_found['brandId'] = outlet_found.get('brandId', brand_found.get('id'))
+        if 'outletId' not in table_found:
+            table_found['outletId'] = outlet_found.get('id')
+        if 'createdAt' not in table_found:
+            table_found['createdAt'] = timezone.now().isoformat()
+        if 'createdBy' not in table_found:
+            table_found['createdBy'] = request.user.id
+        
+        # Get or initialize tables map
+        tables_map = outlet_found.get('tables', {})
+        if not isinstance(tables_map, dict):
+            tables_map = {}
+        
+        # Check if floor number is being changed (for updates)
+        new_floor_number = str(data.get('floorNumber', floor_number)) if not is_new_table else floor_number
+        
+        # If updating and floor number changed, remove from old floor
+        if not is_new_table and new_floor_number != floor_number:
+            # Remove table from old floor
+            if floor_number in tables_map and isinstance(tables_map[floor_number], list):
+                tables_map[floor_number] = [t for t in tables_map[floor_number] if not (isinstance(t, dict) and t.get('id') == table_id)]
+            floor_number = new_floor_number
+        
+        # Ensure the floor number exists in the tables map
+        if floor_number not in tables_map:
+            tables_map[floor_number] = []
+        
+        # Update or insert the table in the list
+        if is_new_table:
+            # Add new table to the list
+            tables_map[floor_number].append(table_found)
+        else:
+            # Update existing table
+            # First, try to find and update in the current floor
+            found = False
+            if isinstance(tables_map[floor_number], list):
+                for idx, table in enumerate(tables_map[floor_number]):
+                    if isinstance(table, dict) and table.get('id') == table_id:
+                        tables_map[floor_number][idx] = table_found
+                        found = True
+                        break
+            
+            # If not found in current floor, append it (shouldn't happen, but handle it)
+            if not found:
+                tables_map[floor_number].append(table_found)
+        
+        # Update the outlet's tables map
+        outlet_found['tables'] = tables_map
+        
+        # Update the outlets array in the brand
+        outlets = brand_found.get('outlets', [])
+        outlets[outlet_index] = outlet_found
+        
+        # Update the brand with the modified outlets array
+        update_data = {
+            'outlets': outlets,
+            'updatedAt': timezone.now().isoformat(),
+            'updatedBy': request.user.id
+        }
+        
+        brand_response = supabase.table('ecosuite_brands').update(update_data).eq('id', brand_found['id']).execute()
+        brand_reads.forget(brand_found['id'])
+        
+        if brand_response.data:
+            message = "Table created successfully" if is_new_table else "Table updated successfully"
+            status_code = status.HTTP_201_CREATED if is_new_table else status.HTTP_200_OK
+            return Response({
+                "message": message,
+                "table": table_found,
+                "outlet": outlet_found,
+                "brand": brand_response.data[0]
+            }, status=status_code)
+        else:
+            return Response({"error": "Failed to update brand"}, status=status.HTTP_400_BAD_REQUEST)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,107 @@
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+
+from ..backends import call_rpc
+from ..coalescing import SingleFlight
+from ..crm_sync import CRM_SYNC_RPC, CRMSyncQueue, crm_sync_item, failed_crm_sync_items
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+def resolve_request_environment(request):
+    if hasattr(request, 'query_params'):
+        env = request.query_params.get('environment')
+        if env:
+            return env
+    try:
+        data_env = request.data.get('environment')
+        if data_env:
+            return data_env
+    except AttributeError:
+        pass
+    return None
+
+
+def sync_crm_customer_from_reservation(supabase, reservation_record, request_user_id):
+    """Upsert the reservation's CRM customer (by normalised phone) and record its receipt id.
+
+    Queued for the background CRM sync worker by default; set ECOSUITE_CRM_SYNC_ASYNC=false
+    to run the ecosuite_sync_crm_customers RPC inline instead.
+    """
+    item = crm_sync_item(reservation_record, request_user_id)
+    if item is None:
+        return
+
+    if os.getenv('ECOSUITE_CRM_SYNC_ASYNC', 'True').lower() == 'true':
+        crm_sync_queue.enqueue(item)
+    else:
+        failed = failed_crm_sync_items([item], call_rpc(CRM_SYNC_RPC, {'p_items': [item]}, supabase))
+        if failed:
+            raise RuntimeError(failed[0][1])
+
+
+_supabase_clients = {}
+_supabase_clients_lock = threading.Lock()
+
+
+def create_supabase_client() -> 'Client':
+    """
+    Supabase client shared by every request in this worker process.
+
+    Reusing it keeps PostgREST connections (and their TLS sessions) open between
+    requests. supabase is imported on first use rather than at startup: it is the
+    slowest import in the app and not every worker serves an ecosuite route.
+    """
+    url = os.getenv('TARA_TECH_SUPABASE_CLIENT_URL')
+    key = os.getenv('TARA_TECH_SUPABASE_CLIENT_SECRET')
+    client = _supabase_clients.get((url, key))
+    if client is None:
+        with _supabase_clients_lock:
+            client = _supabase_clients.get((url, key))
+            if client is None:
+                from supabase import ClientOptions, create_client
+                client = _supabase_clients[(url, key)] = create_client(url, key, options=ClientOptions())
+    return client
+
+
+# get_brand is public (AllowAny); shared caches may keep it briefly and revalidate with the ETag
+BRAND_CACHE_CONTROL = f"public, max-age={int(os.getenv('ECOSUITE_BRAND_CACHE_MAX_AGE', '60'))}"
+
+
+# Reservation saves hand CRM customer syncs to this durable queue; one worker thread per process sends them in batches
+crm_sync_queue = CRMSyncQueue(
+    settings.ECOSUITE_CRM_SYNC_BUFFER_PATH,
+    create_supabase_client,
+    batch_size=int(os.getenv('ECOSUITE_CRM_SYNC_BATCH_SIZE', '100')),
+    flush_interval=float(os.getenv('ECOSUITE_CRM_SYNC_FLUSH_INTERVAL', '1.0')),
+).register_atexit().register_metrics()
+
+
+# Identical availability reads within ~1 second share one Supabase query per worker
+availability_reads = SingleFlight(ttl=float(os.getenv('ECOSUITE_READ_COALESCING_TTL', '1.0')))
+
+# Brand rows (outlets and their operating hours) read by availability checks, cached per
+# worker for ECOSUITE_BRAND_CACHE_SECONDS. Brand writes in this worker drop the entry;
+# other workers pick the change up when theirs expires.
+brand_reads = SingleFlight(ttl=float(os.getenv('ECOSUITE_BRAND_CACHE_SECONDS', '60')))
+
+
+def get_brand_rows(supabase, brand_id):
+    return brand_reads.do(brand_id, lambda: supabase.table('ecosuite_brands').select('*').eq('id', brand_id).execute().data or [])
+
+
+def warm_up():
+    """
+    Do the first-request work ahead of traffic: import supabase, create the shared
+    client (opening its connection) and load every brand into brand_reads.
+    """
+    supabase = create_supabase_client()
+    brands = supabase.table('ecosuite_brands').select('*').execute().data or []
+    for brand in brands:
+        brand_reads.put(brand['id'], [brand])
+    return len(brands)
+
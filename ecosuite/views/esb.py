@@ -0,0 +1,180 @@
+import os
+from datetime import datetime
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from taratechapi.async_api import async_api_view, async_client, json_response
+
+
+def create_esb_header(request, additional_headers=None):
+    headers = {
+        "Authorization": f"Bearer {os.getenv('SUPAGETTI_ESB_TOKEN')}",
+        "Content-Type": "application/json",
+    }
+    if additional_headers:
+        headers.update(additional_headers)
+    return headers
+
+
+def get_branch_list(request):
+    return Response({
+        "message": "Branch list fetched successfully",
+        "data": "data"
+    }, status=status.HTTP_200_OK)
+
+
+@async_api_view(["GET"])
+async def get_menu_list(request):
+    header = create_esb_header(request, additional_headers={"Data-Company":"SAE","Data-Branch": "SUPG"})
+    visitPurposeID = "64"
+    fetchPackagesExtras = False
+    url = os.getenv("ESB_URL_STAGING_INT", "").rstrip("/") + f"/qsv1/menu/{visitPurposeID}?fetchPackagesExtras={fetchPackagesExtras}"
+    esb_resp = await async_client().get(url, headers=header)
+    if esb_resp.status_code != 200:
+        return json_response({
+            "message": "Failed to fetch menu list",
+            "data": esb_resp.text
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return json_response(esb_resp.json(), status=status.HTTP_200_OK)
+
+
+@async_api_view(["POST"])
+async def submit_reservation_transaction(request):
+    header = create_esb_header(request, additional_headers={"Data-Company":"SAE","Data-Branch": "SUPG"})
+    request_body = {
+        
+    "title": request.data.get('title'),
+    "customerName": request.data.get('customerName'),
+    "email": request.data.get('email'),
+    "phoneNumber": request.data.get('phoneNumber'),
+    "paxTotal": request.data.get('paxTotal'),
+    "reservationDate": request.data.get('reservationDate'),
+    "reservationTime": request.data.get('reservationTime'),
+    "purpose": '3' if request.data.get('isDineIn') else '1',
+    "notes": request.data.get('notes')
+
+}
+    url = os.getenv("ESB_URL_STAGING_INT", "").rstrip("/") + "/qsv1/reservation/transaction"
+    esb_resp = await async_client().post(url, headers=header, json=request_body)
+    if esb_resp.status_code != 200:
+        return json_response({
+            "message": "Failed to submit reservation transaction",
+            "data": esb_resp.text
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return json_response(esb_resp.json(), status=status.HTTP_200_OK)
+
+
+@async_api_view(["GET"])
+async def get_tables_list(request):
+    header = create_esb_header(request, additional_headers={"Data-Company":"SAE","Data-Branch": "SUPG"})
+    url = os.getenv("ESB_URL_STAGING_INT", "").rstrip("/") + "/qsv1/reservation/table-section?reservationDate=2025-01-05&reservationTime=15:00"
+    esb_resp = await async_client().get(url, headers=header)
+    if esb_resp.status_code != 200:
+        return json_response({
+            "message": "Failed to fetch tables list",
+            "data": esb_resp.text
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return json_response(esb_resp.json(), status=status.HTTP_200_OK)
+
+
+@async_api_view(["GET"])
+async def get_visit_purpose(request):
+    header = create_esb_header(request)
+    url ="https://stg7.esb.co.id/api-fnb-backend-int/web" + "/extv1/visit-purpose"
+    esb_resp = await async_client().get(url, headers=header)
+    if esb_resp.status_code != 200:
+        return json_response({
+            "message": "Failed to fetch visit purpose",
+            "data": esb_resp.text
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return json_response(esb_resp.json(), status=status.HTTP_200_OK)
+
+
+@async_api_view(["POST"])
+async def reservation_to_esb_order(request):
+    headers = create_esb_header(request, additional_headers={"Data-Company":"SAE","Data-Branch": "SUPG"})
+    url = os.getenv("ESB_URL_STAGING_INT", "").rstrip("/") + "/qsv1/order"
+
+    request_body =   {
+        "orderType": "custom",
+        "orderTypeName": "Tara Tech Reservation",
+        "fullName": request.data.get('customerName'),
+        "email": request.data.get('customerEmail'),
+        "phoneNumber": request.data.get('customerPhone'),
+        "visitPurposeID": "64",
+        "deliveryAddress": "Jl Raya Pos Pengumben No 188C",
+        "deliveryAddressInfo": "",
+        "latitude": -6.2087634,
+        "longitude": 106.845599,
+        "memberID": "",
+        "salesMenus": [
+             {
+            "ID": datetime.now().timestamp(),
+            "menuID": 1,
+            "qty": 1,
+            "extras": [],
+            "packages": [],
+            "notes": ""
+        },
+        ],
+        "promotionCode": "",
+        "vouchers": [],
+        "paymentMethodID": "ovo",
+        "amount": 35000,
+        "returnUrl": "https://int-eso.esb.co.id/payment-notification",
+        "refApp": None,
+        "userToken": "",
+        "paymentPhoneNumber": request.data.get('customerPhone'),
+        "tableName": request.data.get('tableName'),
+        "tokenID": "",
+        "authenticationID": "", 
+        "cvn": "",
+        "bin": "",
+        "customerNotes": f"Reservation ID : {request.data.get('reservationId')}",
+        "additionalCustomerInfo": None,
+        "salesModeParams": False,
+        "giftVoucher": None,
+        "questionAnswer": [
+            {
+                "ID": 1,
+                "desc": "Are you satisfied?",
+                "value": "Yes"
+            }
+        ],
+        "deliveryCourierID": 5,
+        "scheduledAt": None,
+        "platformFees": None,
+        "deliveryCourierID": 5,
+        "scheduledAt": None,
+        "platformFees": None,
+    }
+
+
+    esb_resp = await async_client().post(url, headers=headers, json=request_body)
+
+    if esb_resp.status_code != 200:
+        return json_response({
+            "message": "Failed to create ESB order",
+            "data": esb_resp.text
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return json_response({
+        "message": "Reservation to ESB order fetched successfully",
+        "data": "data"
+    }, status=status.HTTP_200_OK)
+
+
+@async_api_view(["GET"])
+async def get_branch_data(request):
+    header = create_esb_header(request, additional_headers={"Data-Company":"SAE","Data-Branch": "SUPG"})
+
+    url = os.getenv("ESB_URL_STAGING_INT", "").rstrip("/") + "/qsv1/setting/branch"
+    esb_resp = await async_client().get(url, headers=header)
+
+    if esb_resp.status_code != 200:
+        return json_response(
+            {"message": "Failed to fetch branch data", "data": esb_resp.text},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    return json_response(esb_resp.json(), status=status.HTTP_200_OK)
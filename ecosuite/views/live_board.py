@@ -0,0 +1,63 @@
+import os
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from ..authentication import SupabaseJWTAuthentication, SupabaseQueryTokenAuthentication
+from ..live import LiveHub, realtime_url
+from ..renderers import EventStreamRenderer
+
+
+# Live outlet boards share one Supabase Realtime subscription per worker, started by the first board
+live_hub = LiveHub(
+    realtime_url(os.getenv('TARA_TECH_SUPABASE_CLIENT_URL')),
+    os.getenv('TARA_TECH_SUPABASE_CLIENT_SECRET'),
+    buffer_size=int(os.getenv('ECOSUITE_LIVE_REPLAY_SIZE', '1000')),
+)
+
+
+@api_view(['GET'])
+@authentication_classes([SupabaseJWTAuthentication, SupabaseQueryTokenAuthentication])
+@permission_classes([IsAuthenticated])
+@renderer_classes(api_settings.DEFAULT_RENDERER_CLASSES + [EventStreamRenderer])
+def live_outlet_board(request, outlet_id):
+    """Stream reservation and capacity slot changes for an outlet as Server-Sent Events.
+
+    Query parameters:
+    - accessToken: Supabase JWT, for EventSource, which cannot send an Authorization header
+    - lastEventId: Resume after this event id (EventSource sends the Last-Event-ID header on reconnect instead)
+
+    Events: reservation, tombstone and capacitySlot ({action, record, oldRecord, commitTimestamp}),
+    plus reset and resync, after which the board should be refetched (e.g. from
+    get-reservation-changes-for-brand). The stream ends after ECOSUITE_LIVE_MAX_STREAM_SECONDS;
+    EventSource then reconnects and replays what it missed from this worker's buffer.
+    """
+    try:
+        if not live_hub.configured:
+            return Response({"error": "Supabase Realtime is not configured"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        last_event_id = request.META.get('HTTP_LAST_EVENT_ID') or request.query_params.get('lastEventId')
+        max_seconds = float(os.getenv('ECOSUITE_LIVE_MAX_STREAM_SECONDS', '300'))
+        # Under the ASGI server the stream must be an async iterator, or Django reads it to the end before sending
+        if isinstance(request._request, ASGIRequest):
+            events = live_hub.astream(outlet_id, last_event_id, max_seconds=max_seconds)
+        else:
+            events = live_hub.stream(outlet_id, last_event_id, max_seconds=max_seconds)
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_live_board_stats(request):
+    """Return live board stats for this worker (open streams, upstream events and reconnects)."""
+    return Response(live_hub.stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,885 @@
+import json
+from datetime import datetime, timedelta
+
+import pytz
+import requests
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from ..phones import normalize_phone_e164
+from .common import create_supabase_client
+
+
+def _format_full_date(reservation_datetime):
+    """Format reservation datetime to full date format (e.g., 'Monday, January 15, 2024')."""
+    try:
+        if 'Z' in reservation_datetime:
+            dt = datetime.fromisoformat(reservation_datetime.replace('Z', '+00:00'))
+        elif '+' in reservation_datetime or reservation_datetime.count('-') > 2:
+            dt = datetime.fromisoformat(reservation_datetime)
+        else:
+            dt = datetime.fromisoformat(reservation_datetime)
+        return dt.strftime('%A, %B %d, %Y')
+    except:
+        return reservation_datetime
+
+
+def _format_time_for_koala(reservation_datetime):
+    """Format reservation datetime to time format for Koala (e.g., '7:00 PM')."""
+    try:
+        if 'Z' in reservation_datetime:
+            dt = datetime.fromisoformat(reservation_datetime.replace('Z', '+00:00'))
+        elif '+' in reservation_datetime or reservation_datetime.count('-') > 2:
+            dt = datetime.fromisoformat(reservation_datetime)
+        else:
+            dt = datetime.fromisoformat(reservation_datetime)
+        return dt.strftime('%I:%M %p').lstrip('0')
+    except:
+        return reservation_datetime
+
+
+def _parse_phone_to_international(phone_number):
+    """Parse phone number to international format. Handles Indonesian numbers starting with +62."""
+    return normalize_phone_e164(phone_number)
+
+
+def _login_to_koala():
+    """Login to Koala Plus and return access token."""
+    try:
+        trial_email = 'robin.dartanto@taratech.id'
+        trial_password = 'TaraTech123'
+        
+        url = "https://api.koalaapp.id/v1/identity/auth/koala-plus/login"
+        payload = json.dumps({
+            "email": trial_email,
+            "password": trial_password
+        })
+        headers = {
+            'Content-Type': 'application/json'
+        }
+        
+        response = requests.post(url, headers=headers, data=payload)
+        response.raise_for_status()
+        login_data = response.json()
+        
+        # Extract access token from response
+        access_token = None
+        if login_data.get('data') and login_data['data'].get('koalaToken'):
+            access_token = login_data['data']['koalaToken'].get('accessToken')
+        
+        return access_token
+    except Exception as e:
+        print(f"Error logging in to Koala: {e}")
+        return None
+
+
+def _build_notification_data(reservations):
+    """Build notification data array from a list of reservations.
+    Returns a tuple: (notification_data, skipped_reservations)
+    where skipped_reservations is a list of dicts with reservation_id and reason."""
+    notification_data = []
+    skipped_reservations = []
+    
+    for reservation in reservations:
+        reservation_id = reservation.get('id')
+        
+        # Parse phone number
+        customer_phone = reservation.get('customerPhone')
+        if not customer_phone:
+            skipped_reservations.append({
+                "reservation_id": reservation_id,
+                "reason": "Missing customer phone number"
+            })
+            continue
+        
+        phone_number_international = _parse_phone_to_international(customer_phone)
+        if not phone_number_international:
+            skipped_reservations.append({
+                "reservation_id": reservation_id,
+                "reason": "Invalid phone number format"
+            })
+            continue
+        
+        # Format date and time
+        reservation_date_time = reservation.get('reservationDateTime')
+        if not reservation_date_time:
+            skipped_reservations.append({
+                "reservation_id": reservation_id,
+                "reason": "Missing reservation date/time"
+            })
+            continue
+        
+        formatted_date = _format_full_date(reservation_date_time)
+        formatted_time = _format_time_for_koala(reservation_date_time)
+        pax = reservation.get('numberOfGuests', 0)
+        
+        # Prepare confirmation URL
+        confirmation_url = f'https://taratechapi.fly.dev/api/ecosuite/confirm-reservation/{reservation_id}/'
+        
+        # Append notification data item
+        notification_data.append({
+            "phoneNumber": phone_number_international,
+            "paramData": [
+                f"*{pax}*",
+                f"*{formatted_date}*",
+                f"*{formatted_time}*",
+                confirmation_url,
+            ],
+        })
+    
+    return notification_data, skipped_reservations
+
+
+def _build_reminder_notification_data(reservations):
+    """Build notification data array from a list of reservations for reminder messages.
+    This function has different parameters than the reconfirmation notification data."""
+    notification_data = []
+    
+    for reservation in reservations:
+        # Parse phone number
+        customer_phone = reservation.get('customerPhone')
+        if not customer_phone:
+            continue
+        
+        phone_number_international = _parse_phone_to_international(customer_phone)
+        if not phone_number_international:
+            continue
+        
+        # Format date and time
+        reservation_date_time = reservation.get('reservationDateTime')
+        if not reservation_date_time:
+            continue
+        
+        formatted_date = _format_full_date(reservation_date_time)
+        formatted_time = _format_time_for_koala(reservation_date_time)
+        pax = reservation.get('numberOfGuests', 0)
+        reservation_id = reservation.get('id')
+        
+        # Prepare confirmation URL
+        confirmation_url = f'https://taratechapi.fly.dev/api/ecosuite/confirm-reservation/{reservation_id}/'
+        
+        # Append notification data item with different parameters for reminder template
+        notification_data.append({
+            "phoneNumber": phone_number_international,
+            "paramData": [
+                f"*{pax}*",
+                f"*{formatted_date}*",
+                f"*{formatted_time}*",
+                # confirmation_url,
+            ],
+        })
+    
+    return notification_data
+
+
+def _send_reconfirmation_broadcast(token, reservations, campaign_name='025', template_id='025'):
+    """Send reconfirmation messages via Koala broadcast API for all reservations in a single request.
+    Returns dict with success status, notifications sent, skipped reservations, and any errors."""
+    try:
+        if not reservations:
+            return {
+                "success": False,
+                "error": "No reservations provided",
+                "notifications_sent": 0,
+                "reservations_processed": 0,
+                "reservations_skipped": [],
+                "skipped_count": 0
+            }
+        
+        reservations_count = len(reservations)
+        
+        # Build notification data for all reservations
+        notification_data, skipped_reservations = _build_notification_data(reservations)
+        
+        if not notification_data:
+            return {
+                "success": False,
+                "error": "No valid notification data could be built from reservations",
+                "notifications_sent": 0,
+                "reservations_processed": reservations_count,
+                "reservations_skipped": skipped_reservations,
+                "skipped_count": len(skipped_reservations)
+            }
+        
+        # Prepare broadcast payload
+        broadcast_url = 'https://taratechapi.fly.dev/api/koalaplus/broadcast-reservation-success/'
+        broadcast_payload = {
+            'token': token,
+            'campaignName': campaign_name,
+            'templateId': template_id,
+            'notificationData': notification_data,
+        }
+        
+        # Send broadcast request
+        broadcast_response = requests.post(
+            broadcast_url,
+            headers={'Content-Type': 'application/json'},
+            json=broadcast_payload
+        )
+        
+        if broadcast_response.status_code in [200, 201]:
+            return {
+                "success": True,
+                "message": f"Reconfirmation messages sent successfully for {len(notification_data)} reservation(s)",
+                "notifications_sent": len(notification_data),
+                "reservations_processed": reservations_count,
+                "reservations_skipped": skipped_reservations,
+                "skipped_count": len(skipped_reservations)
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to send broadcast: {broadcast_response.status_code}",
+                "response": broadcast_response.text,
+                "notifications_sent": 0,
+                "reservations_processed": reservations_count,
+                "reservations_skipped": skipped_reservations,
+                "skipped_count": len(skipped_reservations)
+            }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "notifications_sent": 0,
+            "reservations_processed": len(reservations) if reservations else 0,
+            "reservations_skipped": [],
+            "skipped_count": 0
+        }
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def check_for_reservations_2_days_before_reservation_date(request):
+    """Get all confirmed reservations that are scheduled 2 days from today. Compares only the date part, not the time.
+    If reservations are found, automatically sends reconfirmation messages via Koala WhatsApp.
+    
+    Query parameters:
+    - brandId: (optional) Filter reservations by brand ID
+    
+    Message routing:
+    - 1-2 pax confirmed reservations → sends previous 1-4 pax confirmation message (campaign '025', template '025')
+    - 3+ pax confirmed reservations → sends previous 5+ pax confirmation message (campaign '028', template '028')
+    """
+    supabase = create_supabase_client()
+    try:
+        # Get brandId from query parameters (optional)
+        brand_id = request.query_params.get('brandId')
+        
+        # Get today's date and calculate target date (2 days from now)
+        today = timezone.localdate()
+        target_date = today + timedelta(days=2)
+        
+        # Get reservations from the database, optionally filtered by brandId
+        query = supabase.table('ecosuite_reservations').select('*')
+        if brand_id:
+            query = query.eq('brandId', brand_id)
+        response = query.execute()
+        all_reservations = response.data or []
+        
+        # Filter reservations where the date part matches the target date
+        # 1-2 pax: confirmed reservations → send 1-4 pax confirmation message
+        # 3+ pax: confirmed reservations → send 5+ pax confirmation message
+        matching_reservations_1_2_pax = []
+        matching_reservations_3_plus_pax = []
+        for reservation in all_reservations:
+            reservation_status = reservation.get('status')
+            reservation_date_time = reservation.get('reservationDateTime')
+            if not reservation_date_time:
+                continue
+            
+            try:
+                # Parse the reservation datetime
+                # Handle various ISO format variations
+                reservation_dt = None
+                if 'Z' in reservation_date_time:
+                    reservation_dt = datetime.fromisoformat(reservation_date_time.replace('Z', '+00:00'))
+                elif '+' in reservation_date_time or reservation_date_time.count('-') > 2:
+                    reservation_dt = datetime.fromisoformat(reservation_date_time)
+                else:
+                    reservation_dt = datetime.fromisoformat(reservation_date_time)
+                
+                # Extract only the date part
+                reservation_date = reservation_dt.date()
+                
+                # Check if the reservation date matches the target date (2 days from today)
+                if reservation_date == target_date:
+                    number_of_guests = reservation.get('numberOfGuests', 0)
+                    try:
+                        number_of_guests_int = int(number_of_guests) if number_of_guests else 0
+                    except (ValueError, TypeError):
+                        number_of_guests_int = 0
+                    
+                    # Both groups must be confirmed status
+                    if reservation_status == 'confirmed':
+                        # 1-2 pax: send previous 1-4 pax confirmation message
+                        if number_of_guests_int >= 1 and number_of_guests_int <= 2:
+                            matching_reservations_1_2_pax.append(reservation)
+                        # 3+ pax: send previous 5+ pax confirmation message
+                        elif number_of_guests_int >= 3:
+                            matching_reservations_3_plus_pax.append(reservation)
+            except Exception as parse_error:
+                # Skip reservations with invalid datetime format
+                continue
+        
+        # Authenticate once if either group has reservations (efficient single authentication)
+        token = None
+        has_reservations = len(matching_reservations_1_2_pax) > 0 or len(matching_reservations_3_plus_pax) > 0
+        if has_reservations:
+            token = _login_to_koala()
+            if not token:
+                # If authentication fails, set error for both groups
+                broadcast_result_1_2 = {"success": False, "error": "Failed to authenticate with Koala"} if matching_reservations_1_2_pax else None
+                broadcast_result_3_plus = {"success": False, "error": "Failed to authenticate with Koala"} if matching_reservations_3_plus_pax else None
+            else:
+                # Send reconfirmation messages for 1-2 pax (confirmed reservations) → use previous 1-4 pax message
+                broadcast_result_1_2 = None
+                if matching_reservations_1_2_pax:
+                    broadcast_result_1_2 = _send_reconfirmation_broadcast(token, matching_reservations_1_2_pax, campaign_name='025', template_id='025')
+                
+                # Send reconfirmation messages for 3+ pax (confirmed reservations) → use previous 5+ pax message
+                broadcast_result_3_plus = None
+                if matching_reservations_3_plus_pax:
+                    broadcast_result_3_plus = _send_reconfirmation_broadcast(token, matching_reservations_3_plus_pax, campaign_name='028', template_id='028')
+        else:
+            broadcast_result_1_2 = None
+            broadcast_result_3_plus = None
+        
+        # Determine if messages were sent successfully
+        messages_sent_1_2 = len(matching_reservations_1_2_pax) > 0 and broadcast_result_1_2 and broadcast_result_1_2.get("success", False)
+        messages_sent_3_plus = len(matching_reservations_3_plus_pax) > 0 and broadcast_result_3_plus and broadcast_result_3_plus.get("success", False)
+        
+        # Collect skipped reservations from both groups
+        skipped_1_2 = broadcast_result_1_2.get("reservations_skipped", []) if broadcast_result_1_2 else []
+        skipped_3_plus = broadcast_result_3_plus.get("reservations_skipped", []) if broadcast_result_3_plus else []
+        all_skipped = skipped_1_2 + skipped_3_plus
+        
+        # Get notification counts
+        notifications_sent_1_2 = broadcast_result_1_2.get("notifications_sent", 0) if broadcast_result_1_2 else 0
+        notifications_sent_3_plus = broadcast_result_3_plus.get("notifications_sent", 0) if broadcast_result_3_plus else 0
+        total_notifications_sent = notifications_sent_1_2 + notifications_sent_3_plus
+        
+        # Return the JSON of all matching reservations along with broadcast results
+        return Response({
+            "brandId": brand_id,
+            "brandId_filtered": brand_id is not None,
+            "reservations": matching_reservations_1_2_pax + matching_reservations_3_plus_pax,
+            "count": len(matching_reservations_1_2_pax) + len(matching_reservations_3_plus_pax),
+            "reservations_1_2_pax": matching_reservations_1_2_pax,
+            "count_1_2_pax": len(matching_reservations_1_2_pax),
+            "reservations_3_plus_pax": matching_reservations_3_plus_pax,
+            "count_3_plus_pax": len(matching_reservations_3_plus_pax),
+            "broadcast_result_1_2_pax": broadcast_result_1_2,
+            "broadcast_result_3_plus_pax": broadcast_result_3_plus,
+            "messages_sent_1_2_pax": messages_sent_1_2,
+            "messages_sent_3_plus_pax": messages_sent_3_plus,
+            "messages_sent": messages_sent_1_2 or messages_sent_3_plus,
+            "notifications_sent_1_2_pax": notifications_sent_1_2,
+            "notifications_sent_3_plus_pax": notifications_sent_3_plus,
+            "total_notifications_sent": total_notifications_sent,
+            "skipped_reservations": all_skipped,
+            "skipped_count": len(all_skipped)
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _send_reservation_reminder_broadcast(token, reservations, campaign_name='022', template_id='019'):
+    """Send reservation reminder messages via Koala broadcast API for all reservations in a single request."""
+    try:
+        if not reservations:
+            return {"success": False, "error": "No reservations provided"}
+        
+        # Build notification data for all reservations using reminder-specific function
+        notification_data = _build_reminder_notification_data(reservations)
+        
+        if not notification_data:
+            return {"success": False, "error": "No valid notification data could be built from reservations"}
+        
+        # Prepare broadcast payload
+        broadcast_url = 'https://taratechapi.fly.dev/api/koalaplus/broadcast-reservation-success/'
+        broadcast_payload = {
+            'token': token,
+            'campaignName': campaign_name,
+            'templateId': template_id,
+            'notificationData': notification_data,
+        }
+        
+        # Send broadcast request
+        broadcast_response = requests.post(
+            broadcast_url,
+            headers={'Content-Type': 'application/json'},
+            json=broadcast_payload
+        )
+        
+        if broadcast_response.status_code in [200, 201]:
+            return {
+                "success": True,
+                "message": f"Reservation reminder messages sent successfully for {len(notification_data)} reservation(s)",
+                "notifications_sent": len(notification_data)
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to send broadcast: {broadcast_response.status_code}",
+                "response": broadcast_response.text
+            }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def send_reservation_reminder_for_5pax_and_above_2day_before_reservation_date(request):
+    """Get all pending reservations with 5+ pax that are scheduled 1 day from today. Compares only the date part, not the time.
+    If reservations are found, automatically sends reminder messages via Koala WhatsApp.
+    
+    Query parameters:
+    - brandId: (optional) Filter reservations by brand ID
+    """
+    supabase = create_supabase_client()
+    try:
+        # Get brandId from query parameters (optional)
+        brand_id = request.query_params.get('brandId')
+        
+        # Get today's date and calculate target date (1 day from now)
+        today = timezone.localdate()
+        target_date = today + timedelta(days=1)
+        
+        # Get reservations from the database, optionally filtered by brandId
+        query = supabase.table('ecosuite_reservations').select('*')
+        if brand_id:
+            query = query.eq('brandId', brand_id)
+        response = query.execute()
+        all_reservations = response.data or []
+        
+        # Filter reservations where the date part matches the target date, status is pending, and numberOfGuests >= 5
+        matching_reservations = []
+        for reservation in all_reservations:
+            # Only process pending reservations
+            reservation_status = reservation.get('status')
+            if reservation_status == 'verified':
+                continue
+            
+            # Only process reservations with 5 or more guests
+            number_of_guests = reservation.get('numberOfGuests', 0)
+            try:
+                number_of_guests_int = int(number_of_guests) if number_of_guests else 0
+                if number_of_guests_int < 5:
+                    continue
+            except (ValueError, TypeError):
+                continue
+            
+            reservation_date_time = reservation.get('reservationDateTime')
+            if not reservation_date_time:
+                continue
+            
+            try:
+                # Parse the reservation datetime
+                # Handle various ISO format variations
+                reservation_dt = None
+                if 'Z' in reservation_date_time:
+                    reservation_dt = datetime.fromisoformat(reservation_date_time.replace('Z', '+00:00'))
+                elif '+' in reservation_date_time or reservation_date_time.count('-') > 2:
+                    reservation_dt = datetime.fromisoformat(reservation_date_time)
+                else:
+                    reservation_dt = datetime.fromisoformat(reservation_date_time)
+                
+                # Extract only the date part
+                reservation_date = reservation_dt.date()
+                
+                # Check if the reservation date matches the target date (1 day from today)
+                if reservation_date == target_date:
+                    matching_reservations.append(reservation)
+            except Exception as parse_error:
+                # Skip reservations with invalid datetime format
+                continue
+        
+        # If list is not empty, send reminder messages
+        broadcast_result = None
+        if matching_reservations:
+            # Login to Koala to get token
+            token = _login_to_koala()
+            if not token:
+                return Response({
+                    "reservations": matching_reservations,
+                    "count": len(matching_reservations),
+                    "message": "Reservations found but failed to authenticate with Koala. Messages not sent.",
+                    "broadcast_result": None
+                }, status=status.HTTP_200_OK)
+            
+            # Send reminder messages for all reservations in a single broadcast
+            broadcast_result = _send_reservation_reminder_broadcast(token, matching_reservations, campaign_name='028', template_id='028')
+        
+        # Return the JSON of all matching reservations along with broadcast result
+        return Response({
+            "brandId": brand_id,
+            "brandId_filtered": brand_id is not None,
+            "reservations": matching_reservations,
+            "count": len(matching_reservations),
+            "broadcast_result": broadcast_result,
+            "messages_sent": len(matching_reservations) > 0 and broadcast_result and broadcast_result.get("success", False)
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _build_cancel_notification_data(reservations):
+    """Build notification data array from a list of reservations for cancel messages.
+    Uses empty paramData since template 026 doesn't need parameters."""
+    notification_data = []
+    
+    for reservation in reservations:
+        # Parse phone number
+        customer_phone = reservation.get('customerPhone')
+        if not customer_phone:
+            continue
+        
+        phone_number_international = _parse_phone_to_international(customer_phone)
+        if not phone_number_international:
+            continue
+        
+        # Append notification data item with empty paramData
+        notification_data.append({
+            "phoneNumber": phone_number_international,
+            "paramData": ['https://reservation.supagetti.com/'],
+        })
+    
+    return notification_data
+
+
+def _send_cancel_broadcast(token, reservations, campaign_name='026', template_id='026'):
+    """Send cancel notification messages via Koala broadcast API for all reservations in a single request."""
+    try:
+        if not reservations:
+            return {"success": False, "error": "No reservations provided"}
+        
+        # Build notification data for all reservations using cancel-specific function
+        notification_data = _build_cancel_notification_data(reservations)
+        
+        if not notification_data:
+            return {"success": False, "error": "No valid notification data could be built from reservations"}
+        
+        # Prepare broadcast payload
+        broadcast_url = 'https://taratechapi.fly.dev/api/koalaplus/broadcast-reservation-success/'
+        broadcast_payload = {
+            'token': token,
+            'campaignName': campaign_name,
+            'templateId': template_id,
+            'notificationData': notification_data,
+        }
+        
+        # Send broadcast request
+        broadcast_response = requests.post(
+            broadcast_url,
+            headers={'Content-Type': 'application/json'},
+            json=broadcast_payload
+        )
+        
+        if broadcast_response.status_code in [200, 201]:
+            return {
+                "success": True,
+                "message": f"Cancel notification messages sent successfully for {len(notification_data)} reservation(s)",
+                "notifications_sent": len(notification_data)
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to send broadcast: {broadcast_response.status_code}",
+                "response": broadcast_response.text
+            }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+JAKARTA_TZ = pytz.timezone("Asia/Jakarta")
+
+
+def _now_jakarta_naive():
+    """
+    Returns Jakarta 'local' timestamp WITHOUT tzinfo (naive),
+    matching how your Supabase column confirmedExpiryDateTime is stored:
+    timestamp (no tz) in Jakarta time.
+    """
+    return timezone.now().astimezone(JAKARTA_TZ).replace(tzinfo=None)
+
+
+def _to_pg_timestamp_str(dt_naive):
+    """
+    PostgREST likes ISO strings. For timestamp (no tz) columns,
+    send 'YYYY-MM-DDTHH:MM:SS' (no timezone suffix).
+    """
+    return dt_naive.replace(microsecond=0).isoformat()
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def send_cancel_notification_for_confirmed_reservations_when_expired(request):
+    """
+    Cancels ONLY reservations where:
+      - status == 'confirmed'
+      - confirmedExpiryDateTime IS NOT NULL
+      - confirmedExpiryDateTime <= now (Jakarta local timestamp, no tz)
+
+    Any other status with confirmedExpiryDateTime != null is left untouched.
+    Optional query param:
+      - brandId
+    """
+    supabase = create_supabase_client()
+
+    try:
+        brand_id = request.query_params.get("brandId")
+
+        now_jkt_naive = _now_jakarta_naive()
+        now_jkt_str = _to_pg_timestamp_str(now_jkt_naive)
+
+        # Filter in Supabase (server-side) to avoid pulling all rows
+        query = (
+            supabase.table("ecosuite_reservations")
+            .select("*")
+            .eq("status", "confirmed")
+            .not_.is_("confirmedExpiryDateTime", "null")
+            .lte("confirmedExpiryDateTime", now_jkt_str)
+        )
+
+        if brand_id:
+            query = query.eq("brandId", brand_id)
+
+        response = query.execute()
+        matching_reservations = response.data or []
+
+        broadcast_result = None
+        updated_reservations = []
+        failed_updates = []
+
+        if matching_reservations:
+            token = _login_to_koala()
+            if not token:
+                return Response(
+                    {
+                        "brandId": brand_id,
+                        "brandId_filtered": brand_id is not None,
+                        "filter": {
+                            "status": "confirmed",
+                            "confirmedExpiryDateTime_not_null": True,
+                            "confirmedExpiryDateTime_lte_nowJakarta": now_jkt_str,
+                        },
+                        "reservations": matching_reservations,
+                        "count": len(matching_reservations),
+                        "message": "Reservations found but failed to authenticate with Koala. Messages not sent.",
+                        "broadcast_result": None,
+                        "messages_sent": False,
+                        "updated_reservations": [],
+                        "updated_count": 0,
+                        "failed_updates": [],
+                        "failed_count": 0,
+                    },
+                    status=status.HTTP_200_OK,
+                )
+
+            # Send cancel notification messages (single broadcast)
+            broadcast_result = _send_cancel_broadcast(
+                token,
+                matching_reservations,
+                campaign_name="026",
+                template_id="026",
+            )
+
+            # Only cancel in DB if broadcast succeeded
+            if broadcast_result and broadcast_result.get("success", False):
+                updated_at_str = now_jkt_str  # keep updatedAt in Jakarta local timestamp (no tz)
+
+                for reservation in matching_reservations:
+                    reservation_id = reservation.get("id")
+                    if not reservation_id:
+                        continue
+
+                    try:
+                        update_data = {
+                            "status": "cancelled",
+                            "updatedAt": updated_at_str,
+                            # optional: keep note trail (uncomment if you want)
+                            # "notes": (reservation.get("notes") or "") + (
+                            #     ("\n" if reservation.get("notes") else "") +
+                            #     f"[AUTO_CANCEL {updated_at_str}] Confirmed expired (not reconfirmed)"
+                            # )
+                        }
+
+                        update_resp = (
+                            supabase.table("ecosuite_reservations")
+                            .update(update_data)
+                            .eq("id", reservation_id)
+                            .execute()
+                        )
+
+                        if update_resp.data and len(update_resp.data) > 0:
+                            updated_reservations.append(reservation_id)
+                        else:
+                            failed_updates.append(
+                                {
+                                    "reservation_id": reservation_id,
+                                    "error": "Failed to update reservation status",
+                                }
+                            )
+
+                    except Exception as update_error:
+                        failed_updates.append(
+                            {"reservation_id": reservation_id, "error": str(update_error)}
+                        )
+
+        return Response(
+            {
+                "brandId": brand_id,
+                "brandId_filtered": brand_id is not None,
+                "filter": {
+                    "status": "confirmed",
+                    "confirmedExpiryDateTime_not_null": True,
+                    "confirmedExpiryDateTime_lte_nowJakarta": now_jkt_str,
+                },
+                "nowJakarta": now_jkt_str,
+                "reservations": matching_reservations,
+                "count": len(matching_reservations),
+                "broadcast_result": broadcast_result,
+                "messages_sent": bool(
+                    matching_reservations
+                    and broadcast_result
+                    and broadcast_result.get("success", False)
+                ),
+                "updated_reservations": updated_reservations,
+                "updated_count": len(updated_reservations),
+                "failed_updates": failed_updates,
+                "failed_count": len(failed_updates),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def check_waitlisted_reservations_with_confirmedExpiryDateTime_expired(request):
+    """Check all reservations that have confirmedExpiryDateTime that is not None or null.
+    If the current datetime (in WIB/Jakarta timezone) is past the confirmedExpiryDateTime,
+    set the reservation's status to cancelled.
+    
+    Query parameters:
+    - brandId: (optional) Filter reservations by brand ID
+    """
+    supabase = create_supabase_client()
+    try:
+        # Get brandId from query parameters (optional)
+        brand_id = request.query_params.get('brandId')
+        
+        # Get current datetime in Jakarta timezone
+        current_datetime = timezone.now()
+        
+        # Get reservations from the database, optionally filtered by brandId
+        query = supabase.table('ecosuite_reservations').select('*')
+        if brand_id:
+            query = query.eq('brandId', brand_id)
+        response = query.execute()
+        all_reservations = response.data or []
+        
+        # Filter reservations with confirmedExpiryDateTime that is not None or null
+        # Only process reservations with status 'confirmed'
+        expired_reservations = []
+        for reservation in all_reservations:
+            confirmed_expiry_date_time = reservation.get('confirmedExpiryDateTime')
+            reservation_status = reservation.get('status')
+            
+            # Skip if confirmedExpiryDateTime is None or null
+            if not confirmed_expiry_date_time:
+                continue
+            
+            # Only process reservations with status 'confirmed'
+            if reservation_status != 'confirmed':
+                continue
+            
+            try:
+                # Parse the confirmedExpiryDateTime
+                # Handle various ISO format variations
+                expiry_dt = None
+                if 'Z' in confirmed_expiry_date_time:
+                    expiry_dt = datetime.fromisoformat(confirmed_expiry_date_time.replace('Z', '+00:00'))
+                elif '+' in confirmed_expiry_date_time or confirmed_expiry_date_time.count('-') > 2:
+                    expiry_dt = datetime.fromisoformat(confirmed_expiry_date_time)
+                else:
+                    expiry_dt = datetime.fromisoformat(confirmed_expiry_date_time)
+                
+                # Make expiry_dt timezone-aware if it's naive (assume Jakarta timezone)
+                if expiry_dt.tzinfo is None:
+                    expiry_dt = timezone.make_aware(expiry_dt)
+                else:
+                    # Convert to Jakarta timezone for comparison
+                    expiry_dt = expiry_dt.astimezone(timezone.get_current_timezone())
+                
+                # Round both datetimes to the minute level (disregard seconds and microseconds)
+                current_datetime_minute = current_datetime.replace(second=0, microsecond=0)
+                expiry_dt_minute = expiry_dt.replace(second=0, microsecond=0)
+                
+                # Check if current datetime (already in Jakarta timezone) is >= the expiry datetime at minute level
+                # If equal (same minute), already consider it expired
+                if current_datetime_minute >= expiry_dt_minute:
+                    expired_reservations.append(reservation)
+            except Exception as parse_error:
+                # Skip reservations with invalid datetime format
+                continue
+        
+        # Update expired reservations to cancelled status
+        updated_reservations = []
+        failed_updates = []
+        
+        if expired_reservations:
+            now = timezone.now().isoformat()
+            for reservation in expired_reservations:
+                reservation_id = reservation.get('id')
+                if not reservation_id:
+                    continue
+                
+                try:
+                    # Update reservation status to cancelled
+                    update_data = {
+                        'status': 'cancelled',
+                        'updatedAt': now
+                    }
+                    
+                    update_response = supabase.table('ecosuite_reservations').update(update_data).eq('id', reservation_id).execute()
+                    
+                    if update_response.data and len(update_response.data) > 0:
+                        updated_reservations.append({
+                            "reservation_id": reservation_id,
+                            "confirmedExpiryDateTime": reservation.get('confirmedExpiryDateTime'),
+                            "previous_status": reservation.get('status')
+                        })
+                    else:
+                        failed_updates.append({
+                            "reservation_id": reservation_id,
+                            "error": "Failed to update reservation status"
+                        })
+                except Exception as update_error:
+                    failed_updates.append({
+                        "reservation_id": reservation_id,
+                        "error": str(update_error)
+                    })
+        
+        # Return the results
+        return Response({
+            "brandId": brand_id,
+            "brandId_filtered": brand_id is not None,
+            "expired_reservations": expired_reservations,
+            "expired_count": len(expired_reservations),
+            "updated_reservations": updated_reservations,
+            "updated_count": len(updated_reservations),
+            "failed_updates": failed_updates,
+            "failed_count": len(failed_updates),
+            "current_datetime": current_datetime.isoformat()
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({
+            "error": str(e),
+            "error_type": type(e).__name__
+        }, status=status.HTTP_400_BAD_REQUEST)
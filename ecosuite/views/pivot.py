@@ -0,0 +1,723 @@
+import asyncio
+import os
+import uuid
+
+import requests
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from taratechapi.async_api import async_api_view, async_client, json_response
+from taratechapi.metrics import query_budget
+
+from .common import create_supabase_client
+
+
+def map_reservation_to_pivot_payment(reservation_data):
+    """
+    Map EcoSuiteReservation data to Pivot payment format.
+    
+    Args:
+        reservation_data: The request data which may contain:
+            - 'reservation': nested object with reservation fields
+            - 'amount': payment amount
+            - 'environment': staging/production
+    
+    Returns:
+        Dictionary in Pivot payment format
+    
+    Raises:
+        ValueError: If required fields are missing
+    """
+    # Check if reservation data is nested in a 'reservation' key
+    reservation = reservation_data.get('reservation', {})
+    if not reservation:
+        # If no nested reservation, assume the data is flat
+        reservation = reservation_data
+    
+    # Extract amount from top level (not from reservation object)
+    amount = reservation_data.get('amount') or 0
+    
+    # Extract reservation fields from the reservation object
+    reservation_id = (
+        reservation.get('id') or 
+        reservation.get('reservationId') or 
+        reservation.get('clientReferenceId') or
+        str(uuid.uuid4())  # Generate one if missing
+    )
+    
+    customer_name = (
+        reservation.get('customerName') or 
+        reservation.get('customer_name') or
+        ''
+    )
+    
+    # Try multiple email field names
+    email = (
+        reservation.get('email') or 
+        reservation.get('customerEmail') or
+        reservation.get('customer_email') or
+        ''
+    )
+    
+    # Try multiple phone field names
+    customer_phone = (
+        reservation.get('customerPhone') or 
+        reservation.get('customer_phone') or
+        reservation.get('phone') or
+        reservation.get('phoneNumber') or
+        ''
+    )
+    
+    number_of_guests = reservation.get('numberOfGuests') or reservation.get('number_of_guests') or 1
+    notes = reservation.get('notes') or ''
+    
+    # Validate required fields
+    if not customer_phone:
+        raise ValueError("Customer phone is required. Please provide 'customerPhone' in the reservation data.")
+    
+    # Email might not be in reservation, generate a placeholder if missing
+    # Pivot API requires email, so we'll use a format: phone@ecosuite.local
+    if not email:
+        # Generate email from phone number as fallback
+        phone_clean = ''.join(filter(str.isdigit, customer_phone))
+        email = f"{phone_clean}@ecosuite.local"
+    
+    if not reservation_id or reservation_id == '':
+        reservation_id = str(uuid.uuid4())
+    
+    # Parse customer phone number (assuming format: +62XXXXXXXXXX or similar)
+    phone_country_code = '+62'
+    phone_number_raw = customer_phone.strip() if customer_phone else ''
+    
+    if not phone_number_raw:
+        raise ValueError("Customer phone is required. Please provide 'customerPhone' in the reservation data.")
+    
+    # First, clean the phone number (remove spaces, dashes, parentheses, etc.)
+    phone_number_cleaned = ''.join(filter(lambda c: c.isdigit() or c == '+', phone_number_raw))
+    
+    if phone_number_cleaned.startswith('+'):
+        # Extract country code and number
+        if phone_number_cleaned.startswith('+62'):
+            phone_country_code = '+62'
+            phone_number = phone_number_cleaned[3:]
+        else:
+            # Try to extract country code (could be +1, +44, etc.)
+            # Find where the country code ends (usually 1-3 digits after +)
+            digits_after_plus = ''
+            for char in phone_number_cleaned[1:]:
+                if char.isdigit():
+                    digits_after_plus += char
+                else:
+                    break
+            
+            if digits_after_plus:
+                # If we have digits, try to determine country code
+                # For now, if it's not +62, we'll use what we found
+                if phone_number_cleaned.startswith('+62'):
+                    phone_country_code = '+62'
+                    phone_number = phone_number_cleaned[3:]
+                else:
+                    # Use first 1-3 digits as country code
+                    if len(digits_after_plus) >= 3:
+                        phone_country_code = '+' + digits_after_plus[:3]
+                        phone_number = phone_number_cleaned[4:]
+                    elif len(digits_after_plus) >= 2:
+                        phone_country_code = '+' + digits_after_plus[:2]
+                        phone_number = phone_number_cleaned[3:]
+                    else:
+                        phone_country_code = '+' + digits_after_plus
+                        phone_number = phone_number_cleaned[1 + len(digits_after_plus):]
+            else:
+                # No digits found, invalid format
+                raise ValueError(f"Invalid phone number format: {customer_phone}. No digits found after +.")
+    elif phone_number_cleaned.startswith('62'):
+        # Phone starts with 62 (Indonesia country code without +)
+        phone_country_code = '+62'
+        phone_number = phone_number_cleaned[2:]
+    elif phone_number_cleaned.startswith('0'):
+        # Phone starts with 0 (local format), remove leading 0
+        phone_country_code = '+62'
+        phone_number = phone_number_cleaned[1:]
+    else:
+        # Just digits, assume Indonesia (+62)
+        phone_country_code = '+62'
+        phone_number = phone_number_cleaned
+    
+    # Final clean - remove any remaining non-digit characters
+    phone_number = ''.join(filter(str.isdigit, phone_number))
+    
+    if not phone_number:
+        raise ValueError(f"Invalid phone number format: {customer_phone}. Could not extract phone number.")
+    
+    # Validate phone number length (should be at least 8 digits for a valid phone number)
+    if len(phone_number) < 8:
+        raise ValueError(f"Invalid phone number: {customer_phone}. Phone number is too short (minimum 8 digits required).")
+    
+    # Extract payment amount and currency
+    # Handle both formats: amount as number or amount as object with value/currency
+    amount_value = amount
+    amount_currency = 'IDR'
+    
+    # Build Pivot payment payload
+    pivot_payment = {
+        "clientReferenceId": reservation_id,
+        "amount": {
+            "value": amount_value,
+            "currency": amount_currency
+        },
+        "paymentType": 'SINGLE',
+        "mode": 'REDIRECT',
+        "redirectUrl": {
+            "successReturnUrl": "https://merchant.com/success",
+            "failureReturnUrl": "https://merchant.com/failure",
+            "expirationReturnUrl": "https://merchant.com/expiration",
+        },
+        "customer": {
+            "givenName": customer_name.split(' ', 1)[0] if customer_name else '',
+            "sureName": customer_name.split(' ', 1)[1] if ' ' in customer_name else customer_name,
+            "email": email,
+            "phoneNumber": {
+                "countryCode": phone_country_code,
+                "number": phone_number
+            },
+            "refundPreference": {
+                "method": "AUTO"
+            }
+        },
+        "orderInformation": {
+            "productDetails": [
+                {
+                    "type": "SERVICE",
+                    "category": "RESTAURANT",
+                    "subCategory": "RESERVATION",
+                    "name": f"Reservation for {number_of_guests} guests",
+                    "description": notes or f"Table reservation",
+                    "quantity": number_of_guests,
+                    "price": {
+                        "value": amount_value,
+                        "currency": amount_currency
+                    }
+                }
+            ]},
+            "billingInfo": {
+                "givenName": customer_name.split(' ', 1)[0] if customer_name else '',
+                "sureName": customer_name.split(' ', 1)[1] if ' ' in customer_name else customer_name,
+                "email": email,
+                "phoneNumber": {
+                    "countryCode": phone_country_code,
+                    "number": phone_number
+                
+            },
+            "shippingInfo": None
+        },
+        "autoConfirm": False,
+        "statementDescriptor": 'EcoSuite Reservation',
+        "expiryAt": None,
+        "metadata": {
+            "reservationId": reservation_id,
+            "numberOfGuests": number_of_guests
+        }
+    }
+    
+    
+    # Remove None values from nested structures
+    def remove_none_values(obj):
+        if isinstance(obj, dict):
+            return {k: remove_none_values(v) for k, v in obj.items() if v is not None}
+        elif isinstance(obj, list):
+            return [remove_none_values(item) for item in obj if item is not None]
+        return obj
+    
+    return remove_none_values(pivot_payment)
+
+
+def _pivot_access_token_request(environment):
+    """Base URL, headers and body of the Pivot access-token request for environment."""
+    pivot_staging_url = 'https://api-stg.pivot-payment.com'
+    pivot_production_url = 'https://api.pivot-payment.com'
+    x_merchant_id = ''
+    x_merchant_secret = ''
+
+    if environment == 'staging':
+        x_merchant_id = os.getenv('TARA_TECH_PIVOT_CLIENT_ID_STAGING')
+        x_merchant_secret = os.getenv('TARA_TECH_PIVOT_CLIENT_SECRET_STAGING')
+        base_url = pivot_staging_url
+    elif environment == 'production':
+        x_merchant_id = os.getenv('TARA_TECH_PIVOT_CLIENT_ID_PRODUCTION')
+        x_merchant_secret = os.getenv('TARA_TECH_PIVOT_CLIENT_SECRET_PRODUCTION')
+        base_url = pivot_production_url
+    else:
+        raise ValueError(f"Invalid environment: {environment}. Must be 'staging' or 'production'")
+
+    if not x_merchant_id or not x_merchant_secret:
+        raise ValueError(f"Missing Pivot credentials for {environment} environment")
+
+    header = {
+        'X-MERCHANT-ID': x_merchant_id,
+        'X-MERCHANT-SECRET': x_merchant_secret,
+    }
+    body = {
+        "grantType": "client_credentials"
+    }
+    return base_url, header, body
+
+
+def _pivot_access_token(response):
+    if response.status_code != 200:
+        raise Exception(f"Failed to authenticate Pivot request: {response.status_code} - {response.text}")
+    
+    response_data = response.json()
+    access_token = response_data.get('data', {}).get('accessToken')
+    if not access_token:
+        raise Exception("Access token not found in Pivot authentication response")
+    return access_token
+
+
+def authenticate_pivot_request(environment='staging'):
+    """Authenticate a request to Pivot and return access token and base URL."""
+    base_url, header, body = _pivot_access_token_request(environment)
+    response = requests.post(f'{base_url}/v1/access-token', headers=header, json=body)
+    return _pivot_access_token(response), base_url
+
+
+async def authenticate_pivot_request_async(environment='staging'):
+    """authenticate_pivot_request for async views."""
+    base_url, header, body = _pivot_access_token_request(environment)
+    response = await async_client().post(f'{base_url}/v1/access-token', headers=header, json=body)
+    return _pivot_access_token(response), base_url
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def pivot_create_payment(request):
+    """Create a payment in Pivot from EcoSuiteReservation data."""
+    try:
+        # Get the reservation data from request body
+        reservation_data = request.data.copy()
+        
+        # Extract environment (needed for authentication)
+        environment = reservation_data.get('environment', 'staging')
+        
+        # Validate that we have the minimum required data
+        if not reservation_data:
+            return Response({
+                "error": "Request body is empty. Please provide reservation data."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Authenticate with Pivot to get access token
+        pivot_access_token, base_url = authenticate_pivot_request(environment)
+        
+        # Map reservation data to Pivot payment format
+        # This will raise ValueError if required fields are missing
+        pivot_payment_payload = map_reservation_to_pivot_payment(
+            reservation_data
+        )
+        
+        # Double-check required fields before sending
+        if not pivot_payment_payload.get('clientReferenceId'):
+            return Response({
+                "error": "clientReferenceId is required but was not generated. Please provide 'id' in reservation data.",
+                "received_data_keys": list(reservation_data.keys())
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        customer_info = pivot_payment_payload.get('customer', {})
+        if not customer_info.get('email'):
+            return Response({
+                "error": "Customer email is required. Please provide 'email' or 'customerEmail' in reservation data.",
+                "received_data_keys": list(reservation_data.keys())
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        phone_info = customer_info.get('phoneNumber', {})
+        if not phone_info.get('number'):
+            return Response({
+                "error": "Customer phone number is required. Please provide 'customerPhone' in reservation data.",
+                "received_data_keys": list(reservation_data.keys())
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Prepare headers for the payment creation request
+        headers = {
+            'Authorization': f'Bearer {pivot_access_token}',
+            'Content-Type': 'application/json'
+        }
+        
+        # Make POST request to Pivot API to create payment
+        pivot_response = requests.post(
+            f'{base_url}/v2/payments',
+            headers=headers,
+            json=pivot_payment_payload
+        )
+        
+        # Return the response from Pivot API
+        if pivot_response.status_code in [200, 201]:
+            return Response({
+                "message": "Payment created successfully",
+                "data": pivot_response.json()
+            }, status=status.HTTP_200_OK)
+        else:
+            try:
+                error_response = pivot_response.json()
+            except:
+                error_response = pivot_response.text
+            
+            return Response({
+                "error": "Failed to create payment in Pivot",
+                "status_code": pivot_response.status_code,
+                "response": error_response,
+                "request_payload": pivot_payment_payload,
+                "received_reservation_keys": list(reservation_data.keys())
+            }, status=status.HTTP_400_BAD_REQUEST)
+            
+    except ValueError as e:
+        return Response({
+            "error": str(e),
+            "received_data_keys": list(request.data.keys()) if hasattr(request, 'data') else []
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except KeyError as e:
+        return Response({
+            "error": f"Missing required field: {str(e)}",
+            "received_data_keys": list(request.data.keys()) if hasattr(request, 'data') else []
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "received_data_keys": list(request.data.keys()) if hasattr(request, 'data') else []
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@async_api_view(['GET'])
+@query_budget(supabase=2)
+async def pivot_check_payment(request, reservation_id):
+    """Check payment status for a specific reservation from Pivot API.
+
+    Pending payments are checked against Pivot concurrently.
+    """
+    try:
+        supabase = create_supabase_client()
+        
+        # Get environment from query params or default to staging
+        environment = request.query_params.get('environment', 'staging')
+        
+        # Get reservation from Supabase
+        reservation_response = await sync_to_async(
+            supabase.table('ecosuite_reservations').select('*').eq('id', reservation_id).execute,
+            thread_sensitive=False,
+        )()
+        
+        if not reservation_response.data or len(reservation_response.data) == 0:
+            return json_response({
+                "error": f"Reservation with id {reservation_id} not found"
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        reservation = reservation_response.data[0]
+        payments = reservation.get('payments', [])
+        
+        if not payments or len(payments) == 0:
+            return json_response({
+                "error": f"No payments found for reservation {reservation_id}",
+                "reservation": reservation
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        # Filter to only pending payments
+        pending_payments = [p for p in payments if p.get('status', '').lower() == 'pending']
+        
+        if not pending_payments:
+            return json_response({
+                "message": "No pending payments found for this reservation",
+                "reservation": reservation
+            }, status=status.HTTP_200_OK)
+        
+        # Authenticate with Pivot
+        pivot_access_token, base_url = await authenticate_pivot_request_async(environment)
+        
+        # Check status for each pending payment
+        updated_payments = []
+        payment_statuses = []
+        
+        # Create a map of payment IDs to payments for easy lookup
+        payment_map = {p.get('id'): p for p in payments}
+        
+        headers = {
+            'Authorization': f'Bearer {pivot_access_token}',
+            'Content-Type': 'application/json'
+        }
+        pending_payments = [p for p in pending_payments if p.get('id')]
+        pivot_responses = await asyncio.gather(*(
+            async_client().get(f'{base_url}/v2/payments/{payment.get("id")}', headers=headers)
+            for payment in pending_payments
+        ))
+        
+        for payment, pivot_response in zip(pending_payments, pivot_responses):
+            payment_id = payment.get('id')
+            
+            if pivot_response.status_code == 200:
+                pivot_data = pivot_response.json()
+                pivot_payment = pivot_data.get('data', {})
+                
+                # Map Pivot status to our status
+                # Pivot statuses: SUCCESS, EXPIRED, FAILED, PROCESSING, WAITING_FOR_USER_ACTION, 
+                # WAITING_FOR_AUTHENTICATION, WAITING_FOR_CAPTURE
+                pivot_status = pivot_payment.get('status', '').upper()
+                if pivot_status == 'SUCCESS':
+                    new_status = 'paid'
+                    paid_at = pivot_payment.get('paidAt') or pivot_payment.get('settledAt') or timezone.now().isoformat()
+                    payment['paidAt'] = paid_at
+                elif pivot_status == 'EXPIRED':
+                    new_status = 'expired'
+                elif pivot_status == 'FAILED':
+                    new_status = 'cancelled'
+                elif pivot_status == 'PROCESSING':
+                    new_status = 'processing'
+                else:
+                    # WAITING_FOR_USER_ACTION, WAITING_FOR_AUTHENTICATION, WAITING_FOR_CAPTURE, etc.
+                    new_status = 'pending'
+                
+                # Update payment status
+                payment['status'] = new_status
+                payment['updatedAt'] = timezone.now().isoformat()
+                
+                # Update in payment map
+                payment_map[payment_id] = payment
+                
+                payment_statuses.append({
+                    'paymentId': payment_id,
+                    'status': new_status,
+                    'pivotStatus': pivot_status,
+                    'pivotData': pivot_payment
+                })
+            else:
+                # If payment not found in Pivot, mark as expired or keep current status
+                if pivot_response.status_code == 404:
+                    payment['status'] = 'expired'
+                    payment['updatedAt'] = timezone.now().isoformat()
+                    payment_map[payment_id] = payment
+                    payment_statuses.append({
+                        'paymentId': payment_id,
+                        'status': 'expired',
+                        'error': 'Payment not found in Pivot'
+                    })
+                else:
+                    payment_statuses.append({
+                        'paymentId': payment_id,
+                        'status': payment.get('status', 'pending'),
+                        'error': f'Failed to check status: {pivot_response.status_code}'
+                    })
+        
+        # Rebuild payments array with updated statuses
+        updated_payments = list(payment_map.values())
+        
+        # Update reservation with updated payments
+        reservation['payments'] = updated_payments
+        reservation['updatedAt'] = timezone.now().isoformat()
+        reservation['updatedBy'] = request.user.id
+        
+        update_response = await sync_to_async(
+            supabase.table('ecosuite_reservations').update({
+                'payments': updated_payments,
+                'updatedAt': reservation['updatedAt'],
+                'updatedBy': reservation['updatedBy']
+            }).eq('id', reservation_id).execute,
+            thread_sensitive=False,
+        )()
+        
+        if update_response.data:
+            return json_response({
+                "message": "Payment status checked and updated successfully",
+                "reservation": update_response.data[0],
+                "paymentStatuses": payment_statuses
+            }, status=status.HTTP_200_OK)
+        else:
+            return json_response({
+                "message": "Payment status checked but failed to update reservation",
+                "paymentStatuses": payment_statuses,
+                "error": "Failed to update reservation in database"
+            }, status=status.HTTP_200_OK)
+            
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return json_response({
+            "error": str(e),
+            "error_type": type(e).__name__
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def pivot_check_all_pending_payments(request):
+    """Check all pending payments and update their status."""
+    try:
+        supabase = create_supabase_client()
+        
+        # Get environment from request body or default to staging
+        environment = request.data.get('environment', 'staging')
+        
+        # Get all reservations with pending payments
+        all_reservations_response = supabase.table('ecosuite_reservations').select('*').execute()
+        
+        if not all_reservations_response.data:
+            return Response({
+                "message": "No reservations found",
+                "updated": 0
+            }, status=status.HTTP_200_OK)
+        
+        # Authenticate with Pivot once
+        pivot_access_token, base_url = authenticate_pivot_request(environment)
+        headers = {
+            'Authorization': f'Bearer {pivot_access_token}',
+            'Content-Type': 'application/json'
+        }
+        
+        updated_count = 0
+        error_count = 0
+        results = []
+        
+        # Process each reservation
+        for reservation in all_reservations_response.data:
+            payments = reservation.get('payments', [])
+            if not payments:
+                continue
+            
+            # Filter to only pending payments
+            pending_payments = [p for p in payments if p.get('status', '').lower() == 'pending']
+            
+            # Create a map of payment IDs to payments for easy lookup
+            payment_map = {p.get('id'): p for p in payments}
+            
+            # Check each pending payment (if any)
+            for payment in pending_payments:
+                payment_id = payment.get('id')
+                
+                if not payment_id:
+                    continue
+                
+                try:
+                    # Get payment status from Pivot API
+                    pivot_response = requests.get(
+                        f'{base_url}/v2/payments/{payment_id}',
+                        headers=headers
+                    )
+                    
+                    if pivot_response.status_code == 200:
+                        pivot_data = pivot_response.json()
+                        pivot_payment = pivot_data.get('data', {})
+                        
+                        # Map Pivot status to our status
+                        # Pivot statuses: SUCCESS, EXPIRED, FAILED, PROCESSING, WAITING_FOR_USER_ACTION, 
+                        # WAITING_FOR_AUTHENTICATION, WAITING_FOR_CAPTURE
+                        pivot_status = pivot_payment.get('status', '').upper()
+                        if pivot_status == 'SUCCESS':
+                            new_status = 'paid'
+                            paid_at = pivot_payment.get('paidAt') or pivot_payment.get('settledAt') or timezone.now().isoformat()
+                            payment['paidAt'] = paid_at
+                        elif pivot_status == 'EXPIRED':
+                            new_status = 'expired'
+                        elif pivot_status == 'FAILED':
+                            new_status = 'cancelled'
+                        elif pivot_status == 'PROCESSING':
+                            new_status = 'processing'
+                        else:
+                            # WAITING_FOR_USER_ACTION, WAITING_FOR_AUTHENTICATION, WAITING_FOR_CAPTURE, etc.
+                            new_status = 'pending'
+                        
+                        # Update payment
+                        payment['status'] = new_status
+                        payment['updatedAt'] = timezone.now().isoformat()
+                        
+                        # Update in payment map
+                        payment_map[payment_id] = payment
+                        
+                        results.append({
+                            'reservationId': reservation.get('id'),
+                            'paymentId': payment_id,
+                            'oldStatus': 'pending',
+                            'newStatus': new_status,
+                            'pivotStatus': pivot_status
+                        })
+                    elif pivot_response.status_code == 404:
+                        # Payment not found in Pivot, mark as expired
+                        payment['status'] = 'expired'
+                        payment['updatedAt'] = timezone.now().isoformat()
+                        payment_map[payment_id] = payment
+                        results.append({
+                            'reservationId': reservation.get('id'),
+                            'paymentId': payment_id,
+                            'oldStatus': 'pending',
+                            'newStatus': 'expired',
+                            'pivotStatus': 'NOT_FOUND'
+                        })
+                    else:
+                        # Error checking payment, keep as pending
+                        error_count += 1
+                        results.append({
+                            'reservationId': reservation.get('id'),
+                            'paymentId': payment_id,
+                            'oldStatus': 'pending',
+                            'newStatus': 'pending',
+                            'error': f'Failed to check: {pivot_response.status_code}'
+                        })
+                    
+                except Exception as e:
+                    error_count += 1
+                    results.append({
+                        'reservationId': reservation.get('id'),
+                        'paymentId': payment_id,
+                        'error': str(e)
+                    })
+            
+            # Rebuild payments array with updated statuses
+            updated_payments = list(payment_map.values())
+            has_successful_payment = any(
+                p.get('status', '').lower() == 'paid'
+                for p in updated_payments
+            )
+            reservation_status = reservation.get('status', '').lower()
+            should_confirm_reservation = (
+                has_successful_payment and
+                reservation_status in ['pending', 'unpaid']
+            )
+            
+            # Update reservation with updated payments (and status when needed)
+            try:
+                reservation['payments'] = updated_payments
+                reservation['updatedAt'] = timezone.now().isoformat()
+                reservation['updatedBy'] = request.user.id
+                update_payload = {
+                    'payments': updated_payments,
+                    'updatedAt': reservation['updatedAt'],
+                    'updatedBy': reservation['updatedBy']
+                }
+                
+                if should_confirm_reservation:
+                    reservation['status'] = 'confirmed'
+                    update_payload['status'] = 'confirmed'
+                
+                update_response = supabase.table('ecosuite_reservations').update(update_payload).eq('id', reservation.get('id')).execute()
+                
+                if update_response.data:
+                    updated_count += 1
+            except Exception as e:
+                error_count += 1
+                results.append({
+                    'reservationId': reservation.get('id'),
+                    'error': f'Failed to update reservation: {str(e)}'
+                })
+        
+        return Response({
+            "message": "Pending payments checked and updated",
+            "updatedReservations": updated_count,
+            "errors": error_count,
+            "results": results
+        }, status=status.HTTP_200_OK)
+        
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            "error": str(e),
+            "error_type": type(e).__name__
+        }, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,1276 @@
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+
+import requests
+from django.shortcuts import render
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from taratechapi.metrics import query_budget
+
+from ..backends import call_rpc, merge_upsert
+from ..changes import parse_since, reservation_changes
+from ..conditional import conditional_response
+from ..exports import (
+    CRM_CUSTOMER_EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    PAYMENT_LAYOUTS,
+    crm_customer_export_rows,
+    export_response,
+    reservation_export_columns,
+    reservation_export_rows,
+)
+from ..pagination import apply_date_range, keyset_page, next_page_headers, parse_fields, parse_page_size
+from ..phones import normalize_phone_e164
+from ..streaming import iter_pages_by_id, iter_reservation_pages, stream_json_list, stream_json_object, wants_stream
+from .common import availability_reads, create_supabase_client, get_brand_rows, sync_crm_customer_from_reservation
+from .notifications import _login_to_koala, _send_cancel_broadcast
+from .slots import _parse_alternative_count, _suggest_alternative_slots, floor_to_slot, round_up_even
+
+
+# Fields a client may set on ecosuite_reservations / ecosuite_crm_customers through the upsert endpoints
+RESERVATION_UPSERT_FIELDS = (
+    'brandId', 'outletId', 'customerName', 'customerPhone', 'numberOfGuests', 'reservationDateTime',
+    'status', 'tableIds', 'notes', 'utcOffset', 'payments', 'checkedInAt', 'checkedInBy',
+    'checkedOutAt', 'checkedOutBy', 'waitlistedAt', 'confirmedExpiryDateTime',
+)
+
+
+RESERVATION_REQUIRED_FIELDS = (
+    'brandId', 'outletId', 'customerName', 'customerPhone', 'numberOfGuests', 'reservationDateTime',
+)
+
+
+CRM_CUSTOMER_UPSERT_FIELDS = (
+    'brandId', 'outletId', 'fullName', 'phone', 'email', 'notes', 'createdAt', 'createdBy',
+    'utcOffset', 'confirmedExpiryDateTime',
+)
+
+
+@api_view(['POST', 'PUT', 'PATCH'])
+@permission_classes([AllowAny])
+def upsert_reservation(request, reservation_id):
+    """Insert or update a reservation. If reservation exists, updates it; otherwise creates a new one.
+
+    Runs as a single ecosuite_merge_upsert call: only the fields present in the request are
+    written to an existing reservation, and a concurrent create of the same id is merged.
+    """
+    supabase = create_supabase_client()
+    try:
+        data = request.data.copy()
+        now = timezone.now().isoformat()
+
+        # Only update fields that are provided in the request
+        # Use 'in' check to allow None values to be set explicitly
+        patch = {
+            'updatedAt': now,
+            'updatedBy': request.user.id
+        }
+        for field in RESERVATION_UPSERT_FIELDS:
+            if field in data:
+                patch[field] = data.get(field)
+
+        insert_data = {
+            'brandId': data.get('brandId'),
+            'outletId': data.get('outletId'),
+            'customerName': data.get('customerName'),
+            'customerPhone': data.get('customerPhone'),
+            'numberOfGuests': data.get('numberOfGuests'),
+            'reservationDateTime': data.get('reservationDateTime'),
+            'status': data.get('status', 'pending'),
+            'tableIds': data.get('tableIds'),
+            'notes': data.get('notes'),
+            'utcOffset': data.get('utcOffset'),
+            'createdAt': data.get('createdAt', now),
+            'createdBy': request.user.id,
+            'payments': data.get('payments', []),
+            'checkedInAt': data.get('checkedInAt', None),
+            'checkedInBy': data.get('checkedInBy', None),
+            'checkedOutAt': data.get('checkedOutAt', None),
+            'checkedOutBy': data.get('checkedOutBy', None),
+            'waitlistedAt': data.get('waitlistedAt', None),
+            'confirmedExpiryDateTime': data.get('confirmedExpiryDateTime', None),
+        }
+
+        reservation_record, is_new_reservation, missing_fields = merge_upsert(
+            'ecosuite_reservations',
+            reservation_id,
+            patch,
+            insert_data,
+            required_fields=RESERVATION_REQUIRED_FIELDS,
+            supabase=supabase,
+        )
+
+        if missing_fields:
+            return Response({"error": f"{missing_fields[0]} is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if not reservation_record:
+            return Response({"error": "Failed to save reservation"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            sync_crm_customer_from_reservation(supabase, reservation_record, request.user.id)
+        except Exception as crm_error:
+            print(f"CRM sync error ({'create' if is_new_reservation else 'update'}): {crm_error}")
+
+        if is_new_reservation:
+            return Response({
+                "message": "Reservation created successfully",
+                "reservation": reservation_record
+            }, status=status.HTTP_201_CREATED)
+        return Response({
+            "message": "Reservation updated successfully",
+            "reservation": reservation_record
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST', 'PUT', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def upsert_crm_customer(request, customer_id):
+    """Insert or update a CRM customer in ecosuite_crm_customers.
+
+    Runs as a single ecosuite_merge_upsert call. receiptIds is only replaced when it is
+    present in the request.
+    """
+    supabase = create_supabase_client()
+    try:
+        data = request.data.copy()
+
+        receipt_ids = data.get('receiptIds')
+        if receipt_ids is None:
+            receipt_ids = []
+        elif isinstance(receipt_ids, str):
+            try:
+                receipt_ids = json.loads(receipt_ids)
+            except (ValueError, TypeError):
+                receipt_ids = [receipt_ids]
+        elif not isinstance(receipt_ids, list):
+            receipt_ids = [receipt_ids]
+
+        now = timezone.now().isoformat()
+
+        patch = {
+            'updatedAt': now,
+            'updatedBy': request.user.id
+        }
+        for field in CRM_CUSTOMER_UPSERT_FIELDS:
+            if field in data:
+                patch[field] = data.get(field)
+        if 'receiptIds' in data:
+            patch['receiptIds'] = receipt_ids
+
+        insert_data = {
+            'brandId': data.get('brandId'),
+            'outletId': data.get('outletId'),
+            'fullName': data.get('fullName'),
+            'phone': data.get('phone'),
+            'email': data.get('email'),
+            'receiptIds': receipt_ids,
+            'notes': data.get('notes'),
+            'createdAt': data.get('createdAt', now),
+            'createdBy': data.get('createdBy', request.user.id),
+            'updatedBy': data.get('updatedBy', request.user.id),
+            'utcOffset': data.get('utcOffset'),
+            'confirmedExpiryDateTime': data.get('confirmedExpiryDateTime'),
+        }
+
+        customer, is_new_customer, missing_fields = merge_upsert(
+            'ecosuite_crm_customers',
+            customer_id,
+            patch,
+            insert_data,
+            required_fields=['brandId', 'outletId', 'fullName'],
+            supabase=supabase,
+        )
+
+        if missing_fields:
+            return Response({
+                "error": f"Missing required fields: {', '.join(missing_fields)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not customer:
+            return Response({"error": "Failed to save CRM customer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if is_new_customer:
+            return Response({
+                "message": "CRM customer created successfully",
+                "customer": customer
+            }, status=status.HTTP_201_CREATED)
+        return Response({
+            "message": "CRM customer updated successfully",
+            "customer": customer
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_reservations(request):
+    """Retrieve reservations with optional filters by brandId, outletId, status, etc.
+
+    Results are ordered by reservationDateTime (latest first) and paginated by cursor.
+    Query parameters:
+    - startDate / endDate: reservationDateTime range (YYYY-MM-DD, inclusive, or ISO datetime)
+    - fields: Comma-separated columns to return (default all)
+    - limit: Page size (default 100, max 500)
+    - cursor: nextCursor from the previous page
+    """
+    supabase = create_supabase_client()
+    try:
+        # Get filter parameters from query string
+        brand_id = request.query_params.get('brandId')
+        outlet_id = request.query_params.get('outletId')
+        reservation_status = request.query_params.get('status')
+        table_id = request.query_params.get('tableId')
+        customer_phone = request.query_params.get('customerPhone')
+        reservation_id = request.query_params.get('id')
+        page_size = parse_page_size(request.query_params.get('limit'))
+        
+        # Build query
+        query = supabase.table('ecosuite_reservations').select(parse_fields(request.query_params.get('fields')))
+        
+        # Apply filters
+        if reservation_id:
+            query = query.eq('id', reservation_id)
+        if brand_id:
+            query = query.eq('brandId', brand_id)
+        if outlet_id:
+            query = query.eq('outletId', outlet_id)
+        if reservation_status:
+            query = query.eq('status', reservation_status)
+        if table_id:
+            query = query.eq('tableId', table_id)
+        if customer_phone:
+            query = query.eq('customerPhoneE164', normalize_phone_e164(customer_phone))
+        query = apply_date_range(query, request.query_params.get('startDate'), request.query_params.get('endDate'))
+        
+        # Execute query
+        reservations, next_cursor = keyset_page(query, request.query_params.get('cursor'), page_size)
+
+        return Response({
+            "reservations": reservations,
+            "count": len(reservations),
+            "limit": page_size,
+            "hasMore": next_cursor is not None,
+            "nextCursor": next_cursor,
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_reservations_for_brand_with_reservation_id(request, brand_id, reservation_id):
+    """Get reservations filtered by brandId and reservation id. Returns full JSON or empty list."""
+    supabase = create_supabase_client()
+    try:
+        # Build query with filters for brandId and reservation id
+        query = supabase.table('ecosuite_reservations').select('*')
+        query = query.eq('brandId', brand_id)
+        query = query.eq('id', reservation_id)
+        
+        # Execute query
+        response = query.execute()
+        reservations = response.data or []
+        
+        # Return the full JSON (list of reservations)
+        return Response(reservations, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@query_budget(supabase=1)
+def get_reservations_for_brand(request, brand_id):
+    """Get reservations filtered by brandId. Returns latest data sorted in descending order by reservationDateTime.
+
+    Returns one page as a JSON list; the X-Next-Cursor / Link headers point at the next page.
+    Query parameters:
+    - startDate / endDate: reservationDateTime range (YYYY-MM-DD, inclusive, or ISO datetime)
+    - fields: Comma-separated columns to return (default all)
+    - limit: Page size (default 100, max 500)
+    - cursor: X-Next-Cursor from the previous page
+    """
+    supabase = create_supabase_client()
+    try:
+        page_size = parse_page_size(request.query_params.get('limit'))
+        fields = parse_fields(request.query_params.get('fields'))
+        start_date = request.query_params.get('startDate')
+        end_date = request.query_params.get('endDate')
+
+        # Build query with filter for brandId, sorted by (reservationDateTime, id) in descending order (latest first)
+        def build_query():
+            query = supabase.table('ecosuite_reservations').select(fields)
+            query = query.eq('brandId', brand_id)
+            return apply_date_range(query, start_date, end_date)
+
+        if wants_stream(request):
+            # Every matching reservation as one JSON list, fetched and written page by page
+            return stream_json_list(iter_reservation_pages(build_query), request=request)
+        
+        # Execute query
+        query = build_query()
+        reservations, next_cursor = keyset_page(query, request.query_params.get('cursor'), page_size)
+        
+        # Return the page as JSON (list of reservations); 304 when the page is unchanged.
+        # RPCs update reservations without bumping updatedAt, so the ETag hashes the content.
+        return conditional_response(
+            request,
+            reservations,
+            reservations,
+            by_updated_at=False,
+            headers=next_page_headers(request, next_cursor),
+        )
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@query_budget(supabase=2)
+def get_reservation_changes_for_brand(request, brand_id):
+    """Get reservations created, updated, cancelled or deleted since a watermark, oldest change first.
+
+    Query parameters:
+    - since: watermark from the previous response, or an ISO datetime (omit for a full first sync)
+    - outletId: Only changes for this outlet (optional)
+    - limit: Page size (default 100, max 500)
+
+    Cancelled/expired and deleted reservations are returned as tombstones
+    ({id, brandId, outletId, status, changedAt, tombstone: true}); other rows are returned in full
+    with tombstone: false. Call again with since=watermark until hasMore is false.
+    """
+    supabase = create_supabase_client()
+    try:
+        page_size = parse_page_size(request.query_params.get('limit'))
+        since = parse_since(request.query_params.get('since'))
+        outlet_id = request.query_params.get('outletId')
+
+        reservations_query = supabase.table('ecosuite_reservations').select('*').eq('brandId', brand_id)
+        tombstones_query = supabase.table('ecosuite_reservation_tombstones').select('*').eq('brandId', brand_id)
+        if outlet_id:
+            reservations_query = reservations_query.eq('outletId', outlet_id)
+            tombstones_query = tombstones_query.eq('outletId', outlet_id)
+
+        changes, watermark, has_more = reservation_changes(
+            reservations_query,
+            tombstones_query,
+            since,
+            page_size,
+            settle_seconds=float(os.getenv('ECOSUITE_CHANGE_FEED_SETTLE_SECONDS', '5')),
+        )
+
+        return Response({
+            "changes": changes,
+            "count": len(changes),
+            "watermark": watermark,
+            "hasMore": has_more,
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_reservations_for_brand_with_phone_number(request, brand_id, phone_number):
+    """Get reservations filtered by brandId and customer phone. Returns full JSON or empty list.
+
+    The phone number is matched on its canonical E.164 form, so 0812..., 62812... and +62 812...
+    all find the same reservations. Paginated like get_reservations_for_brand (limit, cursor,
+    startDate, endDate, fields; next page in the X-Next-Cursor / Link headers).
+    """
+    supabase = create_supabase_client()
+    try:
+        page_size = parse_page_size(request.query_params.get('limit'))
+
+        # Build query with filters for brandId and canonical phone (brandId, customerPhoneE164 index)
+        query = supabase.table('ecosuite_reservations').select(parse_fields(request.query_params.get('fields')))
+        query = query.eq('brandId', brand_id)
+        query = query.eq('customerPhoneE164', normalize_phone_e164(phone_number))
+        query = apply_date_range(query, request.query_params.get('startDate'), request.query_params.get('endDate'))
+        
+        # Execute query
+        reservations, next_cursor = keyset_page(query, request.query_params.get('cursor'), page_size)
+        
+        # Return the page as JSON (list of reservations)
+        return Response(reservations, status=status.HTTP_200_OK, headers=next_page_headers(request, next_cursor))
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_crm_customers(request):
+    """Retrieve CRM customers with optional filters by brandId, outletId and phone (matched in E.164 form).
+
+    Query parameters:
+    - stream: true to stream the customers as they are fetched page by page (constant memory)
+    """
+    supabase = create_supabase_client()
+    try:
+        brand_id = request.query_params.get('brandId')
+        outlet_id = request.query_params.get('outletId')
+        phone = request.query_params.get('phone')
+
+        def build_query():
+            query = supabase.table('ecosuite_crm_customers').select('*')
+            if brand_id:
+                query = query.eq('brandId', brand_id)
+            if outlet_id:
+                query = query.eq('outletId', outlet_id)
+            if phone:
+                query = query.eq('phoneE164', normalize_phone_e164(phone))
+            return query
+
+        if wants_stream(request):
+            return stream_json_object('customers', iter_pages_by_id(build_query), count_key='count', request=request)
+
+        response = build_query().execute()
+        customers = response.data or []
+
+        return Response({
+            "customers": customers,
+            "count": len(customers)
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _export_filename(prefix, brand_id, start_date, end_date):
+    parts = [prefix, brand_id, start_date, end_date]
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', '_'.join(p for p in parts if p))
+
+
+def _export_format(request):
+    export_format = (request.query_params.get('exportFormat') or 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"exportFormat must be one of {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_reservations_for_brand(request, brand_id):
+    """Stream a brand's reservations as CSV or NDJSON, latest first.
+
+    Query parameters:
+    - exportFormat: 'csv' (default) or 'ndjson'
+    - startDate / endDate: reservationDateTime range (YYYY-MM-DD, inclusive, or ISO datetime)
+    - outletId: Only export this outlet (optional)
+    - payments: 'rows' (one line per payment, default for csv), 'columns' (payment summary columns)
+      or 'nested' (payments array as-is, default for ndjson; ndjson only)
+    """
+    supabase = create_supabase_client()
+    try:
+        export_format = _export_format(request)
+        payments_layout = request.query_params.get('payments') or ('rows' if export_format == 'csv' else 'nested')
+        if payments_layout not in PAYMENT_LAYOUTS or (export_format == 'csv' and payments_layout == 'nested'):
+            return Response(
+                {"error": "payments must be 'rows' or 'columns' for csv, or 'rows', 'columns' or 'nested' for ndjson"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        outlet_id = request.query_params.get('outletId')
+        start_date = request.query_params.get('startDate')
+        end_date = request.query_params.get('endDate')
+
+        def build_query():
+            query = supabase.table('ecosuite_reservations').select('*').eq('brandId', brand_id)
+            if outlet_id:
+                query = query.eq('outletId', outlet_id)
+            return apply_date_range(query, start_date, end_date)
+
+        return export_response(
+            iter_reservation_pages(build_query),
+            export_format,
+            reservation_export_columns(payments_layout),
+            lambda reservation: reservation_export_rows(reservation, payments_layout),
+            _export_filename('reservations', brand_id, start_date, end_date),
+            request=request,
+        )
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_crm_customers_for_brand(request, brand_id):
+    """Stream a brand's CRM customers as CSV or NDJSON.
+
+    Query parameters:
+    - exportFormat: 'csv' (default) or 'ndjson'
+    - startDate / endDate: createdAt range (YYYY-MM-DD, inclusive, or ISO datetime)
+    - outletId: Only export this outlet (optional)
+    """
+    supabase = create_supabase_client()
+    try:
+        export_format = _export_format(request)
+        outlet_id = request.query_params.get('outletId')
+        start_date = request.query_params.get('startDate')
+        end_date = request.query_params.get('endDate')
+
+        def build_query():
+            query = supabase.table('ecosuite_crm_customers').select('*').eq('brandId', brand_id)
+            if outlet_id:
+                query = query.eq('outletId', outlet_id)
+            return apply_date_range(query, start_date, end_date, column='createdAt')
+
+        return export_response(
+            iter_pages_by_id(build_query),
+            export_format,
+            CRM_CUSTOMER_EXPORT_COLUMNS,
+            crm_customer_export_rows,
+            _export_filename('crm-customers', brand_id, start_date, end_date),
+            request=request,
+        )
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def check_reservation_conflicts(supabase, brand_id, outlet_id, reservation_date_time):
+    """
+    Check if there are any 'on hold' reservations within 2 hours before or after the requested time.
+    
+    Args:
+        supabase: Supabase client instance
+        brand_id: Brand ID to check
+        outlet_id: Outlet ID to check
+        reservation_date_time: ISO format datetime string
+    
+    Returns:
+        True if conflicts exist (should be waitlisted), False if no conflicts (should be pending)
+    """
+    try:
+        from datetime import datetime, timedelta
+        
+        # Parse the requested reservation datetime
+        # Handle various ISO format variations
+        requested_dt = None
+        try:
+            # Try parsing with timezone info
+            if 'Z' in reservation_date_time:
+                requested_dt = datetime.fromisoformat(reservation_date_time.replace('Z', '+00:00'))
+            elif '+' in reservation_date_time or reservation_date_time.count('-') > 2:
+                requested_dt = datetime.fromisoformat(reservation_date_time)
+            else:
+                # No timezone info, treat as naive datetime
+                requested_dt = datetime.fromisoformat(reservation_date_time)
+        except Exception as parse_error:
+            print(f"Error parsing datetime: {parse_error}")
+            return False
+        
+        if not requested_dt:
+            return False
+        
+        # Calculate time range (2 hours before and after)
+        time_before = requested_dt - timedelta(hours=2)
+        time_after = requested_dt + timedelta(hours=2)
+        
+        # Convert back to ISO format for database query
+        time_before_iso = time_before.isoformat()
+        time_after_iso = time_after.isoformat()
+        
+        # Query for active reservations in the time range (exclude pending and cancelled)
+        response = supabase.table('ecosuite_reservations').select('*').eq('brandId', brand_id).eq('outletId', outlet_id).in_('status', ['waitlisted', 'confirmed', 'verified']).gte('reservationDateTime', time_before_iso).lte('reservationDateTime', time_after_iso).execute()
+        
+        # If any on hold reservations exist in this time range, return True (conflict exists)
+        if response.data and len(response.data) > 0:
+            return True
+        
+        return False
+        
+    except Exception as e:
+        print(f"Error checking reservation conflicts: {e}")
+        # If there's an error, default to no conflict (pending)
+        return False
+
+
+def _get_max_pax_from_operating_hours(outlet, reservation_date):
+    """
+    Get maxPax for a specific date from outlet's operating hours.
+    Prioritizes date exceptions over day-based hours.
+    Returns None if no maxPax is configured (date is unavailable).
+    """
+    if not outlet:
+        return None
+    
+    online_hours = outlet.get('onlineOperatingHours', {})
+    if not online_hours:
+        return None
+    
+    # Get date exceptions and day-based hours
+    date_exceptions = online_hours.get('dateExceptions', [])
+    day_based_hours = online_hours.get('dayBasedHours', [])
+    
+    # Format reservation date as YYYY-MM-DD
+    date_str = reservation_date.strftime('%Y-%m-%d')
+    
+    # Check date exceptions first (prioritize over day-based hours)
+    for exception in date_exceptions:
+        if exception.get('date') == date_str:
+            # If date is closed, return None (unavailable)
+            if exception.get('isClosed', False):
+                return None
+            # Return maxPax from date exception
+            max_pax = exception.get('maxPax')
+            if max_pax is not None:
+                return max_pax
+    
+    # If no date exception found, check day-based hours
+    # Get day of week - JavaScript convention: 0 = Sunday, 1 = Monday, ..., 6 = Saturday
+    # Python weekday(): 0 = Monday, 1 = Tuesday, ..., 6 = Sunday
+    # Convert Python weekday to JavaScript day: (weekday + 1) % 7
+    python_weekday = reservation_date.weekday()  # Monday=0, Sunday=6
+    js_day = (python_weekday + 1) % 7  # Sunday=0, Monday=1, ..., Saturday=6
+    
+    for day_hour in day_based_hours:
+        if day_hour.get('day') == js_day:
+            max_pax = day_hour.get('maxPax')
+            if max_pax is not None:
+                return max_pax
+    
+    # No maxPax configured for this date
+    return None
+
+
+def _round_to_nearest_even(number):
+    """Round a number up to the nearest even number."""
+    import math
+    return math.ceil((number + 1) / 2) * 2
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@query_budget(supabase=3)
+def check_reservation_availability(request):
+    """
+    Check reservation availability without creating a reservation.
+    Returns conflict information to help user decide whether to join waitlist or pick another time.
+    
+    New Rules:
+    1. Check isMaxPaxExclusive flag - if true, only count reservations with createdBy == 'website'
+    2. Get maxPax from operating hours (prioritize date exceptions over day-based hours)
+    3. Filter reservations within 2-hour window (status not pending/cancelled)
+    4. Calculate current total pax and round to nearest even number
+    5. Check if (roundedCurrentPax + newGuests) > maxPax
+    
+    Query parameters:
+    - brandId: Brand ID (required)
+    - outletId: Outlet ID (required)
+    - dateTime: Reservation date and time in ISO format (required)
+    - guests: Number of guests (required for capacity checks)
+    - alternatives: Number of alternative windows to suggest before/after the requested time
+      when capacity is exceeded (optional, default 3, max 10)
+    """
+    supabase = create_supabase_client()
+    try:
+        # Get query parameters
+        brand_id = request.query_params.get('brandId')
+        outlet_id = request.query_params.get('outletId')
+        reservation_date_time = request.query_params.get('dateTime')
+        number_of_guests = request.query_params.get('guests')
+        
+        # Validate required fields
+        if not brand_id:
+            return Response({
+                "error": "Brand ID is required",
+                "parameter": "brandId"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not outlet_id:
+            return Response({
+                "error": "Outlet ID is required",
+                "parameter": "outletId"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not reservation_date_time:
+            return Response({
+                "error": "Reservation date and time is required",
+                "parameter": "dateTime"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Validate guests parameter
+        if not number_of_guests:
+            return Response({
+                "error": "Number of guests is required",
+                "parameter": "guests"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            number_of_guests = int(number_of_guests)
+        except (ValueError, TypeError):
+            return Response({
+                "error": "Number of guests must be a valid number",
+                "parameter": "guests"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Normalize the dateTime format
+        if reservation_date_time:
+            # Replace space before timezone offset with +
+            reservation_date_time = re.sub(r'(\d{2}:\d{2}:\d{2})\s+(\d{2}:\d{2})$', r'\1+\2', reservation_date_time)
+            
+            # Validate datetime format
+            iso_pattern = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})?$'
+            if not re.match(iso_pattern, reservation_date_time):
+                return Response({
+                    "error": "Invalid date/time format. Please use ISO 8601 format (e.g., 2025-11-18T18:00:00+07:00 or 2025-11-18T18:00:00Z)",
+                    "parameter": "dateTime",
+                    "received_value": reservation_date_time
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Get brand data to access outlet's operating hours
+        brand_rows = get_brand_rows(supabase, brand_id)
+        if not brand_rows:
+            return Response({
+                "error": "Brand not found",
+                "parameter": "brandId"
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        brand = brand_rows[0]
+        outlets = brand.get('outlets', [])
+        outlet = None
+        for out in outlets:
+            if out.get('id') == outlet_id:
+                outlet = out
+                break
+        
+        if not outlet:
+            return Response({
+                "error": "Outlet not found",
+                "parameter": "outletId"
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        # Parse reservation datetime
+        try:
+            dt = datetime.fromisoformat(reservation_date_time.replace('Z', '+00:00'))
+            reservation_date = dt.date()
+            time_before = dt - timedelta(hours=2)
+            time_after = dt + timedelta(hours=2)
+        except Exception as e:
+            return Response({
+                "error": "Invalid date/time format",
+                "message": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Get maxPax from operating hours
+        max_pax = _get_max_pax_from_operating_hours(outlet, reservation_date)
+        if max_pax is None:
+            return Response({
+                "available": False,
+                "hasConflicts": True,
+                "hasCapacityConflict": True,
+                "conflictReason": ["no_max_pax_configured"],
+                "message": "This date is unavailable. No maximum capacity is configured for this date.",
+                "requestedDateTime": reservation_date_time,
+                "requestedGuests": number_of_guests,
+                "maxPax": None
+            }, status=status.HTTP_200_OK)
+        
+        # Get isMaxPaxExclusive flag
+        online_hours = outlet.get('onlineOperatingHours', {})
+        is_max_pax_exclusive = online_hours.get('isMaxPaxExclusive', False)
+        
+        # Fetch existing reservations in the 2-hour window
+        # Filter: match outlet, status not pending/cancelled, within time window
+        query = supabase.table('ecosuite_reservations').select('*').eq('brandId', brand_id).eq('outletId', outlet_id).not_.in_('status', ['pending', 'cancelled']).gte('reservationDateTime', time_before.isoformat()).lte('reservationDateTime', time_after.isoformat())
+        
+        # If exclusive, only count reservations with createdBy == 'website'
+        if is_max_pax_exclusive:
+            query = query.eq('createdBy', 'website')
+        
+        reservations_key = ('availability-reservations', brand_id, outlet_id, time_before.isoformat(), time_after.isoformat(), is_max_pax_exclusive)
+        conflicting_reservations = availability_reads.do(reservations_key, lambda: query.execute().data or [])
+        
+        # Calculate current total pax from filtered reservations
+        total_existing_pax = 0
+        for reservation in conflicting_reservations:
+            guests = reservation.get('numberOfGuests', 0)
+            try:
+                guests_int = int(guests) if guests else 0
+                total_existing_pax += guests_int
+            except (ValueError, TypeError):
+                pass
+        
+        # Round current total pax to nearest even number
+        rounded_current_pax = _round_to_nearest_even(total_existing_pax)
+        
+        # Check capacity with new reservation
+        total_with_new = rounded_current_pax + number_of_guests
+        has_capacity_conflict = total_with_new > max_pax
+        
+        # Build response
+        conflict_reason = []
+        if has_capacity_conflict:
+            conflict_reason.append("capacity_exceeded")
+        
+        alternative_slots = None
+        if has_capacity_conflict:
+            # Suggest nearby windows from capacity slots (stored in UTC, naive input is Jakarta time)
+            requested_dt = dt if dt.tzinfo else timezone.make_aware(dt, timezone.get_fixed_timezone(7 * 60))
+            alternative_slots = _suggest_alternative_slots(
+                supabase,
+                brand_id,
+                outlet_id,
+                floor_to_slot(requested_dt.astimezone(timezone.utc)),
+                round_up_even(number_of_guests),
+                count=_parse_alternative_count(request.query_params.get('alternatives')),
+            )
+        
+        if has_capacity_conflict:
+            message = f"Capacity limit reached. Current: {rounded_current_pax} pax (rounded from {total_existing_pax} pax), max: {max_pax} pax. Your request for {number_of_guests} pax would result in {total_with_new} pax, exceeding the limit. You can join the waitlist."
+        else:
+            message = "Reservations available for this time slot"
+        
+        return Response({
+            "available": not has_capacity_conflict,
+            "hasConflicts": has_capacity_conflict,
+            "hasTimeConflicts": False,  # Time conflicts are now part of capacity check
+            "hasCapacityConflict": has_capacity_conflict,
+            "conflictReason": conflict_reason,
+            "requestedDateTime": reservation_date_time,
+            "requestedGuests": number_of_guests,
+            "totalExistingPax": total_existing_pax,
+            "roundedCurrentPax": rounded_current_pax,
+            "totalWithNew": total_with_new,
+            "maxPax": max_pax,
+            "isMaxPaxExclusive": is_max_pax_exclusive,
+            "conflictingReservations": len(conflicting_reservations),
+            "message": message,
+            "recommendedStatus": "waitlisted" if has_capacity_conflict else "pending",
+            "suggestedAction": None if not has_capacity_conflict else "join_waitlist_or_choose_another_time",
+            "alternativeSlots": alternative_slots
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        return Response({
+            "error": str(e),
+            "error_type": type(e).__name__
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def request_reservation(request):
+    """
+    Create a reservation request via query parameters.
+    Accessible from anywhere (website, Instagram, etc.) without authentication.
+    
+    The flow now requires checking availability first, then user decides on action.
+    
+    Query parameters:
+    - name: Customer name (required)
+    - phone: International phone number (required) - automatically normalized
+    - guests: Number of guests (required)
+    - dateTime: Reservation date and time in ISO format (required) - automatically normalized
+    - notes: Additional notes (optional)
+    - brandId: Brand ID (required)
+    - outletId: Outlet ID (required)
+    - joinWaitlist: "true" or "false" (required if conflicts exist)
+    """
+    supabase = create_supabase_client()
+    try:
+        # Get query parameters
+        customer_name = request.query_params.get('name')
+        customer_phone = request.query_params.get('phone')
+        number_of_guests = request.query_params.get('guests')
+        reservation_date_time = request.query_params.get('dateTime')
+        notes = request.query_params.get('notes', '')
+        brand_id = request.query_params.get('brandId')
+        outlet_id = request.query_params.get('outletId')
+        created_by = request.query_params.get('createdBy', 'website')
+        updated_by = request.query_params.get('updatedBy', 'website')
+        reservation_payments = request.query_params.get('payments', [])
+        
+        # Validate required fields
+        if not customer_name:
+            return Response({
+                "error": "Customer name is required",
+                "parameter": "name"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not customer_phone:
+            return Response({
+                "error": "Customer phone is required",
+                "parameter": "phone"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Normalize phone number - handle case where + becomes a space after URL decoding
+        if customer_phone:
+            customer_phone = customer_phone.strip()
+            # If phone starts with a space followed by digits, it's likely a + that got decoded
+            if customer_phone.startswith(' ') and len(customer_phone) > 1 and customer_phone[1].isdigit():
+                customer_phone = '+' + customer_phone[1:]
+            # Also handle case where there's no + at all (add it if it starts with digits)
+            elif customer_phone and customer_phone[0].isdigit():
+                # If it starts with country code like 62, 1, 44, etc., add +
+                customer_phone = '+' + customer_phone
+        
+        if not number_of_guests:
+            return Response({
+                "error": "Number of guests is required",
+                "parameter": "guests"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not reservation_date_time:
+            return Response({
+                "error": "Reservation date and time is required",
+                "parameter": "dateTime"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not brand_id:
+            return Response({
+                "error": "Brand ID is required",
+                "parameter": "brandId"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not outlet_id:
+            return Response({
+                "error": "Outlet ID is required",
+                "parameter": "outletId"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Convert number of guests to integer
+        try:
+            number_of_guests = int(number_of_guests)
+        except ValueError:
+            return Response({
+                "error": "Number of guests must be a valid number",
+                "parameter": "guests"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Normalize the dateTime format
+        # Handle case where + in timezone becomes a space after URL decoding
+        if reservation_date_time:
+            # Replace space before timezone offset with +
+            # This handles "2025-11-18T18:00:00 07:00" -> "2025-11-18T18:00:00+07:00"
+            reservation_date_time = re.sub(r'(\d{2}:\d{2}:\d{2})\s+(\d{2}:\d{2})$', r'\1+\2', reservation_date_time)
+            
+            # Basic validation - check if it looks like an ISO datetime
+            # Accept formats like: 2025-11-18T18:00:00Z, 2025-11-18T18:00:00+07:00, 2025-11-18T18:00:00.000Z
+            iso_pattern = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})?$'
+            if not re.match(iso_pattern, reservation_date_time):
+                return Response({
+                    "error": "Invalid date/time format. Please use ISO 8601 format (e.g., 2025-11-18T18:00:00+07:00 or 2025-11-18T18:00:00Z)",
+                    "parameter": "dateTime",
+                    "received_value": reservation_date_time
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Generate reservation ID
+        reservation_id = str(uuid.uuid4())
+        now = timezone.now().isoformat()
+        
+        # Check for conflicting reservations
+        has_conflicts = check_reservation_conflicts(supabase, brand_id, outlet_id, reservation_date_time)
+        
+        # Get joinWaitlist parameter
+        join_waitlist_param = request.query_params.get('joinWaitlist', '').lower()
+        
+        # Determine status based on conflicts and user choice
+        if has_conflicts:
+            # If conflicts exist, user must explicitly choose to join waitlist or not
+            if join_waitlist_param == '':
+                # No choice provided, ask user to decide
+                return Response({
+                    "error": "Conflict detected",
+                    "message": "There are existing reservations within 2 hours of your requested time. Please choose an action.",
+                    "hasConflicts": True,
+                    "requestedDateTime": reservation_date_time,
+                    "actions": {
+                        "joinWaitlist": "Add '&joinWaitlist=true' to join the waitlist",
+                        "chooseAnotherTime": "Add '&joinWaitlist=false' or select a different time"
+                    },
+                    "suggestedAction": "Please use the check-reservation-availability endpoint first to see availability"
+                }, status=status.HTTP_409_CONFLICT)
+            elif join_waitlist_param == 'true':
+                # User chose to join waitlist
+                reservation_status = 'waitlisted'
+            elif join_waitlist_param == 'false':
+                # User chose not to join waitlist
+                return Response({
+                    "error": "Reservation not created",
+                    "message": "You chose not to join the waitlist. Please select a different time for your reservation.",
+                    "hasConflicts": True,
+                    "requestedDateTime": reservation_date_time,
+                    "suggestion": "Use the check-reservation-availability endpoint to find available times"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                return Response({
+                    "error": "Invalid joinWaitlist parameter",
+                    "message": "joinWaitlist must be 'true' or 'false'",
+                    "received_value": join_waitlist_param
+                }, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            # No conflicts, create with pending status
+            reservation_status = 'pending'
+        
+        # Create reservation data
+        reservation_data = {
+            'id': reservation_id,
+            'brandId': brand_id,
+            'outletId': outlet_id,
+            'customerName': customer_name,
+            'customerPhone': customer_phone,
+            'numberOfGuests': number_of_guests,
+            'reservationDateTime': reservation_date_time,
+            'status': reservation_status,
+            'notes': notes,
+            'createdAt': now,
+            'updatedAt': now,
+            'payments': reservation_payments,
+            'tableId': None,
+            'checkedInAt': None,
+            'checkedInBy': None,
+            'checkedOutAt': None,
+            'checkedOutBy': None,
+            'createdBy': created_by,
+            'updatedBy': updated_by,
+        }
+        
+        # Insert reservation into Supabase
+        response = supabase.table('ecosuite_reservations').insert(reservation_data).execute()
+        
+        if response.data:
+            return Response({
+                "message": "Reservation request created successfully",
+                "reservation": response.data[0]
+            }, status=status.HTTP_201_CREATED)
+        else:
+            return Response({
+                "error": "Failed to create reservation request"
+            }, status=status.HTTP_400_BAD_REQUEST)
+            
+    except Exception as e:
+        return Response({
+            "error": str(e),
+            "error_type": type(e).__name__
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+@query_budget(supabase=2, rpc=1, upstream=2)
+def confirm_reservation(request, reservation_id):
+    """
+    Confirmation endpoint for customers to confirm or cancel their reservation.
+    Accessible via link sent through email or messaging service.
+    
+    GET: Display confirmation UI
+    POST or GET with action parameter: Process confirmation/cancellation
+    
+    Query parameters:
+    - action: "confirm" or "cancel" (optional, triggers action)
+    """
+    supabase = create_supabase_client()
+    
+    try:
+        # Get the reservation
+        response = supabase.table('ecosuite_reservations').select('*').eq('id', reservation_id).execute()
+        
+        if not response.data or len(response.data) == 0:
+            return render(request, 'ecosuite/reservation_error.html', {
+                'error_title': 'Reservation not found',
+                'error_message': "The reservation you're looking for doesn't exist."
+            })
+        
+        reservation = response.data[0]
+        
+        # Format datetime for display
+        formatted_datetime = format_reservation_datetime(reservation.get('reservationDateTime', 'N/A'))
+        
+        # Check if action is provided (either as query param or POST data)
+        action = None
+        if request.method == 'POST':
+            action = request.data.get('action') or request.POST.get('action')
+        elif request.method == 'GET':
+            action = request.query_params.get('action')
+        
+        # If action is provided, process it
+        if action:
+            if action.lower() == 'confirm':
+                # Use RPC to reconfirm reservation (validates and changes status from 'confirmed' to 'verified')
+                try:
+                    rpc_data = call_rpc("reconfirm_reservation", {
+                        "p_reservation_id": reservation_id
+                    }, supabase)
+                    
+                    if rpc_data and rpc_data.get('ok'):
+                        # RPC succeeded - fetch updated reservation
+                        updated_response = supabase.table('ecosuite_reservations').select('*').eq('id', reservation_id).execute()
+                        if updated_response.data:
+                            updated_reservation = updated_response.data[0]
+                            formatted_datetime_updated = format_reservation_datetime(updated_reservation.get('reservationDateTime', 'N/A'))
+                            return render(request, 'ecosuite/reservation_success.html', {
+                                'reservation': updated_reservation,
+                                'formatted_datetime': formatted_datetime_updated,
+                                'action': 'confirmed'
+                            })
+                        else:
+                            return render(request, 'ecosuite/reservation_error.html', {
+                                'error_title': 'Update Failed',
+                                'error_message': 'Reservation was updated but could not be retrieved.'
+                            })
+                    else:
+                        # RPC returned error
+                        rpc_status = rpc_data.get('status', 'UNKNOWN_ERROR') if rpc_data else 'RPC_ERROR'
+                        error_messages = {
+                            'INVALID_RESERVATION_ID': 'Invalid reservation ID.',
+                            'RESERVATION_NOT_FOUND': 'Reservation not found.',
+                            'INVALID_STATUS': f"Reservation status must be 'confirmed'. Current status: {rpc_data.get('currentStatus', 'unknown')}",
+                            'MISSING_RESERVATION_DATETIME': 'Reservation date/time is missing.',
+                            'TOO_EARLY_TO_RECONFIRM': 'Reservation can only be reconfirmed within 2 days of the reservation date.',
+                            'RESERVATION_DATE_PASSED': 'The reservation date has already passed.'
+                        }
+                        error_message = error_messages.get(rpc_status, f'Failed to confirm reservation: {rpc_status}')
+                        return render(request, 'ecosuite/reservation_error.html', {
+                            'error_title': 'Confirmation Failed',
+                            'error_message': error_message
+                        })
+                except Exception as rpc_error:
+                    return render(request, 'ecosuite/reservation_error.html', {
+                        'error_title': 'Update Failed',
+                        'error_message': f'Failed to confirm the reservation: {str(rpc_error)}'
+                    })
+                    
+            elif action.lower() == 'cancel':
+                # Update reservation status to cancelled and send WhatsApp message
+                try:
+                    # First, update reservation status to cancelled
+                    update_data = {
+                        'status': 'cancelled',
+                        'updatedAt': timezone.now().isoformat()
+                    }
+                    update_response = supabase.table('ecosuite_reservations').update(update_data).eq('id', reservation_id).execute()
+                    
+                    if not update_response.data:
+                        return render(request, 'ecosuite/reservation_error.html', {
+                            'error_title': 'Update Failed',
+                            'error_message': 'Failed to cancel the reservation. Please try again.'
+                        })
+                    
+                    updated_reservation = update_response.data[0]
+                    formatted_datetime_updated = format_reservation_datetime(updated_reservation.get('reservationDateTime', 'N/A'))
+                    
+                    # Send WhatsApp cancellation message
+                    try:
+                        token = _login_to_koala()
+                        if token:
+                            # Send cancel notification using the same function as scheduled cancellations
+                            broadcast_result = _send_cancel_broadcast(token, [updated_reservation], campaign_name='026', template_id='026')
+                            # Note: We don't fail the cancellation if WhatsApp fails, but we log it
+                            if not broadcast_result or not broadcast_result.get("success", False):
+                                # WhatsApp message failed, but cancellation succeeded
+                                pass
+                    except Exception as whatsapp_error:
+                        # WhatsApp message failed, but cancellation succeeded - continue to show success
+                        pass
+                    
+                    return render(request, 'ecosuite/reservation_success.html', {
+                        'reservation': updated_reservation,
+                        'formatted_datetime': formatted_datetime_updated,
+                        'action': 'cancelled'
+                    })
+                except Exception as cancel_error:
+                    return render(request, 'ecosuite/reservation_error.html', {
+                        'error_title': 'Update Failed',
+                        'error_message': f'Failed to cancel the reservation: {str(cancel_error)}'
+                    })
+            else:
+                return render(request, 'ecosuite/reservation_error.html', {
+                    'error_title': 'Invalid Action',
+                    'error_message': "The action must be either 'confirm' or 'cancel'."
+                })
+        
+        # No action provided, mark reservation as verified, then show the confirmation UI
+        try:
+            verify_update = {
+                'status': 'verified',
+                'updatedAt': timezone.now().isoformat(),
+                'waitlistedAt': None,
+                'confirmedExpiryDateTime': None
+            }
+            verify_response = supabase.table('ecosuite_reservations').update(verify_update).eq('id', reservation_id).execute()
+
+            if verify_response.data and len(verify_response.data) > 0:
+                # Use the updated reservation data if available
+                reservation = verify_response.data[0]
+                formatted_datetime = format_reservation_datetime(reservation.get('reservationDateTime', 'N/A'))
+
+            # After successful verification, trigger Koala broadcast if templateId is provided
+                try:
+
+                    trial_login_url = 'https://taratechapi.fly.dev/api/koalaplus/trial-login/'
+                    trial_resp = requests.get(trial_login_url, timeout=5)
+                    trial_data = trial_resp.json() if trial_resp.ok else {}
+                    koala_token = (
+                        trial_data.get('data', {})
+                        .get('koalaToken', {})
+                        .get('accessToken')
+                    )
+
+                    if koala_token:
+                        # Prepare notification payload for Koala
+                        customer_phone = reservation.get('customerPhone')
+                        customer_name = reservation.get('customerName') or reservation.get('customer_name')
+                        param_data = [
+                            # customer_name or '',
+                            # formatted_datetime
+                        ]
+
+                        koala_payload = {
+                            'token': koala_token,
+                            'campaignName': '007',
+                            'templateId': '007',
+                            'notificationData': [
+                                {
+                                    'phoneNumber': customer_phone,
+                                    'paramData': param_data,
+                                }
+                            ],
+                        }
+
+                        # Fire-and-forget call to internal Koala broadcast endpoint
+                        koala_broadcast_url = 'https://taratechapi.fly.dev/api/koalaplus/broadcast-reservation-success/'
+                        try:
+                            requests.post(
+                                koala_broadcast_url,
+                                json=koala_payload,
+                                timeout=5,
+                            )
+                        except Exception:
+                            # Do not block or error the confirmation flow if broadcast fails
+                            pass
+                except Exception:
+                    # Swallow any Koala integration errors to keep confirmation flow robust
+                    pass
+        except Exception:
+            # If verification update fails, continue to show the UI with original data
+            pass
+
+        return render(request, 'ecosuite/confirm_reservation.html', {
+            'reservation': reservation,
+            'formatted_datetime': formatted_datetime
+        })
+        
+    except Exception as e:
+        return render(request, 'ecosuite/reservation_error.html', {
+            'error_title': 'Error',
+            'error_message': str(e)
+        })
+
+
+def format_reservation_datetime(reservation_datetime):
+    """Format reservation datetime for display."""
+    try:
+        # Parse and format datetime nicely
+        dt = datetime.fromisoformat(reservation_datetime.replace('Z', '+00:00'))
+        return dt.strftime('%A, %B %d, %Y at %I:%M %p')
+    except:
+        return reservation_datetime
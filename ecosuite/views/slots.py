@@ -0,0 +1,1044 @@
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from taratechapi.metrics import query_budget
+
+from ..backends import call_rpc
+from ..capacity import DINING_WINDOW_SLOTS, SLOT_STEP, columnar_slots, nearest_fitting_windows
+from ..renderers import ColumnarJSONRenderer
+from .common import availability_reads, create_supabase_client
+
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = 30
+DAYS_AHEAD = 1825
+
+
+@api_view(["GET", "POST"])
+@permission_classes([AllowAny])
+def rebuild_capacity_slots(request):
+    """Rebuild capacity slots by calling the RPC function.
+    
+    This function replaces both generate_capacity_slots and audit_capacity_slots.
+    It generates all 30-min slots (24h) and sets maxPax/maxWaitlistedPax based on operating hours.
+    It also recomputes usedPax/waitlistedPax from reservations.
+    
+    Expected fields in request body:
+    - brandId: The brand identifier (required)
+    - outletId: The outlet identifier (required)
+    - startDate: Start date in YYYY-MM-DD format (optional, defaults to today)
+    - endDate: End date in YYYY-MM-DD format (optional, defaults to 5 years ahead)
+    - channel: Channel type - 'online', 'offline', or 'both' (optional, defaults to 'both')
+    - slotMinutes: Slot duration in minutes (optional, defaults to 30, must be 30)
+    - diningSlots: Number of dining slots (optional, defaults to 5, must be 5)
+    - fallbackMaxPax: Fallback max pax when JSON doesn't provide (optional, defaults to 16)
+    - fallbackMaxWait: Fallback max waitlist pax when JSON doesn't provide (optional, defaults to 10)
+    
+    Note: The RPC resolves maxPax/maxWaitlistedPax from operating hours with priority:
+    1. dateExceptions (if date matches and time is within openTime/closeTime)
+    2. dayBasedHours (if day matches and time is within openTime/closeTime)
+    3. fallbackMaxPax/fallbackMaxWait (if JSON doesn't provide maxPax/maxWaitlistedPax)
+    4. 0 (if outside operating hours or closed)
+    Slots outside operating hours have maxPax=0 and maxWaitlistedPax=0.
+    """
+    import traceback
+    
+    try:
+        # Parse request data
+        if request.method == 'GET':
+            data = request.query_params.dict()
+        else:
+            data = request.data
+            # Handle QueryDict with _content field
+            if hasattr(data, 'get') and data.get('_content'):
+                content_value = data.get('_content')
+                if isinstance(content_value, list) and len(content_value) > 0:
+                    content_str = content_value[0]
+                elif isinstance(content_value, str):
+                    content_str = content_value
+                else:
+                    content_str = str(content_value)
+                data = json.loads(content_str)
+            elif hasattr(data, 'dict'):
+                data = data.dict()
+            elif hasattr(data, 'get') and not isinstance(data, dict):
+                data = dict(data)
+        
+        if not isinstance(data, dict):
+            return Response(
+                {"error": "Invalid request format", "message": "Request body must be valid JSON"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Extract required fields
+        brand_id = data.get("brandId")
+        outlet_id = data.get("outletId")
+        
+        if not brand_id:
+            return Response(
+                {"error": "Missing required field: brandId"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not outlet_id:
+            return Response(
+                {"error": "Missing required field: outletId"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Extract optional fields with defaults
+        today = timezone.now().date()
+        start_date_str = data.get("startDate", today.isoformat())
+        end_date_str = data.get("endDate", (today + timedelta(days=DAYS_AHEAD)).isoformat())
+        channel = data.get("channel", "both")
+        slot_minutes = int(data.get("slotMinutes", 30))
+        dining_slots = int(data.get("diningSlots", 5))
+        fallback_max_pax = int(data.get("fallbackMaxPax", 16))  # Fallback when JSON doesn't provide maxPax
+        fallback_max_wait = int(data.get("fallbackMaxWait", 10))  # Fallback when JSON doesn't provide maxWaitlistedPax
+        
+        # Parse dates
+        try:
+            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+        except ValueError as e:
+            return Response(
+                {"error": "Invalid date format", "message": "Dates must be in YYYY-MM-DD format", "details": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Validate channel
+        if channel not in ['online', 'offline', 'both']:
+            return Response(
+                {"error": "Invalid channel", "message": "Channel must be 'online', 'offline', or 'both'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Create Supabase client
+        supabase = create_supabase_client()
+        
+        # Call RPC function
+        rpc_payload = {
+            "p_brand_id": brand_id,
+            "p_outlet_id": outlet_id,
+            "p_start_date": start_date.isoformat(),
+            "p_end_date": end_date.isoformat(),
+            "p_channel": channel,
+            "p_slot_minutes": slot_minutes,
+            "p_dining_slots": dining_slots,
+            "p_fallback_max_pax": fallback_max_pax,
+            "p_fallback_max_wait": fallback_max_wait,
+        }
+        
+        data = call_rpc("rebuild_capacity_slots", rpc_payload, supabase)
+        
+        if data is None:
+            return Response(
+                {
+                    "error": "RPC call returned no data",
+                    "message": "The rebuild_capacity_slots RPC call did not return any data"
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        
+        # Return RPC result
+        return Response(data, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        error_str = str(e)
+        import traceback
+        error_details = {
+            "error": error_str,
+            "error_type": type(e).__name__
+        }
+        
+        # Handle known RPC errors
+        if "INVALID_BRAND_ID" in error_str:
+            return Response(
+                {
+                    "error": "INVALID_BRAND_ID",
+                    "message": "Invalid or missing brand ID"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if "INVALID_OUTLET_ID" in error_str:
+            return Response(
+                {
+                    "error": "INVALID_OUTLET_ID",
+                    "message": "Invalid or missing outlet ID"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if "INVALID_DATE_RANGE" in error_str:
+            return Response(
+                {
+                    "error": "INVALID_DATE_RANGE",
+                    "message": "Invalid date range. End date must be after start date."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if "INVALID_CHANNEL" in error_str:
+            return Response(
+                {
+                    "error": "INVALID_CHANNEL",
+                    "message": "Channel must be 'online', 'offline', or 'both'"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if "ONLY_30_MIN_SUPPORTED" in error_str:
+            return Response(
+                {
+                    "error": "ONLY_30_MIN_SUPPORTED",
+                    "message": "Only 30-minute slots are currently supported"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if "ONLY_2_HOURS_5_SLOTS_SUPPORTED" in error_str:
+            return Response(
+                {
+                    "error": "ONLY_2_HOURS_5_SLOTS_SUPPORTED",
+                    "message": "Only 2-hour dining windows (5 slots) are currently supported"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if "OUTLET_NOT_FOUND" in error_str:
+            return Response(
+                {
+                    "error": "OUTLET_NOT_FOUND",
+                    "message": "Outlet not found in the specified brand"
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        
+        if os.getenv('DEBUG', 'False').lower() == 'true':
+            error_details["traceback"] = traceback.format_exc()
+        
+        return Response(
+            error_details,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+def round_up_even(n: int) -> int:
+    return n if n % 2 == 0 else n + 1
+
+
+def floor_to_slot(dt):
+    minute = (dt.minute // 30) * 30
+    return dt.replace(minute=minute, second=0, microsecond=0)
+
+
+ALTERNATIVE_SLOTS_DEFAULT = 3
+ALTERNATIVE_SLOTS_MAX = 10
+ALTERNATIVE_SEARCH_HOURS = 6
+
+
+def _parse_alternative_count(value):
+    try:
+        count = int(value) if value is not None else ALTERNATIVE_SLOTS_DEFAULT
+    except (ValueError, TypeError):
+        count = ALTERNATIVE_SLOTS_DEFAULT
+    return max(0, min(count, ALTERNATIVE_SLOTS_MAX))
+
+
+def _suggest_alternative_slots(supabase, brand_id, outlet_id, requested_slot_utc, pax, count=ALTERNATIVE_SLOTS_DEFAULT):
+    """
+    Suggest the nearest dining windows (before and after requested_slot_utc) that can seat pax.
+
+    Uses a single ranged fetch of ecosuite_capacity_slot around the requested time.
+    Returns None if the lookup fails so the caller can still return its rejection.
+    """
+    if count <= 0:
+        return None
+
+    try:
+        range_start = requested_slot_utc - timedelta(hours=ALTERNATIVE_SEARCH_HOURS)
+        range_end = requested_slot_utc + timedelta(hours=ALTERNATIVE_SEARCH_HOURS) + SLOT_STEP * (DINING_WINDOW_SLOTS - 1)
+
+        slots_response = supabase.table('ecosuite_capacity_slot').select(
+            'slotStart, maxPax, usedPax'
+        ).eq('brandId', brand_id).eq('outletId', outlet_id).eq('channel', 'both').gte(
+            'slotStart', range_start.isoformat()
+        ).lte('slotStart', range_end.isoformat()).order('slotStart', desc=False).execute()
+
+        return nearest_fitting_windows(
+            slots_response.data or [],
+            pax,
+            requested_slot_utc,
+            count=count,
+            not_before=floor_to_slot(timezone.now()),
+        )
+    except Exception as e:
+        logger.warning(f"Alternative slot lookup failed: {e}")
+        return None
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@query_budget(supabase=3, rpc=2)
+def commit_reservation(request):
+    """
+    Atomic reservation commit endpoint.
+    Expected fields in request body:
+    - brandId: Brand identifier (required)
+    - outletId: The outlet identifier (required)
+    - reservationDateTime: ISO format datetime string (required)
+    - numberOfGuests: Number of guests (will be rounded up to even number) (required)
+    - idempotencyKey: Unique key for idempotency (required)
+    - channel: 'both'
+    - customerName: Customer name (optional)
+    - customerPhone: Customer phone number (optional)
+    - notes: Reservation notes (optional)
+    - joinWaitlist: Boolean flag for waitlist (optional)
+    - alternatives: Number of alternative windows to suggest before/after the requested time
+      when the request is rejected with CAPACITY_EXCEEDED or WAITLIST_FULL (optional, default 3, max 10)
+    """
+    alternative_context = None
+    try:
+        # Handle case where JSON is in _content field (QueryDict format)
+        # This can happen if the request Content-Type isn't properly set
+        data = request.data
+        
+        # Check if data is a QueryDict with _content field containing JSON
+        if hasattr(data, 'get') and data.get('_content'):
+            import json
+            try:
+                content_value = data.get('_content')
+                # Handle both list and string formats
+                if isinstance(content_value, list) and len(content_value) > 0:
+                    content_str = content_value[0]
+                elif isinstance(content_value, str):
+                    content_str = content_value
+                else:
+                    content_str = str(content_value)
+                
+                # Parse JSON from _content field
+                data = json.loads(content_str)
+            except (json.JSONDecodeError, TypeError, AttributeError, ValueError) as e:
+                # If parsing fails, return error
+                return Response(
+                    {
+                        "error": "Failed to parse request body as JSON",
+                        "message": str(e),
+                        "received_content": str(data.get('_content', ''))[:200]  # First 200 chars
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        
+        # If data is still a QueryDict, try to convert it to a dict
+        elif hasattr(data, 'dict'):
+            data = data.dict()
+        elif hasattr(data, 'get') and not isinstance(data, dict):
+            # Convert QueryDict to regular dict (this might not work for nested data)
+            try:
+                data = dict(data)
+            except (TypeError, ValueError):
+                # If conversion fails, data might already be in correct format
+                pass
+
+        # Validate required fields
+        brand_id = data.get("brandId")
+        outlet_id = data.get("outletId")
+        reservation_date_time_str = data.get("reservationDateTime")
+        number_of_guests = data.get("numberOfGuests")
+        idempotency_key = data.get("idempotencyKey")
+        
+        if not brand_id:
+            return Response(
+                {"error": "Missing required field: brandId"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if not outlet_id:
+            return Response(
+                {"error": "Missing required field: outletId"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if not reservation_date_time_str:
+            return Response(
+                {"error": "Missing required field: reservationDateTime"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if number_of_guests is None:
+            return Response(
+                {"error": "Missing required field: numberOfGuests"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if not idempotency_key:
+            return Response(
+                {"error": "Missing required field: idempotencyKey"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Parse and validate datetime
+        # reservationDateTime is always in UTC+7 format (Asia/Jakarta)
+        try:
+            jakarta_tz = timezone.get_fixed_timezone(7 * 60)  # UTC+7
+            
+            # Parse the datetime string
+            if '+' in reservation_date_time_str:
+                # Has timezone offset - parse it
+                dt = datetime.fromisoformat(reservation_date_time_str)
+                # If it's already UTC+7, keep it; otherwise convert to UTC+7
+                if dt.tzinfo:
+                    offset_seconds = dt.utcoffset().total_seconds() if dt.utcoffset() else 0
+                    if offset_seconds == 25200:  # UTC+7 (7 * 60 * 60)
+                        reservation_time = dt
+                    else:
+                        # Convert to UTC+7
+                        reservation_time = dt.astimezone(jakarta_tz)
+                else:
+                    reservation_time = timezone.make_aware(dt, jakarta_tz)
+            elif 'Z' in reservation_date_time_str:
+                # Z means UTC, convert to UTC+7
+                dt = datetime.fromisoformat(reservation_date_time_str.replace('Z', '+00:00'))
+                reservation_time = dt.astimezone(jakarta_tz)
+            else:
+                # No timezone info - assume it's already in UTC+7 (naive datetime)
+                dt = datetime.fromisoformat(reservation_date_time_str)
+                reservation_time = timezone.make_aware(dt, jakarta_tz)
+        except (ValueError, TypeError) as e:
+            return Response(
+                {
+                    "error": "Invalid reservationDateTime format",
+                    "message": str(e),
+                    "received": reservation_date_time_str
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "error": "Failed to parse reservationDateTime",
+                    "message": str(e),
+                    "received": reservation_date_time_str,
+                    "error_type": type(e).__name__
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate and process number of guests
+        try:
+            pax = round_up_even(int(number_of_guests))
+            if pax <= 0:
+                return Response(
+                    {"error": "numberOfGuests must be greater than 0"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        except (ValueError, TypeError):
+            return Response(
+                {"error": "numberOfGuests must be a valid number"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        channel = data.get("channel", "both")  # online / offline
+        if channel not in ["online", "offline", "both"]:
+            return Response(
+                {"error": "channel must be 'online' or 'offline' or 'both'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Optional fields
+        customer_name = data.get("customerName")
+        customer_phone = data.get("customerPhone")
+        notes = data.get("notes")
+        join_waitlist = data.get("joinWaitlist", False)
+
+        # Validate reservation date is not in the past (using Asia/Jakarta timezone)
+        # reservation_time is already in UTC+7 (Jakarta timezone)
+        jakarta_tz = timezone.get_fixed_timezone(7 * 60)  # UTC+7
+        now_jakarta = timezone.now().astimezone(jakarta_tz)
+        today_jakarta = now_jakarta.date()
+        
+        # reservation_time is already in Jakarta timezone, so use it directly
+        reservation_date_jakarta = reservation_time.date()
+        
+        if reservation_date_jakarta < today_jakarta:
+            return Response(
+                {
+                    "error": "Reservation date cannot be in the past",
+                    "reservationDate": reservation_date_jakarta.isoformat(),
+                    "today": today_jakarta.isoformat()
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        # Note: We don't restrict future dates here - if slots exist, allow the reservation
+        # The slot existence check will handle cases where slots haven't been generated
+
+        # Convert reservation_time (UTC+7) to UTC for slot calculation (slots are stored in UTC)
+        reservation_time_utc = reservation_time.astimezone(timezone.utc)
+
+        slot_center = floor_to_slot(reservation_time_utc)
+        window_start = slot_center - timedelta(hours=0)
+        window_end = slot_center + timedelta(hours=2)
+
+        affected_slots = []
+        current = window_start
+        while current <= window_end:
+            affected_slots.append(current)
+            current += timedelta(minutes=30)
+
+        supabase = create_supabase_client()
+        alternative_context = {
+            "supabase": supabase,
+            "brand_id": brand_id,
+            "outlet_id": outlet_id,
+            "requested_slot_utc": slot_center,
+            "pax": pax,
+            "count": _parse_alternative_count(data.get("alternatives")),
+        }
+        
+        # 1️⃣ Idempotency check
+        existing_reservation = supabase.table('ecosuite_reservations').select('id').eq('idempotencyKey', idempotency_key).execute()
+        if existing_reservation.data:
+            return Response(
+                {"reservationId": existing_reservation.data[0]['id'], "status": "already_confirmed"},
+                status=status.HTTP_200_OK,
+            )
+
+        # 2️⃣ Pre-check capacity before calling RPC (defense in depth)
+        slot_starts = [dt.isoformat() for dt in affected_slots]  # keep ISO with timezone (timestamptz[])
+        
+        # Fetch current capacity for all affected slots
+        try:
+            capacity_check_query = supabase.table('ecosuite_capacity_slot').select(
+                'id, slotStart, maxPax, usedPax, maxWaitlistedPax, waitlistedPax'
+            ).eq('brandId', brand_id).eq('outletId', outlet_id).eq('channel', 'both').in_('slotStart', slot_starts).execute()
+            
+            if not capacity_check_query.data or len(capacity_check_query.data) != len(slot_starts):
+                return Response(
+                    {
+                        "error": "CAPACITY_SLOT_NOT_FOUND",
+                        "message": "Some capacity slots have not been generated for this time period",
+                        "expectedSlots": len(slot_starts),
+                        "foundSlots": len(capacity_check_query.data) if capacity_check_query.data else 0
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            
+            # Check capacity for each slot
+            for slot in capacity_check_query.data:
+                slot_max_pax = slot.get('maxPax', 0) or 0
+                slot_used_pax = slot.get('usedPax', 0) or 0
+                slot_max_waitlisted = slot.get('maxWaitlistedPax', 10) or 10
+                slot_waitlisted_pax = slot.get('waitlistedPax', 0) or 0
+                
+                # Check if regular capacity is available
+                regular_capacity_available = (slot_used_pax + pax) <= slot_max_pax
+                
+                # Check if waitlist is overbooked
+                is_waitlist_overbooked = slot_waitlisted_pax > slot_max_waitlisted
+                
+                # Check if waitlist capacity is available (considering overbooking rules)
+                if is_waitlist_overbooked:
+                    # If overbooked, only allow up to 2 pax to be added
+                    waitlist_capacity_available = pax <= 2
+                else:
+                    # Normal case: check if adding pax would exceed max
+                    waitlist_capacity_available = (slot_waitlisted_pax + pax) <= slot_max_waitlisted
+                
+                # If regular capacity is exceeded
+                if not regular_capacity_available:
+                    # Must join waitlist
+                    if not join_waitlist:
+                        return Response(
+                            {
+                                "error": "CAPACITY_EXCEEDED",
+                                "message": f"Capacity exceeded for slot {slot.get('slotStart')}. Regular capacity: {slot_used_pax}/{slot_max_pax}, Requested: {pax}. Please set joinWaitlist=true to join the waitlist.",
+                                "slotStart": slot.get('slotStart'),
+                                "currentUsedPax": slot_used_pax,
+                                "maxPax": slot_max_pax,
+                                "requestedPax": pax,
+                                "alternativeSlots": _suggest_alternative_slots(**alternative_context),
+                            },
+                            status=status.HTTP_409_CONFLICT,
+                        )
+                    
+                    # Check waitlist capacity (with overbooking rules)
+                    if not waitlist_capacity_available:
+                        if is_waitlist_overbooked:
+                            return Response(
+                                {
+                                    "error": "WAITLIST_FULL",
+                                    "message": f"Waitlist is overbooked for slot {slot.get('slotStart')}. Waitlist: {slot_waitlisted_pax}/{slot_max_waitlisted} (overbooked). Only reservations with 2 or fewer guests can join the overbooked waitlist. Requested: {pax}.",
+                                    "slotStart": slot.get('slotStart'),
+                                    "currentWaitlistedPax": slot_waitlisted_pax,
+                                    "maxWaitlistedPax": slot_max_waitlisted,
+                                    "requestedPax": pax,
+                                    "isOverbooked": True,
+                                    "alternativeSlots": _suggest_alternative_slots(**alternative_context),
+                                },
+                                status=status.HTTP_409_CONFLICT,
+                            )
+                        else:
+                            return Response(
+                                {
+                                    "error": "WAITLIST_FULL",
+                                    "message": f"Waitlist is full for slot {slot.get('slotStart')}. Waitlist: {slot_waitlisted_pax}/{slot_max_waitlisted}, Requested: {pax}.",
+                                    "slotStart": slot.get('slotStart'),
+                                    "currentWaitlistedPax": slot_waitlisted_pax,
+                                    "maxWaitlistedPax": slot_max_waitlisted,
+                                    "requestedPax": pax,
+                                    "alternativeSlots": _suggest_alternative_slots(**alternative_context),
+                                },
+                                status=status.HTTP_409_CONFLICT,
+                            )
+        except Exception as capacity_check_error:
+            # If capacity check fails, log but continue to RPC (RPC will do the final check)
+            import traceback
+            if os.getenv('DEBUG', 'False').lower() == 'true':
+                print(f"Capacity pre-check failed (continuing to RPC): {str(capacity_check_error)}")
+                print(traceback.format_exc())
+
+        # 3️⃣, 4️⃣: Update slots and create reservation via RPC (RPC does final atomic check)
+            
+        # Format reservation_time (already in UTC+7) as timestamp without timezone info
+        # This represents the local time in Asia/Jakarta (UTC+7)
+        reservation_datetime_timestamp = reservation_time.strftime('%Y-%m-%d %H:%M:%S')
+        
+        rpc_payload = {
+            "p_brand_id": brand_id,
+            "p_outlet_id": outlet_id,
+            "p_reservation_datetime": reservation_datetime_timestamp,  # timestamp (no tz) - Asia/Jakarta local time
+            "p_slot_starts": slot_starts,  # timestamptz[] - slotStart timestamps
+            "p_pax": pax,  # integer
+            "p_idempotency_key": idempotency_key,  # text
+            "p_channel": channel,  # text
+            "p_customer_name": customer_name,  # text
+            "p_customer_phone": customer_phone,  # text
+            "p_notes": notes,  # text
+            "p_join_waitlist": bool(join_waitlist),  # boolean
+        }
+        
+        # Supabase python returns result.data typically as dict/json;
+        # the direct Postgres backend returns the decoded json the same way
+        data = call_rpc("reserve_slots", rpc_payload, supabase)
+        
+        # Handle case where the RPC result might be None
+        if data is None:
+            return Response(
+                {
+                    "error": "RPC call returned no data",
+                    "message": "The reservation RPC call did not return any data"
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        
+        # Handle known errors if your client surfaces them as exceptions;
+        # otherwise your RPC raises exceptions and Supabase returns an error response.
+        return Response(data, status=status.HTTP_200_OK if data.get("status") != "confirmed" else status.HTTP_201_CREATED)
+
+    except Exception as e:
+        error_str = str(e)
+        import traceback
+        error_details = {
+            "error": error_str,
+            "error_type": type(e).__name__
+        }
+        
+        # Provide more detailed error messages
+        if "CAPACITY_EXCEEDED" in error_str:
+            return Response(
+                {
+                    "error": "CAPACITY_EXCEEDED",
+                    "message": "Capacity exceeded for the requested time period. Please join the waitlist or choose another time.",
+                    "reason": error_str,
+                    "alternativeSlots": _suggest_alternative_slots(**alternative_context) if alternative_context else None,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+        
+        if "WAITLIST_FULL" in error_str:
+            return Response(
+                {
+                    "error": "WAITLIST_FULL",
+                    "message": "Waitlist is full for the requested time period",
+                    "reason": error_str,
+                    "alternativeSlots": _suggest_alternative_slots(**alternative_context) if alternative_context else None,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if "WAITLIST_REQUIRED_DUE_TO_QUEUE" in error_str:
+            return Response(
+                {
+                    "error": "WAITLIST_REQUIRED_DUE_TO_QUEUE",
+                    "message": "There is an existing waitlist queue for this time period. Please set joinWaitlist=true to join the queue.",
+                    "reason": error_str
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+        
+        if "CAPACITY_SLOT_NOT_FOUND" in error_str or "SLOT_NOT_FOUND" in error_str:
+            return Response(
+                {
+                    "error": "CAPACITY_SLOT_NOT_FOUND",
+                    "message": "Capacity slots have not been generated for this time period",
+                    "reason": error_str,
+                    "suggestion": "Run the slot generation endpoint for this brand to create capacity slots"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        if os.getenv('DEBUG', 'False').lower() == 'true':
+            error_details["traceback"] = traceback.format_exc()
+        
+        return Response(
+            error_details,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@gzip_page
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+@renderer_classes(api_settings.DEFAULT_RENDERER_CLASSES + [ColumnarJSONRenderer])
+@query_budget(supabase=1)
+def get_available_capacity_slots(request):
+    """
+    Get all available capacity slots (slots that are not full).
+    
+    A slot is considered available if:
+    - Regular capacity: usedPax < maxPax
+    - Optionally: waitlist capacity available (waitlistedPax < maxWaitlistedPax)
+    
+    Query parameters (GET) or request body (POST):
+    - brandId: Filter by brand ID (optional)
+    - outletId: Filter by outlet ID (optional)
+    - startDate: Filter slots from this date (ISO format, optional, defaults to now)
+    - endDate: Filter slots until this date (ISO format, optional)
+    - includeWaitlistInfo: Include waitlist availability info (boolean, default: true)
+    - limit: Maximum number of results (optional, default: 1000)
+    - offset: Pagination offset (optional, default: 0)
+    - format: 'columnar' to return per-field arrays instead of one object per slot (optional)
+    
+    Returns slots with:
+    - id, brandId, outletId, slotStart, channel
+    - maxPax, usedPax, availablePax (maxPax - usedPax)
+    - maxWaitlistedPax, waitlistedPax, availableWaitlistPax (if includeWaitlistInfo=true)
+    
+    With format=columnar, availableSlots is replaced by 'slots' holding the constant fields once
+    ('constants'), 'baseTime', and per-field arrays in 'columns' (slotStart as slotStartOffsetMinutes
+    from baseTime). Responses are gzip-compressed when the client sends Accept-Encoding: gzip.
+    """
+    supabase = create_supabase_client()
+    try:
+        # Parse request data (support both GET and POST)
+        if request.method == 'GET':
+            data = request.query_params.dict()
+        else:
+            data = request.data
+            if hasattr(data, '_content') and data.get('_content'):
+                import json
+                try:
+                    content_str = data.get('_content')[0] if isinstance(data.get('_content'), list) else data.get('_content')
+                    data = json.loads(content_str)
+                except (json.JSONDecodeError, TypeError, AttributeError):
+                    pass
+            if hasattr(data, 'dict'):
+                data = data.dict()
+            elif hasattr(data, 'get') and not isinstance(data, dict):
+                data = dict(data)
+        
+        brand_id = data.get('brandId')
+        outlet_id = data.get('outletId')
+        start_date_str = data.get('startDate')
+        end_date_str = data.get('endDate')
+        include_waitlist_info = data.get('includeWaitlistInfo', 'true').lower() == 'true'
+        limit = int(data.get('limit', 1000))
+        offset = int(data.get('offset', 0))
+        response_format = data.get('format')
+        is_columnar = response_format == 'columnar'
+        
+        # Get current time for filtering future slots
+        # (truncated to the second so identical requests coalesce; slots start on the minute)
+        now = timezone.now().replace(microsecond=0)
+        now_iso = now.isoformat()
+        
+        # Build query
+        query = supabase.table('ecosuite_capacity_slot').select('id, brandId, outletId, slotStart, channel, maxPax, usedPax, maxWaitlistedPax, waitlistedPax')
+        
+        # Filter by brandId
+        if brand_id:
+            query = query.eq('brandId', brand_id)
+        
+        # Filter by outletId
+        if outlet_id:
+            query = query.eq('outletId', outlet_id)
+        
+        # Filter by date range
+        if start_date_str:
+            try:
+                start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
+                if start_date.tzinfo is None:
+                    start_date = timezone.make_aware(start_date)
+                query = query.gte('slotStart', start_date.isoformat())
+            except (ValueError, AttributeError):
+                return Response(
+                    {"error": "Invalid startDate format. Use ISO format (e.g., 2026-01-01T00:00:00Z)"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            # Default to current time if no startDate provided
+            query = query.gte('slotStart', now_iso)
+        
+        if end_date_str:
+            try:
+                end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
+                if end_date.tzinfo is None:
+                    end_date = timezone.make_aware(end_date)
+                query = query.lte('slotStart', end_date.isoformat())
+            except (ValueError, AttributeError):
+                return Response(
+                    {"error": "Invalid endDate format. Use ISO format (e.g., 2026-01-31T23:59:59Z)"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        # Filter by channel (only 'both' slots)
+        query = query.eq('channel', 'both')
+        
+        # Order by slotStart (ascending)
+        query = query.order('slotStart', desc=False)
+        
+        # Execute query (shared with identical concurrent requests)
+        slots_key = ('capacity-slots', brand_id, outlet_id, start_date_str or now_iso, end_date_str)
+        slots_data = availability_reads.do(slots_key, lambda: query.execute().data or [])
+        
+        if not slots_data:
+            empty_payload = {
+                "message": "No capacity slots found",
+                "count": 0
+            }
+            if is_columnar:
+                empty_payload["slots"] = columnar_slots([], include_waitlist_info)
+            else:
+                empty_payload["availableSlots"] = []
+            return Response(empty_payload, status=status.HTTP_200_OK)
+        
+        # Keep only slots where at least one capacity type is available:
+        # 1. Regular capacity is available (usedPax < maxPax), OR
+        # 2. Waitlist capacity is available (waitlistedPax < maxWaitlistedPax)
+        # If BOTH are full, the slot is NOT available
+        available_rows = [
+            slot for slot in slots_data
+            if (slot.get('usedPax', 0) or 0) < (slot.get('maxPax', 0) or 0)
+            or (slot.get('waitlistedPax', 0) or 0) < (slot.get('maxWaitlistedPax', 10) or 10)
+        ]
+        
+        # Apply pagination
+        total_count = len(available_rows)
+        paginated_rows = available_rows[offset:offset + limit]
+        
+        pagination = {
+            "count": len(paginated_rows),
+            "totalCount": total_count,
+            "offset": offset,
+            "limit": limit,
+            "hasMore": (offset + limit) < total_count
+        }
+        
+        if is_columnar:
+            return Response(
+                {
+                    "message": "Available capacity slots retrieved successfully",
+                    "format": "columnar",
+                    "slots": columnar_slots(paginated_rows, include_waitlist_info),
+                    **pagination
+                },
+                status=status.HTTP_200_OK,
+            )
+        
+        # Calculate total allowed guests for each slot on the page
+        paginated_slots = []
+        for slot in paginated_rows:
+            used_pax = slot.get('usedPax', 0) or 0
+            max_pax = slot.get('maxPax', 0) or 0
+            max_waitlisted = slot.get('maxWaitlistedPax', 10) or 10
+            waitlisted_pax = slot.get('waitlistedPax', 0) or 0
+            
+            # Calculate available capacities
+            available_pax = max_pax - used_pax
+            available_waitlist_pax = max_waitlisted - waitlisted_pax
+            
+            # Calculate total allowed guests (availablePax + availableWaitlistPax)
+            # This can be negative if waitlist is overbooked
+            total_allowed_guests = available_pax + available_waitlist_pax
+            
+            # Check if waitlist is overbooked (availableWaitlistPax < 0)
+            is_waitlist_overbooked = available_waitlist_pax < 0
+            
+            slot_info = {
+                'id': slot.get('id'),
+                'brandId': slot.get('brandId'),
+                'outletId': slot.get('outletId'),
+                'slotStart': slot.get('slotStart'),
+                'channel': slot.get('channel'),
+                'maxPax': max_pax,
+                'usedPax': used_pax,
+                'availablePax': available_pax,
+                'capacityPercentage': round((used_pax / max_pax * 100) if max_pax > 0 else 0, 2),
+                'totalAllowedGuests': total_allowed_guests,
+                'isWaitlistOverbooked': is_waitlist_overbooked
+            }
+            
+            # Include waitlist info if requested
+            if include_waitlist_info:
+                slot_info['maxWaitlistedPax'] = max_waitlisted
+                slot_info['waitlistedPax'] = waitlisted_pax
+                slot_info['availableWaitlistPax'] = available_waitlist_pax
+                slot_info['waitlistCapacityPercentage'] = round((waitlisted_pax / max_waitlisted * 100) if max_waitlisted > 0 else 0, 2)
+            
+            paginated_slots.append(slot_info)
+        
+        return Response(
+            {
+                "message": "Available capacity slots retrieved successfully",
+                "availableSlots": paginated_slots,
+                **pagination
+            },
+            status=status.HTTP_200_OK,
+        )
+    
+    except Exception as e:
+        error_str = str(e)
+        import traceback
+        error_details = {
+            "error": error_str,
+            "error_type": type(e).__name__
+        }
+        
+        if os.getenv('DEBUG', 'False').lower() == 'true':
+            error_details["traceback"] = traceback.format_exc()
+        
+        return Response(
+            error_details,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_read_coalescing_stats(request):
+    """Return single-flight stats for availability reads in this worker (upstream queries made vs saved)."""
+    return Response(availability_reads.stats(), status=status.HTTP_200_OK)
+
+
+@api_view(["GET", "POST"])
+@permission_classes([AllowAny])
+def promoteReservationQueue(request):
+    """
+    Promote the reservation queue by calling the RPC function.
+    This endpoint checks and promotes reservations from the queue, expiring stale leases and promoting new ones.
+    
+    Query parameters:
+    - brandId: Brand ID (required)
+    - outletId: Outlet ID (required)
+    - maxActive: Maximum number of active reservations (optional, default: 5)
+    - reservationMinutes: Minutes until reservation expires (optional, default: 5)
+    """
+    try:
+        # Get brandId and outletId from query parameters
+        brand_id = request.query_params.get('brandId')
+        outlet_id = request.query_params.get('outletId')
+        
+        # Validate required parameters
+        if not brand_id or not outlet_id:
+            return Response(
+                {
+                    "error": "Missing required parameters",
+                    "message": "Both brandId and outletId are required as query parameters"
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Get optional parameters
+        max_active = request.query_params.get('maxActive')
+        reservation_minutes = request.query_params.get('reservationMinutes')
+        
+        # Create Supabase client
+        supabase = create_supabase_client()
+        
+        # Build RPC payload with required parameters
+        # Note: p_max_active and p_reservation_minutes are optional
+        # If not provided, the RPC will use its defaults (5 for both)
+        rpc_payload = {
+            "p_brand_id": brand_id,
+            "p_outlet_id": outlet_id,
+        }
+        
+        # Add optional parameters only if explicitly provided
+        # If not provided, RPC defaults (p_max_active=5, p_reservation_minutes=5) will be used
+        if max_active is not None:
+            try:
+                rpc_payload["p_max_active"] = int(max_active)
+            except ValueError:
+                return Response(
+                    {
+                        "error": "Invalid maxActive parameter",
+                        "message": "maxActive must be a valid integer"
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        if reservation_minutes is not None:
+            try:
+                rpc_payload["p_reservation_minutes"] = int(reservation_minutes)
+            except ValueError:
+                return Response(
+                    {
+                        "error": "Invalid reservationMinutes parameter",
+                        "message": "reservationMinutes must be a valid integer"
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        # Call RPC function to check and promote reservation queue
+        data = call_rpc("check_and_promote_reservation_queue", rpc_payload, supabase)
+        
+        if data is None:
+            return Response(
+                {
+                    "error": "RPC call returned no data",
+                    "message": "The check_and_promote_reservation_queue RPC call did not return any data"
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        
+        # Return RPC result
+        return Response(data, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        error_str = str(e)
+        import traceback
+        error_details = {
+            "error": error_str,
+            "error_type": type(e).__name__
+        }
+        
+        if os.getenv('DEBUG', 'False').lower() == 'true':
+            error_details["traceback"] = traceback.format_exc()
+        
+        return Response(
+            error_details,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
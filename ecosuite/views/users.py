@@ -0,0 +1,279 @@
+import os
+import traceback
+import uuid
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..streaming import iter_pages_by_id, stream_json_object, wants_stream
+from .common import create_supabase_client
+
+
+def index(request):
+    return JsonResponse({"message": "Welcome to Ecosuite API"})
+
+
+def hello(request):
+    return JsonResponse({"message": "Hello from Ecosuite!"})
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def register(request):
+    supabase = create_supabase_client()
+    try:
+        data = request.data.copy()
+        data['password'] = make_password(data['password'])
+        response = supabase.table('ecosuite_users').insert(data).execute()
+
+        return Response({
+            "message": "User registered successfully",
+            "data": response.data
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def save_analytics_data(request):
+    """Save analytics data to Supabase.
+    Expected fields in request body:
+    - type
+    - device
+    - timestamp
+    - tag
+    - brandId
+    Note: id is auto-generated as UUID v4
+    """
+    supabase = create_supabase_client()
+    try:
+        # Extract and validate required fields
+        analytics_type = request.data.get('type')
+        device = request.data.get('device')
+        timestamp = request.data.get('timestamp')
+        tag = request.data.get('tag')
+        brand_id = request.data.get('brandId')
+        
+        # Validate required fields
+        if not analytics_type:
+            return Response({
+                "error": "Missing required field: type"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not device:
+            return Response({
+                "error": "Missing required field: device"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not timestamp:
+            return Response({
+                "error": "Missing required field: timestamp"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not tag:
+            return Response({
+                "error": "Missing required field: tag"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not brand_id:
+            return Response({
+                "error": "Missing required field: brandId"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Prepare data for insertion (id is auto-generated)
+        analytics_data = {
+            'id': str(uuid.uuid4()),
+            'type': analytics_type,
+            'device': device,
+            'timestamp': timestamp,
+            'tag': tag,
+            'brandId': brand_id
+        }
+        
+        # Insert into Supabase
+        response = supabase.table('ecosuite_analytics').insert(analytics_data).execute()
+        
+        return Response({
+            "message": "Analytics data saved successfully",
+            "data": response.data
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        error_details = {
+            "error": str(e),
+            "error_type": type(e).__name__
+        }
+        # Include traceback for debugging (remove in production if needed)
+        if os.getenv('DEBUG', 'False').lower() == 'true':
+            error_details["traceback"] = traceback.format_exc()
+        return Response(error_details, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def login_user(request):
+    supabase = create_supabase_client()
+    try:
+        email = request.data.get('email')
+        password = request.data.get('password')
+
+        # Step 1: Fetch user by email
+        response = supabase.table('ecosuite_users').select('*').eq('email', email).execute()
+        if not response.data:
+            return Response({"error": "Invalid email or password"}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = response.data[0]
+
+        # Step 2: Verify password using Django's built-in hasher
+        if not check_password(password, user['password']):
+            return Response({"error": "Invalid email or password"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Step 3: Generate JWT tokens with Supabase user data in claims
+        # Create a token without Django user - we'll add all user data as claims
+        refresh = RefreshToken()
+        access = refresh.access_token
+
+        # Add all required user claims for authentication (using camelCase)
+        access['id'] = user['id']
+        access['email'] = user['email']
+        access['fullName'] = user.get('fullName', '')
+        access['role'] = user.get('role', 'user')
+        access['isActive'] = user.get('isActive', True)
+        access['phoneNumber'] = user.get('phoneNumber')
+        access['assignedBrandIds'] = user.get('assignedBrandIds', [])
+        access['assignedModuleIds'] = user.get('assignedModuleIds', [])
+        access['preferences'] = user.get('preferences', {})
+        access['dateJoined'] = user.get('dateJoined')
+        access['isPendingApproval'] = user.get('isPendingApproval', False)
+
+        # Add same claims to refresh token
+        refresh['id'] = user['id']
+        refresh['email'] = user['email']
+
+        # Step 5: Return both tokens
+        return Response({
+            "message": "Login successful",
+            "access": str(access),
+            "refresh": str(refresh),
+            "user": {
+                "id": user["id"],
+                "email": user["email"],
+                "fullName": user.get("fullName", ""),
+            }
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def profile(request):
+    # request.user is now a SupabaseUser object from our custom authentication
+    return Response({
+        "message": "JWT verified successfully",
+        "user": {
+            "id": request.user.id,
+            "email": request.user.email,
+            "fullName": request.user.fullName,
+            "role": request.user.role,
+            "isActive": request.user.isActive,
+            "phoneNumber": request.user.phoneNumber,
+            "assignedBrandIds": request.user.assignedBrandIds,
+            "assignedModuleIds": request.user.assignedModuleIds,
+            "preferences": request.user.preferences,
+            "dateJoined": request.user.dateJoined,
+            "isPendingApproval": request.user.isPendingApproval,
+        }
+    })
+
+
+def logout_user(request):
+    supabase = create_supabase_client()
+    try:
+        supabase.table('ecosuite_users').delete().eq('id', request.data.get('id')).execute()
+        return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_all_users(request):
+    """Get all users
+
+    Query parameters:
+    - stream: true to stream the users as they are fetched page by page (constant memory)
+    """
+    supabase = create_supabase_client()
+    try:
+        if wants_stream(request):
+            return stream_json_object(
+                'users',
+                iter_pages_by_id(lambda: supabase.table('ecosuite_users').select('*')),
+                transform=_without_password,
+                request=request,
+            )
+
+        response = supabase.table('ecosuite_users').select('*').execute()
+        users = response.data if response.data else []
+        
+        # Remove password field from each user for security
+        for user in users:
+            if 'password' in user:
+                del user['password']
+        
+        return Response({
+            "users": users
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _without_password(user):
+    user.pop('password', None)
+    return user
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def update_user(request, user_id):
+    """Update an existing user"""
+    supabase = create_supabase_client()
+    try:
+        data = request.data.copy()
+        
+        # Hash password if provided
+        if 'password' in data and data['password']:
+            data['password'] = make_password(data['password'])
+        
+        # Update timestamp if field exists
+        if 'updatedAt' in data or 'dateJoined' in data:
+            data['updatedAt'] = timezone.now().isoformat()
+        
+        # Update user
+        response = supabase.table('ecosuite_users').update(data).eq('id', user_id).execute()
+        
+        if response.data:
+            # Remove password from response for security
+            user_data = response.data[0].copy()
+            if 'password' in user_data:
+                del user_data['password']
+            
+            return Response({
+                "message": "User updated successfully",
+                "user": user_data
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({"error": "User not found or update failed"}, status=status.HTTP_404_NOT_FOUND)
+            
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,40 @@
+# gunicorn reads this file from the working directory (/code in the Dockerfile).
+import os
+import shutil
+import threading
+
+# Workers save their metrics here and /metrics sums them (taratechapi.metrics.write_snapshot)
+os.environ.setdefault('METRICS_DIR', '/tmp/taratechapi-metrics')
+
+
+def on_starting(server):
+    # Snapshots left by a previous run would be added to this run's totals
+    if os.environ['METRICS_DIR']:
+        shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+
+
+def _warm_up(worker):
+    try:
+        from ecosuite.views import warm_up
+        brands = warm_up()
+        worker.log.info(f"Worker {worker.pid} warmed up: Supabase client connected, {brands} brands cached")
+    except Exception as e:
+        worker.log.warning(f"Worker {worker.pid} warm-up failed: {e}")
+
+
+def post_worker_init(worker):
+    # Each worker, once the app is loaded: import supabase, connect the shared client and
+    # load the brand cache, so the first request on a freshly started machine doesn't
+    # pay for it. Runs on its own thread; the worker accepts requests meanwhile.
+    if os.getenv('ECOSUITE_WARM_UP', 'True').lower() == 'true':
+        threading.Thread(target=_warm_up, args=(worker,), name='warm-up', daemon=True).start()
+    # Renew the Qontak CRM token before it expires; the refresh lock keeps the workers
+    # from refreshing it more than once
+    if os.getenv('CQ_HOTPOT_CRM_TOKEN_REFRESHER', 'True').lower() == 'true':
+        from chongqinghotpot.views import start_crm_token_refresher
+        start_crm_token_refresher()
+    # Flush Qontak webhook events and CRM syncs a previous run left in the local buffers
+    from chongqinghotpot.views import message_interaction_buffer
+    from ecosuite.views import crm_sync_queue
+    message_interaction_buffer.start()
+    crm_sync_queue.start()
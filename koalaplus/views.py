@@ -1,11 +1,14 @@
 from django.shortcuts import render
 import requests
 import json
+import httpx
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 
+from taratechapi.async_api import async_api_view, async_client, json_response
+
 # Create your views here.
 @api_view(['GET', 'POST'])
 @permission_classes([AllowAny])
@@ -103,9 +106,8 @@ def refresh_access_token(request):
             "message": str(e)
         }, status=error_status)
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def get_broadcast_templates(request):
+@async_api_view(['GET'])
+async def get_broadcast_templates(request):
     """Get all broadcast templates from Koala Plus."""
     url = "https://api.koalaapp.id/v1/plus/broadcast/template/list"
     headers = {}
@@ -116,24 +118,23 @@ def get_broadcast_templates(request):
         headers['Authorization'] = auth_header
     
     try:
-        response = requests.get(url, headers=headers)
+        response = await async_client().get(url, headers=headers)
         response.raise_for_status()
-        return Response(response.json(), status=status.HTTP_200_OK)
-    except requests.exceptions.RequestException as e:
+        return json_response(response.json(), status=status.HTTP_200_OK)
+    except (httpx.HTTPError, ValueError) as e:
         error_status = e.response.status_code if hasattr(e, 'response') and e.response else status.HTTP_500_INTERNAL_SERVER_ERROR
-        return Response({
+        return json_response({
             "error": "Failed to get broadcast templates",
             "message": str(e)
         }, status=error_status)
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def broadcast_otp(request):
+@async_api_view(['POST'])
+async def broadcast_otp(request):
     """Broadcast OTP to a phone number via Koala Plus."""
     phone_number = request.data.get('phone_number')
     
     if not phone_number:
-        return Response({
+        return json_response({
             "error": "phone_number is required"
         }, status=status.HTTP_400_BAD_REQUEST)
     
@@ -169,12 +170,12 @@ def broadcast_otp(request):
         headers['x-kokatto-token'] = 'Bearer '
     
     try:
-        response = requests.post(url, headers=headers, data=payload)
+        response = await async_client().post(url, headers=headers, content=payload)
         response.raise_for_status()
-        return Response(response.json(), status=status.HTTP_200_OK)
-    except requests.exceptions.RequestException as e:
+        return json_response(response.json(), status=status.HTTP_200_OK)
+    except (httpx.HTTPError, ValueError) as e:
         error_status = e.response.status_code if hasattr(e, 'response') and e.response else status.HTTP_500_INTERNAL_SERVER_ERROR
-        return Response({
+        return json_response({
             "error": "Failed to broadcast OTP",
             "message": str(e)
         }, status=error_status)
@@ -436,14 +437,13 @@ def trial_broadcast(request):
             "message": str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def broadcast_reservation_success(request):
+@async_api_view(['POST'])
+async def broadcast_reservation_success(request):
     """Broadcast successful reservation notification. Token is received in request body."""
     # Get token from request body
     token = request.data.get('token')
     if not token:
-        return Response({
+        return json_response({
             "error": "token is required in request body"
         }, status=status.HTTP_400_BAD_REQUEST)
     
@@ -461,36 +461,36 @@ def broadcast_reservation_success(request):
     
     # Validate campaignName
     if not campaign_name:
-        return Response({
+        return json_response({
             "error": "campaignName is required"
         }, status=status.HTTP_400_BAD_REQUEST)
     
     # Validate templateId
     if not template_id:
-        return Response({
+        return json_response({
             "error": "templateId is required"
         }, status=status.HTTP_400_BAD_REQUEST)
     
     # Validate notificationData
     if not notification_data:
-        return Response({
+        return json_response({
             "error": "notificationData is required"
         }, status=status.HTTP_400_BAD_REQUEST)
     
     if not isinstance(notification_data, list):
-        return Response({
+        return json_response({
             "error": "notificationData must be an array"
         }, status=status.HTTP_400_BAD_REQUEST)
     
     # Validate each notification data item and normalize phone numbers
     for item in notification_data:
         if not isinstance(item, dict):
-            return Response({
+            return json_response({
                 "error": "Each item in notificationData must be an object"
             }, status=status.HTTP_400_BAD_REQUEST)
         
         if 'phoneNumber' not in item:
-            return Response({
+            return json_response({
                 "error": "phoneNumber is required in each notificationData item"
             }, status=status.HTTP_400_BAD_REQUEST)
         
@@ -502,7 +502,7 @@ def broadcast_reservation_success(request):
         
         # paramData is optional according to docs, but validate if provided
         if 'paramData' in item and not isinstance(item['paramData'], list):
-            return Response({
+            return json_response({
                 "error": "paramData must be an array"
             }, status=status.HTTP_400_BAD_REQUEST)
     
@@ -531,7 +531,7 @@ def broadcast_reservation_success(request):
     
     try:
         # Use data= with JSON string as shown in docs example
-        broadcast_response = requests.post(broadcast_url, headers=broadcast_headers, data=broadcast_payload)
+        broadcast_response = await async_client().post(broadcast_url, headers=broadcast_headers, content=broadcast_payload)
         
         # Check status before raising
         if broadcast_response.status_code >= 400:
@@ -545,7 +545,7 @@ def broadcast_reservation_success(request):
                     "note": "Response is not valid JSON"
                 }
             
-            return Response({
+            return json_response({
                 "error": "Failed to broadcast reservation success",
                 "message": f"{broadcast_response.status_code} Client Error",
                 "status_code": broadcast_response.status_code,
@@ -567,9 +567,9 @@ def broadcast_reservation_success(request):
             }, status=broadcast_response.status_code)
         
         broadcast_response.raise_for_status()
-        return Response(broadcast_response.json(), status=status.HTTP_200_OK)
+        return json_response(broadcast_response.json(), status=status.HTTP_200_OK)
         
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         # Get more details from the error response
         error_details = {}
         response_text = ""
@@ -629,16 +629,16 @@ def broadcast_reservation_success(request):
             }
         }
         
-        return Response(error_response, status=status_code)
-    except requests.exceptions.RequestException as e:
+        return json_response(error_response, status=status_code)
+    except (httpx.HTTPError, ValueError) as e:
         error_status = e.response.status_code if hasattr(e, 'response') and e.response else status.HTTP_500_INTERNAL_SERVER_ERROR
-        return Response({
+        return json_response({
             "error": "Failed to broadcast reservation success",
             "message": str(e)
         }, status=error_status)
     except Exception as e:
         # Catch any other unexpected exceptions
-        return Response({
+        return json_response({
             "error": "Unexpected error occurred",
             "message": str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
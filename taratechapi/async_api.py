@@ -0,0 +1,102 @@
+import asyncio
+import functools
+import json
+import weakref
+
+import httpx
+from django.contrib.auth.models import AnonymousUser
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+
+
+# Upstream calls (ESB, Pivot, Koala, Mekari) get the same 20 s budget the sync views used
+UPSTREAM_TIMEOUT = httpx.Timeout(20.0, connect=5.0)
+UPSTREAM_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def async_client():
+    """
+    httpx.AsyncClient shared by every async view running on the current event loop.
+
+    Under the ASGI server there is one loop per worker, so upstream connections
+    (and their TLS sessions) are pooled across requests. Under WSGI each async
+    view runs on its own short-lived loop and gets a fresh client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=UPSTREAM_TIMEOUT, limits=UPSTREAM_LIMITS)
+        _clients[loop] = client
+    return client
+
+
+def json_response(data, status=200, headers=None):
+    return JsonResponse(data, status=status, headers=headers, safe=False, encoder=DjangoJSONEncoder)
+
+
+def _request_data(request):
+    if request.method in ('GET', 'HEAD', 'DELETE', 'OPTIONS'):
+        return {}
+    content_type = request.content_type or ''
+    if content_type.endswith('json'):
+        return json.loads(request.body or b'{}')
+    if content_type in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+        return request.POST.dict()
+    return {}
+
+
+def _authenticate(request):
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authentication_class().authenticate(request)
+        if result is not None:
+            return result[0]
+    return AnonymousUser()
+
+
+def async_api_view(methods, require_authentication=False):
+    """
+    Async counterpart of @api_view for views that mostly wait on upstream APIs.
+
+    DRF views are synchronous, so under ASGI each one holds a thread for as long as
+    its upstream call takes. Views decorated with this are plain Django coroutines
+    instead: they await async_client() and free the worker while waiting. The
+    decorator provides the parts of @api_view these views rely on: the allowed
+    methods, request.data (JSON or form body), request.query_params, request.user
+    from the default authentication classes, and CSRF exemption. Return
+    json_response(...) instead of Response(...).
+    """
+    allowed = [method.upper() for method in methods]
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in allowed:
+                return json_response(
+                    {"detail": f'Method "{request.method}" not allowed.'},
+                    status=405,
+                    headers={'Allow': ', '.join(allowed)},
+                )
+            try:
+                request.data = _request_data(request)
+            except ValueError as e:
+                return json_response({"detail": f"JSON parse error - {e}"}, status=400)
+            request.query_params = request.GET
+
+            try:
+                request.user = _authenticate(request)
+            except AuthenticationFailed as e:
+                return json_response({"detail": e.detail}, status=401)
+            if require_authentication and not request.user.is_authenticated:
+                return json_response({"detail": "Authentication credentials were not provided."}, status=401)
+
+            return await view(request, *args, **kwargs)
+
+        # django.views.decorators.csrf.csrf_exempt only wraps sync views on Django 4.2
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
@@ -0,0 +1,280 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .metrics import Counter, Gauge, Histogram, register
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    record TEXT NOT NULL,
+    enqueuedAt REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    availableAt REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS failed_events (
+    seq INTEGER PRIMARY KEY,
+    record TEXT NOT NULL,
+    enqueuedAt REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    failedAt REAL NOT NULL
+);
+"""
+
+# Buffers whose depth is reported on /metrics (DurableBuffer.register_metrics)
+_buffers = []
+_buffers_lock = threading.Lock()
+
+
+def _buffer_depths():
+    depths = {}
+    for buffer in list(_buffers):
+        stats = buffer.stats()
+        depths[(buffer.table, 'pending')] = stats['pending']
+        depths[(buffer.table, 'failed')] = stats['failed']
+    return depths
+
+
+def _buffer_ages():
+    return {(buffer.table,): buffer.stats()['oldestAgeSeconds'] for buffer in list(_buffers)}
+
+
+FLUSH_DURATION = register(Histogram(
+    'taratech_buffer_flush_duration_seconds',
+    'Time to send one batch of buffered events, by table and outcome.',
+    ('table', 'outcome'),
+))
+FLUSHED_EVENTS = register(Counter(
+    'taratech_buffer_flushed_events_total',
+    'Buffered events sent, by table.',
+    ('table',),
+))
+register(Gauge(
+    'taratech_buffer_events',
+    'Events in local buffers, by table and state (pending or failed).',
+    ('table', 'state'),
+    collect=_buffer_depths,
+))
+register(Gauge(
+    'taratech_buffer_oldest_event_age_seconds',
+    'Age of the oldest pending event in each local buffer, by table.',
+    ('table',),
+    collect=_buffer_ages,
+))
+
+
+class DurableBuffer:
+    """
+    Durable local queue in front of a Supabase write, so callers can return without
+    waiting on Supabase and nothing queued is lost when a worker dies.
+
+    append() commits the record to a SQLite file (WAL, synchronous=FULL) and returns.
+    A daemon thread per worker claims up to batch_size records at a time and hands
+    them to deliver() as one request. A failed batch is split in half and retried,
+    down to single records, so one rejected record does not hold back the rest.
+    Records that still fail go back with exponential backoff; records that failed
+    max_attempts times move to failed_events, and requeue_failed() puts them back.
+    Workers on a host share the file and claim records in a transaction, so no
+    record is sent by two flushers at once. A claim expires after claim_timeout
+    seconds, so records held by a worker that died are picked up again.
+
+    Subclasses implement deliver(). table names the destination in stats and metrics.
+    """
+
+    def __init__(self, path, table, batch_size=200, flush_interval=1.0, max_attempts=8, claim_timeout=60):
+        self.path = str(path)
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {
+            'appended': 0,
+            'batches': 0,
+            'flushed': 0,
+            'failedBatches': 0,
+        }
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=FULL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def append(self, record):
+        now = time.time()
+        self._connection().execute(
+            'INSERT INTO events (record, enqueuedAt, availableAt) VALUES (?, ?, ?)',
+            (json.dumps(record), now, now),
+        )
+        with self._lock:
+            self._stats['appended'] += 1
+        self.start()
+        return True
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f'buffer-flush-{self.table}', daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                sent = self.flush_once()
+            except Exception as e:
+                logger.warning(f"Buffer flush for {self.table} failed: {e}")
+                sent = 0
+            if sent < self.batch_size:
+                time.sleep(self.flush_interval)
+
+    def _claim(self):
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            rows = connection.execute(
+                'SELECT seq, record, attempts FROM events WHERE availableAt <= ? ORDER BY seq LIMIT ?',
+                (now, self.batch_size),
+            ).fetchall()
+            if rows:
+                connection.execute(
+                    f"UPDATE events SET availableAt = ? WHERE seq IN ({','.join('?' * len(rows))})",
+                    (now + self.claim_timeout, *(seq for seq, _, _ in rows)),
+                )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return rows
+
+    def flush_once(self):
+        """Claim and insert one batch; returns the number of events sent."""
+        rows = self._claim()
+        if not rows:
+            return 0
+        return self._send(rows)
+
+    def deliver(self, records):
+        """
+        Send records with one request. Raise when the request fails as a whole;
+        return [(index, error)] for records rejected on their own, or None.
+        """
+        raise NotImplementedError
+
+    def _send(self, rows):
+        started = time.perf_counter()
+        records = [json.loads(record) for _, record, _ in rows]
+        try:
+            rejected = dict(self.deliver(records) or [])
+        except Exception as e:
+            FLUSH_DURATION.observe((self.table, 'failed'), time.perf_counter() - started)
+            if len(rows) > 1:
+                middle = len(rows) // 2
+                return self._send(rows[:middle]) + self._send(rows[middle:])
+            rejected = {0: str(e)}
+        else:
+            FLUSH_DURATION.observe((self.table, 'ok'), time.perf_counter() - started)
+
+        delivered = [row for i, row in enumerate(rows) if i not in rejected]
+        if delivered:
+            FLUSHED_EVENTS.inc((self.table,), len(delivered))
+            seqs = [seq for seq, _, _ in delivered]
+            self._connection().execute(f"DELETE FROM events WHERE seq IN ({','.join('?' * len(seqs))})", seqs)
+            with self._lock:
+                self._stats['batches'] += 1
+                self._stats['flushed'] += len(delivered)
+        for i, error in rejected.items():
+            with self._lock:
+                self._stats['failedBatches'] += 1
+            self._retry_later([rows[i]], error)
+            logger.warning(f"Buffered event {rows[i][0]} for {self.table} failed: {error}")
+        return len(delivered)
+
+    def _retry_later(self, rows, error):
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for seq, _, attempts in rows:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    connection.execute(
+                        'INSERT INTO failed_events (seq, record, enqueuedAt, attempts, error, failedAt) '
+                        'SELECT seq, record, enqueuedAt, ?, ?, ? FROM events WHERE seq = ?',
+                        (attempts, error, now, seq),
+                    )
+                    connection.execute('DELETE FROM events WHERE seq = ?', (seq,))
+                else:
+                    connection.execute(
+                        'UPDATE events SET attempts = ?, availableAt = ? WHERE seq = ?',
+                        (attempts, now + min(300, 2 ** attempts), seq),
+                    )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def requeue_failed(self):
+        """Move every failed_events row back into events, due now; returns how many were moved."""
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            moved = connection.execute(
+                'INSERT INTO events (seq, record, enqueuedAt, attempts, availableAt) '
+                'SELECT seq, record, enqueuedAt, 0, ? FROM failed_events',
+                (now,),
+            ).rowcount
+            connection.execute('DELETE FROM failed_events')
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return moved
+
+    def flush(self):
+        """Send everything that is due from the calling thread."""
+        while self.flush_once() == self.batch_size:
+            pass
+
+    def stats(self):
+        connection = self._connection()
+        pending, oldest = connection.execute('SELECT COUNT(*), MIN(enqueuedAt) FROM events').fetchone()
+        failed = connection.execute('SELECT COUNT(*) FROM failed_events').fetchone()[0]
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending'] = pending
+        stats['failed'] = failed
+        stats['oldestAgeSeconds'] = round(time.time() - oldest, 1) if oldest is not None else 0
+        return stats
+
+    def register_atexit(self):
+        atexit.register(self.flush)
+        return self
+
+    def register_metrics(self):
+        """Report the buffer depth and the age of its oldest event on /metrics."""
+        with _buffers_lock:
+            if self not in _buffers:
+                _buffers.append(self)
+        return self
@@ -0,0 +1,56 @@
+import contextlib
+import fcntl
+import os
+import time
+import uuid
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache as DjangoFileBasedCache
+
+
+class LockTimeout(Exception):
+    """cache_lock could not get its lock within the wait time."""
+
+
+class FileBasedCache(DjangoFileBasedCache):
+    """
+    Django's FileBasedCache with an add() that is atomic across processes: the
+    check and the write happen under an flock on the cache directory. Workers on
+    one host share the directory, so cache_lock works between them.
+    """
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        with open(os.path.join(self._dir, 'add.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            return super().add(key, value, timeout, version)
+
+
+@contextlib.contextmanager
+def cache_lock(name, timeout=30, wait=10, poll=0.05, alias='default'):
+    """
+    Hold the lock name across every process sharing the cache, e.g. so only one
+    worker refreshes a token while the others wait and then read its result.
+
+    The lock is a cache.add() of a unique token. It expires after timeout seconds
+    even if its holder dies. Yields the seconds spent waiting for it (0.0 if it
+    was free). Raises LockTimeout when the lock is still held after wait seconds;
+    with wait=0 it is tried once.
+    """
+    cache = caches[alias]
+    key = f'lock:{name}'
+    token = uuid.uuid4().hex
+    started = time.monotonic()
+    waited = 0.0
+    while not cache.add(key, token, timeout=timeout):
+        waited = time.monotonic() - started
+        if waited >= wait:
+            raise LockTimeout(f"Lock {name} is still held after {wait}s")
+        time.sleep(poll)
+    try:
+        yield waited
+    finally:
+        # Only delete our own lock; after timeout it may belong to someone else
+        if cache.get(key) == token:
+            cache.delete(key)
@@ -0,0 +1,610 @@
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+
+# Backend call kinds: Supabase REST queries, Supabase/Postgres RPCs, Django ORM queries
+# and other upstream HTTP APIs
+SUPABASE = 'supabase'
+RPC = 'rpc'
+DB = 'db'
+UPSTREAM = 'upstream'
+BACKEND_KINDS = (SUPABASE, RPC, DB, UPSTREAM)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_timings', default=None)
+# Set while timer() measures a call, so the SQL it runs is not counted again as ORM queries
+_in_timer = contextvars.ContextVar('in_timer', default=False)
+_installed = False
+_install_lock = threading.Lock()
+_snapshot_writer = None
+
+
+class Histogram:
+    """Prometheus histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labels, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['count'] += 1
+            series['sum'] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {**value, 'buckets': list(value['buckets'])} for key, value in self._series.items()}
+
+    @staticmethod
+    def merge(series, other):
+        """Add another worker's snapshot into series."""
+        for label_values, data in other.items():
+            current = series.get(label_values)
+            if current is None:
+                series[label_values] = {**data, 'buckets': list(data['buckets'])}
+            else:
+                current['buckets'] = [a + b for a, b in zip(current['buckets'], data['buckets'])]
+                current['count'] += data['count']
+                current['sum'] += data['sum']
+
+    def render(self, series=None):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        if series is None:
+            series = self.snapshot()
+        for label_values, data in sorted(series.items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            for bound, count in zip(self.buckets, data['buckets']):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {data["count"]}')
+            lines.append(f'{self.name}_sum{{{labels}}} {data["sum"]}')
+            lines.append(f'{self.name}_count{{{labels}}} {data["count"]}')
+        return '\n'.join(lines)
+
+
+class Counter:
+    """Prometheus counter keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def value(self, label_values=()):
+        with self._lock:
+            return self._series.get(label_values, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._series)
+
+    @staticmethod
+    def merge(series, other):
+        """Add another worker's snapshot into series."""
+        for label_values, count in other.items():
+            series[label_values] = series.get(label_values, 0) + count
+
+    def render(self, series=None):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        if series is None:
+            series = self.snapshot()
+        for label_values, count in sorted(series.items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            lines.append(f'{self.name}{{{labels}}} {count}' if labels else f'{self.name} {count}')
+        return '\n'.join(lines)
+
+
+class Gauge:
+    """
+    Prometheus gauge whose values are read at scrape time: collect() returns {label values: value}.
+
+    Only the worker serving the scrape collects it, so collect() should read state the
+    workers share (a file, the database) rather than per-worker counts.
+    """
+
+    def __init__(self, name, help_text, labels, collect):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.collect = collect
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for label_values, value in sorted(self.collect().items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            lines.append(f'{self.name}{{{labels}}} {value}' if labels else f'{self.name} {value}')
+        return '\n'.join(lines)
+
+
+def register(metric):
+    """Add metric (anything with render(); with snapshot() and merge() to be summed across workers) to /metrics."""
+    if metric not in _registry:
+        _registry.append(metric)
+    return metric
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'taratech_request_duration_seconds',
+    'Wall time of each request, by URL name.',
+    ('view', 'method', 'status'),
+)
+BACKEND_DURATION = Histogram(
+    'taratech_backend_call_duration_seconds',
+    'Duration of Supabase queries, RPCs and upstream HTTP calls, by URL name.',
+    ('view', 'kind', 'target'),
+)
+BACKEND_CALLS_PER_REQUEST = Histogram(
+    'taratech_backend_calls_per_request',
+    'Number of backend calls made while serving one request, by URL name.',
+    ('view', 'kind'),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+_registry = [REQUEST_DURATION, BACKEND_DURATION, BACKEND_CALLS_PER_REQUEST]
+
+
+class RequestTimings:
+    """Backend calls made while serving one request (shared with threads the view hands work to)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def add(self, kind, target, duration):
+        with self._lock:
+            self.calls.append((kind, target, duration))
+
+    def totals(self):
+        """{(kind, host): (count, seconds)}; host is only set for upstream calls."""
+        totals = {}
+        with self._lock:
+            calls = list(self.calls)
+        for kind, target, duration in calls:
+            key = (kind, target if kind == UPSTREAM else '')
+            count, seconds = totals.get(key, (0, 0.0))
+            totals[key] = (count + 1, seconds + duration)
+        return totals
+
+
+def current_timings():
+    """RequestTimings of the request being served, or None outside RequestMetricsMiddleware."""
+    return _current.get()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return (match.url_name or match.view_name) if match is not None else 'unresolved'
+
+
+def record(kind, target, duration):
+    """Record one backend call against the current request, or directly when there is none."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(kind, target, duration)
+    else:
+        BACKEND_DURATION.observe(('background', kind, target), duration)
+
+
+@contextlib.contextmanager
+def timer(kind, target):
+    """Time a backend call that does not go through an instrumented HTTP client."""
+    started = time.perf_counter()
+    token = _in_timer.set(True)
+    try:
+        yield
+    finally:
+        _in_timer.reset(token)
+        record(kind, target, time.perf_counter() - started)
+
+
+def _supabase_hosts():
+    hosts = set()
+    for env_name in ('TARA_TECH_SUPABASE_CLIENT_URL', 'CQ_HOTPOT_SUPABASE_CLIENT_URL'):
+        url = os.getenv(env_name)
+        if url:
+            hosts.add(urlsplit(url).hostname)
+    return hosts
+
+
+_REST_PATH_RE = re.compile(r'^/rest/v1/(rpc/)?([^/?]+)')
+
+
+def classify(url):
+    """(kind, target) for an outbound request URL."""
+    parts = urlsplit(str(url))
+    host = parts.hostname or ''
+    if host in _supabase_hosts() or host.endswith('.supabase.co'):
+        match = _REST_PATH_RE.match(parts.path)
+        if match:
+            return (RPC if match.group(1) else SUPABASE), match.group(2)
+        return SUPABASE, parts.path.strip('/').split('/', 1)[0] or host
+    return UPSTREAM, host
+
+
+def _timed_send(send):
+    def wrapper(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return send(self, request, *args, **kwargs)
+        finally:
+            record(*classify(request.url), time.perf_counter() - started)
+    return wrapper
+
+
+def _timed_async_send(send):
+    async def wrapper(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await send(self, request, *args, **kwargs)
+        finally:
+            record(*classify(request.url), time.perf_counter() - started)
+    return wrapper
+
+
+def _db_execute_wrapper(execute, sql, params, many, context):
+    if _in_timer.get():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record(DB, context['connection'].alias, time.perf_counter() - started)
+
+
+def _wrap_connection(connection, **kwargs):
+    if _db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_execute_wrapper)
+
+
+def install_instrumentation():
+    """
+    Time every request sent through httpx (the Supabase client, async views) and
+    requests, and every Django ORM query.
+
+    Patches the HTTP send methods once per process, so calls made anywhere, including
+    module-level requests.post(...), are attributed to the request being served.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        httpx.Client.send = _timed_send(httpx.Client.send)
+        httpx.AsyncClient.send = _timed_async_send(httpx.AsyncClient.send)
+        requests.Session.send = _timed_send(requests.Session.send)
+        connection_created.connect(_wrap_connection, dispatch_uid='taratechapi.metrics')
+        for connection in connections.all(initialized_only=True):
+            _wrap_connection(connection)
+        _installed = True
+
+
+def _warn_repeated_calls(view, timings):
+    # The same table or function queried over and over in one request is usually a loop
+    # doing one round trip per item (N+1); upstream calls are left to query budgets
+    threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 10)
+    repeats = {}
+    for kind, target, _ in list(timings.calls):
+        if kind != UPSTREAM:
+            repeats[(kind, target)] = repeats.get((kind, target), 0) + 1
+    for (kind, target), count in sorted(repeats.items()):
+        if count >= threshold:
+            logger.warning(f"Possible N+1 in {view}: {count} {kind} calls to {target} in one request")
+
+
+def server_timing(timings, total, hosts=False):
+    """
+    Server-Timing header value: total, then count and time per backend kind.
+
+    With hosts, upstream calls are split by host; the header reaches every client,
+    so this is left to SERVER_TIMING_HOSTS.
+    """
+    totals = {}
+    for (kind, host), (count, seconds) in timings.totals().items():
+        key = (kind, host if hosts else '')
+        total_count, total_seconds = totals.get(key, (0, 0.0))
+        totals[key] = (total_count + count, total_seconds + seconds)
+    entries = [f"total;dur={total * 1000:.1f}"]
+    for (kind, host), (count, seconds) in sorted(totals.items()):
+        desc = f"{host} x{count}" if host else f"x{count}"
+        entries.append(f'{kind};desc="{desc}";dur={seconds * 1000:.1f}')
+    return ', '.join(entries)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure every request: wall time, and the number and duration of Supabase
+    queries, RPCs and upstream calls made while serving it.
+
+    Adds a Server-Timing header and feeds the histograms exposed by metrics_view,
+    labelled by URL name. Histograms are kept per worker process and summed across
+    workers at scrape time (see write_snapshot). Streaming responses are timed until
+    they are closed; their Server-Timing header only covers the time to first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        install_instrumentation()
+        start_snapshot_writer()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings)
+
+    def _finish(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        view = view_name(request)
+        labels = (view, request.method, str(response.status_code))
+
+        if response.streaming:
+            # The body is still to be sent: time the request when the server closes the response
+            response._resource_closers.append(
+                lambda: REQUEST_DURATION.observe(labels, time.perf_counter() - timings.started)
+            )
+        else:
+            REQUEST_DURATION.observe(labels, total)
+        counts = dict.fromkeys(BACKEND_KINDS, 0)
+        for kind, target, duration in list(timings.calls):
+            BACKEND_DURATION.observe((view, kind, target), duration)
+            counts[kind] += 1
+        for kind, count in counts.items():
+            BACKEND_CALLS_PER_REQUEST.observe((view, kind), count)
+
+        _warn_repeated_calls(view, timings)
+        response['Server-Timing'] = server_timing(timings, total, hosts=getattr(settings, 'SERVER_TIMING_HOSTS', False))
+        return response
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _call_counts(calls):
+    counts = dict.fromkeys(BACKEND_KINDS, 0)
+    for kind, _, _ in calls:
+        counts[kind] += 1
+    return counts
+
+
+@contextlib.contextmanager
+def count_calls():
+    """
+    Count backend calls made inside the block, by kind; yields a dict filled in on exit.
+
+    Inside a request the calls are also part of the request's timings; outside one
+    (management commands, tests calling views directly) the block gets its own.
+    """
+    install_instrumentation()
+    timings = _current.get()
+    token = None
+    if timings is None:
+        timings = RequestTimings()
+        token = _current.set(timings)
+    start = len(timings.calls)
+    counts = {}
+    try:
+        yield counts
+    finally:
+        if token is not None:
+            _current.reset(token)
+        counts.update(_call_counts(timings.calls[start:]))
+
+
+def check_query_budget(name, budget, counts, strict=None):
+    """Warn (or raise QueryBudgetExceeded when strict) if counts go over budget."""
+    counts = {**counts, 'total': sum(counts.values())}
+    over = [
+        f"{kind} {counts.get(kind, 0)}/{limit}"
+        for kind, limit in budget.items()
+        if limit is not None and counts.get(kind, 0) > limit
+    ]
+    if not over:
+        return
+    message = f"{name} exceeded its query budget: {', '.join(over)}"
+    if strict is None:
+        strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+    if strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def query_budget(supabase=None, rpc=None, db=None, upstream=None, total=None):
+    """
+    Declare how many backend round trips one call of a view may make.
+
+    Exceeding a limit logs a warning, or raises QueryBudgetExceeded when
+    settings.QUERY_BUDGET_STRICT is on (as it is under manage.py test), so a
+    view that starts making extra round trips fails its tests. Put it directly
+    above the def, below @api_view / @async_api_view. None means no limit.
+    """
+    budget = {'supabase': supabase, 'rpc': rpc, 'db': db, 'upstream': upstream, 'total': total}
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def wrapper(*args, **kwargs):
+                with count_calls() as counts:
+                    response = await view(*args, **kwargs)
+                check_query_budget(view.__name__, budget, counts)
+                return response
+        else:
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                with count_calls() as counts:
+                    response = view(*args, **kwargs)
+                check_query_budget(view.__name__, budget, counts)
+                return response
+        wrapper.query_budget = budget
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def assert_query_budget(supabase=None, rpc=None, db=None, upstream=None, total=None):
+    """Test helper: fail if the block makes more backend calls than allowed."""
+    budget = {'supabase': supabase, 'rpc': rpc, 'db': db, 'upstream': upstream, 'total': total}
+    with count_calls() as counts:
+        yield counts
+    check_query_budget('block', budget, counts, strict=True)
+
+
+def _snapshot_path(directory, pid):
+    return os.path.join(directory, f'{pid}.json')
+
+
+def write_snapshot(directory=None):
+    """
+    Save this worker's counters and histograms to METRICS_DIR/<pid>.json.
+
+    gunicorn puts every worker behind one port, so a scrape reaches whichever worker
+    accepts it; metrics_view adds the other workers' latest snapshots to its own.
+    Files of workers that have exited are kept, so totals do not drop when a worker
+    is replaced; gunicorn.conf.py empties the directory when the server starts.
+    """
+    directory = directory or settings.METRICS_DIR
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    data = {
+        metric.name: [[list(label_values), value] for label_values, value in metric.snapshot().items()]
+        for metric in _registry
+        if hasattr(metric, 'snapshot')
+    }
+    path = _snapshot_path(directory, os.getpid())
+    with open(f'{path}.tmp', 'w') as snapshot_file:
+        json.dump(data, snapshot_file)
+    os.replace(f'{path}.tmp', path)
+
+
+def _other_worker_snapshots(directory):
+    snapshots = []
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return snapshots
+    own = os.path.basename(_snapshot_path(directory, os.getpid()))
+    for name in names:
+        if not name.endswith('.json') or name == own:
+            continue
+        try:
+            with open(os.path.join(directory, name)) as snapshot_file:
+                data = json.load(snapshot_file)
+        except (OSError, ValueError):
+            continue
+        snapshots.append({
+            metric_name: {tuple(label_values): value for label_values, value in series}
+            for metric_name, series in data.items()
+        })
+    return snapshots
+
+
+def _write_snapshots(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_snapshot()
+        except Exception as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+
+
+def start_snapshot_writer():
+    """Write this worker's snapshot every METRICS_WRITE_INTERVAL seconds and at exit (when METRICS_DIR is set)."""
+    global _snapshot_writer
+    if not settings.METRICS_DIR:
+        return
+    with _install_lock:
+        if _snapshot_writer is not None:
+            return
+        _snapshot_writer = threading.Thread(
+            target=_write_snapshots, args=(settings.METRICS_WRITE_INTERVAL,), name='metrics-snapshot', daemon=True,
+        )
+        _snapshot_writer.start()
+        atexit.register(write_snapshot)
+
+
+def render_metrics():
+    """Prometheus text exposition of every registered metric, counters and histograms summed across workers."""
+    others = _other_worker_snapshots(settings.METRICS_DIR) if settings.METRICS_DIR else []
+    parts = []
+    for metric in _registry:
+        if hasattr(metric, 'snapshot'):
+            series = metric.snapshot()
+            for snapshot in others:
+                metric.merge(series, snapshot.get(metric.name, {}))
+            parts.append(metric.render(series))
+        else:
+            parts.append(metric.render())
+    return '\n'.join(parts) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus metrics for the whole server. Requires Authorization: Bearer <METRICS_TOKEN>;
+    when METRICS_TOKEN is not set the endpoint is closed.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponse(status=403)
+    if request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
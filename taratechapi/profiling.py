@@ -0,0 +1,134 @@
+import cProfile
+import hmac
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import current_timings, view_name
+
+
+PROFILE_HEADER = 'X-Profile-Token'
+
+# cProfile can only have one active profiler per process on Python 3.12+, so a
+# request is profiled only when no other one is; concurrent requests run normally
+_profiling = threading.Lock()
+
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in cProfile of single requests, for finding where a slow endpoint spends its time.
+
+    A request is profiled when it carries X-Profile-Token: <PROFILING_TOKEN>, or at
+    random for a PROFILING_SAMPLE_RATE fraction of requests. Each profile is saved
+    to PROFILING_DIR as <id>.prof (read with python -m pstats) next to <id>.json
+    holding the URL name, status, duration and backend call totals; only the newest
+    PROFILING_MAX_FILES profiles are kept. Profiled responses carry X-Profile-Id.
+
+    With no token and a zero sample rate (the default) the middleware removes
+    itself at startup. Under ASGI the profile of an async view also includes
+    whatever else the event loop ran while the view was awaiting.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.token = getattr(settings, 'PROFILING_TOKEN', '')
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        if not self.token and self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.directory = Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+        self.max_files = getattr(settings, 'PROFILING_MAX_FILES', 200)
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _trigger(self, request):
+        supplied = request.headers.get(PROFILE_HEADER)
+        if supplied and self.token and hmac.compare_digest(supplied, self.token):
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        trigger = self._trigger(request)
+        if trigger is None or not _profiling.acquire(blocking=False):
+            return self.get_response(request)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profile.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.disable()
+        finally:
+            _profiling.release()
+        return self._save(request, response, profile, trigger, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None or not _profiling.acquire(blocking=False):
+            return await self.get_response(request)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profile.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profile.disable()
+        finally:
+            _profiling.release()
+        return self._save(request, response, profile, trigger, time.perf_counter() - started)
+
+    def _save(self, request, response, profile, trigger, duration):
+        view = view_name(request)
+        now = datetime.now(dt_timezone.utc)
+        profile_id = f"{now:%Y%m%dT%H%M%S}-{view}-{os.getpid()}-{random.randrange(16 ** 4):04x}"
+        timings = current_timings()
+        backend_calls = [
+            {'kind': kind, 'target': target, 'count': count, 'durationMs': round(seconds * 1000, 1)}
+            for (kind, target), (count, seconds) in sorted(timings.totals().items())
+        ] if timings is not None else []
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.directory / f'{profile_id}.prof')
+            (self.directory / f'{profile_id}.json').write_text(json.dumps({
+                'id': profile_id,
+                'urlName': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'durationMs': round(duration * 1000, 1),
+                'backendCalls': backend_calls,
+                'trigger': trigger,
+                'pid': os.getpid(),
+                'createdAt': now.isoformat(),
+            }, indent=2))
+            self._prune()
+        except OSError as e:
+            print(f"Failed to save request profile {profile_id}: {e}")
+            return response
+
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def _prune(self):
+        profiles = sorted(self.directory.glob('*.prof'), key=lambda path: path.stat().st_mtime)
+        for path in profiles[:max(0, len(profiles) - self.max_files)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix('.json').unlink(missing_ok=True)
@@ -14,6 +14,7 @@ from pathlib import Path
 import os
 from datetime import timedelta
 import environ
+from corsheaders.defaults import default_headers
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -63,6 +64,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'taratechapi.metrics.RequestMetricsMiddleware',
+    'taratechapi.profiling.RequestProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -75,6 +78,11 @@ MIDDLEWARE = [
 
 CORS_ALLOW_ALL_ORIGINS = True # or set a whitelist
 
+# Let browser clients read the pagination cursor of list-shaped responses and
+# revalidate polled reads with ETag / If-None-Match; Server-Timing carries per-request backend timings
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'Link', 'ETag', 'Server-Timing']
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match', 'last-event-id')
+
 # CORS_ALLOWED_ORIGINS = [
 #     "http://localhost:4838",  # Your Flutter web dev origin
 # ]
@@ -112,21 +120,76 @@ DATABASES = {
         'PASSWORD': 'TaraTech2025',
         'HOST': 'ecosuite.taratech.id',
         'PORT': '5432',
+        # Keep connections open between requests so direct RPC calls skip the
+        # TCP/TLS/auth handshake; health checks drop connections the server closed.
+        'CONN_MAX_AGE': env.int('DATABASE_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
-# Cache configuration
-# Using locmem cache (in-memory) - works without database connection
-# Note: Tokens will be lost on server restart. For persistence, use database cache:
-# 'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-# 'LOCATION': 'django_cache_table',
-# Then run: python manage.py createcachetable
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'crm-oauth-tokens',
+# Backend used to call ecosuite Postgres functions: 'supabase' (PostgREST RPC over
+# HTTPS) or 'postgres' (direct call over the DATABASES connection above).
+# ECOSUITE_RPC_BACKENDS overrides it per function, e.g.
+# ECOSUITE_RPC_BACKENDS=reserve_slots=postgres,rebuild_capacity_slots=postgres
+ECOSUITE_RPC_BACKEND = env('ECOSUITE_RPC_BACKEND', default='supabase')
+ECOSUITE_RPC_BACKENDS = env.dict('ECOSUITE_RPC_BACKENDS', default={})
+ECOSUITE_RPC_DATABASE = 'default'
+
+# Views declare how many Supabase/RPC/ORM/upstream round trips they may make with
+# taratechapi.metrics.query_budget. Going over logs a warning; with QUERY_BUDGET_STRICT
+# it raises instead; the test runner turns it on, so regressions fail the tests.
+QUERY_BUDGET_STRICT = env.bool('QUERY_BUDGET_STRICT', default=False)
+TEST_RUNNER = 'taratechapi.test_runner.TestRunner'
+# Requests that hit the same table/function this many times are logged as possible N+1 loops
+QUERY_REPEAT_THRESHOLD = env.int('QUERY_REPEAT_THRESHOLD', default=10)
+
+# Opt-in request profiling (taratechapi.profiling): requests sent with
+# X-Profile-Token: <PROFILING_TOKEN>, and a PROFILING_SAMPLE_RATE fraction of all
+# requests, run under cProfile and are saved to PROFILING_DIR. Off when both are unset.
+PROFILING_TOKEN = env('PROFILING_TOKEN', default='')
+PROFILING_SAMPLE_RATE = env.float('PROFILING_SAMPLE_RATE', default=0.0)
+PROFILING_DIR = env('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = env.int('PROFILING_MAX_FILES', default=200)
+
+# /metrics (taratechapi.metrics) answers only requests sent with
+# Authorization: Bearer <METRICS_TOKEN>, and is closed when it is unset. With
+# METRICS_DIR set (gunicorn.conf.py sets it), each worker saves its counters there
+# every METRICS_WRITE_INTERVAL seconds and a scrape sums them across workers.
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+METRICS_DIR = env('METRICS_DIR', default='')
+METRICS_WRITE_INTERVAL = env.float('METRICS_WRITE_INTERVAL', default=5.0)
+# Name upstream hosts in the Server-Timing header; it is sent to every client, so off by default
+SERVER_TIMING_HOSTS = env.bool('SERVER_TIMING_HOSTS', default=False)
+
+# Cache shared by every worker on the host: the Qontak CRM OAuth tokens live here,
+# and a refresh in one worker rotates the refresh token for all of them. Set
+# REDIS_URL (needs the redis package) to share it across hosts instead.
+# taratechapi.cache.cache_lock takes its locks in this cache.
+REDIS_URL = env('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'taratechapi.cache.FileBasedCache',
+            'LOCATION': env('CACHE_DIR', default=str(BASE_DIR / 'cache')),
+        }
+    }
+
+# Local SQLite buffer for Qontak message interaction webhooks (chongqinghotpot). Events
+# wait here until they are inserted into Supabase, so keep it on a volume that survives
+# deploys (fly.toml mounts one at /data). Events that gave up are put back with
+# manage.py requeue_failed_webhook_events.
+QONTAK_WEBHOOK_BUFFER_PATH = env('QONTAK_WEBHOOK_BUFFER_PATH', default=str(BASE_DIR / 'buffers' / 'qontak_webhooks.sqlite3'))
+
+# Local SQLite buffer for CRM customer syncs queued by reservation saves (ecosuite.crm_sync);
+# on the same volume as the webhook buffer.
+ECOSUITE_CRM_SYNC_BUFFER_PATH = env('ECOSUITE_CRM_SYNC_BUFFER_PATH', default=str(BASE_DIR / 'buffers' / 'crm_sync.sqlite3'))
 
 
 # Password validation
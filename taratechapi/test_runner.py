@@ -0,0 +1,18 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    manage.py test runner that makes query budgets strict, so a view that starts
+    making extra round trips fails its tests instead of logging a warning.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._strict_query_budgets = override_settings(QUERY_BUDGET_STRICT=True)
+        self._strict_query_budgets.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._strict_query_budgets.disable()
+        super().teardown_test_environment(**kwargs)
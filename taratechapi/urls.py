@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from . import views
+from .metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,6 +28,7 @@ urlpatterns = [
     path('api/ecosuite/', include('ecosuite.urls')),
     path('api/koalaplus/', include('koalaplus.urls')),
     path('healthz', views.healthz, name='healthz'),
+    path('metrics', metrics_view, name='metrics'),
     
      
 ]